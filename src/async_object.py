@@ -1,32 +1,103 @@
 import asyncio
-from typing import List, Coroutine, Any, Union, Optional
+import inspect
+import time
+from collections import deque
+from typing import List, Coroutine, Any, Union, Optional, Callable, Set, Dict, Deque, Tuple
+
+from src.timer_wheel import TimerHandle, timer_wheel
+from src.utils import logger
+
+DEFAULT_TASK_GROUP = 'default'
+
+MAX_RECENT_TASK_ERRORS = 20
 
 
 class AsyncObject:
     """
     Manages asynchronous tasks within the application, ensuring that all tasks are properly canceled and cleaned up
     when the AsyncObject is no longer needed.
+
+    Tasks are dropped as soon as they finish, so only running tasks are held. Every task belongs to a named group,
+    groups are cancelled in ``teardown_order`` on cleanup_async and the rest afterwards.
     """
 
-    _async_tasks: List[asyncio.Task]
-    """List of tasks"""
+    teardown_order: Tuple[str, ...] = ()
+    """Task groups cancelled (and awaited) one after the other on cleanup_async, before any remaining group"""
+
+    _async_tasks: Dict[asyncio.Task, str]
+    """Running tasks and their group"""
+
+    _task_groups: Dict[str, Dict[asyncio.Task, float]]
+    """Running tasks by group, with the monotonic time they were started"""
+
+    _task_counters: Dict[str, int]
+    """Number of tasks created, completed, failed and cancelled over the lifetime of this object"""
+
+    _recent_task_errors: Deque[Dict[str, Any]]
+    """The last few task failures"""
+
+    _timer_handles: Set[TimerHandle]
+    """Pending timers on the shared timer wheel"""
 
     def __init__(self):
-        self._async_tasks: List[asyncio.Task] = []
+        self._async_tasks: Dict[asyncio.Task, str] = {}
+        self._task_groups: Dict[str, Dict[asyncio.Task, float]] = {}
+        self._task_counters: Dict[str, int] = {'created': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+        self._recent_task_errors: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECENT_TASK_ERRORS)
+        self._timer_handles: Set[TimerHandle] = set()
 
     def cleanup(self):
-        for task in self._async_tasks:
-            task.cancel()
+        self._cancel_timers()
 
-        self._async_tasks.clear()
+        for task in list(self._async_tasks):
+            task.cancel()
 
     async def cleanup_async(self):
-        """Cancel all tracked tasks and wait for them to finish."""
-        for task in self._async_tasks:
+        """Cancel all tracked tasks group by group, in teardown order, and wait for them to finish."""
+        self._cancel_timers()
+
+        for group in self.teardown_order:
+            await self.cancel_group_async(group)
+        for group in list(self._task_groups):
+            await self.cancel_group_async(group)
+
+    def cancel_group(self, group: str) -> None:
+        for task in list(self._task_groups.get(group, ())):
             task.cancel()
 
-        await asyncio.gather(*self._async_tasks, return_exceptions=True)
-        self._async_tasks.clear()
+    async def cancel_group_async(self, group: str) -> None:
+        """Cancel every running task of a group and wait until they have finished, except the calling task."""
+        current = asyncio.current_task()
+        tasks = [task for task in self._task_groups.get(group, ()) if task is not current]
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def task_snapshot(self) -> Dict[str, Any]:
+        """Counters, running tasks by group and the most recent failures of this object's tasks."""
+        now = time.monotonic()
+        return {
+            **self._task_counters,
+            'running': len(self._async_tasks),
+            'groups': {
+                group: [
+                    {
+                        'name': task.get_name(),
+                        'coroutine': getattr(task.get_coro(), '__qualname__', str(task.get_coro())),
+                        'age_s': round(now - started_at, 3),
+                    }
+                    for task, started_at in tasks.items()
+                ]
+                for group, tasks in self._task_groups.items()
+            },
+            'recent_errors': list(self._recent_task_errors),
+            'pending_timers': len(self._timer_handles),
+        }
+
+    def on_task_exception(self, task: asyncio.Task, exception: BaseException) -> None:
+        """Called when a tracked task raises. Override to route task failures, by default they are logged."""
+        logger.error(f'Task {task.get_name()} of {self.__class__.__name__} failed: {exception!r}', exc_info=exception)
 
     @staticmethod
     async def _gather_coroutines(coroutines: List[Coroutine[Any, Any, Any]]):
@@ -36,32 +107,94 @@ class AsyncObject:
             self,
             coroutine: Union[Coroutine[Any, Any, Any], List[Coroutine[Any, Any, Any]]],
             *,
-            delay: Optional[float] = None
+            delay: Optional[float] = None,
+            group: str = DEFAULT_TASK_GROUP,
     ) -> asyncio.Task:
         """Start an async task and add it to the task list."""
 
         if delay is None:
-            return self._create_task_sync(coroutine)
+            return self._create_task_sync(coroutine, group)
         else:
-            return asyncio.create_task(self._create_task_async(coroutine, delay))
+            return self._create_task_sync(self._create_task_async(coroutine, delay, group), group)
 
     async def _create_task_async(
             self,
             coroutine: Union[Coroutine[Any, Any, Any], List[Coroutine[Any, Any, Any]]],
-            delay: float
+            delay: float,
+            group: str,
     ) -> asyncio.Task:
         await asyncio.sleep(delay)
-        return self._create_task_sync(coroutine)
+        return self._create_task_sync(coroutine, group)
 
     def _create_task_sync(
             self,
             coroutine: Union[Coroutine[Any, Any, Any], List[Coroutine[Any, Any, Any]]],
+            group: str = DEFAULT_TASK_GROUP,
     ) -> asyncio.Task:
         if isinstance(coroutine, list):
             task = asyncio.create_task(self._gather_coroutines(coroutine))
         else:
             task = asyncio.create_task(coroutine)
 
-        self._async_tasks.append(task)
+        self._async_tasks[task] = group
+        self._task_groups.setdefault(group, {})[task] = time.monotonic()
+        self._task_counters['created'] += 1
+        task.add_done_callback(self._on_task_done)
 
         return task
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        group = self._async_tasks.pop(task, DEFAULT_TASK_GROUP)
+        group_tasks = self._task_groups.get(group)
+        if group_tasks is not None:
+            group_tasks.pop(task, None)
+            if not group_tasks:
+                del self._task_groups[group]
+
+        if task.cancelled():
+            self._task_counters['cancelled'] += 1
+            return
+
+        exception = task.exception()
+        if exception is None:
+            self._task_counters['completed'] += 1
+            return
+
+        self._task_counters['failed'] += 1
+        self._recent_task_errors.append({
+            'name': task.get_name(),
+            'group': group,
+            'error': repr(exception),
+            'at': time.time(),
+        })
+        try:
+            self.on_task_exception(task, exception)
+        except Exception as e:
+            logger.exception(f'on_task_exception of {self.__class__.__name__} failed: {e}')
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        """
+        Run a callback after a delay on the shared timer wheel, without keeping a sleeping task alive in the meantime.
+        Coroutine functions are started as a tracked task when the timer fires. Pending timers are cancelled on cleanup.
+        """
+        def fire() -> None:
+            self._timer_handles.discard(handle)
+            if inspect.iscoroutinefunction(callback):
+                self._create_task_sync(callback(*args))
+            else:
+                callback(*args)
+
+        handle = timer_wheel.call_later(delay, fire)
+        self._timer_handles.add(handle)
+        return handle
+
+    def cancel_timer(self, handle: Optional[TimerHandle]) -> None:
+        if handle is not None:
+            handle.cancel()
+            self._timer_handles.discard(handle)
+
+    def _cancel_timers(self) -> None:
+        for handle in self._timer_handles:
+            handle.cancel()
+
+        self._timer_handles.clear()
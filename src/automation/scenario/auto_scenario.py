@@ -41,7 +41,7 @@ class AutoScenario(BaseAutomation[AutoScenarioConfig]):
             "message_mode": "async",
             "agent_callbacks": self.config.agent_callbacks,
         }
-        self.scenario = scenario_manager.create_scenario(
+        self.scenario = await scenario_manager.create_scenario_async(
             self.instance, override_settings
         )
 
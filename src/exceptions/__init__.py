@@ -1,3 +1,3 @@
-from .scenario import BaseScenarioException, ScenarioAwakeException, ScenarioStartException, ScenarioStepException, ScenarioLateStepException, ScenarioUpdateException
+from .scenario import BaseScenarioException, ScenarioAwakeException, ScenarioStartException, ScenarioStepException, ScenarioLateStepException, ScenarioUpdateException, ScenarioOwnedByWorkerException
 from .websocket import BaseWebsocketException, WebsocketTimeoutException, WebsocketScenarioNotFoundException, WebsocketInitializeScenarioException, WebsocketReceiveException, WebsocketHandleMessageException
 
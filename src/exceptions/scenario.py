@@ -42,3 +42,13 @@ class ScenarioUpdateException(BaseScenarioException):
     """Raised when there is an error during the update of the scenario"""
     def __init__(self, *args):
         super().__init__('update', *args)
+
+
+class ScenarioOwnedByWorkerException(BaseQuiplyException):
+    """Raised when the scenario runs on another worker and the call can only be made on that worker"""
+
+    worker_id: str
+
+    def __init__(self, scenario_instance_id: str, worker_id: str):
+        self.worker_id = worker_id
+        super().__init__(f'Scenario {scenario_instance_id} is owned by worker {worker_id}')
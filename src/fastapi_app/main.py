@@ -8,8 +8,19 @@ from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
 from starlette.websockets import WebSocket
 
+from src.framework.runnables.generators.audio import AudioGenerationParams, get_audio_cache
+from src.framework.runnables.generators.audio.services import get_audio_generation_service
+from src.framework.runnables.generators.clients import client_registry, get_default_providers
+from src.framework.runnables.generators.diarization.vad import get_voice_activity_detector
+from src.framework.runnables.generators.moderation.services import get_moderation_service
+from src.framework.runnables.generators.speech_to_text.services import get_speech_to_text_generation_service
+from src.framework.runnables.generators.text import tokenizer_registry
+from src.framework.settings import framework_settings
+from src.framework.utils import get_audio_decoder_pool
 from src.settings import quiply_settings, FastAPISettings
+from src.utils import loggers
 from src.scenario import scenario_manager
+from src.services import async_storage_service, derived_content_cache
 from src.websocket.error_handler import handle_websocket_exception
 from ..exceptions import BaseWebsocketException
 
@@ -50,9 +61,92 @@ class QuiplyAPI(FastAPI):
         @self.on_event("startup")
         async def startup_event():
             asyncio.create_task(debug_worker())
+            self._registry_heartbeat = asyncio.create_task(scenario_manager.maintain_registry_async())
+            if client_registry.settings.warm_up:
+                client_registry.warm_up(get_default_providers())
+            if framework_settings.runnables.generators.codec.warm_up:
+                get_audio_decoder_pool().warm_up()
+            await self._warm_up_speech_to_text()
+            await self._warm_up_tokenizers()
+            await self._warm_up_moderation()
+            await asyncio.get_running_loop().run_in_executor(None, get_voice_activity_detector().warm_up)
+            # Generating the lines calls the text to speech service, the app starts without waiting for them
+            self._audio_cache_prewarm = asyncio.create_task(self._warm_up_audio_cache())
             for callback in self._startup_callbacks:
                 callback()
 
+        @self.on_event("shutdown")
+        async def shutdown_event():
+            self._registry_heartbeat.cancel()
+            scenario_manager.close_registry()
+            await client_registry.aclose()
+            if framework_settings.runnables.generators.audio.enabled:
+                from src.framework.runnables.generators.audio.services.eleven_labs.transport import eleven_labs_transport
+                await eleven_labs_transport.aclose()
+            get_audio_decoder_pool().close()
+            if (audio_cache := get_audio_cache()) is not None:
+                await audio_cache.flush()
+            await derived_content_cache.flush()
+            await async_storage_service.flush_writes()
+            async_storage_service.close()
+
+    @staticmethod
+    async def _warm_up_speech_to_text():
+        stt_settings = framework_settings.runnables.generators.speech_to_text
+        if not stt_settings.enabled or not stt_settings.get_service_value(stt_settings.service_name, 'preload_on_startup'):
+            return
+        service = get_speech_to_text_generation_service(stt_settings.service_name)
+        await asyncio.get_running_loop().run_in_executor(None, service.warm_up)
+
+    @staticmethod
+    async def _warm_up_tokenizers():
+        text_settings = framework_settings.runnables.generators.text
+        if not text_settings.enabled or not text_settings.warm_up_tokenizers:
+            return
+        models = [(text_settings.generation_params or {}).get('model')]
+        models += [service.get('default_model') for service in (text_settings.services or {}).values()]
+        await asyncio.get_running_loop().run_in_executor(None, tokenizer_registry.warm_up, models)
+
+    @staticmethod
+    async def _warm_up_moderation():
+        moderation_settings = framework_settings.runnables.generators.moderation
+        if not moderation_settings.enabled or not moderation_settings.get_service_value('transformers', 'preload_on_startup'):
+            return
+        service = get_moderation_service('transformers')
+        await asyncio.get_running_loop().run_in_executor(None, service.warm_up)
+
+    @staticmethod
+    async def _warm_up_audio_cache():
+        audio_settings = framework_settings.runnables.generators.audio
+        cache = get_audio_cache()
+        if not audio_settings.enabled or cache is None or not audio_settings.cache.prewarm_on_startup:
+            return
+
+        # The default voice and the voices of the default actors of every scenario in the app package
+        default_params = AudioGenerationParams.model_validate(audio_settings.generation_params or {})
+        voice_ids = {default_params.voice_id}
+        for scenario in await async_storage_service.get_scenario_schemas():
+            for actor_id in scenario.actor_settings.default_actor_ids or []:
+                try:
+                    actor = await async_storage_service.get_actor_template(actor_id)
+                except Exception:
+                    continue
+                if actor is not None and actor.selected_voice_id:
+                    voice_ids.add(actor.selected_voice_id)
+
+        service = get_audio_generation_service(audio_settings.service_name)
+        requests = [
+            (line, default_params.model_copy(update={'voice_id': voice_id}))
+            for voice_id in voice_ids
+            for line in audio_settings.cache.prewarm_lines
+        ]
+        generated = await cache.prewarm(
+            requests,
+            lambda text, params: service.generate_async(request=text, generation_params=params),
+            audio_settings.cache.prewarm_concurrency,
+        )
+        loggers.framework.info(f'Prewarmed the audio cache: generated {generated} of {len(requests)} lines')
+
     def register_middlewares(self):
         self.add_middleware(
             CORSMiddleware,
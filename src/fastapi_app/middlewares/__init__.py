@@ -1 +1,2 @@
 from .firebase_auth import FirebaseAuthMiddleware
+from .token_verifier import CachedTokenVerifier, FirebaseTokenVerifier, GooglePublicKeys, get_token_verifier
@@ -1,28 +1,49 @@
-from devtools import debug
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from fastapi import Request, Response
-from firebase_admin import auth as firebase_auth
+from typing import Optional
+
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .token_verifier import CachedTokenVerifier, get_token_verifier
+
+
+class FirebaseAuthMiddleware:
+    """
+    Checks the Firebase ID token in the Authorization header of every HTTP request and stores its claims in the
+    request state (``request.state.user``).
 
+    A pure ASGI middleware: verified requests are passed on untouched, so streaming responses are not buffered through
+    an extra task like with BaseHTTPMiddleware. Websockets and CORS preflight requests are passed on unchecked.
+    """
 
-class FirebaseAuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        if request.method == "OPTIONS":
-            return await call_next(request)
+    def __init__(self, app: ASGIApp, verifier: Optional[CachedTokenVerifier] = None):
+        self.app = app
+        self._verifier = verifier
 
-        authorization: str = request.headers.get("Authorization")
+    @property
+    def verifier(self) -> CachedTokenVerifier:
+        if self._verifier is None:
+            self._verifier = get_token_verifier()
+        return self._verifier
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['method'] == 'OPTIONS':
+            await self.app(scope, receive, send)
+            return
+
+        authorization = Headers(scope=scope).get('authorization')
         if not authorization:
-            return JSONResponse({"detail": "Authorization header is missing"}, status_code=401)
+            response = JSONResponse({"detail": "Authorization header is missing"}, status_code=401)
+            await response(scope, receive, send)
+            return
 
         token = authorization.split(" ")[-1]
         try:
-            decoded_token = firebase_auth.verify_id_token(token)
-            request.state.user = decoded_token  # Store user information in request state
-        except Exception as e:
-            return JSONResponse({"detail": "Invalid or expired token"}, status_code=403)
+            decoded_token = await self.verifier.verify(token)
+        except Exception:
+            response = JSONResponse({"detail": "Invalid or expired token"}, status_code=403)
+            await response(scope, receive, send)
+            return
 
-        try:
-            response = await call_next(request)
-        except Exception as e:
-            raise e
-        return response
+        scope.setdefault('state', {})['user'] = decoded_token  # Store user information in request state
+        await self.app(scope, receive, send)
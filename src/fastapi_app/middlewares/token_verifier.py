@@ -0,0 +1,284 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from firebase_admin import auth as firebase_auth
+from google.auth import crypt
+
+from src.framework.utils.lru_cache import LRUCache
+from src.settings.fastapi import FirebaseAuthSettings
+from src.utils.logging import loggers
+
+ID_TOKEN_CERT_URL = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+
+Claims = Dict[str, Any]
+CertificateFetch = Callable[[str], Tuple[Dict[str, str], Dict[str, str]]]
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+
+
+def fetch_certificates(url: str, timeout: float = 10.0) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """The PEM certificates by key id served at ``url``, and the response headers."""
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.json(), dict(response.headers)
+
+
+class GooglePublicKeys:
+    """
+    The public keys Google signs Firebase ID tokens with, by key id.
+
+    The certificates are fetched once and kept for the max-age of the ``Cache-Control`` header of the response, Google
+    rotates its keys well within that time. A key id that is not known triggers a refresh, at most once every
+    ``min_refresh_interval`` seconds, so that tokens signed with a new key are accepted right away.
+    """
+
+    def __init__(
+            self,
+            url: str = ID_TOKEN_CERT_URL,
+            fetch: Optional[CertificateFetch] = None,
+            clock: Callable[[], float] = time.monotonic,
+            default_max_age: float = 300.0,
+            min_refresh_interval: float = 30.0,
+    ):
+        self._url = url
+        self._fetch = fetch or fetch_certificates
+        self._clock = clock
+        self._default_max_age = default_max_age
+        self._min_refresh_interval = min_refresh_interval
+
+        self._verifiers: Dict[str, crypt.Verifier] = {}
+        self._expires_at = 0.0
+        self._fetched_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._fetches = 0
+
+    def get(self, key_id: str) -> Optional[crypt.Verifier]:
+        now = self._clock()
+        verifiers = self._verifiers
+        if now < self._expires_at and key_id in verifiers:
+            return verifiers[key_id]
+
+        with self._lock:
+            # Another thread may have refreshed the keys while this one waited
+            if self._clock() >= self._expires_at or (key_id not in self._verifiers and self._may_refresh()):
+                self._refresh()
+            return self._verifiers.get(key_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'keys': len(self._verifiers),
+            'fetches': self._fetches,
+            'expires_in': max(0.0, self._expires_at - self._clock()),
+        }
+
+    def _may_refresh(self) -> bool:
+        return self._fetched_at is None or self._clock() - self._fetched_at >= self._min_refresh_interval
+
+    def _refresh(self) -> None:
+        try:
+            certificates, headers = self._fetch(self._url)
+        except Exception as e:
+            raise firebase_auth.CertificateFetchError(f'Failed to fetch the Google public certificates: {e}', e)
+
+        self._verifiers = {key_id: crypt.RSAVerifier.from_string(pem) for key_id, pem in certificates.items()}
+        self._fetched_at = self._clock()
+        self._expires_at = self._fetched_at + self._max_age(headers)
+        self._fetches += 1
+        loggers.fastapi.debug(f'Fetched {len(self._verifiers)} Google public keys')
+
+    def _max_age(self, headers: Dict[str, str]) -> float:
+        cache_control = next((value for name, value in headers.items() if name.lower() == 'cache-control'), '')
+        match = _MAX_AGE.search(cache_control)
+        return float(match.group(1)) if match else self._default_max_age
+
+
+class FirebaseTokenVerifier:
+    """
+    Verifies Firebase ID tokens like ``firebase_admin.auth.verify_id_token`` and raises the same errors, but checks the
+    signature with the public keys of a GooglePublicKeys, which are parsed once instead of on every call.
+    """
+
+    def __init__(
+            self,
+            project_id: str,
+            public_keys: Optional[GooglePublicKeys] = None,
+            clock_skew_seconds: int = 0,
+            clock: Callable[[], float] = time.time,
+    ):
+        if not project_id:
+            raise ValueError('A project id is required to verify Firebase ID tokens')
+        self._project_id = project_id
+        self._issuer = ID_TOKEN_ISSUER_PREFIX + project_id
+        self._public_keys = public_keys or GooglePublicKeys()
+        self._clock_skew = clock_skew_seconds
+        self._clock = clock
+
+    @property
+    def public_keys(self) -> GooglePublicKeys:
+        return self._public_keys
+
+    def __call__(self, token: str) -> Claims:
+        return self.verify(token)
+
+    def verify(self, token: str) -> Claims:
+        try:
+            header_segment, payload_segment, signature_segment = token.split('.')
+            header = json.loads(_b64decode(header_segment))
+            claims = json.loads(_b64decode(payload_segment))
+            signature = _b64decode(signature_segment)
+        except ValueError as e:
+            raise firebase_auth.InvalidIdTokenError(f'Malformed ID token: {e}', cause=e)
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise firebase_auth.InvalidIdTokenError('Malformed ID token')
+
+        self._check_claims(header, claims)
+
+        verifier = self._public_keys.get(header['kid'])
+        if verifier is None:
+            raise firebase_auth.InvalidIdTokenError(f'ID token signed with an unknown key "{header["kid"]}"')
+        if not verifier.verify(f'{header_segment}.{payload_segment}'.encode(), signature):
+            raise firebase_auth.InvalidIdTokenError('ID token has an invalid signature')
+
+        self._check_times(claims)
+        claims['uid'] = claims['sub']
+        return claims
+
+    def _check_claims(self, header: Dict[str, Any], claims: Claims) -> None:
+        error = None
+        if not header.get('kid'):
+            error = 'Firebase ID token has no "kid" claim'
+        elif header.get('alg') != 'RS256':
+            error = f'Firebase ID token has incorrect algorithm. Expected "RS256" but got "{header.get("alg")}"'
+        elif claims.get('aud') != self._project_id:
+            error = f'Firebase ID token has incorrect "aud" (audience) claim "{claims.get("aud")}"'
+        elif claims.get('iss') != self._issuer:
+            error = f'Firebase ID token has incorrect "iss" (issuer) claim "{claims.get("iss")}"'
+        elif not isinstance(claims.get('sub'), str) or not claims['sub'] or len(claims['sub']) > 128:
+            error = 'Firebase ID token has an invalid "sub" (subject) claim'
+        elif not isinstance(claims.get('iat'), (int, float)) or not isinstance(claims.get('exp'), (int, float)):
+            error = 'Firebase ID token has no "iat" (issued at) or "exp" (expires) claim'
+        if error:
+            raise firebase_auth.InvalidIdTokenError(error)
+
+    def _check_times(self, claims: Claims) -> None:
+        now = self._clock()
+        if claims['iat'] > now + self._clock_skew:
+            raise firebase_auth.InvalidIdTokenError(f'Token used too early, {claims["iat"]} > {now}')
+        if claims['exp'] < now - self._clock_skew:
+            error = ValueError(f'Token expired, {claims["exp"]} < {now}')
+            raise firebase_auth.ExpiredIdTokenError(str(error), error)
+
+
+class CachedTokenVerifier:
+    """
+    Verifies ID tokens off the event loop and remembers the claims of verified tokens until they expire.
+
+    Tokens are cached by their SHA-256 hash, for at most ``cache_max_ttl`` seconds and never past their ``exp`` claim.
+    Concurrent verifications of the same token share one call of ``verify``, which runs on a small thread pool.
+    Tokens that fail verification are not cached. Every call returns its own copy of the claims.
+    """
+
+    def __init__(
+            self,
+            verify: Callable[[str], Claims],
+            settings: FirebaseAuthSettings,
+            clock: Callable[[], float] = time.time,
+    ):
+        self._verify = verify
+        self._settings = settings
+        self._clock = clock
+        self._cache: LRUCache[bytes, Tuple[Claims, float]] = LRUCache(settings.cache_max_size)
+        self._pending: Dict[bytes, asyncio.Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=settings.max_workers, thread_name_prefix='auth')
+        self._counters: Dict[str, int] = dict.fromkeys(('verifications', 'failures', 'shared', 'expired'), 0)
+
+    async def verify(self, token: str) -> Claims:
+        key = hashlib.sha256(token.encode()).digest()
+        if self._settings.cache_enabled:
+            entry = self._cache.get(key)
+            if entry is not None:
+                claims, expires_at = entry
+                if self._clock() < expires_at:
+                    return dict(claims)
+                self._cache.pop(key)
+                self._counters['expired'] += 1
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._verify_and_cache(key, token))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self._counters['shared'] += 1
+        # A cancelled request does not cancel the verification the other requests for the token wait on
+        return dict(await asyncio.shield(pending))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {'cache': self._cache.stats(), 'pending': len(self._pending), **self._counters}
+        public_keys = getattr(self._verify, 'public_keys', None)
+        if public_keys is not None:
+            stats['public_keys'] = public_keys.stats()
+        return stats
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _verify_and_cache(self, key: bytes, token: str) -> Claims:
+        self._counters['verifications'] += 1
+        try:
+            claims = await asyncio.get_running_loop().run_in_executor(self._executor, self._verify, token)
+        except Exception:
+            self._counters['failures'] += 1
+            raise
+
+        expires = claims.get('exp')
+        if self._settings.cache_enabled and isinstance(expires, (int, float)):
+            expires_at = min(expires + self._settings.clock_skew_seconds, self._clock() + self._settings.cache_max_ttl)
+            self._cache.set(key, (claims, expires_at))
+        return claims
+
+
+_token_verifier: Optional[CachedTokenVerifier] = None
+
+
+def get_token_verifier() -> CachedTokenVerifier:
+    """The verifier of the ID tokens of API requests, created with the default Firebase app on first use."""
+    global _token_verifier
+    if _token_verifier is None:
+        import firebase_admin
+        from src.settings import quiply_settings
+
+        settings = quiply_settings.fastapi.auth
+        try:
+            app = firebase_admin.get_app()
+        except ValueError:
+            app = firebase_admin.initialize_app()
+
+        if os.environ.get('FIREBASE_AUTH_EMULATOR_HOST'):
+            # Emulator tokens are not signed, firebase_admin knows how to check them
+            verify = firebase_auth.verify_id_token
+        else:
+            verify = FirebaseTokenVerifier(
+                app.project_id,
+                GooglePublicKeys(fetch=lambda url: fetch_certificates(url, settings.certificates_timeout)),
+                clock_skew_seconds=settings.clock_skew_seconds,
+            )
+        _token_verifier = CachedTokenVerifier(verify, settings)
+    return _token_verifier
@@ -2,7 +2,11 @@ from fastapi import APIRouter
 
 from .llm_response_router import router as llm_response_router
 from .evaluation import router as evaluation_router
+from .storage import router as storage_router
+from .auth import router as auth_router
 
 router = APIRouter()
 router.include_router(llm_response_router, prefix='/respond')
 router.include_router(evaluation_router, prefix='/evaluation')
+router.include_router(storage_router, prefix='/storage')
+router.include_router(auth_router, prefix='/auth')
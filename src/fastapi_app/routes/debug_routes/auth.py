@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from src.fastapi_app.middlewares import get_token_verifier
+
+router = APIRouter()
+
+
+@router.get('/tokens')
+async def get_token_cache_stats_route():
+    return get_token_verifier().stats()
+
+
+@router.delete('/tokens')
+async def clear_token_cache_route():
+    get_token_verifier().clear()
+    return get_token_verifier().stats()
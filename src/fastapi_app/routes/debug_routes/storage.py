@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from src.services import storage_service, async_storage_service
+
+router = APIRouter()
+
+
+@router.get('/cache')
+async def get_storage_cache_stats_route():
+    return storage_service.get_cache_stats()
+
+
+@router.delete('/cache')
+async def clear_storage_cache_route():
+    storage_service.clear_cache()
+    return storage_service.get_cache_stats()
+
+
+@router.get('/executor')
+async def get_storage_executor_stats_route():
+    return async_storage_service.stats()
+
+
+@router.get('/writes')
+async def get_storage_write_stats_route():
+    return storage_service.get_write_stats()
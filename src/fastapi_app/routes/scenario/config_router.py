@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 
 from src.models import ScenarioConfig
-from src.services import storage_service
+from src.services import async_storage_service
 
 router = APIRouter()
 
@@ -10,7 +10,7 @@ router = APIRouter()
 async def create_scenario_config_route(request: ScenarioConfig):
     print(request)
     try:
-        storage_service.save_scenario_config(request)
+        await async_storage_service.save_scenario_config(request)
         return True
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
@@ -19,7 +19,7 @@ async def create_scenario_config_route(request: ScenarioConfig):
 @router.delete('/{user_id}/{config_name}')
 async def delete_scenario_config_route(user_id: str, config_name: str):
     try:
-        storage_service.delete_scenario_config(user_id, config_name)
+        await async_storage_service.delete_scenario_config(user_id, config_name)
         return {'success': True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
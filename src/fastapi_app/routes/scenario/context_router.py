@@ -3,7 +3,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Form, File, UploadFile
 
 from src.models import ContextReference
-from src.services import storage_service
+from src.services import async_storage_service
 
 router = APIRouter()
 
@@ -28,7 +28,7 @@ async def add_context_reference_route(
         data = text_data if text_data else await file_data.read()
         content_type = file_data.content_type if file_data else 'text/plain'
 
-        return storage_service.add_context_reference(
+        return await async_storage_service.add_context_reference(
             user_id,
             context_template_uid,
             name,
@@ -44,7 +44,7 @@ async def add_context_reference_route(
 @router.delete('/{user_id}/{context_reference_uid}')
 async def delete_context_reference_route(user_id: str, context_reference_uid: str):
     try:
-        storage_service.delete_context_reference(user_id, context_reference_uid)
+        await async_storage_service.delete_context_reference(user_id, context_reference_uid)
         return {'success': True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
@@ -3,9 +3,10 @@ from typing import List
 
 from fastapi import APIRouter, HTTPException
 
+from src.exceptions import ScenarioOwnedByWorkerException
 from src.models import ScenarioInstance, ScenarioResult
 from src.scenario import scenario_manager
-from src.services import storage_service
+from src.services import async_storage_service
 from src.utils.logging import loggers
 from .models import CreateScenarioRequest, EndScenarioRequest
 
@@ -35,19 +36,19 @@ async def create_scenario_instance_route(request: CreateScenarioRequest):
     loggers.fastapi.debug(f'ScenarioInstance request: {request.model_dump_json(indent=2)}')
     try:
         # Handle mystery actors in config
-        eligible_actor_ids = [actor.uid for actor in storage_service.get_actor_templates()]
+        eligible_actor_ids = [actor.uid for actor in await async_storage_service.get_actor_templates()]
         if 'random' in request.scenario_config.actor_ids:
             request.scenario_config.actor_ids = replace_random_actors(request.scenario_config.actor_ids, eligible_actor_ids)
         if 'random' in request.scenario_config.special_actor_ids:
             request.scenario_config.special_actor_ids = replace_random_actors(request.scenario_config.special_actor_ids, eligible_actor_ids)
 
-        account_data = storage_service.get_account_data(request.user_id)
+        account_data = await async_storage_service.get_account_data(request.user_id)
 
-        instance = storage_service.create_scenario_instance(ScenarioInstance(
+        instance = await async_storage_service.create_scenario_instance(ScenarioInstance(
             account_data=account_data,
             scenario_config=request.scenario_config,
         ))
-        scenario_manager.create_scenario(instance, request.overrideSettings)
+        await scenario_manager.create_scenario_async(instance, request.overrideSettings)
         return instance
     except Exception as e:
         loggers.fastapi.exception(e)
@@ -73,7 +74,31 @@ async def complete_scenario_route(request: EndScenarioRequest):
         if result is None:
             return HTTPException(status_code=404, detail="Scenario not found")
         return result
+    except ScenarioOwnedByWorkerException as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         loggers.fastapi.exception(e)
         return HTTPException(status_code=500, detail=e)
 
+
+
+@router.get('/{scenario_instance_id}/tasks')
+async def get_scenario_tasks_route(scenario_instance_id: str):
+    try:
+        snapshot = await scenario_manager.get_task_snapshot_async(scenario_instance_id)
+    except ScenarioOwnedByWorkerException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    return snapshot
+
+
+@router.get('/{scenario_instance_id}/send_queue')
+async def get_scenario_send_queue_route(scenario_instance_id: str):
+    try:
+        stats = await scenario_manager.get_send_queue_stats_async(scenario_instance_id)
+    except ScenarioOwnedByWorkerException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Scenario not connected")
+    return stats
@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException
 
 from src.settings import quiply_settings
 from src.models import AccountData, UserProfile
-from src.services import storage_service
+from src.services import async_storage_service
 from src.utils.logging import loggers
 from .models import CreateAccountDataRequest, UpdateAccountNameRequest, UpdateAccountDataRequest
 
@@ -35,7 +35,7 @@ async def create_account_data_route(request: CreateAccountDataRequest):
                 image_url=request.image_url,
             )
         )
-        storage_service.create_account_data(account_data)
+        await async_storage_service.create_account_data(account_data)
         return account_data
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
@@ -45,7 +45,7 @@ async def create_account_data_route(request: CreateAccountDataRequest):
 async def delete_account_data_route(user_id: str):
     loggers.fastapi.info(f"delete_account_data_route request: {user_id}")
     try:
-        storage_service.delete_account_data(user_id)
+        await async_storage_service.delete_account_data(user_id)
         return True
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
@@ -57,7 +57,7 @@ async def update_name_route(request: UpdateAccountNameRequest):
     try:
         if request.first_name is None and request.last_name is None:
             return True
-        storage_service.set_account_data_first_last_name(request.uid, request.first_name, request.last_name)
+        await async_storage_service.set_account_data_first_last_name(request.uid, request.first_name, request.last_name)
         return True
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
@@ -67,7 +67,7 @@ async def update_name_route(request: UpdateAccountNameRequest):
 async def update_account_data(request: UpdateAccountDataRequest):
     loggers.fastapi.info(f"update_account_data request: {request}")
     try:
-        storage_service.update_account_data(request.user_id, request.updated_fields)
+        await async_storage_service.update_account_data(request.user_id, request.updated_fields)
         return True
     except Exception as e:
         raise HTTPException(status_code=500, detail=e)
@@ -0,0 +1,14 @@
+from .base import FrameworkException
+
+
+class AdmissionException(FrameworkException):
+    """
+    Raised when an inference request is rejected because the executor queue is full.
+    """
+    queue_depth: int
+    max_queue_depth: int
+
+    def __init__(self, *, queue_depth: int, max_queue_depth: int):
+        self.queue_depth = queue_depth
+        self.max_queue_depth = max_queue_depth
+        super().__init__(f'Inference queue is full ({queue_depth}/{max_queue_depth})')
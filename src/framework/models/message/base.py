@@ -1,5 +1,5 @@
 import textwrap
-from typing import Optional, Dict, Any, TypeVar, List
+from typing import Optional, Dict, Any, TypeVar, List, Tuple
 
 from pydantic import Field, PrivateAttr, computed_field
 
@@ -37,6 +37,9 @@ class Message(UIDMixin, CreatedAtMixin):
     metadata: Dict[str, Any] = Field(default_factory=dict)
     """ Additional metadata about the message. """
 
+    _token_counts: Dict[Tuple[str, str], int] = PrivateAttr(default_factory=dict)
+    """ Token count of to_string() by encoding and prefix. Reset whenever the content changes. """
+
     def serializable_copy(self) -> 'Message':
         return Message(
             id=self.id,
@@ -58,6 +61,8 @@ class Message(UIDMixin, CreatedAtMixin):
     @content.setter
     def content(self, value: str) -> None:
         self._content = value
+        # Reassigned instead of cleared, copies of this message may share the dict
+        self._token_counts = {}
 
     def __init__(self, **data: Any):
         super().__init__(**data)
@@ -84,6 +89,14 @@ class Message(UIDMixin, CreatedAtMixin):
         string = f'{self.prefix}: {self.content}'
         return string
 
+    def get_cached_token_count(self, encoding_name: str) -> Optional[int]:
+        # Read from __pydantic_private__ directly, going through the private attribute __getattr__ costs more than
+        # the lookup itself when counting long conversations
+        return self.__pydantic_private__['_token_counts'].get((encoding_name, self.prefix))
+
+    def set_cached_token_count(self, encoding_name: str, count: int) -> None:
+        self.__pydantic_private__['_token_counts'][(encoding_name, self.prefix)] = count
+
     @staticmethod
     def join_as_string(messages: List['Message'], omit_system_messages: bool = False) -> str:
         messages_str = ''
@@ -2,3 +2,4 @@ from .prompt import Prompt
 from .evaluable_prompt import EvaluablePrompt
 from .structure import *
 from .prompt_mesage import PromptMessage
+from .compiled import CompiledTemplate, compile_template
@@ -0,0 +1,76 @@
+from string import Formatter
+from typing import Any, FrozenSet, Mapping, Tuple, Union
+
+from src.framework.utils import LRUCache
+
+_formatter = Formatter()
+
+# A segment is either literal text or the name of a variable to substitute
+Segment = Union[str, Tuple[str]]
+
+_compiled_templates: LRUCache[str, 'CompiledTemplate'] = LRUCache(max_size=4096)
+
+
+class CompiledTemplate:
+    """
+    A format template parsed once into literal text and variable segments. Rendering concatenates the segments
+    instead of parsing the template again with str.format.
+
+    Templates using anything beyond plain ``{name}`` fields (format specs, conversions, indexing, positional fields)
+    are rendered with str.format, so the output is always the same as ``template.format(**values)``.
+    """
+
+    __slots__ = ('template', 'segments', 'input_keys', 'simple')
+
+    def __init__(self, template: str):
+        self.template = template
+        segments = []
+        input_keys = set()
+        simple = True
+        try:
+            parsed = list(_formatter.parse(template))
+        except ValueError:
+            # Unbalanced braces, str.format raises the same error when the template is rendered
+            parsed = [(template, None, None, None)]
+            simple = False
+        for literal, field_name, format_spec, conversion in parsed:
+            if literal:
+                segments.append(literal)
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                simple = False
+                name = field_name.split('.', 1)[0].split('[', 1)[0]
+                if name:
+                    input_keys.add(name)
+                continue
+            segments.append((field_name,))
+            input_keys.add(field_name)
+
+        self.segments: Tuple[Segment, ...] = tuple(segments)
+        self.input_keys: FrozenSet[str] = frozenset(input_keys)
+        self.simple = simple
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        if not self.simple:
+            return self.template.format(**values)
+        parts = []
+        for segment in self.segments:
+            if segment.__class__ is str:
+                parts.append(segment)
+            else:
+                value = values[segment[0]]
+                parts.append(value if value.__class__ is str else format(value))
+        return ''.join(parts)
+
+    def __repr__(self):
+        return f'CompiledTemplate(template={self.template[:50]!r}, input_keys={sorted(self.input_keys)})'
+
+
+def compile_template(template: str) -> CompiledTemplate:
+    """Return the compiled form of a template, parsing it only the first time it is seen."""
+    compiled = _compiled_templates.get(template)
+    if compiled is None:
+        compiled = CompiledTemplate(template)
+        _compiled_templates.set(template, compiled)
+    return compiled
@@ -1,7 +1,8 @@
 from typing import Optional, Dict
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
+from .compiled import compile_template
 from .prompt import Prompt
 
 
@@ -10,9 +11,16 @@ class EvaluablePrompt(Prompt):
     scenario: Optional[str] = Field(default=None)
     alternatives: Dict[str, str] = Field(default_factory=dict)
 
+    _prompts: Dict[str, Prompt] = PrivateAttr(default_factory=dict)
+    """ Prompts built from the template and its alternatives, by template. """
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
+        # Parse the alternatives up front too, so that no template is parsed while serving a request
+        for template in self.alternatives.values():
+            compile_template(template)
+
         if self.scenario is None:
             if '.' not in self.name:
                 self.scenario = self.name
@@ -22,7 +30,7 @@ class EvaluablePrompt(Prompt):
     @property
     def default_prompt(self) -> Prompt:
         """Return the default prompt without evaluation context."""
-        return Prompt(template=self.template)
+        return self._get_prompt_for_template(self.template)
 
     def get_prompt(self) -> Prompt:
         """Return the prompt to use for the current evaluation context."""
@@ -42,7 +50,13 @@ class EvaluablePrompt(Prompt):
         if not key or key not in self.alternatives:
             return self.default_prompt
 
-        return Prompt(template=self.alternatives[key])
+        return self._get_prompt_for_template(self.alternatives[key])
+
+    def _get_prompt_for_template(self, template: str) -> Prompt:
+        prompt = self._prompts.get(template)
+        if prompt is None:
+            prompt = self._prompts[template] = Prompt(template=template)
+        return prompt
 
     def format(self, **kwargs) -> str:
         return self.get_prompt().format(**kwargs)
@@ -1,7 +1,8 @@
-import re
 from typing import Set
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+from .compiled import CompiledTemplate, compile_template
 
 
 class Prompt(BaseModel):
@@ -9,26 +10,31 @@ class Prompt(BaseModel):
 
     input_keys: Set[str] = Field(default_factory=set)
 
+    _compiled: CompiledTemplate = PrivateAttr()
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         template_str = kwargs.get('template', '')
 
-        if re.fullmatch(r"[-a-zA-Z0-9_/]+", template_str):
-            no_spaces = True
-            # TODO: Load Files etc.
+        # TODO: Load templates given as file paths etc.
+
+        self._compiled = compile_template(template_str)
+        self.input_keys = set(self._compiled.input_keys)
 
-        self.input_keys = self._parse_template_variables(template_str)
+    @property
+    def compiled(self) -> CompiledTemplate:
+        if self._compiled.template != self.template:
+            self._compiled = compile_template(self.template)
+        return self._compiled
 
     @staticmethod
     def _parse_template_variables(template_str: str) -> Set[str]:
         """Parse the format variables from a string."""
-        pattern = r"\{([^}]+)\}"
-        var_list = re.findall(pattern, template_str)
-        return set(var_list)
+        return set(compile_template(template_str).input_keys)
 
     def format(self, **kwargs) -> str:
-        return self.template.format(**kwargs)
+        return self.compiled.render(kwargs)
 
     def __repr__(self):
         return f"Prompt(template={self.template[:50]}, input_keys={list(self.input_keys)})"
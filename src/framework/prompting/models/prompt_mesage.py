@@ -1,4 +1,6 @@
-from typing import Dict, Callable, Union, Any
+from typing import Dict, Callable, Union, Any, Optional, Tuple
+
+from pydantic import Field, PrivateAttr
 
 from src.framework.models.message.base import Message
 from .prompt import Prompt
@@ -8,12 +10,44 @@ class PromptMessage(Message):
     prompt: Prompt
     input_variables: Dict[str, Union[str, Callable[..., str]]]
 
+    memoize: bool = Field(default=True, exclude=True)
+    """ Reuse the last rendered content while the resolved input variables are unchanged. """
+
+    _render_memo: Optional[Tuple[Tuple[Any, ...], str]] = PrivateAttr(default=None)
+    """ Resolved variable values of the last render and the content they rendered to. """
+
     @property
     def content(self) -> str:
         vals: Dict[str, Any] = {}
         for k, v in self.input_variables.items():
-            if isinstance(v, Callable):
+            if callable(v):
                 vals[k] = v()
             else:
                 vals[k] = v
-        return self.prompt.format(**vals)
+
+        key = self._get_memo_key(vals) if self.memoize else None
+        memo = self._render_memo
+        if key is not None and memo is not None and memo[0] == key:
+            return memo[1]
+
+        content = self.prompt.format(**vals)
+        if memo is None or memo[1] != content:
+            # The content changed, so did its token count
+            self._token_counts = {}
+        self._render_memo = (key, content)
+        return content
+
+    @staticmethod
+    def _get_memo_key(vals: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        # Equal values of different types can render differently, e.g. 1 and True
+        key = tuple((name, type(value), value) for name, value in vals.items())
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get_cached_token_count(self, encoding_name: str) -> Optional[int]:
+        # Resolving the content resets the cached counts when a variable changed since they were counted
+        _ = self.content
+        return super().get_cached_token_count(encoding_name)
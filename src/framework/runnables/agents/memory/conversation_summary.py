@@ -1,7 +1,7 @@
 import asyncio
 from typing import Optional, List, Callable, Any, Generator
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from src.utils import logger
 
@@ -44,16 +44,57 @@ class ConversationSummaryMemory(ConversationMemory):
     summarize_prompt: Prompt = Field(default_factory=lambda: Prompt(template=_DEFAULT_SUMMARY_TEMPLATE))
     moving_summary_buffer: str = Field(default="")
     summarize_message_batch: int = Field(default=_DEFAULT_SUMMARIZE_MESSAGE_BATCH)
+    token_counter: Optional[Callable[[str], int]] = Field(default=None, exclude=True)
+    """ Counts the tokens of a string. Defaults to the tokenizer of the summary generator's model. """
+
+    _token_counts: List[int] = PrivateAttr(default_factory=list)
+    """ Token count of each message, aligned with messages and computed once when the message is added. """
+
+    _buffer_tokens: int = PrivateAttr(default=0)
+    """ Sum of _token_counts. """
+
+    _counted_messages: Optional[List[Message]] = PrivateAttr(default=None)
+    """ The messages list that _token_counts was computed for, a list assigned to messages is counted again. """
+
+    _unsummarized: List[Message] = PrivateAttr(default_factory=list)
+    """ Pruned messages whose summary has not been committed yet. load() still serves them. """
+
+    _summary_task: Optional[asyncio.Task] = PrivateAttr(default=None)
+    """ Background task summarizing _unsummarized. Prunes while it runs are picked up by its next round. """
+
+    def model_post_init(self, __context: Any) -> None:
+        self._recount()
 
     def cleanup(self):
+        self._cancel_summary_task()
         self.summary_generator.cleanup()
         del self.summary_generator
         super().cleanup()
 
+    def load(self) -> List[Message]:
+        """The buffer, with messages pruned but not yet summarized served right after the last committed summary."""
+        if not self._unsummarized:
+            return self.messages
+
+        head = 0
+        while head < len(self.messages) and (self.messages[head].is_from(MessageRole.system) or self.messages[head].is_from(MessageRole.summary)):
+            head += 1
+        return self.messages[:head] + self._unsummarized + self.messages[head:]
+
     def save(self, request: TextGenerationRequest) -> None:
         super().save(request)
         self.prune()
 
+    @property
+    def pending_summary_count(self) -> int:
+        """Number of pruned messages waiting for the background summarizer."""
+        return len(self._unsummarized)
+
+    async def wait_for_summary(self) -> None:
+        """Wait until every pruned message has been summarized."""
+        while self._summary_task is not None and not self._summary_task.done():
+            await asyncio.shield(self._summary_task)
+
     def __pretty__(self, fmt: Callable[[Any], Any], **kwargs: Any) -> Generator[Any, None, None]:
         yield self.__class__.__name__
         yield 1
@@ -66,61 +107,148 @@ class ConversationSummaryMemory(ConversationMemory):
         yield f'Messages:'
         yield fmt(self.messages)
 
-    def predict_new_summary(self, messages: List[Message], existing_summary: str) -> str:
+    def _format_summary_input(self, messages: List[Message], existing_summary: str) -> str:
         new_lines = Message.join_as_string(messages)
-        _input = self.summarize_prompt.format(summary=existing_summary, new_lines=new_lines)
-
-        event_loop = asyncio.get_event_loop()
-
-        future = asyncio.run_coroutine_threadsafe(self.summary_generator.run_async(_input), event_loop)
-        completion = future.result()
+        return self.summarize_prompt.format(summary=existing_summary, new_lines=new_lines)
 
-        new_summary = completion.choice.content.strip()
-        return new_summary
+    def predict_new_summary(self, messages: List[Message], existing_summary: str) -> str:
+        """Blocking summary, only used when memory is pruned outside of an event loop."""
+        completion = self.summary_generator.run(self._format_summary_input(messages, existing_summary))
+        return completion.content.strip()
+
+    async def predict_new_summary_async(self, messages: List[Message], existing_summary: str) -> str:
+        completion = await self.summary_generator.run_async(self._format_summary_input(messages, existing_summary))
+        return completion.content.strip()
+
+    def count_tokens(self, message: Message) -> int:
+        if self.token_counter is not None:
+            return self.token_counter(f'{message.to_string()}\n')
+        # Counted as a line of join_as_string and cached on the message
+        return self.summary_generator.get_token_count(message)
+
+    def _recount(self) -> None:
+        if self.token_counter is None and self.messages:
+            # Encodes the uncached messages in one batch, the per message counts below are then cache hits
+            self.summary_generator.get_token_count(self.messages)
+        self._token_counts = [self.count_tokens(message) for message in self.messages]
+        self._buffer_tokens = sum(self._token_counts)
+        self._counted_messages = self.messages
+
+    def _sync_token_counts(self) -> None:
+        # messages may have been replaced or mutated directly instead of through add_message/pop
+        if self._counted_messages is not self.messages or len(self._token_counts) != len(self.messages):
+            self._recount()
+
+    def add_message(self, message: Message, index: int = -1) -> None:
+        self._sync_token_counts()
+        super().add_message(message, index)
+        count = self.count_tokens(message)
+        if index == -1:
+            self._token_counts.append(count)
+        else:
+            self._token_counts.insert(index, count)
+        self._buffer_tokens += count
+
+    def pop(self, index: Optional[int] = None) -> Message:
+        self._sync_token_counts()
+        message = super().pop(index)
+        self._buffer_tokens -= self._token_counts.pop() if index is None else self._token_counts.pop(index)
+        return message
 
     def get_token_count(self) -> int:
-        return self.summary_generator.get_token_count(self.messages)
+        """Tokens currently in the buffer, from the cached per message counts."""
+        self._sync_token_counts()
+        return self._buffer_tokens
+
+    @property
+    def token_headroom(self) -> int:
+        """Tokens that can still be added before the buffer is pruned. Negative while over budget."""
+        return self.max_buffer_tokens - self.get_token_count()
+
+    def fits(self, request: TextGenerationRequest) -> bool:
+        """Whether saving the request would keep the buffer within max_buffer_tokens."""
+        if isinstance(request, str):
+            request = Message.from_user(request)
+        messages = request if isinstance(request, list) else [request]
+        return sum(self.count_tokens(message) for message in messages) <= self.token_headroom
 
     def prune(self) -> None:
+        def is_popable(message: Message) -> bool:
+            return not message.is_from(MessageRole.system) and not message.is_from(MessageRole.summary)
+
         def pop_first_message() -> Optional[Message]:
             for index, message in enumerate(self):
-                if not message.is_from(MessageRole.system) and not message.is_from(MessageRole.summary):
+                if is_popable(message):
                     return self.pop(index)
             return None
 
-        def popable_length() -> int:
-            length = 0
-            for message in self:
-                if not message.is_from(MessageRole.system) and not message.is_from(MessageRole.summary):
-                    length += 1
-            return length
+        buffer_tokens: int = self.get_token_count()
+        if buffer_tokens <= self.max_buffer_tokens:
+            if self._unsummarized:
+                self._schedule_summary()
+            return
 
-        if len(self) == 0 or popable_length() == 0:
+        popable_length = sum(1 for message in self if is_popable(message))
+        if popable_length == 0:
             return
 
-        buffer_tokens: int = self.get_token_count()
-        if buffer_tokens > self.max_buffer_tokens:
-            pruned_messages = []
-            start_buffer_tokens: int = buffer_tokens
-
-            error = False
-            while not error and buffer_tokens > self.max_buffer_tokens:
-                batch = min(self.summarize_message_batch, popable_length())
-                for i in range(batch):
-                    popped = pop_first_message()
-                    if popped is not None:
-                        pruned_messages.append(popped)
-                    else:
-                        error = True
-                        break
-                buffer_tokens = self.get_token_count()
-
-            self.moving_summary_buffer = self.predict_new_summary(pruned_messages, self.moving_summary_buffer)
-            insert_index = 1 if self[0].is_from(MessageRole.system) else 0
-            self.insert(insert_index, Message.from_summary(self.moving_summary_buffer))
-            buffer_tokens = self.get_token_count()
-            logger.info(f'Pruned {len(pruned_messages)} messages from memory. New Token Count: {buffer_tokens} Old Token Count: {start_buffer_tokens} New summary: {self.moving_summary_buffer}')
+        pruned_messages = []
+
+        while popable_length > 0 and self.get_token_count() > self.max_buffer_tokens:
+            for i in range(min(self.summarize_message_batch, popable_length)):
+                popped = pop_first_message()
+                if popped is None:
+                    break
+                pruned_messages.append(popped)
+                popable_length -= 1
+
+        self._unsummarized.extend(pruned_messages)
+        logger.info(f'Pruned {len(pruned_messages)} messages from memory. New Token Count: {self.get_token_count()} Old Token Count: {buffer_tokens}')
+        self._schedule_summary()
+
+    def _schedule_summary(self) -> None:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            batch = list(self._unsummarized)
+            self._commit_summary(self.predict_new_summary(batch, self.moving_summary_buffer), len(batch))
+            return
+
+        if self._summary_task is None or self._summary_task.done():
+            self._summary_task = asyncio.create_task(self._summarize_pending())
+
+    async def _summarize_pending(self) -> None:
+        while self._unsummarized:
+            batch = list(self._unsummarized)
+            try:
+                summary = await self.predict_new_summary_async(batch, self.moving_summary_buffer)
+            except Exception as e:
+                # The messages stay in _unsummarized and are retried on the next prune
+                logger.exception(f'Failed to summarize {len(batch)} pruned messages: {e}')
+                return
+            self._commit_summary(summary, len(batch))
+
+    def _commit_summary(self, summary: str, summarized_count: int) -> None:
+        """Swaps in a new summary for the first ``summarized_count`` pruned messages. Runs without awaiting."""
+        self.moving_summary_buffer = summary
+        del self._unsummarized[:summarized_count]
+
+        # The moving summary already contains the previous one, so it replaces it
+        for index in reversed([i for i, message in enumerate(self) if message.is_from(MessageRole.summary)]):
+            self.pop(index)
+        insert_index = 1 if len(self) > 0 and self[0].is_from(MessageRole.system) else 0
+        self.add_message(Message.from_summary(self.moving_summary_buffer), index=insert_index)
+        logger.info(f'Summarized {summarized_count} pruned messages. Token Count: {self.get_token_count()} New summary: {self.moving_summary_buffer}')
+
+    def _cancel_summary_task(self) -> None:
+        if self._summary_task is not None and not self._summary_task.done():
+            self._summary_task.cancel()
+        self._summary_task = None
 
     def clear(self) -> None:
+        self._cancel_summary_task()
         super().clear()
+        self._unsummarized = []
+        self._token_counts = []
+        self._buffer_tokens = 0
         self.moving_summary_buffer = ""
@@ -4,3 +4,4 @@ from .moderation import *
 from .speech_to_text import *
 from .text import *
 from .embeddings import *
+from .clients import ProviderClientRegistry, client_registry
@@ -1,2 +1,3 @@
+from .cache import AudioCache, get_audio_cache
 from .generator import AudioGenerator
 from .models import *
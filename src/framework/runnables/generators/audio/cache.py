@@ -0,0 +1,427 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils import loggers, get_project_path_str
+from .models import AudioGenerationParams, AudioResponse, AudioResponseChunk
+
+
+def normalize_text(text: str) -> str:
+    """Texts that only differ in whitespace are spoken the same."""
+    return ' '.join(text.split())
+
+
+def audio_cache_key(text: str, generation_params: AudioGenerationParams) -> str:
+    """Everything that changes the generated audio: the voice, model, voice settings, output format and the text."""
+    fields = (
+        generation_params.voice_id,
+        generation_params.model,
+        generation_params.stability,
+        generation_params.similarity_boost,
+        generation_params.style,
+        generation_params.use_speaker_boost,
+        generation_params.output_format,
+        normalize_text(text),
+    )
+    return hashlib.sha256(json.dumps(fields).encode()).hexdigest()
+
+
+def join_chunks(chunks: List[AudioResponseChunk]) -> AudioResponse:
+    """
+    One response from streamed chunks. Every chunk is base64 of its own, so the bytes are joined and encoded again
+    instead of concatenating the strings like AudioResponse.from_chunks.
+    """
+    audio = b''.join(base64.b64decode(chunk.audio) for chunk in chunks if chunk.audio)
+    alignment = next((chunk.normalized_alignment for chunk in chunks if chunk.normalized_alignment), None)
+    return AudioResponse(audio=base64.b64encode(audio).decode('utf-8'), normalized_alignment=alignment)
+
+
+class _SharedStream:
+    """The chunks of one live generation, followed by every stream of the same text that started meanwhile."""
+    __slots__ = ('chunks', 'done', 'error', 'followers', 'task', '_changed')
+
+    def __init__(self):
+        self.chunks: List[AudioResponseChunk] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def add(self, chunk: AudioResponseChunk) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[AudioResponseChunk]:
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class AudioCache:
+    """
+    Generated audio by voice, model, voice settings and text, for lines that are spoken again and again like greetings
+    and moderator messages.
+
+    Entries are JSON files named by their key under ``directory``, least recently used ones are deleted past
+    ``max_disk_bytes``. The most recently used ones are also kept in memory up to ``max_memory_bytes``. A disk entry
+    that can not be read is treated as missing and deleted.
+
+    A text that is missing is generated once however many sessions ask for it at the same time, streams of it share
+    the chunks of one live generation.
+    """
+
+    def __init__(
+            self,
+            directory: Optional[Path],
+            max_memory_bytes: int = 64 * 1024 * 1024,
+            max_disk_bytes: int = 1024 * 1024 * 1024,
+            max_text_chars: int = 1000,
+    ):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_text_chars = max_text_chars
+
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, AudioResponse] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: Optional[OrderedDict[str, int]] = None  # Sizes by key, read from the directory on first use
+        self._disk_bytes = 0
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ('memory_hits', 'disk_hits', 'misses', 'generations', 'shared_streams', 'memory_evictions',
+             'disk_evictions', 'disk_errors', 'cancelled_streams'), 0)
+
+    def cacheable(self, text: Any) -> bool:
+        return isinstance(text, str) and 0 < len(normalize_text(text)) <= self.max_text_chars
+
+    # ------------------------------------ Lookups ------------------------------------ #
+
+    async def get(self, key: str) -> Optional[AudioResponse]:
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                self._counters['memory_hits'] += 1
+                return response
+
+        response = await asyncio.get_running_loop().run_in_executor(None, self._read, key) if self.directory else None
+        with self._lock:
+            if response is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+        self._remember(key, response)
+        return response
+
+    async def put(self, key: str, response: AudioResponse) -> None:
+        if not response.audio:
+            return
+        self._remember(key, response)
+        if self.directory:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, key, response)
+
+    async def get_or_generate(
+            self,
+            text: str,
+            generation_params: AudioGenerationParams,
+            generate: Callable[[], Awaitable[AudioResponse]],
+    ) -> AudioResponse:
+        """The cached audio of a text, generated once when several sessions ask for a missing text at the same time."""
+        key = audio_cache_key(text, generation_params)
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        response = await self.get(key)
+        if response is not None:
+            return response
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            self._counters['generations'] += 1
+            response = await generate()
+            await self.put(key, response)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here when nobody else waits for it
+            raise
+        finally:
+            del self._pending[key]
+
+    async def stream(
+            self,
+            text: str,
+            generation_params: AudioGenerationParams,
+            generate: Callable[[], AsyncIterator[AudioResponseChunk]],
+    ) -> AsyncIterator[AudioResponseChunk]:
+        """
+        The cached audio of a text replayed in chunks, or the chunks of its live generation which is cached once it
+        completes. The generation is cancelled when every stream following it stopped early.
+        """
+        key = audio_cache_key(text, generation_params)
+        shared = self._streams.get(key)
+        if shared is None:
+            response = await self.get(key)
+            if response is not None:
+                async for chunk in self.replay(response, generation_params.stream_chunk_size):
+                    yield chunk
+                return
+            shared = self._streams.get(key)
+
+        if shared is None:
+            shared = self._streams[key] = _SharedStream()
+            self._counters['generations'] += 1
+            task = shared.task = asyncio.create_task(self._pump(key, shared, generate()))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self._counters['shared_streams'] += 1
+
+        shared.followers += 1
+        try:
+            async for chunk in shared.follow():
+                yield chunk
+        finally:
+            shared.followers -= 1
+            if shared.followers == 0 and not shared.done:
+                # Nobody plays the rest of the audio, the next stream of the text starts a generation of its own
+                if self._streams.get(key) is shared:
+                    del self._streams[key]
+                self._counters['cancelled_streams'] += 1
+                shared.task.cancel()
+
+    async def _pump(self, key: str, shared: _SharedStream, chunks: AsyncIterator[AudioResponseChunk]) -> None:
+        try:
+            async for chunk in chunks:
+                shared.add(chunk)
+        except BaseException as e:
+            self._streams.pop(key, None)
+            shared.finish(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        response = join_chunks(shared.chunks)
+        self._remember(key, response)  # Found by the next stream before it is written to disk
+        self._streams.pop(key, None)
+        shared.finish()
+        await self.put(key, response)
+
+    async def flush(self) -> None:
+        """Wait for the generations that are under way to finish and be written to disk."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def prewarm(
+            self,
+            requests: Iterable[Tuple[str, AudioGenerationParams]],
+            generate: Callable[[str, AudioGenerationParams], Awaitable[AudioResponse]],
+            concurrency: int = 4,
+    ) -> int:
+        """Generate the missing texts ahead of the first session. Returns the number of texts that were generated."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        generated = 0
+
+        async def one(text: str, generation_params: AudioGenerationParams) -> None:
+            async def generate_missing() -> AudioResponse:
+                nonlocal generated
+                generated += 1
+                return await generate(text, generation_params)
+
+            async with semaphore:
+                try:
+                    await self.get_or_generate(text, generation_params, generate_missing)
+                except Exception as e:
+                    loggers.framework.warning(f'Unable to prewarm audio for voice {generation_params.voice_id}: {e}')
+
+        await asyncio.gather(*(one(text, params) for text, params in requests if self.cacheable(text)))
+        return generated
+
+    @staticmethod
+    async def replay(response: AudioResponse, stream_chunk_size: int) -> AsyncIterator[AudioResponseChunk]:
+        """Stream cached audio in the chunks a live generation streams: a start chunk, the audio and a final chunk."""
+        # Cut at whole base64 groups so every chunk decodes on its own
+        step = max(stream_chunk_size // 3, 1) * 4
+        audio = response.audio or ''
+        chunk_count = 0
+        yield AudioResponseChunk(index=chunk_count, is_start=True)
+        for start in range(0, len(audio), step):
+            chunk_count += 1
+            yield AudioResponseChunk(
+                index=chunk_count,
+                audio=audio[start:start + step],
+                normalized_alignment=response.normalized_alignment if chunk_count == 1 else None,
+            )
+        yield AudioResponseChunk(index=chunk_count + 1, is_final=True)
+
+    def _remember(self, key: str, response: AudioResponse) -> None:
+        size = len(response.audio or '')
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous.audio or '')
+            self._memory[key] = response
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.audio or '')
+                self._counters['memory_evictions'] += 1
+
+    # ------------------------------------ Disk ------------------------------------ #
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.json'
+
+    def _load_index(self) -> OrderedDict:
+        """Sizes of the entries on disk, least recently used first. Called with the lock held."""
+        if self._disk is None:
+            entries = []
+            if self.directory.exists():
+                for path in self.directory.glob('*/*.json'):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, path.stem, stat.st_size))
+            self._disk = OrderedDict((key, size) for _, key, size in sorted(entries))
+            self._disk_bytes = sum(self._disk.values())
+        return self._disk
+
+    def _read(self, key: str) -> Optional[AudioResponse]:
+        with self._lock:
+            if key not in self._load_index():
+                return None
+            self._disk.move_to_end(key)
+        path = self._path(key)
+        try:
+            response = AudioResponse.model_validate_json(path.read_bytes())
+            os.utime(path)  # The modification time orders the entries of the next process
+            return response
+        except (OSError, ValueError) as e:
+            loggers.framework.warning(f'Unreadable audio cache entry {path}: {e}')
+            with self._lock:
+                self._counters['disk_errors'] += 1
+            self._delete(key)
+            return None
+
+    def _write(self, key: str, response: AudioResponse) -> None:
+        path = self._path(key)
+        data = response.model_dump_json(include={'audio', 'normalized_alignment'}).encode()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+        except OSError as e:
+            loggers.framework.warning(f'Unable to write audio cache entry {path}: {e}')
+            with self._lock:
+                self._counters['disk_errors'] += 1
+            return
+
+        with self._lock:
+            index = self._load_index()
+            self._disk_bytes += len(data) - index.pop(key, 0)
+            index[key] = len(data)
+            evicted = []
+            while self._disk_bytes > self.max_disk_bytes and len(index) > 1:
+                evicted_key, size = index.popitem(last=False)
+                self._disk_bytes -= size
+                evicted.append(evicted_key)
+            self._counters['disk_evictions'] += len(evicted)
+        for evicted_key in evicted:
+            self._unlink(evicted_key)
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            size = self._load_index().pop(key, None)
+            if size is not None:
+                self._disk_bytes -= size
+        self._unlink(key)
+
+    def _unlink(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.directory:
+            for key in list(self._load_index()):
+                self._delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters['memory_hits'] + self._counters['disk_hits'] + self._counters['misses']
+            hits = self._counters['memory_hits'] + self._counters['disk_hits']
+            return {
+                **self._counters,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk) if self._disk is not None else None,
+                'disk_bytes': self._disk_bytes if self._disk is not None else None,
+                'hit_rate': hits / lookups if lookups else 0.0,
+            }
+
+
+_cache: Optional[AudioCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_audio_cache() -> Optional[AudioCache]:
+    """The process-wide audio cache configured from the framework settings, None when it is disabled."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from src.framework.settings import framework_settings
+                settings = framework_settings.runnables.generators.audio.cache
+                if not settings.enabled:
+                    return None
+                _cache = AudioCache(
+                    directory=Path(get_project_path_str()) / settings.directory if settings.directory else None,
+                    max_memory_bytes=settings.max_memory_bytes,
+                    max_disk_bytes=settings.max_disk_bytes,
+                    max_text_chars=settings.max_text_chars,
+                )
+    return _cache
@@ -1,8 +1,10 @@
-from typing import TypeVar, AsyncGenerator, List, AsyncIterator, Any, ClassVar
+from typing import TypeVar, AsyncGenerator, List, AsyncIterator, Any, ClassVar, Optional
 from uuid import UUID
 
 from src.framework.exceptions import GenerationException
 from src.framework.runnables.models import RunContext
+from src.utils import loggers
+from .cache import AudioCache, get_audio_cache
 from .models import (
     AudioGenerationParams,
     AudioGenerationRequest,
@@ -42,10 +44,26 @@ class AudioGenerator(BaseGenerator[AudioGenerationParams]):
                 inner_exception=e,
             )
 
+    def _get_audio_cache(self) -> Optional[AudioCache]:
+        return get_audio_cache()
+
+    def prewarm(self) -> None:
+        """Let the generation service open its connections for these generation params before the first run."""
+        try:
+            self._get_generation_service().prewarm(self.generation_params)
+        except Exception as e:
+            loggers.framework.warning(f"Unable to prewarm audio generation service {self.service_name}: {e}")
+
     async def run_async(
         self,
         request: str,
+        *,
+        cache: bool = False,
     ) -> AudioResponse:
+        """
+        Generate the audio of a text. With ``cache`` the audio is looked up in and added to the audio cache, meant
+        for fixed lines that are spoken again and again, not for generated replies.
+        """
         run_ctx = self._begin_run(generation_params=self.generation_params)
         generation_service = self._get_generation_service()
 
@@ -54,9 +72,19 @@ class AudioGenerator(BaseGenerator[AudioGenerationParams]):
         )
 
         try:
-            response = await generation_service.generate_async(
-                request=request, generation_params=self.generation_params
-            )
+            audio_cache = self._get_audio_cache() if cache else None
+            if audio_cache and audio_cache.cacheable(request):
+                response = await audio_cache.get_or_generate(
+                    request,
+                    self.generation_params,
+                    lambda: generation_service.generate_async(
+                        request=request, generation_params=self.generation_params
+                    ),
+                )
+            else:
+                response = await generation_service.generate_async(
+                    request=request, generation_params=self.generation_params
+                )
         except Exception as e:
             await self._invoke_callback_async(
                 "on_audio_generation_error", error=e, **run_ctx
@@ -74,7 +102,10 @@ class AudioGenerator(BaseGenerator[AudioGenerationParams]):
     async def run_stream(
         self,
         request: AudioGenerationRequest,
+        *,
+        cache: bool = False,
     ) -> AsyncGenerator[AudioResponseChunk, None]:
+        """Stream the audio of a text or of a stream of text. ``cache`` as in run_async, for texts only."""
         run_ctx = self._begin_run(generation_params=self.generation_params)
         generation_service = self._get_generation_service()
 
@@ -82,8 +113,18 @@ class AudioGenerator(BaseGenerator[AudioGenerationParams]):
             "on_audio_generation_start", request=request, **run_ctx
         )
 
+        audio_cache = self._get_audio_cache() if cache else None
+
         try:
-            if isinstance(request, str):
+            if audio_cache and audio_cache.cacheable(request):
+                generator = audio_cache.stream(
+                    request,
+                    self.generation_params,
+                    lambda: generation_service.generate_stream_output(
+                        request, generation_params=self.generation_params
+                    ),
+                )
+            elif isinstance(request, str):
                 generator = generation_service.generate_stream_output(
                     request, generation_params=self.generation_params
                 )
@@ -30,6 +30,10 @@ class BaseAudioGenerationService(ABC):
     ) -> AsyncGenerator[AudioResponseChunk, None]:
         pass
 
+    def prewarm(self, generation_params: AudioGenerationParams) -> None:
+        """Open connections for the given parameters ahead of the first generation. Services without any ignore it."""
+        pass
+
     @classmethod
     def get_service(cls, service_name: str) -> 'BaseAudioGenerationService':
         if service_name == 'eleven_labs':
@@ -13,6 +13,7 @@ from framework import framework_settings
 from ...models import AudioResponse, AudioResponseChunk
 
 from .converter import ElevenLabsGenerationConverter
+from .transport import ElevenLabsTransport, StreamKey, eleven_labs_transport
 
 async def default_text_chunker(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
     """Used during input streaming to chunk text blocks and set last char to space"""
@@ -34,14 +35,17 @@ async def default_text_chunker(chunks: AsyncIterator[str]) -> AsyncIterator[str]
 
 class ElevenLabsClient:
     url_base: str = framework_settings.runnables.generators.audio.get_service_value('eleven_labs', 'url_base') or "https://api.elevenlabs.io/v1"
-    ws_url_base: str = framework_settings.runnables.generators.audio.get_service_value('eleven_labs', 'ws_url_base') or "wss://api.elevenlabs.io/v1"
-    headers: dict = framework_settings.runnables.generators.audio.get_service_value('eleven_labs', 'headers') or {
+    default_headers: dict = framework_settings.runnables.generators.audio.get_service_value('eleven_labs', 'headers') or {
         "Accept": "audio/mpeg",
         "Content-Type": "application/json",
     }
 
-    def __init__(self, api_key: Optional[str] = None):
-        self.headers["xi-api-key"] = api_key or self._get_api_key()
+    headers: dict
+    transport: ElevenLabsTransport
+
+    def __init__(self, api_key: Optional[str] = None, transport: Optional[ElevenLabsTransport] = None):
+        self.headers = {**self.default_headers, "xi-api-key": api_key or self._get_api_key()}
+        self.transport = transport or eleven_labs_transport
 
     @staticmethod
     def _get_api_key() -> str:
@@ -89,18 +93,18 @@ class ElevenLabsClient:
         """
         url, data = self._get_generation_data(False, text, voice_id, voice_settings, model, output_format, 1)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url, json=data, headers=self.headers) as response:
-                    if response.status == 200:
-                        response_data = await response.read()
-                        response_str = base64.b64encode(response_data).decode("utf-8")
-                        return AudioResponse(audio=response_str)
-                    else:
-                        response_text = await response.text()
-                        raise requests.exceptions.HTTPError(f"Failed to generate text-to-speech: {response_text}")
-            except aiohttp.ClientError as e:
-                raise e
+        session = self.transport.get_session()
+        try:
+            async with session.post(url, json=data, headers=self.headers) as response:
+                if response.status == 200:
+                    response_data = await response.read()
+                    response_str = base64.b64encode(response_data).decode("utf-8")
+                    return AudioResponse(audio=response_str)
+                else:
+                    response_text = await response.text()
+                    raise requests.exceptions.HTTPError(f"Failed to generate text-to-speech: {response_text}")
+        except aiohttp.ClientError as e:
+            raise e
 
     async def generate_async_stream_output(
             self,
@@ -129,24 +133,24 @@ class ElevenLabsClient:
         """
         url, data = self._get_generation_data(True, text, voice_id, voice_settings, model, output_format, latency)
 
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url, json=data, headers=self.headers) as response:
-                    if response.status == 200:
-                        chunk_count = 0
-                        yield AudioResponseChunk(index=chunk_count, is_start=True)
-                        async for chunk in response.content.iter_chunked(stream_chunk_size):
-                            if chunk:
-                                chunk_count += 1
-                                chunk_bytes = chunk
-                                chunk_str = base64.b64encode(chunk_bytes).decode("utf-8")
-                                yield AudioResponseChunk(index=chunk_count, audio=chunk_str)
-                        yield AudioResponseChunk(index=chunk_count + 1, is_final=True)
-                    else:
-                        response_text = await response.text()
-                        raise requests.exceptions.HTTPError(f"Failed to generate text-to-speech: {response_text}")
-            except Exception as e:
-                raise e
+        session = self.transport.get_session()
+        try:
+            async with session.post(url, json=data, headers=self.headers) as response:
+                if response.status == 200:
+                    chunk_count = 0
+                    yield AudioResponseChunk(index=chunk_count, is_start=True)
+                    async for chunk in response.content.iter_chunked(stream_chunk_size):
+                        if chunk:
+                            chunk_count += 1
+                            chunk_bytes = chunk
+                            chunk_str = base64.b64encode(chunk_bytes).decode("utf-8")
+                            yield AudioResponseChunk(index=chunk_count, audio=chunk_str)
+                    yield AudioResponseChunk(index=chunk_count + 1, is_final=True)
+                else:
+                    response_text = await response.text()
+                    raise requests.exceptions.HTTPError(f"Failed to generate text-to-speech: {response_text}")
+        except Exception as e:
+            raise e
 
     async def generate_async_stream_full_duplex(
             self,
@@ -188,8 +192,6 @@ class ElevenLabsClient:
         eos = json.dumps(dict(text=""))
 
         async def send():
-            await websocket.send(bos)
-
             chunker = text_chunker or default_text_chunker
             prev_text = None
             cur_chunk = None
@@ -221,12 +223,8 @@ class ElevenLabsClient:
             if isinstance(model, str):
                 model = Model(model_id=model)
 
-            uri = f"{self.ws_url_base}/text-to-speech/{voice_id}/stream-input?model_id={model.model_id}&output_format={output_format}&optimize_streaming_latency={latency}"
-
-            async with websockets.connect(
-                    uri,
-                    # extra_headers={"xi-api-key": self.headers["xi-api-key"]}
-            ) as websocket:
+            websocket = await self._open_stream(StreamKey(voice_id, model.model_id, output_format, latency), bos)
+            try:
                 send_task = asyncio.create_task(send())
 
                 chunk_count = 0
@@ -248,9 +246,29 @@ class ElevenLabsClient:
                 yield AudioResponseChunk(index=chunk_count + 1, is_final=True)
 
                 await send_task  # Wait for send task to finish (it should always be done)
+            finally:
+                await websocket.close()
         except websockets.WebSocketException as e:
             raise e
 
+    async def _open_stream(self, key: StreamKey, bos: str):
+        """
+        A stream-input websocket that accepted the beginning of stream.
+        A warm socket that was closed in the meantime is replaced by a new connection once.
+        """
+        websocket = await self.transport.acquire(key)
+        try:
+            await websocket.send(bos)
+        except websockets.ConnectionClosed:
+            websocket = await self.transport.acquire(key)
+            await websocket.send(bos)
+        return websocket
+
+    def prewarm(self, voice_id: str, model: Union[str, Model], output_format: OutputFormat, latency: int) -> None:
+        """Open the websockets of a voice ahead of its first full duplex stream."""
+        model_id = model if isinstance(model, str) else model.model_id
+        self.transport.prewarm(StreamKey(voice_id, model_id, output_format, latency))
+
     def _get_generation_data(
             self,
             stream: bool,
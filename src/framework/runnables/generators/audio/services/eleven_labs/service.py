@@ -61,3 +61,11 @@ class ElevenLabsGenerationService(BaseAudioGenerationService):
         debug(eleven_labs_request)
 
         return self.client.generate_async_stream_full_duplex(**eleven_labs_request)
+
+    def prewarm(self, generation_params: AudioGenerationParams) -> None:
+        self.client.prewarm(
+            generation_params.voice_id,
+            generation_params.model,
+            generation_params.output_format,
+            generation_params.latency,
+        )
@@ -0,0 +1,272 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, NamedTuple, Optional, Set
+
+import aiohttp
+import websockets
+from websockets.protocol import State
+
+from src.utils import loggers
+from src.framework.settings import framework_settings
+
+_settings = framework_settings.runnables.generators.audio
+
+
+def _get_setting(*keys: str, default: Any = None) -> Any:
+    value = _settings.get_service_value('eleven_labs', *keys)
+    return default if value is None else value
+
+
+class StreamKey(NamedTuple):
+    """What a stream-input websocket is opened for, its URL does not depend on anything else."""
+    voice_id: str
+    model_id: str
+    output_format: str
+    latency: int
+
+
+class WarmSocket:
+    __slots__ = ('websocket', 'opened_at')
+
+    def __init__(self, websocket: Any, opened_at: float):
+        self.websocket = websocket
+        self.opened_at = opened_at
+
+
+class ElevenLabsTransport:
+    """
+    Connections to ElevenLabs shared by every ElevenLabsClient of the process.
+
+    HTTP requests go through one aiohttp ClientSession with a keep-alive connection pool. Text to speech streams use
+    stream-input websockets, which ElevenLabs closes at the end of every generation, so instead of reusing a socket
+    the transport keeps ``warm_sockets`` already connected sockets per voice and model: a generation takes one and
+    another is opened in the background. Warm sockets are replaced before ElevenLabs closes them for inactivity, for
+    ``keep_warm_for`` seconds after a voice was last prewarmed or used.
+
+    The session and the sockets belong to the event loop that created them and are replaced on another loop.
+    """
+
+    def __init__(
+            self,
+            ws_url_base: Optional[str] = None,
+            connect: Callable[..., Any] = websockets.connect,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ws_url_base = ws_url_base or _get_setting('ws_url_base', default='wss://api.elevenlabs.io/v1')
+        self._connect = connect
+        self._clock = clock
+
+        self.warm_sockets: int = _get_setting('warm_sockets', default=1)
+        self.inactivity_timeout: int = _get_setting('inactivity_timeout', default=60)
+        self.warm_socket_max_idle: float = _get_setting('warm_socket_max_idle', default=50.0)
+        self.keep_warm_for: float = _get_setting('keep_warm_for', default=300.0)
+        self.connect_timeout: float = _get_setting('connect_timeout', default=5.0)
+        self.ping_interval: Optional[float] = _get_setting('ping_interval', default=20.0)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._sockets: Dict[StreamKey, Deque[WarmSocket]] = {}
+        self._fills: Dict[StreamKey, asyncio.Task] = {}
+        self._opening: Dict[StreamKey, int] = {}
+        self._waiting: Dict[StreamKey, int] = {}
+        self._last_used: Dict[StreamKey, float] = {}
+        self._keepers: Dict[StreamKey, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ('sessions', 'connects', 'warm_hits', 'cold_connects', 'expired', 'connect_errors'), 0)
+
+    # ------------------------------------ HTTP ------------------------------------ #
+
+    def _make_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=_get_setting('connection_limit', default=100),
+            limit_per_host=_get_setting('connection_limit_per_host', default=20),
+            keepalive_timeout=_get_setting('keepalive_timeout', default=30.0),
+            ttl_dns_cache=_get_setting('dns_cache_ttl', default=300),
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=_get_setting('timeout', default=60.0),
+            sock_connect=self.connect_timeout,
+        )
+        self._counters['sessions'] += 1
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """The shared session of the running event loop."""
+        self._check_loop()
+        if self._session is None or self._session.closed:
+            self._session = self._make_session()
+        return self._session
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            loggers.framework.dev_debug('Event loop changed, replacing the ElevenLabs session and warm sockets')
+        # Everything from the previous loop is unusable here and is left to be collected with it
+        self._loop = loop
+        self._session = None
+        self._sockets.clear()
+        self._fills.clear()
+        self._opening.clear()
+        self._waiting.clear()
+        self._keepers.clear()
+        self._tasks.clear()
+
+    # ------------------------------------ Websockets ------------------------------------ #
+
+    def stream_uri(self, key: StreamKey) -> str:
+        return (f'{self.ws_url_base}/text-to-speech/{key.voice_id}/stream-input?model_id={key.model_id}'
+                f'&output_format={key.output_format}&optimize_streaming_latency={key.latency}'
+                f'&inactivity_timeout={self.inactivity_timeout}')
+
+    async def _open(self, key: StreamKey) -> Any:
+        self._counters['connects'] += 1
+        return await self._connect(
+            self.stream_uri(key),
+            open_timeout=self.connect_timeout,
+            ping_interval=self.ping_interval,
+        )
+
+    async def acquire(self, key: StreamKey) -> Any:
+        """
+        A connected stream-input websocket for one generation, warm if one is ready. The caller closes it.
+        Another socket is opened in the background so the next generation finds one too.
+        """
+        self._check_loop()
+        self._last_used[key] = self._clock()
+
+        websocket = self._take_warm(key)
+        fill = self._fills.get(key)
+        if websocket is None and fill is not None and self._waiting.get(key, 0) < self._opening.get(key, 0):
+            # A handshake that is under way finishes sooner than a new one, one waiting generation per handshake
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            try:
+                await asyncio.shield(fill)
+            finally:
+                self._waiting[key] -= 1
+            websocket = self._take_warm(key)
+
+        if self.warm_sockets > 0:
+            self._spawn_fill(key)
+        if websocket is not None:
+            self._counters['warm_hits'] += 1
+            return websocket
+
+        self._counters['cold_connects'] += 1
+        return await self._open(key)
+
+    def prewarm(self, key: StreamKey) -> None:
+        """Open warm sockets for a voice ahead of its first generation. Does nothing outside an event loop."""
+        if self.warm_sockets <= 0:
+            return
+        try:
+            self._check_loop()
+        except RuntimeError:
+            return
+        self._last_used[key] = self._clock()
+        self._spawn_fill(key)
+
+    def _take_warm(self, key: StreamKey) -> Optional[Any]:
+        sockets = self._sockets.get(key)
+        while sockets:
+            warm = sockets.popleft()
+            if self._is_usable(warm):
+                return warm.websocket
+            self._counters['expired'] += 1
+            self._spawn(self._close(warm.websocket))
+        return None
+
+    def _is_usable(self, warm: WarmSocket) -> bool:
+        return (getattr(warm.websocket, 'state', None) is State.OPEN
+                and self._clock() - warm.opened_at < self.warm_socket_max_idle)
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _spawn_fill(self, key: StreamKey) -> None:
+        fill = self._fills.get(key)
+        if fill is None or fill.done():
+            self._fills[key] = self._spawn(self._fill(key))
+        keeper = self._keepers.get(key)
+        if keeper is None or keeper.done():
+            self._keepers[key] = self._spawn(self._keep_warm(key))
+
+    async def _fill(self, key: StreamKey) -> None:
+        sockets = self._sockets.setdefault(key, deque())
+        missing = self.warm_sockets - len(sockets)
+        if missing <= 0:
+            return
+
+        self._opening[key] = missing
+        try:
+            results = await asyncio.gather(*(self._open(key) for _ in range(missing)), return_exceptions=True)
+        finally:
+            self._opening[key] = 0
+
+        # The voice may have gone cold or the transport closed while the sockets were opening
+        dropped = self._sockets.get(key) is not sockets
+        for result in results:
+            if isinstance(result, BaseException):
+                self._counters['connect_errors'] += 1
+                loggers.framework.warning(f'Unable to open a warm ElevenLabs socket for voice {key.voice_id}: {result!r}')
+            elif dropped:
+                await self._close(result)
+            else:
+                sockets.append(WarmSocket(result, self._clock()))
+
+    async def _keep_warm(self, key: StreamKey) -> None:
+        """Replace the warm sockets of a voice before they expire, until it was not used for ``keep_warm_for``."""
+        while self._clock() - self._last_used.get(key, float('-inf')) < self.keep_warm_for:
+            sockets = self._sockets.get(key) or ()
+            oldest = min((warm.opened_at for warm in sockets), default=self._clock())
+            await asyncio.sleep(max(oldest + self.warm_socket_max_idle - self._clock(), 0.0) + 0.01)
+
+            sockets = self._sockets.get(key)
+            if sockets:
+                for warm in [warm for warm in sockets if not self._is_usable(warm)]:
+                    sockets.remove(warm)
+                    self._counters['expired'] += 1
+                    await self._close(warm.websocket)
+            self._spawn_fill(key)
+
+        for warm in self._sockets.pop(key, ()):
+            await self._close(warm.websocket)
+        self._keepers.pop(key, None)
+
+    @staticmethod
+    async def _close(websocket: Any) -> None:
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    async def aclose(self) -> None:
+        """Close the session and every warm socket. Safe to call more than once."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for sockets in self._sockets.values():
+            for warm in sockets:
+                await self._close(warm.websocket)
+        self._sockets.clear()
+        self._keepers.clear()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            'warm': {f'{key.voice_id}/{key.model_id}': len(sockets) for key, sockets in self._sockets.items()},
+        }
+
+
+eleven_labs_transport = ElevenLabsTransport()
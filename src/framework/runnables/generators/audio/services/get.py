@@ -1,12 +1,22 @@
-from typing import TypeVar
+from typing import Dict, TypeVar
 
 from .base import BaseAudioGenerationService
 
 TAudioGenerationService = TypeVar("TAudioGenerationService", bound=BaseAudioGenerationService)
 
+_services: Dict[str, BaseAudioGenerationService] = {}
+
 
 def get_audio_generation_service(service_name: str) -> TAudioGenerationService:
+    # Services share the pooled ElevenLabs transport and keep their api key in their own headers, one per name is enough
+    if service_name in _services:
+        return _services[service_name]
+
     if service_name == 'eleven_labs':
         from .eleven_labs import ElevenLabsGenerationService
-        return ElevenLabsGenerationService()
-    raise NotImplementedError(f'Audio Generation service: {service_name} is not implemented')
\ No newline at end of file
+        service = ElevenLabsGenerationService()
+    else:
+        raise NotImplementedError(f'Audio Generation service: {service_name} is not implemented')
+
+    _services[service_name] = service
+    return service
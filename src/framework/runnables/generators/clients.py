@@ -0,0 +1,210 @@
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from dotenv import load_dotenv
+
+from src.utils import loggers
+from ...settings import framework_settings
+from ...settings.runnables.generators.client_pool import ClientPoolSettings
+
+load_dotenv()
+
+ClientKey = Tuple[str, Optional[str], Optional[str], float]
+"""(provider, api_key, base_url, timeout)"""
+
+_API_KEY_ENV: Dict[str, str] = {
+    'openai': 'OPENAI_API_KEY',
+    'anthropic': 'ANTHROPIC_API_KEY',
+}
+
+
+def _openai_factory(is_async: bool) -> Callable[..., Any]:
+    from openai import AsyncOpenAI, OpenAI
+    return AsyncOpenAI if is_async else OpenAI
+
+
+def _anthropic_factory(is_async: bool) -> Callable[..., Any]:
+    from anthropic import AsyncAnthropic, Anthropic
+    return AsyncAnthropic if is_async else Anthropic
+
+
+_FACTORIES: Dict[str, Callable[[bool], Callable[..., Any]]] = {
+    'openai': _openai_factory,
+    'anthropic': _anthropic_factory,
+}
+
+
+class ProviderClientRegistry:
+    """
+    Process-wide pool of LLM provider SDK clients.
+    One async and one sync client is kept per (provider, api_key, base_url, timeout) so that every
+    generation service shares the same keep-alive connection pool instead of opening its own.
+    """
+
+    def __init__(self, settings: Optional[ClientPoolSettings] = None):
+        self._settings = settings or framework_settings.runnables.generators.clients
+        self._lock = threading.Lock()
+        self._async_clients: Dict[ClientKey, Tuple[Optional[asyncio.AbstractEventLoop], Any]] = {}
+        self._replaced_clients: List[Tuple[Optional[asyncio.AbstractEventLoop], Any]] = []
+        self._sync_clients: Dict[ClientKey, Any] = {}
+        self._created: int = 0
+
+    @property
+    def settings(self) -> ClientPoolSettings:
+        return self._settings
+
+    def _make_key(
+            self,
+            provider: str,
+            api_key: Optional[str],
+            base_url: Optional[str],
+            timeout: Optional[float],
+    ) -> ClientKey:
+        if provider not in _FACTORIES:
+            raise NotImplementedError(f'Client provider: {provider} is not implemented')
+        if api_key is None:
+            api_key = os.environ.get(_API_KEY_ENV[provider])
+        return provider, api_key, base_url, timeout if timeout is not None else self._settings.timeout
+
+    def _httpx_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self._settings.max_connections,
+            max_keepalive_connections=self._settings.max_keepalive_connections,
+            keepalive_expiry=self._settings.keepalive_expiry,
+        )
+
+    def _httpx_timeout(self, timeout: float) -> httpx.Timeout:
+        return httpx.Timeout(timeout, connect=self._settings.connect_timeout)
+
+    def _build_client(self, key: ClientKey, is_async: bool) -> Any:
+        provider, api_key, base_url, timeout = key
+        http_client_cls = httpx.AsyncClient if is_async else httpx.Client
+        http_client = http_client_cls(
+            limits=self._httpx_limits(),
+            timeout=self._httpx_timeout(timeout),
+            follow_redirects=True,
+        )
+        client_cls = _FACTORIES[provider](is_async)
+        kwargs: Dict[str, Any] = {
+            'api_key': api_key,
+            'timeout': timeout,
+            'max_retries': self._settings.max_retries,
+            'http_client': http_client,
+        }
+        if base_url is not None:
+            kwargs['base_url'] = base_url
+
+        self._created += 1
+        loggers.framework.dev_debug(f'Created pooled {"async" if is_async else "sync"} {provider} client')
+        return client_cls(**kwargs)
+
+    def get_async_client(
+            self,
+            provider: str,
+            *,
+            api_key: Optional[str] = None,
+            base_url: Optional[str] = None,
+            timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Get the pooled async client for the given provider configuration.
+        Async connection pools are bound to the event loop that first used them, so a client requested from a
+        different running loop is replaced. Replaced clients are closed by aclose.
+        """
+        key = self._make_key(provider, api_key, base_url, timeout)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        with self._lock:
+            entry = self._async_clients.get(key)
+            if entry is not None:
+                client_loop, client = entry
+                if client_loop is None or loop is None or client_loop is loop:
+                    if client_loop is None and loop is not None:
+                        self._async_clients[key] = (loop, client)
+                    return client
+                loggers.framework.dev_debug(f'Event loop changed, replacing pooled async {provider} client')
+                self._replaced_clients.append(entry)
+
+            client = self._build_client(key, is_async=True)
+            self._async_clients[key] = (loop, client)
+            return client
+
+    def get_sync_client(
+            self,
+            provider: str,
+            *,
+            api_key: Optional[str] = None,
+            base_url: Optional[str] = None,
+            timeout: Optional[float] = None,
+    ) -> Any:
+        """Get the pooled sync client for the given provider configuration."""
+        key = self._make_key(provider, api_key, base_url, timeout)
+        with self._lock:
+            client = self._sync_clients.get(key)
+            if client is None:
+                client = self._build_client(key, is_async=False)
+                self._sync_clients[key] = client
+            return client
+
+    def warm_up(self, providers: Iterable[str]) -> None:
+        """Create the default clients for the given providers ahead of the first request."""
+        for provider in set(providers):
+            if provider not in _FACTORIES:
+                continue
+            try:
+                self.get_async_client(provider)
+                self.get_sync_client(provider)
+            except Exception as e:
+                loggers.framework.warning(f'Unable to warm up {provider} client: {e}')
+
+    async def aclose(self) -> None:
+        """Close every pooled client. Safe to call more than once."""
+        with self._lock:
+            async_clients = self._replaced_clients + list(self._async_clients.values())
+            sync_clients = list(self._sync_clients.values())
+            self._async_clients.clear()
+            self._replaced_clients.clear()
+            self._sync_clients.clear()
+
+        for client_loop, client in async_clients:
+            await self._close_async_client(client_loop, client)
+        for client in sync_clients:
+            try:
+                client.close()
+            except Exception as e:
+                loggers.framework.warning(f'Error closing pooled client: {e}')
+
+    @staticmethod
+    async def _close_async_client(client_loop: Optional[asyncio.AbstractEventLoop], client: Any) -> None:
+        try:
+            if client_loop is not None and client_loop is not asyncio.get_running_loop() and client_loop.is_running():
+                # The connections belong to a loop running in another thread, close them there
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.close(), client_loop))
+            else:
+                await client.close()
+        except Exception as e:
+            loggers.framework.warning(f'Error closing pooled client: {e}')
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'async_clients': len(self._async_clients),
+                'sync_clients': len(self._sync_clients),
+                'created': self._created,
+            }
+
+
+client_registry = ProviderClientRegistry()
+
+
+def get_default_providers() -> Iterable[str]:
+    """Providers used by the configured generators, used to warm up the registry on startup."""
+    generators = framework_settings.runnables.generators
+    providers = {generators.text.service_name, generators.embeddings.service_name}
+    return [provider for provider in providers if provider in _FACTORIES]
@@ -1,2 +1,3 @@
 from .generator import DiarizationGenerator
 from .models import *
+from .vad import BaseVoiceActivityDetector, VoiceActivitySession, VoiceActivityResult, get_voice_activity_detector
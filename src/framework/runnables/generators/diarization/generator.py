@@ -1,4 +1,4 @@
-from typing import TypeVar, AsyncGenerator, AsyncIterator, ClassVar
+from typing import TypeVar, AsyncGenerator, AsyncIterator, ClassVar, List
 
 from pydantic import Field
 
@@ -83,34 +83,30 @@ class DiarizationGenerator(BaseGenerator[DiarizationGenerationParams]):
             self,
             request: AsyncIterator[DiarizationRequest],
     ) -> AsyncGenerator[DiarizationResponse, None]:
-        raise NotImplementedError()
-
-        # context = self._get_context(generation_params=self.generation_params)
-        # generation_service = self._get_generation_service()
-        #
-        # await self._invoke_callback_async('on_diarization_generation_start', request=request, **context)
-        #
-        # try:
-        #     generator = generation_service.run_stream(
-        #         request=request,
-        #         generation_params=self.generation_params
-        #     )
-        # except Exception as e:
-        #     await self._invoke_callback_async('on_diarization_generation_error', error=e, **context)
-        #     raise GenerationException(
-        #         message=f'Error while generating diarization: {e}',
-        #         inner_exception=e
-        #     )
-        #
-        # chunks: List[DiarizationResponse] = []
-        #
-        # async for chunk in generator:
-        #     chunks.append(chunk)
-        #     await self._invoke_callback_async('on_diarization_generation_chunk', chunk=chunk, **context)
-        #     yield chunk
-        #
-        #
-        #
-        # await self._invoke_callback_async('on_diarization_generation_end', response=response, **context)
-        #
-        # return response
\ No newline at end of file
+        """
+        Incrementally diarize a stream of audio chunks.
+        Each response holds the speaker turns that became stable since the previous one.
+        """
+        context = self._begin_run(generation_params=self.generation_params)
+        generation_service = self._get_generation_service()
+
+        await self._invoke_callback_async('on_diarization_generation_start', request=request, **context)
+
+        chunks: List[DiarizationResponse] = []
+        try:
+            async for chunk in generation_service.run_stream(
+                request=request,
+                generation_params=self.generation_params
+            ):
+                chunks.append(chunk)
+                await self._invoke_callback_async('on_diarization_generation_chunk', chunk=chunk, **context)
+                yield chunk
+        except Exception as e:
+            await self._invoke_callback_async('on_diarization_generation_error', error=e, **context)
+            raise GenerationException(
+                message=f'Error while streaming diarization: {e}',
+                inner_exception=e
+            )
+
+        response = DiarizationResponse.from_chunks(chunks)
+        await self._invoke_callback_async('on_diarization_generation_end', response=response, **context)
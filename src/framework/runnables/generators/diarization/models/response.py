@@ -55,3 +55,26 @@ class DiarizationResponse(UIDMixin, CreatedAtMixin):
     @property
     def speaker_count(self) -> int:
         return len(self.speakers)
+
+    @classmethod
+    def from_chunks(
+            cls,
+            chunks: List['DiarizationResponse']
+    ) -> 'DiarizationResponse':
+        """
+        Combine the responses of a diarization stream into a single diarization response.
+        """
+
+        if not chunks or len(chunks) == 0:
+            raise ValueError("Cannot create a DiarizationResponse from an empty list of chunks.")
+
+        segments = [
+            segment.model_copy(update={'index': index})
+            for index, segment in enumerate(segment for chunk in chunks for segment in chunk.segments)
+        ]
+
+        return cls(
+            mode=chunks[0].mode,
+            segments=segments,
+            duration=max(chunk.duration for chunk in chunks),
+        )
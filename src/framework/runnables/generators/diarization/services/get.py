@@ -1,12 +1,22 @@
-from typing import TypeVar
+from typing import Dict, TypeVar
 
 from .base import BaseSpeechDiarizationService
 
 TSpeechDiarizationService = TypeVar('TSpeechDiarizationService', bound=BaseSpeechDiarizationService)
 
+_services: Dict[str, BaseSpeechDiarizationService] = {}
+
 
 def get_speech_diarization_service(service_name: str) -> TSpeechDiarizationService:
+    # One instance per process so that resident models and the inference executor are shared across sessions
+    if service_name in _services:
+        return _services[service_name]
+
     if service_name == 'pyannote':
         from .pyannote import PyannoteSpeechDiarizationService
-        return PyannoteSpeechDiarizationService()
-    raise NotImplementedError(f'Speech Diarization service: {service_name} is not implemented')
+        service = PyannoteSpeechDiarizationService()
+    else:
+        raise NotImplementedError(f'Speech Diarization service: {service_name} is not implemented')
+
+    _services[service_name] = service
+    return service
@@ -1,9 +1,10 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from pyannote.core.annotation import Annotation
 
 from src.framework.exceptions import ConversionException
 from ...models import DiarizationGenerationParams, DiarizationSegment, DiarizationResponse
+from ...streaming import SpeakerTurn
 
 
 class PyannoteSpeechDiarizationConverter:
@@ -59,4 +60,46 @@ class PyannoteSpeechDiarizationConverter:
                 from_type=Annotation,
                 to_type=DiarizationResponse,
                 inner_exception=e
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def from_speaker_turns(
+            turns: List[SpeakerTurn],
+            generation_params: DiarizationGenerationParams,
+            *,
+            start_index: int = 0,
+            duration: float = 0.0,
+    ) -> DiarizationResponse:
+        """
+        Convert closed speaker turns of a diarization stream to a Quiply DiarizationResponse.
+
+        :param turns: The speaker turns to convert.
+        :param generation_params: The generation parameters used to generate the turns.
+        :param start_index: The index of the first segment within the stream.
+        :param duration: The duration of the stream so far in seconds.
+        :return: The converted Quiply DiarizationResponse.
+        """
+        try:
+            segments = [
+                DiarizationSegment(
+                    index=start_index + i,
+                    start_time=turn.start,
+                    end_time=turn.end,
+                    speaker=turn.speaker,
+                    is_final=True
+                )
+                for i, turn in enumerate(turns)
+            ]
+
+            return DiarizationResponse(
+                mode=generation_params.mode,
+                segments=segments,
+                duration=duration
+            )
+        except Exception as e:
+            raise ConversionException(
+                PyannoteSpeechDiarizationConverter,
+                from_type=SpeakerTurn,
+                to_type=DiarizationResponse,
+                inner_exception=e
+            )
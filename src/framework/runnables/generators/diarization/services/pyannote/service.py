@@ -1,40 +1,138 @@
 import asyncio
 import os
-from concurrent.futures import ThreadPoolExecutor
 from typing import AsyncIterator, AsyncGenerator, Any, Dict, Optional
 
 import torch
 from dotenv import load_dotenv
-from pyannote.audio import Model, Pipeline
+from pyannote.audio import Inference, Model, Pipeline
 from pyannote.audio.pipelines import VoiceActivityDetection
+from pyannote.audio.pipelines.speaker_verification import PretrainedSpeakerEmbedding
 from pyannote.core.annotation import Annotation
 
-from framework import framework_settings
-from src.framework.utils import CreateWavFile
+from src.framework.exceptions import GenerationException
+from src.framework.settings import framework_settings
+from src.framework.utils import decode_audio
 from src.utils import loggers
 from .converter import PyannoteSpeechDiarizationConverter
+from .streaming import PyannoteStreamingSession, SAMPLE_RATE
 from ..base import BaseSpeechDiarizationService
+from ....inference import InferenceExecutor, ModelPool
 from ...models import DiarizationGenerationParams, DiarizationResponse, DiarizationRequest
 
+load_dotenv()
 
-class PyannoteSpeechDiarizationService(BaseSpeechDiarizationService):
-    converter: PyannoteSpeechDiarizationConverter
+_settings = framework_settings.runnables.generators.diarization
+
+DEFAULT_DETECTION_CHECKPOINT = 'pyannote/segmentation-3.0'
+DEFAULT_DIARIZATION_CHECKPOINT = 'pyannote/speaker-diarization-3.1'
+DEFAULT_EMBEDDING_CHECKPOINT = 'pyannote/wespeaker-voxceleb-resnet34-LM'
+
+
+def _get_setting(*keys: str, default: Any = None) -> Any:
+    value = _settings.get_service_value('pyannote', *keys)
+    return default if value is None else value
+
+
+def _resolve_device(device: str) -> torch.device:
+    return torch.device('cuda' if torch.cuda.is_available() and device == 'cuda' else 'cpu')
+
+
+def _load_segmentation_model(checkpoint: str) -> Model:
+    return Model.from_pretrained(checkpoint, use_auth_token=os.environ.get('HF_TOKEN'))
 
-    detection_model: Model = Model.from_pretrained(
-        framework_settings.runnables.generators.diarization.services.pyannote.detection_checkpoint or "pyannote/segmentation-3.0",
-        use_auth_token=os.environ.get('HF_TOKEN')
-    )
 
-    diarization_pipeline: Pipeline = Pipeline.from_pretrained(
-        framework_settings.runnables.generators.diarization.services.pyannote.diarization_checkpoint or "pyannote/speaker-diarization-3.1",
-        use_auth_token=os.environ.get('HF_TOKEN')
+def _load_diarization_pipeline(checkpoint: str, device: str) -> Pipeline:
+    pipeline = Pipeline.from_pretrained(checkpoint, use_auth_token=os.environ.get('HF_TOKEN'))
+    pipeline.to(torch.device(device))
+    return pipeline
+
+
+def _load_detection_pipeline(
+        window: str,
+        duration: Optional[float],
+        batch_size: Optional[int],
+        min_duration_on: float,
+        min_duration_off: float,
+        device: str,
+) -> VoiceActivityDetection:
+    # model=Model(sample_rate=generation_params.sample_rate),  We could use this f we wanted to provide sample rate from frontend
+    pipeline = VoiceActivityDetection(
+        segmentation=pyannote_model_pool.get(_get_setting('detection_checkpoint', default=DEFAULT_DETECTION_CHECKPOINT)),
+        window=window,
+        duration=duration,
+        batch_size=batch_size
     )
+    pipeline.to(torch.device(device))
+
+    HYPER_PARAMETERS = {
+        # remove speech regions shorter than that many seconds.
+        "min_duration_on": min_duration_on,
+        # fill non-speech regions shorter than that many seconds.
+        "min_duration_off": min_duration_off
+    }
+    pipeline.instantiate(HYPER_PARAMETERS)
+    return pipeline
+
+
+def _load_segmentation_inference(checkpoint: str, device: str) -> Inference:
+    return Inference(pyannote_model_pool.get(checkpoint), window='whole', device=torch.device(device))
+
+
+def _load_embedding(checkpoint: str, device: str) -> PretrainedSpeakerEmbedding:
+    return PretrainedSpeakerEmbedding(checkpoint, device=torch.device(device), use_auth_token=os.environ.get('HF_TOKEN'))
+
+
+pyannote_model_pool: ModelPool[Model] = ModelPool('pyannote segmentation', _load_segmentation_model)
+pyannote_diarization_pool: ModelPool[Pipeline] = ModelPool('pyannote diarization', _load_diarization_pipeline)
+pyannote_detection_pool: ModelPool[VoiceActivityDetection] = ModelPool('pyannote detection', _load_detection_pipeline)
+pyannote_inference_pool: ModelPool[Inference] = ModelPool('pyannote streaming segmentation', _load_segmentation_inference)
+pyannote_embedding_pool: ModelPool[PretrainedSpeakerEmbedding] = ModelPool('pyannote embedding', _load_embedding)
+""" Pyannote models and pipelines are loaded on first use and stay resident for the lifetime of the process. """
+
+pyannote_executor = InferenceExecutor(
+    'pyannote',
+    max_workers=_get_setting('max_workers'),
+    max_queue_depth=_get_setting('max_queue_depth'),
+)
+""" Shared executor that all pyannote inference runs on. """
+
+
+class PyannoteSpeechDiarizationService(BaseSpeechDiarizationService):
+    converter: PyannoteSpeechDiarizationConverter
 
     def __init__(self):
         super().__init__()
 
         self.converter = PyannoteSpeechDiarizationConverter()
 
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'executor': pyannote_executor.stats(),
+            'models': [
+                f'{pool.name}:{key}'
+                for pool in (pyannote_model_pool, pyannote_diarization_pool, pyannote_detection_pool,
+                             pyannote_inference_pool, pyannote_embedding_pool)
+                for key in pool.loaded_keys
+            ],
+        }
+
+    @staticmethod
+    def _get_pipeline(generation_params: DiarizationGenerationParams) -> Pipeline:
+        device = str(_resolve_device(generation_params.device))
+        if generation_params.mode == 'detection':
+            return pyannote_detection_pool.get(
+                generation_params.window or 'sliding',
+                generation_params.chunk_duration,
+                generation_params.batch_size,
+                generation_params.min_duration_on,
+                generation_params.min_duration_off,
+                device,
+            )
+        return pyannote_diarization_pool.get(
+            _get_setting('diarization_checkpoint', default=DEFAULT_DIARIZATION_CHECKPOINT),
+            device,
+        )
+
     def run(
             self,
             request: DiarizationRequest,
@@ -57,32 +155,101 @@ class PyannoteSpeechDiarizationService(BaseSpeechDiarizationService):
         if request is None:
             raise ValueError("DiarizationRequest cannot be None")
 
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            response = await loop.run_in_executor(executor, self._sync, request, generation_params)
+        response = await pyannote_executor.run(self._sync, request, generation_params)
 
         loggers.framework.dev_debug(response)
 
         return response
 
+    def create_streaming_session(self, generation_params: DiarizationGenerationParams) -> PyannoteStreamingSession:
+        """Create a streaming session. Blocking on the first use of the models, run it on the inference executor."""
+        device = str(_resolve_device(generation_params.device))
+        embedding = None
+        if generation_params.mode == 'diarization':
+            embedding = pyannote_embedding_pool.get(
+                _get_setting('embedding_checkpoint', default=DEFAULT_EMBEDDING_CHECKPOINT),
+                device,
+            )
+
+        return PyannoteStreamingSession(
+            pyannote_inference_pool.get(_get_setting('detection_checkpoint', default=DEFAULT_DETECTION_CHECKPOINT), device),
+            embedding,
+            generation_params,
+            window_seconds=_get_setting('streaming', 'window_seconds', default=5.0),
+            step_seconds=_get_setting('streaming', 'step_seconds', default=0.5),
+            activity_threshold=_get_setting('streaming', 'activity_threshold', default=0.5),
+            clustering_threshold=_get_setting('streaming', 'clustering_threshold', default=0.7),
+            max_speakers=_get_setting('streaming', 'max_speakers', default=4),
+            min_speaker_seconds=_get_setting('streaming', 'min_speaker_seconds', default=0.2),
+        )
+
     async def run_stream(
             self,
             request: AsyncIterator[DiarizationRequest],
             generation_params: DiarizationGenerationParams,
             **stream_settings_kwargs: Any
     ) -> AsyncGenerator[DiarizationResponse, None]:
+        """
+        Incrementally diarize a stream of independently decodable audio chunks.
+
+        Yields a response with the speaker turns closed by each step as soon as they are stable, and a final response
+        with the remaining turns once the request iterator is exhausted. Audio that arrives while a step is running is
+        merged into the next step rather than queued per chunk.
+        """
         if request is None:
             raise ValueError("DiarizationRequest cannot be None")
 
-        loop = asyncio.get_event_loop()
+        try:
+            session = await pyannote_executor.run(self.create_streaming_session, generation_params)
+        except Exception as e:
+            raise GenerationException(
+                message=f'Error while creating diarization stream: {e}',
+                inner_exception=e
+            )
+
+        audio_ready = asyncio.Event()
+        request_ended = False
+
+        async def feed() -> None:
+            nonlocal request_ended
+            try:
+                async for chunk in request:
+                    session.insert_audio(await pyannote_executor.run(decode_audio, chunk))
+                    audio_ready.set()
+            finally:
+                request_ended = True
+                audio_ready.set()
 
-        async for chunk in request:
-            with ThreadPoolExecutor() as executor:
-                response = await loop.run_in_executor(executor, self._sync, chunk, generation_params, stream_settings_kwargs)
+        feeder = asyncio.ensure_future(feed())
+        index = 0
+
+        try:
+            while not request_ended:
+                await audio_ready.wait()
+                audio_ready.clear()
+                if request_ended or not session.ready:
+                    continue
 
-            loggers.framework.dev_debug(response)
+                turns = await pyannote_executor.run(session.process)
+                if turns:
+                    yield self.converter.from_speaker_turns(turns, generation_params, start_index=index, duration=session.stream_seconds)
+                    index += len(turns)
 
-            yield response
+            await feeder
+            turns = await pyannote_executor.run(session.finish)
+            yield self.converter.from_speaker_turns(turns, generation_params, start_index=index, duration=session.stream_seconds)
+        except Exception as e:
+            raise GenerationException(
+                message=f'Error while generating diarization stream: {e}',
+                inner_exception=e
+            )
+        finally:
+            if not feeder.done():
+                feeder.cancel()
+            loggers.framework.dev_debug(
+                f'Pyannote stream ran {session.step_count} steps for {session.stream_seconds:.1f}s of audio, '
+                f'{session.clustering.speaker_count} speakers'
+            )
 
     def _sync(
             self,
@@ -90,42 +257,8 @@ class PyannoteSpeechDiarizationService(BaseSpeechDiarizationService):
             generation_params: DiarizationGenerationParams,
             stream_settings_kwargs: Optional[Dict[str, Any]] = None
     ) -> DiarizationResponse:
-        load_dotenv()
-
-        device = torch.device('cuda' if torch.cuda.is_available() and generation_params.device == 'cuda' else 'cpu')
-
-        try:
-            if generation_params.mode == 'detection':
-                # model=Model(sample_rate=generation_params.sample_rate),  We could use this f we wanted to provide sample rate from frontend
-                pipeline = VoiceActivityDetection(
-                    segmentation=self.__class__.detection_model,
-                    window=generation_params.window or 'sliding',
-                    duration=generation_params.chunk_duration,
-                    batch_size=generation_params.batch_size
-                )
-                pipeline.to(device)
-
-                HYPER_PARAMETERS = {
-                    # remove speech regions shorter than that many seconds.
-                    "min_duration_on": generation_params.min_duration_on,
-                    # fill non-speech regions shorter than that many seconds.
-                    "min_duration_off": generation_params.min_duration_off
-                }
-                pipeline.instantiate(HYPER_PARAMETERS)
-
-                with CreateWavFile(request, mime_type='audio/webm;codec=opus') as file_path:
-                    annotation: Annotation = pipeline(file_path)
-            else:
-                pipeline = self.__class__.diarization_pipeline
-
-                with CreateWavFile(request, mime_type='audio/webm;codec=opus') as file_path:
-                    annotation: Annotation = pipeline(file_path)
-
-                # dump the diarization output to disk using RTTM format
-                with open("audio.rttm", "w") as rttm:
-                    annotation.write_rttm(rttm)
-        except Exception as e:
-            raise e
+        waveform = torch.from_numpy(decode_audio(request, sample_rate=SAMPLE_RATE)).unsqueeze(0)
+        annotation: Annotation = self._get_pipeline(generation_params)({'waveform': waveform, 'sample_rate': SAMPLE_RATE})
 
         if not stream_settings_kwargs:
             stream_settings_kwargs = {}
@@ -0,0 +1,160 @@
+import threading
+from typing import List, Optional
+
+import numpy as np
+import torch
+from pyannote.audio import Inference
+from pyannote.audio.pipelines.speaker_verification import PretrainedSpeakerEmbedding
+
+from ...models import DiarizationGenerationParams
+from ...streaming import OnlineSpeakerClustering, SpeakerTurn, SpeakerTurnBuilder
+
+SAMPLE_RATE = 16000
+DETECTION_LABEL = 'SPEECH'
+
+
+class PyannoteStreamingSession:
+    """
+    Incremental diarization over a rolling audio window.
+
+    Every ``process`` call runs the segmentation model on the last ``window_seconds`` of audio only, so the cost per
+    step does not grow with the stream. The local speakers of the window are embedded and matched to the speakers
+    seen so far by online clustering, then the frames that arrived since the previous step are added to the speaker
+    turns. Turns are returned once they are closed and will not change again.
+
+    In detection mode no embeddings are computed and all speech is attributed to a single ``SPEECH`` label.
+    """
+
+    def __init__(
+            self,
+            segmentation: Inference,
+            embedding: Optional[PretrainedSpeakerEmbedding],
+            generation_params: DiarizationGenerationParams,
+            *,
+            window_seconds: float = 5.0,
+            step_seconds: float = 0.5,
+            activity_threshold: float = 0.5,
+            clustering_threshold: float = 0.7,
+            max_speakers: int = 4,
+            min_speaker_seconds: float = 0.2,
+    ):
+        self.segmentation = segmentation
+        self.embedding = embedding
+        self.generation_params = generation_params
+        self.window_samples = int(window_seconds * SAMPLE_RATE)
+        self.step_samples = int(step_seconds * SAMPLE_RATE)
+        self.activity_threshold = activity_threshold
+        self.min_speaker_seconds = min_speaker_seconds
+
+        self.clustering = OnlineSpeakerClustering(threshold=clustering_threshold, max_speakers=max_speakers)
+        self.turns = SpeakerTurnBuilder(
+            min_duration_on=generation_params.min_duration_on,
+            min_duration_off=generation_params.min_duration_off,
+        )
+
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.buffer_offset: float = 0.0
+        """ Seconds of stream audio that were dropped from the start of the window. """
+        self.processed_until: float = 0.0
+        """ Stream time up to which frames were added to the speaker turns. """
+
+        self._pending: List[np.ndarray] = []
+        self._pending_samples = 0
+        self._lock = threading.Lock()
+        self.step_count = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full step of new audio arrived."""
+        return self._pending_samples >= self.step_samples
+
+    @property
+    def stream_seconds(self) -> float:
+        return self.buffer_offset + (len(self.audio) + self._pending_samples) / SAMPLE_RATE
+
+    @property
+    def window_end(self) -> float:
+        """Stream time of the end of the window, audio inserted since the last ``process`` call is not in it yet."""
+        return self.buffer_offset + len(self.audio) / SAMPLE_RATE
+
+    def insert_audio(self, pcm: np.ndarray) -> None:
+        """Append 16 kHz mono float32 PCM to the stream."""
+        if pcm.size == 0:
+            return
+        with self._lock:
+            self._pending.append(pcm.astype(np.float32, copy=False))
+            self._pending_samples += len(pcm)
+
+    def _take_pending(self) -> None:
+        with self._lock:
+            pending, self._pending, self._pending_samples = self._pending, [], 0
+        if pending:
+            self.audio = np.concatenate([self.audio, *pending])
+        if len(self.audio) > self.window_samples:
+            dropped = len(self.audio) - self.window_samples
+            self.audio = self.audio[dropped:]
+            self.buffer_offset += dropped / SAMPLE_RATE
+
+    def _local_labels(self, waveform: torch.Tensor, activity: np.ndarray) -> List[Optional[str]]:
+        """Map each local speaker of the window to a stream-wide label, None for speakers heard too briefly."""
+        local_speakers = activity.shape[1]
+        if self.generation_params.mode == 'detection' or self.embedding is None:
+            return [DETECTION_LABEL] * local_speakers
+
+        frame_seconds = len(self.audio) / SAMPLE_RATE / activity.shape[0]
+        speaking = [
+            local for local in range(local_speakers)
+            if np.count_nonzero(activity[:, local] > self.activity_threshold) * frame_seconds >= self.min_speaker_seconds
+        ]
+        if not speaking:
+            return [None] * local_speakers
+
+        masks = torch.from_numpy(np.ascontiguousarray(activity[:, speaking].T)).float()
+        embeddings = self.embedding(waveform.expand(len(speaking), 1, -1), masks=masks)
+        valid = [i for i, embedding in enumerate(embeddings) if not np.any(np.isnan(embedding))]
+        if not valid:
+            return [None] * local_speakers
+
+        assignment = self.clustering.assign(embeddings[valid])
+        labels: List[Optional[str]] = [None] * local_speakers
+        for i, speaker in zip(valid, assignment):
+            labels[speaking[i]] = self.clustering.label(speaker)
+        return labels
+
+    def _step(self) -> List[SpeakerTurn]:
+        waveform = torch.from_numpy(self.audio).unsqueeze(0)
+        activity: np.ndarray = self.segmentation({'waveform': waveform, 'sample_rate': SAMPLE_RATE})
+        labels = self._local_labels(waveform.unsqueeze(0), activity)
+        self.step_count += 1
+
+        closed: List[SpeakerTurn] = []
+        frame_count = activity.shape[0]
+        frame_seconds = len(self.audio) / SAMPLE_RATE / frame_count
+        first_frame = max(0, int((self.processed_until - self.buffer_offset) / frame_seconds))
+        for frame in range(first_frame, frame_count):
+            start = self.buffer_offset + frame * frame_seconds
+            active = {
+                labels[local] for local in np.flatnonzero(activity[frame] > self.activity_threshold)
+                if labels[local] is not None
+            }
+            closed.extend(self.turns.update(start, start + frame_seconds, active))
+
+        # Audio inserted while the models ran is still pending and is diarized by the next step
+        self.processed_until = self.buffer_offset + frame_count * frame_seconds
+        return closed
+
+    def process(self) -> List[SpeakerTurn]:
+        """
+        Add the pending audio and diarize the new frames. Blocking, run it on the inference executor.
+
+        :return: The speaker turns that were closed by the new audio.
+        """
+        self._take_pending()
+        if len(self.audio) == 0 or self.window_end <= self.processed_until:
+            return []
+        return self._step()
+
+    def finish(self) -> List[SpeakerTurn]:
+        """Diarize any remaining audio and close all open turns. Blocking, run it on the inference executor."""
+        closed = self.process()
+        return sorted(closed + self.turns.flush(), key=lambda turn: turn.start)
@@ -0,0 +1,140 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+
+class SpeakerTurn(NamedTuple):
+    """A closed speaker turn, in seconds from the start of the stream."""
+    speaker: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class OnlineSpeakerClustering:
+    """
+    Incremental speaker clustering over the embeddings of successive audio windows.
+
+    Each speaker is represented by the running mean of its normalised embeddings. A local speaker of a window joins
+    the closest speaker within ``threshold`` cosine distance, otherwise it becomes a new speaker until
+    ``max_speakers`` is reached. Local speakers of one window are different people, so no two of them are ever
+    assigned to the same speaker.
+    """
+
+    def __init__(self, *, threshold: float = 0.7, max_speakers: int = 4):
+        self.threshold = threshold
+        self.max_speakers = max_speakers
+        self._sums: List[np.ndarray] = []
+        self._counts: List[int] = []
+
+    @property
+    def speaker_count(self) -> int:
+        return len(self._sums)
+
+    @staticmethod
+    def label(speaker: int) -> str:
+        return f'SPEAKER_{speaker:02d}'
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-12)
+
+    def distances(self, embeddings: np.ndarray) -> np.ndarray:
+        """Cosine distances between each embedding (rows) and each speaker centroid (columns)."""
+        if not self._sums:
+            return np.zeros((len(embeddings), 0))
+        centroids = self._normalize(np.stack(self._sums))
+        return 1.0 - self._normalize(embeddings) @ centroids.T
+
+    def assign(self, embeddings: np.ndarray) -> List[int]:
+        """
+        Assign the local speakers of one window to global speakers and update their centroids.
+
+        :param embeddings: One embedding per local speaker, shape (local speakers, dimension).
+        :return: The global speaker index of each local speaker.
+        """
+        embeddings = np.atleast_2d(np.asarray(embeddings, dtype=np.float64))
+        distances = self.distances(embeddings)
+        assignment: List[Optional[int]] = [None] * len(embeddings)
+        taken = set()
+
+        pairs = sorted(np.ndindex(*distances.shape), key=lambda pair: distances[pair])
+        for local, speaker in pairs:
+            if distances[local, speaker] > self.threshold:
+                break
+            if assignment[local] is None and speaker not in taken:
+                assignment[local] = speaker
+                taken.add(speaker)
+
+        for local in range(len(embeddings)):
+            if assignment[local] is not None:
+                continue
+            if self.speaker_count < self.max_speakers:
+                self._sums.append(np.zeros(embeddings.shape[1]))
+                self._counts.append(0)
+                assignment[local] = self.speaker_count - 1
+            else:
+                # Every speaker slot is used, fall back to the closest speaker not used in this window
+                free = [speaker for speaker in range(self.speaker_count) if speaker not in taken]
+                candidates = free or list(range(self.speaker_count))
+                assignment[local] = min(candidates, key=lambda speaker: distances[local, speaker])
+            taken.add(assignment[local])
+
+        normalized = self._normalize(embeddings)
+        for local, speaker in enumerate(assignment):
+            self._sums[speaker] = self._sums[speaker] + normalized[local]
+            self._counts[speaker] += 1
+
+        return assignment
+
+
+class SpeakerTurnBuilder:
+    """
+    Builds speaker turns from frame level speaker activity.
+
+    A turn stays open while its speaker is active and is closed once the speaker has been silent for longer than
+    ``min_duration_off``. Closed turns shorter than ``min_duration_on`` are dropped. Closed turns never change again,
+    so they can be emitted right away.
+    """
+
+    def __init__(self, *, min_duration_on: float = 0.0, min_duration_off: float = 0.0):
+        self.min_duration_on = min_duration_on
+        self.min_duration_off = min_duration_off
+        self._open: Dict[str, List[float]] = {}
+
+    @property
+    def open_turns(self) -> List[SpeakerTurn]:
+        return [SpeakerTurn(speaker, start, end) for speaker, (start, end) in self._open.items()]
+
+    def update(self, start: float, end: float, active: Iterable[str]) -> List[SpeakerTurn]:
+        """
+        Record the speakers active in the frame from ``start`` to ``end``.
+
+        :return: The turns that were closed by this frame.
+        """
+        closed: List[SpeakerTurn] = []
+        active = set(active)
+
+        for speaker in active:
+            turn = self._open.get(speaker)
+            if turn is None:
+                self._open[speaker] = [start, end]
+            else:
+                turn[1] = max(turn[1], end)
+
+        for speaker in [speaker for speaker in self._open if speaker not in active]:
+            turn_start, turn_end = self._open[speaker]
+            if end - turn_end > self.min_duration_off:
+                del self._open[speaker]
+                closed.append(SpeakerTurn(speaker, turn_start, turn_end))
+
+        return [turn for turn in closed if turn.duration >= self.min_duration_on]
+
+    def flush(self) -> List[SpeakerTurn]:
+        """Close every open turn, used at the end of the stream."""
+        closed = [turn for turn in self.open_turns if turn.duration >= self.min_duration_on]
+        self._open.clear()
+        return sorted(closed, key=lambda turn: turn.start)
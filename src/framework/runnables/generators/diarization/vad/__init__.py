@@ -0,0 +1,10 @@
+from .base import (
+    BaseFrameClassifier,
+    BaseVoiceActivityDetector,
+    SpeechSegment,
+    VoiceActivityRequest,
+    VoiceActivityResult,
+    VoiceActivitySession,
+    vad_executor,
+)
+from .get import get_voice_activity_detector
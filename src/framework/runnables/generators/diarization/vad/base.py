@@ -0,0 +1,178 @@
+from abc import ABC, abstractmethod
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from src.framework.settings import framework_settings
+from src.framework.utils import decode_audio
+from ...inference import InferenceExecutor
+
+_settings = framework_settings.runnables.generators.diarization.vad
+
+vad_executor = InferenceExecutor('vad', max_workers=_settings.max_workers)
+""" Shared executor that audio decoding and voice activity detection run on. """
+
+VoiceActivityRequest = Union[str, bytes, np.ndarray]
+
+
+class SpeechSegment(NamedTuple):
+    """A detected span of speech, in seconds from the start of the session."""
+    start: float
+    end: Optional[float]
+    """ None while the speech is still ongoing. """
+
+
+class VoiceActivityResult(NamedTuple):
+    """Outcome of running one chunk of audio through a VoiceActivitySession."""
+
+    is_speech: bool
+    """ Whether the smoothed state was speech for any frame of the chunk. """
+
+    is_speaking: bool
+    """ Whether the smoothed state is speech at the end of the chunk. """
+
+    speech_ratio: float
+    """ Fraction of the chunk's frames that the classifier labelled speech, before smoothing. """
+
+    duration: float
+    """ Seconds of audio in the chunk. """
+
+    pcm: np.ndarray
+    """ The decoded chunk, so it can be passed on without decoding it again. """
+
+
+class BaseFrameClassifier(ABC):
+    """
+    Labels single frames as speech or non-speech.
+    One classifier is created per session and may keep adaptive state between frames.
+    """
+
+    @abstractmethod
+    def is_speech(self, frame: np.ndarray) -> bool:
+        pass
+
+
+class BaseVoiceActivityDetector(ABC):
+    """
+    A voice activity detection engine. Engines are shared by every session and must not keep per-stream state,
+    that belongs in the frame classifiers they create.
+    """
+
+    def __init__(self, *, sample_rate: int, frame_ms: int, onset_ms: int, hangover_ms: int):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.onset_ms = onset_ms
+        self.hangover_ms = hangover_ms
+
+    @property
+    def frame_samples(self) -> int:
+        return int(self.sample_rate * self.frame_ms / 1000)
+
+    def warm_up(self) -> None:
+        pass
+
+    @abstractmethod
+    def create_classifier(self) -> BaseFrameClassifier:
+        pass
+
+    def create_session(self) -> 'VoiceActivitySession':
+        frame_seconds = self.frame_samples / self.sample_rate
+        return VoiceActivitySession(
+            self.create_classifier(),
+            sample_rate=self.sample_rate,
+            frame_samples=self.frame_samples,
+            onset_frames=max(1, round(self.onset_ms / 1000 / frame_seconds)),
+            hangover_frames=max(0, round(self.hangover_ms / 1000 / frame_seconds)),
+        )
+
+
+class VoiceActivitySession:
+    """
+    Streaming voice activity detection for a single audio stream.
+
+    Audio is cut into fixed size frames, samples that do not fill a frame are carried over to the next chunk.
+    Speech starts after ``onset_frames`` consecutive speech frames and ends after ``hangover_frames`` consecutive
+    non-speech frames, which keeps short clicks from opening an utterance and short pauses from closing one.
+    """
+
+    def __init__(
+            self,
+            classifier: BaseFrameClassifier,
+            *,
+            sample_rate: int,
+            frame_samples: int,
+            onset_frames: int,
+            hangover_frames: int,
+    ):
+        self.classifier = classifier
+        self.sample_rate = sample_rate
+        self.frame_samples = frame_samples
+        self.onset_frames = onset_frames
+        self.hangover_frames = hangover_frames
+
+        self.is_speaking = False
+        self.segments: List[SpeechSegment] = []
+        self.frame_count = 0
+
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self._speech_run = 0
+        self._silence_run = 0
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds of audio processed so far."""
+        return self.frame_count * self.frame_samples / self.sample_rate
+
+    def _frames(self, pcm: np.ndarray) -> Tuple[np.ndarray, int]:
+        audio = np.concatenate([self._remainder, pcm]) if len(self._remainder) else pcm
+        frame_count = len(audio) // self.frame_samples
+        used = frame_count * self.frame_samples
+        self._remainder = audio[used:]
+        return audio[:used].reshape(frame_count, self.frame_samples), frame_count
+
+    def _update(self, frame_is_speech: bool) -> None:
+        if frame_is_speech:
+            self._speech_run += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+            self._speech_run = 0
+
+        self.frame_count += 1
+        frame_seconds = self.frame_samples / self.sample_rate
+
+        if not self.is_speaking and self._speech_run >= self.onset_frames:
+            self.is_speaking = True
+            self.segments.append(SpeechSegment(self.elapsed - self._speech_run * frame_seconds, None))
+        elif self.is_speaking and self._silence_run > self.hangover_frames:
+            self.is_speaking = False
+            start, _ = self.segments[-1]
+            self.segments[-1] = SpeechSegment(start, self.elapsed - self._silence_run * frame_seconds)
+
+    def process(self, audio: VoiceActivityRequest) -> VoiceActivityResult:
+        """
+        Run a chunk of audio through the detector. Blocking, run it on the vad executor.
+
+        :param audio: Encoded audio or 16 kHz mono float32 PCM.
+        """
+        pcm = decode_audio(audio, sample_rate=self.sample_rate)
+        frames, frame_count = self._frames(pcm)
+
+        is_speech = self.is_speaking
+        speech_frames = 0
+        for frame in frames:
+            frame_is_speech = self.classifier.is_speech(frame)
+            speech_frames += frame_is_speech
+            self._update(frame_is_speech)
+            is_speech = is_speech or self.is_speaking
+
+        return VoiceActivityResult(
+            is_speech=is_speech,
+            is_speaking=self.is_speaking,
+            speech_ratio=speech_frames / frame_count if frame_count else 0.0,
+            duration=len(pcm) / self.sample_rate,
+            pcm=pcm,
+        )
+
+    async def process_async(self, audio: VoiceActivityRequest) -> VoiceActivityResult:
+        return await vad_executor.run(self.process, audio)
@@ -0,0 +1,74 @@
+from typing import Optional
+
+import numpy as np
+
+from .base import BaseFrameClassifier, BaseVoiceActivityDetector
+
+_EPSILON = 1e-10
+
+
+class EnergyFrameClassifier(BaseFrameClassifier):
+    """
+    Labels a frame as speech when its level clears both the absolute threshold and the tracked noise floor by a margin.
+    Frames only just above the threshold with a high zero-crossing rate are broadband noise rather than voiced speech.
+    """
+
+    def __init__(self, *, threshold_db: float, noise_margin_db: float, noise_adapt_rate: float, zcr_max: float):
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.noise_adapt_rate = noise_adapt_rate
+        self.zcr_max = zcr_max
+        self.noise_floor_db: Optional[float] = None
+
+    @staticmethod
+    def level_db(frame: np.ndarray) -> float:
+        return 10 * np.log10(np.mean(np.square(frame, dtype=np.float64)) + _EPSILON)
+
+    @staticmethod
+    def zero_crossing_rate(frame: np.ndarray) -> float:
+        return np.count_nonzero(np.signbit(frame[1:]) != np.signbit(frame[:-1])) / max(1, len(frame) - 1)
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        level = self.level_db(frame)
+        if self.noise_floor_db is None:
+            self.noise_floor_db = min(level, self.threshold_db)
+
+        threshold = max(self.threshold_db, self.noise_floor_db + self.noise_margin_db)
+        is_speech = level > threshold
+        if is_speech and level < threshold + self.noise_margin_db and self.zero_crossing_rate(frame) > self.zcr_max:
+            is_speech = False
+
+        if level < self.noise_floor_db:
+            # The floor drops immediately so a loud start does not mask the speech that follows
+            self.noise_floor_db = level
+        elif not is_speech:
+            self.noise_floor_db += self.noise_adapt_rate * (level - self.noise_floor_db)
+
+        return is_speech
+
+
+class EnergyVoiceActivityDetector(BaseVoiceActivityDetector):
+    """Short-time energy and zero-crossing rate detector with an adaptive noise floor. Needs no model."""
+
+    def __init__(
+            self,
+            *,
+            threshold_db: float = -45.0,
+            noise_margin_db: float = 9.0,
+            noise_adapt_rate: float = 0.05,
+            zcr_max: float = 0.4,
+            **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.noise_adapt_rate = noise_adapt_rate
+        self.zcr_max = zcr_max
+
+    def create_classifier(self) -> EnergyFrameClassifier:
+        return EnergyFrameClassifier(
+            threshold_db=self.threshold_db,
+            noise_margin_db=self.noise_margin_db,
+            noise_adapt_rate=self.noise_adapt_rate,
+            zcr_max=self.zcr_max,
+        )
@@ -0,0 +1,38 @@
+from typing import Dict, Optional
+
+from src.framework.settings import framework_settings
+from .base import BaseVoiceActivityDetector
+
+_detectors: Dict[str, BaseVoiceActivityDetector] = {}
+
+
+def get_voice_activity_detector(engine_name: Optional[str] = None) -> BaseVoiceActivityDetector:
+    """
+    Get the shared voice activity detector for an engine, configured from the framework settings.
+
+    :param engine_name: The engine to use. Defaults to the configured engine.
+    """
+    settings = framework_settings.runnables.generators.diarization.vad
+    engine_name = engine_name or settings.engine
+
+    detector = _detectors.get(engine_name)
+    if detector is not None:
+        return detector
+
+    common = {
+        'sample_rate': settings.sample_rate,
+        'frame_ms': settings.frame_ms,
+        'onset_ms': settings.onset_ms,
+        'hangover_ms': settings.hangover_ms,
+    }
+    if engine_name == 'energy':
+        from .energy import EnergyVoiceActivityDetector
+        detector = EnergyVoiceActivityDetector(**settings.energy.model_dump(), **common)
+    elif engine_name == 'silero':
+        from .silero import SileroVoiceActivityDetector
+        detector = SileroVoiceActivityDetector(**settings.silero.model_dump(), **common)
+    else:
+        raise NotImplementedError(f'Voice activity detection engine: {engine_name} is not implemented')
+
+    _detectors[engine_name] = detector
+    return detector
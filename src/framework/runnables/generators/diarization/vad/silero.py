@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.utils import get_project_path_str
+from .base import BaseFrameClassifier, BaseVoiceActivityDetector
+from ...inference import ModelPool
+
+_CONTEXT_SAMPLES = {16000: 64, 8000: 32}
+_FRAME_SAMPLES = {16000: 512, 8000: 256}
+
+
+def _load_session(model_name: str, intra_op_threads: int):
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError('The silero voice activity detector requires onnxruntime to be installed') from e
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = intra_op_threads
+    options.inter_op_num_threads = 1
+    model_path = Path(get_project_path_str()) / 'transformer_models' / 'models' / model_name
+    return onnxruntime.InferenceSession(str(model_path), sess_options=options, providers=['CPUExecutionProvider'])
+
+
+silero_model_pool = ModelPool('silero_vad', _load_session)
+""" Silero ONNX sessions resident in this process. A session is stateless, the recurrent state is kept per stream. """
+
+
+class SileroFrameClassifier(BaseFrameClassifier):
+    """Runs the Silero VAD model on one frame at a time, carrying its recurrent state and audio context."""
+
+    def __init__(self, session, *, sample_rate: int, threshold: float):
+        self.session = session
+        self.threshold = threshold
+        self._sample_rate = np.array(sample_rate, dtype=np.int64)
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._context = np.zeros((1, _CONTEXT_SAMPLES[sample_rate]), dtype=np.float32)
+
+    def probability(self, frame: np.ndarray) -> float:
+        audio = np.concatenate([self._context, frame.reshape(1, -1).astype(np.float32, copy=False)], axis=1)
+        output, self._state = self.session.run(None, {'input': audio, 'state': self._state, 'sr': self._sample_rate})
+        self._context = audio[:, -self._context.shape[1]:]
+        return float(output[0][0])
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        return self.probability(frame) > self.threshold
+
+
+class SileroVoiceActivityDetector(BaseVoiceActivityDetector):
+    """
+    Small neural detector (Silero VAD, ~2MB ONNX) on CPU. More robust to music and background chatter than
+    the energy detector. Requires onnxruntime and the model file in transformer_models/models.
+    """
+
+    def __init__(
+            self,
+            *,
+            model_name: str = 'silero_vad.onnx',
+            threshold: float = 0.5,
+            intra_op_threads: int = 1,
+            **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if self.sample_rate not in _FRAME_SAMPLES:
+            raise ValueError(f'Silero voice activity detection supports 8000 or 16000 Hz, not {self.sample_rate}')
+        self.model_name = model_name
+        self.threshold = threshold
+        self.intra_op_threads = intra_op_threads
+
+    @property
+    def frame_samples(self) -> int:
+        return _FRAME_SAMPLES[self.sample_rate]
+
+    def warm_up(self) -> None:
+        silero_model_pool.get(self.model_name, self.intra_op_threads)
+
+    def create_classifier(self) -> SileroFrameClassifier:
+        return SileroFrameClassifier(
+            silero_model_pool.get(self.model_name, self.intra_op_threads),
+            sample_rate=self.sample_rate,
+            threshold=self.threshold,
+        )
@@ -1,12 +1,21 @@
-from typing import TypeVar
+from typing import Dict, TypeVar
 from .base import BaseEmbeddingsGenerationService
 
 TEmbeddingsGenerationService = TypeVar("TEmbeddingsGenerationService", bound=BaseEmbeddingsGenerationService)
 
+_services: Dict[str, BaseEmbeddingsGenerationService] = {}
+
 
 def get_embeddings_generation_service(service_name: str) -> TEmbeddingsGenerationService:
+    # Services are stateless and share pooled provider clients, so one instance per name is enough
+    if service_name in _services:
+        return _services[service_name]
+
     if service_name == 'openai':
         from .openai import OpenAiEmbeddingsGenerationService
-        return OpenAiEmbeddingsGenerationService()
+        service = OpenAiEmbeddingsGenerationService()
+    else:
+        raise NotImplementedError(f'Embedding Generation service: {service_name} is not implemented')
 
-    raise NotImplementedError(f'Embedding Generation service: {service_name} is not implemented')
\ No newline at end of file
+    _services[service_name] = service
+    return service
@@ -1,29 +1,29 @@
-import os
-
-from dotenv import load_dotenv
 from openai import AsyncOpenAI, OpenAI
 from openai.types import CreateEmbeddingResponse
 
 from src.utils import loggers
 from ..base import BaseEmbeddingsGenerationService
 from .converter import OpenAiEmbeddingsGenerationConverter
+from ....clients import client_registry
 from ...models import EmbeddingsGenerationRequest, EmbeddingsGenerationParams, EmbeddingsResponse
 
 
 class OpenAiEmbeddingsGenerationService(BaseEmbeddingsGenerationService):
-    client: AsyncOpenAI
-    client_sync: OpenAI
     converter: OpenAiEmbeddingsGenerationConverter
     default_model: str = 'text-embedding-3-small'
 
     def __init__(self):
         super().__init__()
-        load_dotenv()
-        api_key = os.environ.get('OPENAI_API_KEY')
-        self.client = AsyncOpenAI(api_key=api_key)
-        self.client_sync = OpenAI(api_key=api_key)
         self.converter = OpenAiEmbeddingsGenerationConverter()
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        return client_registry.get_async_client('openai')
+
+    @property
+    def client_sync(self) -> OpenAI:
+        return client_registry.get_sync_client('openai')
+
     @staticmethod
     def calculate_cost(
             token_count: int,
@@ -0,0 +1,248 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from src.utils import loggers
+from ...exceptions import AdmissionException
+
+T = TypeVar('T')
+TItem = TypeVar('TItem')
+TResult = TypeVar('TResult')
+
+
+def default_worker_count() -> int:
+    """Number of inference threads to use when none is configured: one per CPU core."""
+    return max(1, os.cpu_count() or 1)
+
+
+class InferenceExecutor:
+    """
+    A bounded, long-lived thread pool for blocking model inference.
+
+    Requests beyond ``max_workers`` wait in the executor queue. When ``max_queue_depth`` is set, requests that
+    would grow the queue past it are rejected with an AdmissionException instead of piling up latency.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            *,
+            max_workers: Optional[int] = None,
+            max_queue_depth: Optional[int] = None,
+    ):
+        self.name = name
+        self.max_workers = max_workers or default_worker_count()
+        self.max_queue_depth = max_queue_depth or 0
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f'{name}-inference')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._peak_queue_depth = 0
+        self._total_wait_time = 0.0
+        self._total_run_time = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of accepted requests that are waiting for a worker thread."""
+        return max(0, self._in_flight - self._running)
+
+    def _admit(self) -> None:
+        with self._lock:
+            queue_depth = max(0, self._in_flight - self.max_workers)
+            if self.max_queue_depth and queue_depth >= self.max_queue_depth:
+                self._rejected += 1
+                raise AdmissionException(queue_depth=queue_depth, max_queue_depth=self.max_queue_depth)
+            self._in_flight += 1
+            self._submitted += 1
+            self._peak_queue_depth = max(self._peak_queue_depth, self._in_flight - self.max_workers)
+
+    def _execute(self, submitted_at: float, fn: Callable[..., T], *args: Any) -> T:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._total_wait_time += started_at - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._total_run_time += time.perf_counter() - started_at
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking function on the executor.
+
+        :raises AdmissionException: If the queue is full.
+        """
+        self._admit()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor, self._execute, time.perf_counter(), fn, *args)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = max(1, self._completed + self._failed)
+            return {
+                'name': self.name,
+                'max_workers': self.max_workers,
+                'max_queue_depth': self.max_queue_depth,
+                'in_flight': self._in_flight,
+                'running': self._running,
+                'queue_depth': max(0, self._in_flight - self._running),
+                'peak_queue_depth': self._peak_queue_depth,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'avg_wait_ms': self._total_wait_time / finished * 1000,
+                'avg_run_ms': self._total_run_time / finished * 1000,
+                'total_run_s': self._total_run_time,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class ModelPool(Generic[T]):
+    """
+    Loads each model once per process and keeps it resident.
+    Models are keyed by the arguments passed to the loader, loading is lazy and thread-safe.
+    """
+
+    def __init__(self, name: str, loader: Callable[..., T]):
+        self.name = name
+        self._loader = loader
+        self._models: Dict[Tuple[Hashable, ...], T] = {}
+        self._lock = threading.Lock()
+
+    def get(self, *key: Hashable) -> T:
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                started_at = time.perf_counter()
+                model = self._loader(*key)
+                self._models[key] = model
+                loggers.framework.info(f'Loaded {self.name} model {key} in {time.perf_counter() - started_at:.2f}s')
+            return model
+
+    def preload(self, keys: Iterable[Tuple[Hashable, ...]]) -> None:
+        for key in keys:
+            self.get(*key)
+
+    @property
+    def loaded_keys(self) -> List[Tuple[Hashable, ...]]:
+        return list(self._models.keys())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+class MicroBatcher(Generic[TItem, TResult]):
+    """
+    Groups concurrent requests that share a batch key and runs them through ``batch_fn`` together.
+
+    A batch is flushed when it reaches ``max_batch_size`` or ``max_wait_ms`` after its first item arrived,
+    whichever comes first. ``batch_fn`` receives the batch key and the items and must return one result per item.
+    """
+
+    def __init__(
+            self,
+            batch_fn: Callable[[Hashable, List[TItem]], List[TResult]],
+            executor: InferenceExecutor,
+            *,
+            max_batch_size: int = 4,
+            max_wait_ms: float = 10.0,
+    ):
+        self._batch_fn = batch_fn
+        self._executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: Dict[Hashable, List[Tuple[TItem, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        # The running batches, the event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item: TItem, key: Hashable = None) -> TResult:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, key: Hashable, batch: List[Tuple[TItem, asyncio.Future]]) -> None:
+        self._batches += 1
+        self._items += len(batch)
+        try:
+            results = await self._executor.run(self._batch_fn, key, [item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f'Batch function returned {len(results)} results for {len(batch)} items')
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def aclose(self) -> None:
+        """Cancel the items that are still waiting for a batch and wait for the running batches."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        pending, self._pending = self._pending, {}
+        for batch in pending.values():
+            for _, future in batch:
+                future.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self._batches,
+            'items': self._items,
+            'avg_batch_size': self._items / self._batches if self._batches else 0.0,
+            'pending': sum(len(batch) for batch in self._pending.values()),
+        }
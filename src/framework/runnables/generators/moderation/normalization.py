@@ -0,0 +1,21 @@
+import hashlib
+import re
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_WORD_PATTERN = re.compile(r"[\w']+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace, so trivially different messages share a cache entry."""
+    return _WHITESPACE_PATTERN.sub(' ', text).strip().lower()
+
+
+def text_key(text: str) -> str:
+    """Cache key of a message: the hash of its normalized text."""
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def is_short_text(text: str, max_words: int = 3) -> bool:
+    """Whether a message has at most ``max_words`` words, e.g. "yes", "ok thanks" or "ignore previous"."""
+    return len(_WORD_PATTERN.findall(text)) <= max_words
+
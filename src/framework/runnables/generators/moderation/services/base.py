@@ -5,6 +5,10 @@ from ..models import ModerationResponse, ModerationGenerationParams
 
 class BaseModerationService(ABC):
 
+    def warm_up(self) -> None:
+        """Load anything the service needs ahead of the first request."""
+        pass
+
     @abstractmethod
     def run(
             self,
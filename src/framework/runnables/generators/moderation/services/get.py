@@ -1,16 +1,25 @@
-from typing import TypeVar
+from typing import Dict, TypeVar
 
 from .base import BaseModerationService
 
 TModerationService = TypeVar("TModerationService", bound=BaseModerationService)
 
+_services: Dict[str, BaseModerationService] = {}
+
 
 def get_moderation_service(service_name: str) -> TModerationService:
+    # One instance per process so that the resident classifier, its batcher and result cache are shared
+    if service_name in _services:
+        return _services[service_name]
+
     if service_name == 'openai':
         from .openai import OpenaiModerationService
-        return OpenaiModerationService()
+        service = OpenaiModerationService()
     elif service_name == 'transformers':
         from .transformers import TransformersModerationService
-        return TransformersModerationService()
-    
-    raise NotImplementedError(f'Moderation service: {service_name} is not implemented')
\ No newline at end of file
+        service = TransformersModerationService()
+    else:
+        raise NotImplementedError(f'Moderation service: {service_name} is not implemented')
+
+    _services[service_name] = service
+    return service
@@ -1,29 +1,29 @@
-import os
-
-from dotenv import load_dotenv
 from openai import AsyncOpenAI, OpenAI
 from openai.types import ModerationCreateResponse
 
 from src.utils import loggers
 from .converter import OpenaiModerationConverter
 from ..base import BaseModerationService
+from ....clients import client_registry
 from ...models import ModerationResponse, ModerationGenerationParams
 
 
 class OpenaiModerationService(BaseModerationService):
-    client: AsyncOpenAI
-    client_sync: OpenAI
     converter: OpenaiModerationConverter
     default_model: str = 'text-moderation-stable'
 
     def __init__(self):
         super().__init__()
-        load_dotenv()
-        api_key = os.environ.get('OPENAI_API_KEY')
-        self.client = AsyncOpenAI(api_key=api_key)
-        self.client_sync = OpenAI(api_key=api_key)
         self.converter = OpenaiModerationConverter()
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        return client_registry.get_async_client('openai')
+
+    @property
+    def client_sync(self) -> OpenAI:
+        return client_registry.get_sync_client('openai')
+
     def run(
             self,
             request: str,
@@ -1,16 +1,67 @@
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
+from transformers import AutoTokenizer, AutoModelForSequenceClassification, Pipeline, pipeline
 
+from src.framework.exceptions import GenerationException
+from src.framework.settings import framework_settings
+from src.framework.utils import LRUCache
 from src.utils import loggers, get_project_path_str
 from .converter import TransformersModerationConverter
 from ..base import BaseModerationService
+from ...normalization import is_short_text, text_key
+from ....inference import InferenceExecutor, MicroBatcher, ModelPool
 from ...models import ModerationResponse, ModerationGenerationParams
 
+_settings = framework_settings.runnables.generators.moderation
+
+
+def _get_setting(*keys: str, default: Any = None) -> Any:
+    value = _settings.get_service_value('transformers', *keys)
+    return default if value is None else value
+
+
+def _resolve_device(device: str) -> str:
+    return 'cuda' if torch.cuda.is_available() and device == 'cuda' else 'cpu'
+
+
+def _load_classifier(model_name: str, device: str, quantize: bool) -> Pipeline:
+    model_path = Path(get_project_path_str()) / "transformer_models" / "models" / model_name
+
+    tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path, local_files_only=True)
+    model.eval()
+
+    if quantize and device == 'cpu':
+        # int8 weights for the linear layers, activations stay float
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    return pipeline(
+        'text-classification',
+        model=model,
+        tokenizer=tokenizer,
+        truncation=True,
+        max_length=512,
+        device=torch.device(device),
+    )
+
+
+moderation_model_pool: ModelPool[Pipeline] = ModelPool('moderation', _load_classifier)
+""" Classifier pipelines resident in this process, keyed by (model name, device, quantize). """
+
+moderation_executor = InferenceExecutor(
+    'moderation',
+    max_workers=_get_setting('max_workers'),
+    max_queue_depth=_get_setting('max_queue_depth'),
+)
+""" Shared executor that all moderation inference runs on. """
+
+moderation_cache: LRUCache[Tuple[str, bool, str], Dict[str, Any]] = LRUCache(_get_setting('cache', 'max_size', default=10_000))
+""" Classification results keyed by (model name, quantize, normalized text hash). """
+
+ClassifierKey = Tuple[str, str, bool]
+
 
 class TransformersModerationService(BaseModerationService):
     converter: TransformersModerationConverter
@@ -19,28 +70,63 @@ class TransformersModerationService(BaseModerationService):
     def __init__(self):
         super().__init__()
         self.converter = TransformersModerationConverter()
+        self.model_name: str = _get_setting('model', default=self.default_model)
+        self.quantize: bool = _get_setting('quantize', default=False)
+        self.cache_enabled: bool = _get_setting('cache', 'enabled', default=True)
+        self.fast_path_enabled: bool = _get_setting('fast_path', 'enabled', default=True)
+        self.fast_path_max_words: int = _get_setting('fast_path', 'max_words', default=3)
+
+        self._batcher: Optional[MicroBatcher[str, Dict[str, Any]]] = None
+        if _get_setting('batching', 'enabled', default=True):
+            self._batcher = MicroBatcher(
+                self._classify_batch,
+                moderation_executor,
+                max_batch_size=_get_setting('batching', 'max_batch_size', default=16),
+                max_wait_ms=_get_setting('batching', 'max_wait_ms', default=10),
+            )
+
+    def _classifier_key(self, generation_params: ModerationGenerationParams) -> ClassifierKey:
+        return self.model_name, _resolve_device(generation_params.device), self.quantize
+
+    def warm_up(self) -> None:
+        generation_params = ModerationGenerationParams(**(_settings.generation_params or {}))
+        moderation_model_pool.get(*self._classifier_key(generation_params))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'executor': moderation_executor.stats(),
+            'batcher': self._batcher.stats() if self._batcher else None,
+            'cache': moderation_cache.stats(),
+            'models': [f'{model_name}:{device}:{"int8" if quantize else "fp32"}'
+                       for model_name, device, quantize in moderation_model_pool.loaded_keys],
+        }
 
-    def run(
-            self,
-            request: str,
-            generation_params: ModerationGenerationParams
-    ) -> ModerationResponse:
-        if request is None:
-            raise ValueError('ModerationRequest cannot be None')
+    @staticmethod
+    def _classify_batch(key: ClassifierKey, texts: List[str]) -> List[Dict[str, Any]]:
+        classifier = moderation_model_pool.get(*key)
+        with torch.inference_mode():
+            return classifier(texts, batch_size=len(texts))
 
-        model_path = Path(get_project_path_str()) / "transformer_models" / "models" / self.default_model
+    def _lookup(self, request: str) -> Tuple[Tuple[str, bool, str], Optional[Dict[str, Any]]]:
+        # Quantized and full precision models can score the same text differently
+        cache_key = (self.model_name, self.quantize, text_key(request))
+        if self.cache_enabled:
+            return cache_key, moderation_cache.get(cache_key)
+        return cache_key, None
 
-        transformer_response = self._classify_sync(request, str(model_path))
+    def _to_response(self, cache_key: Tuple[str, bool, str], result: Dict[str, Any]) -> ModerationResponse:
+        if self.cache_enabled:
+            moderation_cache.set(cache_key, result)
 
-        loggers.framework.dev_debug(transformer_response)
+        loggers.framework.dev_debug(result)
 
-        response = self.converter.from_transformer_response(self.default_model, transformer_response)
+        response = self.converter.from_transformer_response(self.model_name, [result])
 
         loggers.framework.dev_debug(response)
 
         return response
 
-    async def run_async(
+    def run(
             self,
             request: str,
             generation_params: ModerationGenerationParams
@@ -48,35 +134,34 @@ class TransformersModerationService(BaseModerationService):
         if request is None:
             raise ValueError('ModerationRequest cannot be None')
 
-        model_path = Path(get_project_path_str()) / "transformer_models" / "models" / self.default_model
-
-        loop = asyncio.get_event_loop()
-        with ThreadPoolExecutor() as executor:
-            transformer_response = await loop.run_in_executor(executor, self._classify_sync, request, str(model_path))
-
-        loggers.framework.dev_debug(transformer_response)
+        cache_key, result = self._lookup(request)
+        if result is None:
+            result, = self._classify_batch(self._classifier_key(generation_params), [request])
 
-        response = self.converter.from_transformer_response(self.default_model, transformer_response)
-
-        loggers.framework.dev_debug(response)
+        return self._to_response(cache_key, result)
 
-        return response
+    async def run_async(
+            self,
+            request: str,
+            generation_params: ModerationGenerationParams
+    ) -> ModerationResponse:
+        if request is None:
+            raise ValueError('ModerationRequest cannot be None')
 
-    @staticmethod
-    def _classify_sync(query: str, model_path: str) -> List:
-        tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=True)
-        model = AutoModelForSequenceClassification.from_pretrained(model_path, local_files_only=True)
-
-        classifier = pipeline(
-            'text-classification',
-            model=model,
-            tokenizer=tokenizer,
-            truncation=True,
-            max_length=512,
-            #device=torch.device("cuda" if torch.cuda.is_available() else "cpu"),
-            device=torch.device("cpu"),
-        )
-
-        result = classifier(query)
-
-        return result
\ No newline at end of file
+        cache_key, result = self._lookup(request)
+        if result is None:
+            key = self._classifier_key(generation_params)
+            try:
+                # Short messages are cheap to classify alone and should not wait for a batch to fill
+                short = self.fast_path_enabled and is_short_text(request, self.fast_path_max_words)
+                if self._batcher is not None and not short:
+                    result = await self._batcher.submit(request, key)
+                else:
+                    result, = await moderation_executor.run(self._classify_batch, key, [request])
+            except Exception as e:
+                raise GenerationException(
+                    message=f'Error while generating moderation: {e}',
+                    inner_exception=e
+                )
+
+        return self._to_response(cache_key, result)
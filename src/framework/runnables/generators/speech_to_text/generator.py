@@ -1,4 +1,4 @@
-from typing import TypeVar, AsyncGenerator, ClassVar
+from typing import TypeVar, AsyncGenerator, AsyncIterator, ClassVar, List
 from uuid import UUID
 
 from pydantic import Field
@@ -57,12 +57,37 @@ class SpeechToTextGenerator(BaseGenerator[SpeechToTextGenerationParams]):
 
         return response
 
-    # TODO: Add support for streaming
-    def run_stream(
+    async def run_stream(
             self,
-            request: SpeechToTextRequest,
+            request: AsyncIterator[SpeechToTextRequest],
     ) -> AsyncGenerator[SpeechToTextResponseChunk, None]:
-        raise NotImplementedError()
+        """
+        Incrementally transcribe a stream of audio chunks.
+        Partial chunks carry the current unstable hypothesis, the remaining chunks concatenate to the final transcript.
+        """
+        content = self._begin_run(generation_params=self.generation_params)
+        generation_service = self._get_generation_service()
+
+        await self._invoke_callback_async('on_speech_to_text_generation_start', request=request, **content)
+
+        chunks: List[SpeechToTextResponseChunk] = []
+        try:
+            async for chunk in generation_service.run_stream(
+                request=request,
+                generation_params=self.generation_params
+            ):
+                chunks.append(chunk)
+                await self._invoke_callback_async('on_speech_to_text_generation_chunk', chunk=chunk, **content)
+                yield chunk
+        except Exception as e:
+            await self._invoke_callback_async('on_speech_to_text_generation_error', error=e, **content)
+            raise GenerationException(
+                message=f'Error while streaming speech to text: {e}',
+                inner_exception=e
+            )
+
+        response = SpeechToTextResponse.from_chunks(chunks)
+        await self._invoke_callback_async('on_speech_to_text_generation_end', response=response, **content)
 
     def _begin_run(
             self,
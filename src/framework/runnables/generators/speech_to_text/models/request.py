@@ -1,6 +1,10 @@
 from typing import Union
 
+import numpy as np
+
 SpeechToTextRequest = Union[
     str,
-    bytes
+    bytes,
+    np.ndarray,
 ]
+""" A file path, base64 string or encoded audio bytes. Streaming requests also accept 16 kHz mono float32 PCM. """
@@ -25,6 +25,15 @@ class SpeechToTextResponseChunk(BaseModel):
 
     tokens: List[int] = Field(default_factory=list)
 
+    is_partial: bool = Field(default=False)
+    """ Whether the text is an unstable hypothesis that later chunks may revise. Partial chunks are not part of the final text. """
+
+    start_time: Optional[float] = Field(default=None)
+    """ Start of the transcribed audio in seconds from the start of the stream. """
+
+    end_time: Optional[float] = Field(default=None)
+    """ End of the transcribed audio in seconds from the start of the stream. """
+
     is_final: bool = Field(default=False)
     """Whether this chunk is the final chunk in a streaming response."""
 
@@ -73,6 +82,8 @@ class SpeechToTextResponse(BaseModel):
         tokens = []
 
         for chunk in chunks:
+            if chunk.is_partial:
+                continue
             if chunk.text:
                 text += chunk.text
             if chunk.language:
@@ -1,10 +1,15 @@
 from abc import ABC, abstractmethod
+from typing import AsyncGenerator, AsyncIterator
 
-from ..models import SpeechToTextGenerationParams, SpeechToTextResponse, SpeechToTextRequest
+from ..models import SpeechToTextGenerationParams, SpeechToTextResponse, SpeechToTextResponseChunk, SpeechToTextRequest
 
 
 class BaseSpeechToTextGenerationService(ABC):
 
+    def warm_up(self) -> None:
+        """Load any resident models ahead of the first request."""
+        pass
+
     @abstractmethod
     async def run_async(
             self,
@@ -12,3 +17,10 @@ class BaseSpeechToTextGenerationService(ABC):
             generation_params: SpeechToTextGenerationParams,
     ) -> SpeechToTextResponse:
         pass
+
+    def run_stream(
+            self,
+            request: AsyncIterator[SpeechToTextRequest],
+            generation_params: SpeechToTextGenerationParams,
+    ) -> AsyncGenerator[SpeechToTextResponseChunk, None]:
+        raise NotImplementedError(f'{type(self).__name__} does not support streaming')
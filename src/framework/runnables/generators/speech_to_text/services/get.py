@@ -1,12 +1,22 @@
-from typing import TypeVar
+from typing import Dict, TypeVar
 
 from .base import BaseSpeechToTextGenerationService
 
 TSpeechToTextGenerationService = TypeVar("TSpeechToTextGenerationService", bound=BaseSpeechToTextGenerationService)
 
+_services: Dict[str, BaseSpeechToTextGenerationService] = {}
+
 
 def get_speech_to_text_generation_service(service_name: str) -> TSpeechToTextGenerationService:
+    # One instance per process so that resident models, executors and batchers are shared across sessions
+    if service_name in _services:
+        return _services[service_name]
+
     if service_name == 'whisper':
         from .whisper import WhisperGenerationService
-        return WhisperGenerationService()
-    raise NotImplementedError(f'Speech to Text Generation service: {service_name} is not implemented')
\ No newline at end of file
+        service = WhisperGenerationService()
+    else:
+        raise NotImplementedError(f'Speech to Text Generation service: {service_name} is not implemented')
+
+    _services[service_name] = service
+    return service
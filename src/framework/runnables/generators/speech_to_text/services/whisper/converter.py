@@ -1,7 +1,10 @@
+from typing import List
+
 from whisper import DecodingOptions, DecodingResult
 
 from src.framework.exceptions import ConversionException
-from ...models import SpeechToTextGenerationParams, SpeechToTextResponse
+from ...models import SpeechToTextGenerationParams, SpeechToTextResponse, SpeechToTextResponseChunk
+from ...streaming import TimedWord, join_words
 
 
 class WhisperGenerationConverter:
@@ -74,4 +77,41 @@ class WhisperGenerationConverter:
                 from_type=DecodingResult,
                 to_type=SpeechToTextResponse,
                 inner_exception=e
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def from_timed_words(
+            index: int,
+            words: List[TimedWord],
+            *,
+            is_partial: bool = False,
+            is_final: bool = False,
+    ) -> SpeechToTextResponseChunk:
+        """
+        Convert streamed Whisper words to a Quiply SpeechToTextResponseChunk.
+        Committed chunks keep Whisper's leading spaces so that their texts can be concatenated.
+
+        :param index: The index of the chunk in the stream.
+        :param words: The words the chunk covers.
+        :param is_partial: Whether the words are an unstable hypothesis.
+        :param is_final: Whether this is the last chunk of the stream.
+
+        :return: The converted Quiply SpeechToTextResponseChunk.
+        """
+
+        try:
+            return SpeechToTextResponseChunk(
+                index=index,
+                text=join_words(words) if is_partial else ''.join(word.text for word in words),
+                is_partial=is_partial,
+                start_time=words[0].start if words else None,
+                end_time=words[-1].end if words else None,
+                is_final=is_final,
+            )
+        except Exception as e:
+            raise ConversionException(
+                WhisperGenerationConverter,
+                from_type=TimedWord,
+                to_type=SpeechToTextResponseChunk,
+                inner_exception=e
+            )
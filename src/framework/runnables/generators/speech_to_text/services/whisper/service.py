@@ -1,15 +1,48 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import AsyncGenerator, AsyncIterator
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Tuple
 
+import numpy as np
 import torch
 import whisper
+from whisper import DecodingOptions, DecodingResult
 
 from src.framework.exceptions import GenerationException
-from src.framework.utils import CreateWavFile
+from src.framework.settings import framework_settings
+from src.framework.utils import decode_audio
+from src.utils import loggers
 from .converter import WhisperGenerationConverter
 from ..base import BaseSpeechToTextGenerationService
-from ...models import SpeechToTextGenerationParams, SpeechToTextResponse, SpeechToTextRequest
+from ....inference import InferenceExecutor, MicroBatcher, ModelPool
+from .streaming import WhisperStreamingSession
+from ...models import SpeechToTextGenerationParams, SpeechToTextResponse, SpeechToTextResponseChunk, SpeechToTextRequest
+
+_settings = framework_settings.runnables.generators.speech_to_text
+
+
+def _get_setting(*keys: str, default: Any = None) -> Any:
+    value = _settings.get_service_value('whisper', *keys)
+    return default if value is None else value
+
+
+def _resolve_device(device: str) -> str:
+    return 'cuda' if torch.cuda.is_available() and device == 'cuda' else 'cpu'
+
+
+def _load_model(model_name: str, device: str) -> whisper.Whisper:
+    return whisper.load_model(model_name, torch.device(device))
+
+
+whisper_model_pool: ModelPool[whisper.Whisper] = ModelPool('whisper', _load_model)
+""" Whisper models resident in this process, keyed by (model name, device). """
+
+whisper_executor = InferenceExecutor(
+    'whisper',
+    max_workers=_get_setting('max_workers'),
+    max_queue_depth=_get_setting('max_queue_depth'),
+)
+""" Shared executor that all Whisper inference runs on. """
+
+BatchKey = Tuple[str, str, DecodingOptions]
 
 
 class WhisperGenerationService(BaseSpeechToTextGenerationService):
@@ -18,25 +51,55 @@ class WhisperGenerationService(BaseSpeechToTextGenerationService):
     def __init__(self):
         super().__init__()
         self.converter = WhisperGenerationConverter()
+        self._batcher: MicroBatcher[torch.Tensor, DecodingResult] | None = None
+        if _get_setting('batching', 'enabled', default=False):
+            self._batcher = MicroBatcher(
+                self._decode_batch,
+                whisper_executor,
+                max_batch_size=_get_setting('batching', 'max_batch_size', default=4),
+                max_wait_ms=_get_setting('batching', 'max_wait_ms', default=20),
+            )
 
-    def _transcribe(
+    def warm_up(self) -> None:
+        generation_params = _settings.generation_params or {}
+        models = _get_setting('preload_models', default=[generation_params.get('model', 'base')])
+        device = _resolve_device(generation_params.get('device', 'cpu'))
+        whisper_model_pool.preload((model_name, device) for model_name in models)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'executor': whisper_executor.stats(),
+            'batcher': self._batcher.stats() if self._batcher else None,
+            'models': [f'{model_name}:{device}' for model_name, device in whisper_model_pool.loaded_keys],
+        }
+
+    @staticmethod
+    def _load_audio(request: SpeechToTextRequest) -> np.ndarray:
+        return decode_audio(request, sample_rate=whisper.audio.SAMPLE_RATE)
+
+    def _prepare(
             self,
             request: SpeechToTextRequest,
             generation_params: SpeechToTextGenerationParams,
-    ) -> SpeechToTextResponse:
+    ) -> Tuple[whisper.Whisper, torch.Tensor]:
         if request is None:
             raise ValueError('SpeechToTextGenerationRequest cannot be None')
 
-        try:
-            with CreateWavFile(request, mime_type='audio/webm;codec=opus') as file_path:
-                audio = whisper.load_audio(file_path)
+        audio = self._load_audio(request)
+        model = whisper_model_pool.get(generation_params.model, _resolve_device(generation_params.device))
 
-            device = torch.device("cuda" if torch.cuda.is_available() and generation_params.device == 'cuda' else "cpu")
-            model = whisper.load_model(generation_params.model, device)
-            options = self.converter.to_decoding_options(generation_params)
+        audio = whisper.pad_or_trim(audio)
+        mel = whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels).to(model.device)
+        return model, mel
 
-            audio = whisper.pad_or_trim(audio)
-            mel = whisper.log_mel_spectrogram(audio).to(model.device)
+    def _transcribe(
+            self,
+            request: SpeechToTextRequest,
+            generation_params: SpeechToTextGenerationParams,
+    ) -> SpeechToTextResponse:
+        try:
+            model, mel = self._prepare(request, generation_params)
+            options = self.converter.to_decoding_options(generation_params)
             decoding_result = whisper.decode(model, mel, options)
 
             result = self.converter.from_decoding_result(decoding_result)
@@ -48,45 +111,126 @@ class WhisperGenerationService(BaseSpeechToTextGenerationService):
 
         return result
 
-    async def run_async(
+    @staticmethod
+    def _decode_batch(key: BatchKey, mels: List[torch.Tensor]) -> List[DecodingResult]:
+        model_name, device, options = key
+        model = whisper_model_pool.get(model_name, device)
+        batch = torch.stack(mels).to(model.device)
+        return whisper.decode(model, batch, options)
+
+    async def _transcribe_batched(
             self,
             request: SpeechToTextRequest,
             generation_params: SpeechToTextGenerationParams,
     ) -> SpeechToTextResponse:
+        options = self.converter.to_decoding_options(generation_params)
+        key: BatchKey = (generation_params.model, _resolve_device(generation_params.device), options)
         try:
-            loop = asyncio.get_event_loop()
+            hash(key)
+        except TypeError:
+            # Options holding lists (e.g. prompt tokens) cannot be grouped, decode them on their own
+            return await whisper_executor.run(self._transcribe, request, generation_params)
+
+        _, mel = await whisper_executor.run(self._prepare, request, generation_params)
+        decoding_result = await self._batcher.submit(mel, key)
+        return self.converter.from_decoding_result(decoding_result)
 
-            with ThreadPoolExecutor() as executor:
-                result = await loop.run_in_executor(executor, self._transcribe, request, generation_params)
+    async def run_async(
+            self,
+            request: SpeechToTextRequest,
+            generation_params: SpeechToTextGenerationParams,
+    ) -> SpeechToTextResponse:
+        try:
+            if self._batcher is not None:
+                result = await self._transcribe_batched(request, generation_params)
+            else:
+                result = await whisper_executor.run(self._transcribe, request, generation_params)
         except Exception as e:
             raise GenerationException(
                 message=f'Error while generating speech to text async: {e}',
                 inner_exception=e
             )
 
+        loggers.framework.dev_debug(f'Whisper queue depth: {whisper_executor.queue_depth}')
         return result
 
+    def create_streaming_session(self, generation_params: SpeechToTextGenerationParams) -> WhisperStreamingSession:
+        """Create a streaming session. Blocking on the first use of a model, run it on the inference executor."""
+        return WhisperStreamingSession(
+            whisper_model_pool.get(generation_params.model, _resolve_device(generation_params.device)),
+            generation_params,
+            min_chunk_seconds=_get_setting('streaming', 'min_chunk_seconds', default=1.0),
+            buffer_trim_seconds=_get_setting('streaming', 'buffer_trim_seconds', default=5.0),
+            prompt_chars=_get_setting('streaming', 'prompt_chars', default=200),
+        )
+
+    async def _to_pcm(self, chunk: SpeechToTextRequest) -> np.ndarray:
+        if isinstance(chunk, np.ndarray):
+            return chunk
+        return await whisper_executor.run(self._load_audio, chunk)
+
     async def run_stream(
             self,
             request: AsyncIterator[SpeechToTextRequest],
             generation_params: SpeechToTextGenerationParams,
-    ) -> AsyncGenerator[SpeechToTextResponse, None]:
-        queue: asyncio.Queue = asyncio.Queue(maxsize=10)
-
+    ) -> AsyncGenerator[SpeechToTextResponseChunk, None]:
+        """
+        Incrementally transcribe a stream of independently decodable audio chunks.
+
+        Yields committed chunks as soon as consecutive hypotheses agree on them, partial chunks with the current
+        unstable tail, and a final chunk with the remaining words once the request iterator is exhausted.
+        Audio that arrives while a decode is running is merged into the next decode rather than queued per chunk.
+        """
         try:
-            async for chunk in request:
-                await queue.put(chunk)
-
-                if queue.full():
-                    data = b''
-                    while not queue.empty():
-                        data += await queue.get()
-                    response = await self.run_async(data, generation_params)
-                    yield response
+            session = await whisper_executor.run(self.create_streaming_session, generation_params)
         except Exception as e:
             raise GenerationException(
-                message=f'Error while generating speech to text stream: {e}',
+                message=f'Error while creating speech to text stream: {e}',
                 inner_exception=e
             )
 
+        audio_ready = asyncio.Event()
+        request_ended = False
+
+        async def feed() -> None:
+            nonlocal request_ended
+            try:
+                async for chunk in request:
+                    session.insert_audio(await self._to_pcm(chunk))
+                    audio_ready.set()
+            finally:
+                request_ended = True
+                audio_ready.set()
 
+        feeder = asyncio.ensure_future(feed())
+        index = 0
+
+        try:
+            while not request_ended:
+                await audio_ready.wait()
+                audio_ready.clear()
+                if request_ended or not session.ready:
+                    continue
+
+                committed, tail = await whisper_executor.run(session.process)
+                if committed:
+                    yield self.converter.from_timed_words(index, committed)
+                    index += 1
+                if tail:
+                    yield self.converter.from_timed_words(index, tail, is_partial=True)
+
+            await feeder
+            remaining = await whisper_executor.run(session.finish)
+            yield self.converter.from_timed_words(index, remaining, is_final=True)
+        except Exception as e:
+            raise GenerationException(
+                message=f'Error while generating speech to text stream: {e}',
+                inner_exception=e
+            )
+        finally:
+            if not feeder.done():
+                feeder.cancel()
+            loggers.framework.dev_debug(
+                f'Whisper stream decoded {session.decoded_seconds:.1f}s of audio in {session.decode_count} passes '
+                f'for {session.stream_seconds:.1f}s of speech'
+            )
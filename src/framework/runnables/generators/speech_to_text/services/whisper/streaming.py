@@ -0,0 +1,139 @@
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import whisper
+
+from ...models import SpeechToTextGenerationParams
+from ...streaming import LocalAgreementBuffer, TimedWord
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+
+class WhisperStreamingSession:
+    """
+    Incremental Whisper transcription over a rolling audio window.
+
+    Audio is appended as it arrives. Every ``process`` call re-decodes the window, commits the words two consecutive
+    hypotheses agree on and returns the unstable tail as a partial hypothesis. Once the window grows past
+    ``buffer_trim_seconds`` the audio up to the last committed word is dropped, so only the unstable tail is
+    decoded again and the committed text is passed to Whisper as prompt context instead.
+    """
+
+    def __init__(
+            self,
+            model: whisper.Whisper,
+            generation_params: SpeechToTextGenerationParams,
+            *,
+            min_chunk_seconds: float = 1.0,
+            buffer_trim_seconds: float = 5.0,
+            prompt_chars: int = 200,
+    ):
+        self.model = model
+        self.generation_params = generation_params
+        self.min_chunk_samples = int(min_chunk_seconds * SAMPLE_RATE)
+        self.buffer_trim_seconds = buffer_trim_seconds
+        self.prompt_chars = prompt_chars
+
+        self.agreement = LocalAgreementBuffer()
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.buffer_offset: float = 0.0
+        """ Seconds of stream audio that were trimmed from the start of the window. """
+
+        self._pending: List[np.ndarray] = []
+        self._pending_samples = 0
+        self._lock = threading.Lock()
+        self.decode_count = 0
+        self.decoded_seconds = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """Whether enough new audio arrived to make another decode worthwhile."""
+        return self._pending_samples >= self.min_chunk_samples
+
+    @property
+    def stream_seconds(self) -> float:
+        return self.buffer_offset + (len(self.audio) + self._pending_samples) / SAMPLE_RATE
+
+    def insert_audio(self, pcm: np.ndarray) -> None:
+        """Append 16 kHz mono float32 PCM to the stream."""
+        if pcm.size == 0:
+            return
+        with self._lock:
+            self._pending.append(pcm.astype(np.float32, copy=False))
+            self._pending_samples += len(pcm)
+
+    def _take_pending(self) -> None:
+        with self._lock:
+            pending, self._pending, self._pending_samples = self._pending, [], 0
+        if pending:
+            self.audio = np.concatenate([self.audio, *pending])
+
+    def _decode_options(self) -> Dict[str, Any]:
+        params = self.generation_params
+        options: Dict[str, Any] = {
+            'language': params.language,
+            'task': params.task,
+            'fp16': params.device == 'cuda',
+            'suppress_tokens': params.suppress_tokens,
+            'suppress_blank': params.suppress_blank,
+        }
+        if params.beam_size is not None:
+            options['beam_size'] = params.beam_size
+        if params.best_of is not None:
+            options['best_of'] = params.best_of
+        return options
+
+    def _transcribe_window(self) -> List[TimedWord]:
+        prompt = self.agreement.committed_text(self.prompt_chars) or None
+        result = whisper.transcribe(
+            self.model,
+            self.audio,
+            temperature=self.generation_params.temperature or 0.0,
+            word_timestamps=True,
+            initial_prompt=prompt,
+            condition_on_previous_text=False,
+            verbose=None,
+            **self._decode_options(),
+        )
+        self.decode_count += 1
+        self.decoded_seconds += len(self.audio) / SAMPLE_RATE
+
+        return [
+            TimedWord(self.buffer_offset + word['start'], self.buffer_offset + word['end'], word['word'])
+            for segment in result.get('segments', [])
+            for word in segment.get('words', [])
+        ]
+
+    def _trim(self) -> None:
+        if len(self.audio) / SAMPLE_RATE <= self.buffer_trim_seconds:
+            return
+        cut_time = self.agreement.last_committed_time
+        if cut_time <= self.buffer_offset:
+            return
+        cut_samples = int((cut_time - self.buffer_offset) * SAMPLE_RATE)
+        self.audio = self.audio[cut_samples:]
+        self.buffer_offset = cut_time
+
+    def process(self) -> Tuple[List[TimedWord], List[TimedWord]]:
+        """
+        Decode the current window. Blocking, run it on the inference executor.
+
+        :return: The newly committed words and the current unstable tail.
+        """
+        self._take_pending()
+        if len(self.audio) == 0:
+            return [], self.agreement.tail
+
+        self.agreement.insert(self._transcribe_window())
+        committed = self.agreement.flush()
+        self._trim()
+        return committed, self.agreement.tail
+
+    def finish(self) -> List[TimedWord]:
+        """Decode any remaining audio and commit the whole tail. Blocking, run it on the inference executor."""
+        has_new_audio = self._pending_samples > 0 or self.decode_count == 0
+        self._take_pending()
+        if has_new_audio and len(self.audio) > 0:
+            self.agreement.insert(self._transcribe_window())
+        return self.agreement.complete()
@@ -0,0 +1,95 @@
+import re
+from typing import List, NamedTuple, Optional
+
+_NORMALIZE_PATTERN = re.compile(r'[^\w\']+')
+
+
+class TimedWord(NamedTuple):
+    """A transcribed word with absolute start and end times in seconds from the start of the stream."""
+    start: float
+    end: float
+    text: str
+
+    @property
+    def normalized(self) -> str:
+        return _NORMALIZE_PATTERN.sub('', self.text.lower())
+
+
+def join_words(words: List[TimedWord]) -> str:
+    return ''.join(word.text for word in words).strip()
+
+
+class LocalAgreementBuffer:
+    """
+    Commits the stable prefix of successive streaming hypotheses (LocalAgreement-2).
+
+    Each time the audio window is re-decoded, the new hypothesis is compared against the previous one.
+    Words both hypotheses agree on are committed and never re-emitted, the rest stays as the unstable tail that
+    the next decode may still revise.
+    """
+
+    def __init__(self, overlap_tolerance: float = 0.1):
+        self.overlap_tolerance = overlap_tolerance
+        self.committed: List[TimedWord] = []
+        self._previous: List[TimedWord] = []
+        self._current: List[TimedWord] = []
+
+    @property
+    def last_committed_time(self) -> float:
+        return self.committed[-1].end if self.committed else 0.0
+
+    @property
+    def tail(self) -> List[TimedWord]:
+        """The words of the latest hypothesis that are not committed yet."""
+        return list(self._current)
+
+    def insert(self, words: List[TimedWord]) -> None:
+        """Insert a new hypothesis. Words ending before the last committed word are dropped."""
+        cutoff = self.last_committed_time - self.overlap_tolerance
+        words = [word for word in words if word.start >= cutoff]
+        self._current = self._drop_repeated_prefix(words)
+
+    def _drop_repeated_prefix(self, words: List[TimedWord]) -> List[TimedWord]:
+        """
+        A re-decoded window often starts by repeating the last committed words (up to 5-grams),
+        those must not be committed twice.
+        """
+        if not words or not self.committed:
+            return words
+        if abs(words[0].start - self.last_committed_time) > 1.0:
+            return words
+
+        max_n = min(len(self.committed), len(words), 5)
+        for n in range(max_n, 0, -1):
+            committed_tail = [word.normalized for word in self.committed[-n:]]
+            new_head = [word.normalized for word in words[:n]]
+            if committed_tail == new_head:
+                return words[n:]
+        return words
+
+    def flush(self) -> List[TimedWord]:
+        """Commit and return the longest common prefix of the previous and current hypotheses."""
+        newly_committed: List[TimedWord] = []
+        while self._current and self._previous:
+            if self._current[0].normalized != self._previous[0].normalized:
+                break
+            newly_committed.append(self._current.pop(0))
+            self._previous.pop(0)
+
+        self.committed.extend(newly_committed)
+        self._previous = list(self._current)
+        return newly_committed
+
+    def complete(self) -> List[TimedWord]:
+        """Commit and return everything that is still uncommitted, used at the end of an utterance."""
+        remaining = list(self._current)
+        self.committed.extend(remaining)
+        self._current = []
+        self._previous = []
+        return remaining
+
+    def committed_text(self, max_chars: Optional[int] = None) -> str:
+        text = join_words(self.committed)
+        if max_chars is not None and len(text) > max_chars:
+            text = text[-max_chars:]
+        return text
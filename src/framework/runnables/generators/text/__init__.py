@@ -1,2 +1,3 @@
 from .generator import TextGenerator
 from .models import *
+from .tokenizer import TokenizerRegistry, tokenizer_registry, count_tokens
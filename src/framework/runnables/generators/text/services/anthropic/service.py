@@ -1,17 +1,16 @@
 import os
 from typing import AsyncGenerator, Optional, Union
 
-import tiktoken
 from anthropic import Anthropic, AsyncAnthropic, AsyncMessageStreamManager
 from anthropic.types import Message as AnthropicMessage
 from anthropic.types.message_create_params import MessageCreateParamsBase
-from dotenv import load_dotenv
 
 from framework import framework_settings
-from src.framework import Message
 from src.utils import loggers
 from .converter import AnthropicGenerationConverter
 from ..base import BaseTextGenerationService
+from ...tokenizer import tokenizer_registry
+from ....clients import client_registry
 from ...models import (
     TextGenerationParams,
     TextGenerationRequest,
@@ -21,18 +20,21 @@ from ...models import (
 
 
 class AnthropicGenerationService(BaseTextGenerationService):
-    client: AsyncAnthropic
-    client_sync: Anthropic
     converter: AnthropicGenerationConverter
     default_model: str = framework_settings.runnables.generators.text.get_service_value('anthropic', 'default_model') or "claude-3-5-sonnet-20240620"
 
     def __init__(self):
         super().__init__()
-        load_dotenv()
-        self.client = AsyncAnthropic()
-        self.client_sync = Anthropic()
         self.converter = AnthropicGenerationConverter()
 
+    @property
+    def client(self) -> AsyncAnthropic:
+        return client_registry.get_async_client('anthropic')
+
+    @property
+    def client_sync(self) -> Anthropic:
+        return client_registry.get_sync_client('anthropic')
+
     @staticmethod
     def _get_model_name(params: Optional[TextGenerationParams]) -> str:
         if params is None or params.model is None:
@@ -48,26 +50,14 @@ class AnthropicGenerationService(BaseTextGenerationService):
         if isinstance(generation_info, str):
             model = generation_info
         elif isinstance(generation_info, TextGenerationParams):
-            model = generation_info.model
+            model = generation_info.model or AnthropicGenerationService.default_model
         else:
             loggers.framework.warning(
                 f"get_token_count called without a model name. Using default model '{AnthropicGenerationService.default_model}'."
             )
             model = AnthropicGenerationService.default_model
 
-        if isinstance(request, str):
-            request_str = request
-        elif isinstance(request, list):
-            request_str = Message.join_as_string(request)
-        elif isinstance(request, Message):
-            request_str = request.to_string()
-        else:
-            loggers.framework.warning(f"Cannot get token count for request: {request}")
-            return 0
-
-        encoder = tiktoken.encoding_for_model(model_name=str(model))
-        encoding = encoder.encode(request_str)
-        return len(encoding)
+        return tokenizer_registry.count_tokens(request, model)
 
     def _get_anthropic_params(
             self,
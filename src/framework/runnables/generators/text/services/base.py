@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, AsyncGenerator, List, Union, Callable, Awaitable, Literal
+from typing import Optional, AsyncGenerator, List, Union, Callable, Awaitable, Literal, Dict, Tuple
 
 from src.framework.models import TokenUsage
 from src.utils import loggers
@@ -72,6 +72,10 @@ PRICING_DICT = {
     }
 }
 
+# Resolved cost per token by model name and cost type, so that the pricing lookup (and its warning) runs once per model
+_COST_PER_TOKEN_CACHE: Dict[Tuple[str, str], float] = {}
+
+
 class BaseTextGenerationService(ABC):
     @staticmethod
     @abstractmethod
@@ -86,6 +90,10 @@ class BaseTextGenerationService(ABC):
             model_name: str,
             cost_type: Literal['input', 'output']
     ):
+        cached = _COST_PER_TOKEN_CACHE.get((model_name, cost_type))
+        if cached is not None:
+            return cached
+
         cost_per_token = None
         try:
             model = PRICING_DICT[model_name]
@@ -102,6 +110,7 @@ class BaseTextGenerationService(ABC):
                 f"Could not find cost for model '{model_name}'. Using default cost of {cost_per_token} per token."
             )
 
+        _COST_PER_TOKEN_CACHE[(model_name, cost_type)] = cost_per_token
         return cost_per_token
 
     @staticmethod
@@ -1,16 +1,25 @@
-from typing import TypeVar
+from typing import Dict, TypeVar
 
 from .base import BaseTextGenerationService
 
 TTextGenerationService = TypeVar("TTextGenerationService", bound=BaseTextGenerationService)
 
+_services: Dict[str, BaseTextGenerationService] = {}
+
 
 def get_text_generation_service(service_name: str) -> TTextGenerationService:
+    # Services are stateless and share pooled provider clients, so one instance per name is enough
+    if service_name in _services:
+        return _services[service_name]
+
     if service_name == 'openai':
         from .openai import OpenAiGenerationService
-        return OpenAiGenerationService()
+        service = OpenAiGenerationService()
     elif service_name == 'anthropic':
         from .anthropic import AnthropicGenerationService
-        return AnthropicGenerationService()
+        service = AnthropicGenerationService()
     else:
         raise NotImplementedError(f'Generation service: {service_name} is not implemented')
+
+    _services[service_name] = service
+    return service
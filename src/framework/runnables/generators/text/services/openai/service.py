@@ -1,17 +1,15 @@
-import os
 from typing import AsyncGenerator, Optional, Union
 
-import tiktoken
-from dotenv import load_dotenv
 from openai import AsyncOpenAI, AsyncStream, OpenAI
 from openai.types.chat import ChatCompletion, ChatCompletionChunk
 from openai.types.chat.completion_create_params import CompletionCreateParamsBase
 
 from framework import framework_settings
-from src.framework.models.message import Message
 from src.utils import loggers
 from .converter import OpenAiGenerationConverter
 from ..base import BaseTextGenerationService
+from ...tokenizer import tokenizer_registry
+from ....clients import client_registry
 from ...models import (
     TextGenerationParams,
     TextGenerationRequest,
@@ -23,19 +21,21 @@ MAX_OUTPUT_TOKENS: int = 1024
 
 
 class OpenAiGenerationService(BaseTextGenerationService):
-    client: AsyncOpenAI
-    client_sync: OpenAI
     converter: OpenAiGenerationConverter
     default_model: str = framework_settings.runnables.generators.text.get_service_value('openai', 'default_model') or "gpt-4o"
 
     def __init__(self):
         super().__init__()
-        load_dotenv()
-        api_key = os.environ.get("OPENAI_API_KEY")
-        self.client = AsyncOpenAI(api_key=api_key)
-        self.client_sync = OpenAI(api_key=api_key)
         self.converter = OpenAiGenerationConverter()
 
+    @property
+    def client(self) -> AsyncOpenAI:
+        return client_registry.get_async_client('openai')
+
+    @property
+    def client_sync(self) -> OpenAI:
+        return client_registry.get_sync_client('openai')
+
     @staticmethod
     def _get_model_name(params: Optional[TextGenerationParams]) -> str:
         if params is None or params.model is None:
@@ -51,26 +51,14 @@ class OpenAiGenerationService(BaseTextGenerationService):
         if isinstance(generation_info, str):
             model = generation_info
         elif isinstance(generation_info, TextGenerationParams):
-            model = generation_info.model
+            model = generation_info.model or OpenAiGenerationService.default_model
         else:
             loggers.framework.warning(
                 f"get_token_count called without a model name. Using default model '{OpenAiGenerationService.default_model}'."
             )
             model = OpenAiGenerationService.default_model
 
-        if isinstance(request, str):
-            request_str = request
-        elif isinstance(request, list):
-            request_str = Message.join_as_string(request)
-        elif isinstance(request, Message):
-            request_str = request.to_string()
-        else:
-            loggers.framework.warning(f"Cannot get token count for request: {request}")
-            return 0
-
-        encoder = tiktoken.encoding_for_model(model_name=str(model))
-        encoding = encoder.encode(request_str)
-        return len(encoding)
+        return tokenizer_registry.count_tokens(request, model)
 
     def _get_openai_params(
             self,
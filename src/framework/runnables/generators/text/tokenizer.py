@@ -0,0 +1,120 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import tiktoken
+
+from src.framework.models import Message
+from src.utils import loggers
+
+DEFAULT_ENCODING = 'cl100k_base'
+
+# Encoding used for each model family, matched by prefix. Anthropic does not publish its tokenizer, cl100k_base is
+# close enough to budget prompts with.
+MODEL_FAMILY_ENCODINGS: Tuple[Tuple[str, str], ...] = (
+    ('gpt-4o', 'o200k_base'),
+    ('chatgpt-4o', 'o200k_base'),
+    ('o1', 'o200k_base'),
+    ('o3', 'o200k_base'),
+    ('gpt-4', 'cl100k_base'),
+    ('gpt-3.5', 'cl100k_base'),
+    ('gpt-35', 'cl100k_base'),
+    ('claude', 'cl100k_base'),
+)
+
+
+class TokenizerRegistry:
+    """
+    Process wide tiktoken encodings, loaded once per encoding and shared by every service, generator and memory.
+
+    Message token counts are cached on the message itself (see Message.get_cached_token_count), so a message is
+    tokenized once per encoding until its content changes.
+    """
+
+    def __init__(self, loader: Callable[[str], tiktoken.Encoding] = tiktoken.get_encoding):
+        self._loader = loader
+        self._encodings: Dict[str, tiktoken.Encoding] = {}
+        self._model_encodings: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def encoding_name_for_model(model: Optional[str]) -> str:
+        if not model:
+            return DEFAULT_ENCODING
+        try:
+            return tiktoken.encoding_name_for_model(model)
+        except KeyError:
+            pass
+        for prefix, encoding_name in MODEL_FAMILY_ENCODINGS:
+            if model.startswith(prefix):
+                return encoding_name
+        return DEFAULT_ENCODING
+
+    def get_encoding_name(self, model: Optional[str]) -> str:
+        key = model or ''
+        encoding_name = self._model_encodings.get(key)
+        if encoding_name is None:
+            encoding_name = self._model_encodings[key] = self.encoding_name_for_model(model)
+        return encoding_name
+
+    def get_encoding(self, model: Optional[str] = None) -> tiktoken.Encoding:
+        encoding_name = self.get_encoding_name(model)
+        encoding = self._encodings.get(encoding_name)
+        if encoding is None:
+            with self._lock:
+                encoding = self._encodings.get(encoding_name)
+                if encoding is None:
+                    encoding = self._encodings[encoding_name] = self._loader(encoding_name)
+        return encoding
+
+    def warm_up(self, models: Iterable[Optional[str]]) -> None:
+        """Load the encodings of the given models so that the first request does not pay for it."""
+        for model in models:
+            try:
+                self.get_encoding(model)
+            except Exception as e:
+                loggers.framework.warning(f'Could not load the tokenizer for model {model}: {e}')
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        return len(self.get_encoding(model).encode(text, disallowed_special=()))
+
+    def count_batch(self, texts: List[str], model: Optional[str] = None) -> List[int]:
+        if not texts:
+            return []
+        if len(texts) == 1:
+            return [self.count(texts[0], model)]
+        encodings = self.get_encoding(model).encode_batch(texts, disallowed_special=())
+        return [len(tokens) for tokens in encodings]
+
+    def count_messages(self, messages: List[Message], model: Optional[str] = None) -> List[int]:
+        """
+        Token count of each message as a line of Message.join_as_string. Cached counts are reused, the rest are
+        encoded in one batch and cached on their message.
+        """
+        encoding_name = self.get_encoding_name(model)
+        counts: List[Optional[int]] = [message.get_cached_token_count(encoding_name) for message in messages]
+        missing = [index for index, count in enumerate(counts) if count is None]
+        if missing:
+            new_counts = self.count_batch([f'{messages[index].to_string()}\n' for index in missing], model)
+            for index, count in zip(missing, new_counts):
+                messages[index].set_cached_token_count(encoding_name, count)
+                counts[index] = count
+        return counts
+
+    def count_tokens(self, request, model: Optional[str] = None) -> int:
+        """Token count of a TextGenerationRequest: a string, a message or a list of messages."""
+        if isinstance(request, str):
+            return self.count(request, model)
+        if isinstance(request, Message):
+            return self.count_messages([request], model)[0]
+        if isinstance(request, list):
+            return sum(self.count_messages(request, model))
+        loggers.framework.warning(f'Cannot get token count for request: {request}')
+        return 0
+
+
+tokenizer_registry = TokenizerRegistry()
+
+
+def count_tokens(messages: List[Message], model: Optional[str] = None) -> int:
+    """Total tokens of a list of messages for the given model, using and filling the per message cache."""
+    return sum(tokenizer_registry.count_messages(messages, model))
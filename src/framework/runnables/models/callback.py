@@ -157,6 +157,47 @@ class BaseAsyncCallback(BaseModel, ABC):
     ):
         pass
 
+    async def on_diarization_generation_start(
+            self,
+            info: 'RunInfo',
+            *,
+            request: 'gen.DiarizationRequest',
+            generator: Optional['gen.DiarizationGenerator'] = None,
+            generation_params: Optional['gen.DiarizationGenerationParams'] = None,
+            **kwargs,
+    ):
+        pass
+
+    async def on_diarization_generation_chunk(
+            self,
+            info: 'RunInfo',
+            *,
+            chunk: 'gen.DiarizationResponse',
+            generator: Optional['gen.DiarizationGenerator'] = None,
+            **kwargs,
+    ):
+        pass
+
+    async def on_diarization_generation_end(
+            self,
+            info: 'RunInfo',
+            *,
+            response: 'gen.DiarizationResponse',
+            generator: Optional['gen.DiarizationGenerator'] = None,
+            **kwargs,
+    ):
+        pass
+
+    async def on_diarization_generation_error(
+            self,
+            info: 'RunInfo',
+            *,
+            error: Exception,
+            generator: Optional['gen.DiarizationGenerator'] = None,
+            **kwargs,
+    ):
+        pass
+
     async def on_speech_to_text_generation_start(
             self,
             info: 'RunInfo',
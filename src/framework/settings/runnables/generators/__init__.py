@@ -2,6 +2,8 @@ from pydantic import Field
 from pydantic_settings import BaseSettings
 
 from .audio import AudioSettings
+from .client_pool import ClientPoolSettings
+from .codec import AudioCodecSettings
 from .diarization import DiarizationSettings
 from .embeddings import EmbeddingSettings
 from .moderation import ModerationSettings
@@ -11,6 +13,8 @@ from .text import TextSettings
 
 class GeneratorSettings(BaseSettings):
     audio: AudioSettings = Field(default_factory=AudioSettings)
+    clients: ClientPoolSettings = Field(default_factory=ClientPoolSettings)
+    codec: AudioCodecSettings = Field(default_factory=AudioCodecSettings)
     diarization: DiarizationSettings = Field(default_factory=DiarizationSettings)
     embeddings: EmbeddingSettings = Field(default_factory=EmbeddingSettings)
     moderation: ModerationSettings = Field(default_factory=ModerationSettings)
@@ -1,5 +1,21 @@
+from typing import List
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
 from .base import BaseGeneratorSettings
 
 
+class AudioCacheSettings(BaseSettings):
+    enabled: bool = Field(default=True, description='If True, audio generated from text requests is cached and replayed.')
+    directory: str = Field(default='data/tts_cache', description='Directory of the disk cache, relative to the project root.')
+    max_memory_bytes: int = Field(default=64 * 1024 * 1024, description='Encoded audio kept in memory in front of the disk cache.')
+    max_disk_bytes: int = Field(default=1024 * 1024 * 1024, description='Encoded audio kept on disk, least recently used entries are evicted first.')
+    max_text_chars: int = Field(default=1000, description='Longer texts are generated every time.')
+    prewarm_on_startup: bool = Field(default=False, description='If True, prewarm_lines are generated on startup for the voices of the app package scenarios.')
+    prewarm_lines: List[str] = Field(default_factory=list, description='Fixed lines to generate ahead of the first session, e.g. greetings.')
+    prewarm_concurrency: int = Field(default=4, description='Lines generated at the same time while prewarming.')
+
+
 class AudioSettings(BaseGeneratorSettings):
-    pass
+    cache: AudioCacheSettings = Field(default_factory=AudioCacheSettings)
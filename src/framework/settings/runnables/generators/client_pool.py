@@ -0,0 +1,12 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class ClientPoolSettings(BaseSettings):
+    max_connections: int = Field(default=100, description='Maximum number of concurrent connections per pooled provider client.')
+    max_keepalive_connections: int = Field(default=20, description='Maximum number of idle keep-alive connections per pooled provider client.')
+    keepalive_expiry: float = Field(default=30.0, description='Seconds an idle keep-alive connection is kept open.')
+    timeout: float = Field(default=60.0, description='Default request timeout in seconds for provider clients.')
+    connect_timeout: float = Field(default=5.0, description='Connect timeout in seconds for provider clients.')
+    max_retries: int = Field(default=2, description='Number of retries performed by the provider SDKs.')
+    warm_up: bool = Field(default=True, description='If True, provider clients are created on application startup.')
@@ -0,0 +1,9 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class AudioCodecSettings(BaseSettings):
+    decoder_pool_size: int = Field(default=4, description='Number of ffmpeg decoder processes kept started and waiting for input.')
+    sample_rate: int = Field(default=16000, description='Sample rate that audio is decoded to.')
+    decode_timeout: float = Field(default=10.0, description='Seconds a single decode may take before the ffmpeg process is killed.')
+    warm_up: bool = Field(default=True, description='If True, the decoder processes are started on application startup.')
@@ -1,5 +1,34 @@
+from typing import Literal, Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
 from .base import BaseGeneratorSettings
 
 
+class EnergyVoiceActivitySettings(BaseSettings):
+    threshold_db: float = Field(default=-45.0, description='Frames quieter than this level (dBFS) are never speech.')
+    noise_margin_db: float = Field(default=9.0, description='Frames must be this many dB above the tracked noise floor to count as speech.')
+    noise_adapt_rate: float = Field(default=0.05, description='How quickly the noise floor follows non-speech frames, between 0 and 1.')
+    zcr_max: float = Field(default=0.4, description='Frames close to the threshold with a zero-crossing rate above this are treated as noise.')
+
+
+class SileroVoiceActivitySettings(BaseSettings):
+    model_name: str = Field(default='silero_vad.onnx', description='ONNX model file in transformer_models/models.')
+    threshold: float = Field(default=0.5, description='Speech probability above which a frame counts as speech.')
+    intra_op_threads: int = Field(default=1, description='onnxruntime threads per inference call.')
+
+
+class VoiceActivitySettings(BaseSettings):
+    engine: Literal['energy', 'silero'] = Field(default='energy', description='Voice activity detection engine.')
+    sample_rate: int = Field(default=16000, description='Sample rate that audio is decoded to before detection.')
+    frame_ms: int = Field(default=30, description='Frame length in milliseconds. The silero engine always uses 32ms frames.')
+    onset_ms: int = Field(default=60, description='Consecutive speech required before speech starts.')
+    hangover_ms: int = Field(default=300, description='Non-speech tolerated before speech ends.')
+    max_workers: Optional[int] = Field(default=None, description='Threads used for decoding and detection. Defaults to the number of CPU cores.')
+    energy: EnergyVoiceActivitySettings = Field(default_factory=EnergyVoiceActivitySettings)
+    silero: SileroVoiceActivitySettings = Field(default_factory=SileroVoiceActivitySettings)
+
+
 class DiarizationSettings(BaseGeneratorSettings):
-    pass
+    vad: VoiceActivitySettings = Field(default_factory=VoiceActivitySettings)
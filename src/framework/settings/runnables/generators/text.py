@@ -1,5 +1,7 @@
+from pydantic import Field
+
 from .base import BaseGeneratorSettings
 
 
 class TextSettings(BaseGeneratorSettings):
-    pass
+    warm_up_tokenizers: bool = Field(default=True, description='If True, the tokenizers of the default models are loaded on application startup.')
@@ -1,7 +1,9 @@
 from .list import get_duplicates, get_duplicate_counts, has_index
-from .audio import audio_file_to_wav, CustomTempFile, CreateWavFile
+from .audio import audio_file_to_wav, decode_audio, CustomTempFile, CreateWavFile
+from .audio_decoder import AudioDecoderPool, get_audio_decoder_pool
 from .dict import find_nonexistent_keys, change_key
 from .files import get_framework_path, get_framework_data_path
 from .math import weighted_average
 from .stopwatch_context import StopwatchContext
 from .path import find_project_root
+from .lru_cache import LRUCache
@@ -5,6 +5,10 @@ import tempfile
 from typing import Optional, Union, TextIO, BinaryIO, Literal, Tuple
 
 import ffmpeg
+import numpy as np
+
+from src.utils import loggers
+from .audio_decoder import AudioDecoderPool, get_audio_decoder_pool
 
 
 def audio_file_to_wav(input_file_path: str, output_file_path: str):
@@ -15,6 +19,46 @@ def audio_file_to_wav(input_file_path: str, output_file_path: str):
             .output(output_file_path, format='wav')
             .run(overwrite_output=True, quiet=True)
         )
+    except ffmpeg.Error as e:
+        loggers.framework.error(f'ffmpeg could not decode the audio: {e.stderr.decode(errors="replace") if e.stderr else e}')
+        raise
+
+
+def decode_audio(
+        data_or_file: Union[str, bytes, np.ndarray],
+        *,
+        sample_rate: int = 16000,
+) -> np.ndarray:
+    """
+    Decode audio to mono float32 PCM without writing anything to disk.
+    Decoding goes through the warm ffmpeg processes of the shared decoder pool.
+
+    :param data_or_file: Encoded audio bytes, a base64 encoded string, a file path, or already decoded PCM.
+    :param sample_rate: The sample rate to resample to.
+    :return: The decoded samples in [-1, 1].
+    """
+    if isinstance(data_or_file, np.ndarray):
+        return data_or_file.astype(np.float32, copy=False)
+
+    if isinstance(data_or_file, str):
+        if os.path.exists(data_or_file):
+            with open(data_or_file, 'rb') as file:
+                data = file.read()
+        elif re.match(CreateWavFile.base64_pattern, data_or_file):
+            data = base64.b64decode(data_or_file)
+        else:
+            raise ValueError(f'Unsupported data type: {type(data_or_file)} -- Not a file path or base64 string')
+    elif isinstance(data_or_file, bytes):
+        data = data_or_file
+    else:
+        raise ValueError(f'Unsupported data type: {type(data_or_file)} -- Not a file path or base64 string')
+
+    pool = get_audio_decoder_pool()
+    if sample_rate != pool.sample_rate:
+        pool = AudioDecoderPool(size=0, sample_rate=sample_rate, timeout=pool.timeout)
+
+    try:
+        return pool.decode(data)
     except ffmpeg.Error as e:
         print(e.stderr)  # This will print the error from FFmpeg
         raise
@@ -0,0 +1,215 @@
+import io
+import queue
+import subprocess
+import threading
+import time
+import wave
+from typing import Any, Dict, List, Optional
+
+import ffmpeg
+import numpy as np
+
+
+def pcm16_to_float(data: bytes, channels: int = 1) -> np.ndarray:
+    pcm = np.frombuffer(data, np.int16)
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    return pcm.astype(np.float32) / 32768.0
+
+
+def read_wav(data: bytes, sample_rate: int) -> Optional[np.ndarray]:
+    """
+    Decode a 16 bit PCM wav file in process when it is already at ``sample_rate``.
+
+    :return: The mono samples, or None if the data needs resampling or is not a plain PCM wav file.
+    """
+    if data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            if wav.getsampwidth() != 2 or wav.getframerate() != sample_rate:
+                return None
+            return pcm16_to_float(wav.readframes(wav.getnframes()), wav.getnchannels())
+    except (wave.Error, EOFError):
+        return None
+
+
+class _WarmDecoder:
+    """An ffmpeg process that was started ahead of time and is blocked waiting for its input on stdin."""
+
+    def __init__(self, args: List[str]):
+        self.process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def decode(self, data: bytes, timeout: float) -> bytes:
+        try:
+            out, err = self.process.communicate(input=data, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.communicate()
+            raise
+        if self.process.returncode != 0:
+            raise ffmpeg.Error('ffmpeg', out, err)
+        return out
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+            self.process.communicate()
+
+
+class AudioDecoderPool:
+    """
+    Decodes encoded audio (webm/opus, ogg, mp3, wav...) to mono float32 PCM through ffmpeg pipes, without temp files.
+
+    Starting ffmpeg (fork, exec and loading its libraries) costs more than decoding a short voice chunk, so ``size``
+    processes are kept started and waiting for input. Each decode takes one, writes the chunk to its stdin and reads
+    the PCM from its stdout, and a single background worker starts the replacements. Plain wav input that is already at the
+    target sample rate is decoded in process without ffmpeg.
+    """
+
+    def __init__(self, *, size: int = 4, sample_rate: int = 16000, timeout: float = 10.0):
+        self.size = max(0, size)
+        self.sample_rate = sample_rate
+        self.timeout = timeout
+        self._idle: queue.SimpleQueue[_WarmDecoder] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._starting = 0
+        self._refilling = False
+        self._closed = False
+        self._decoded = 0
+        self._in_process = 0
+        self._cold_starts = 0
+        self._failures = 0
+        self._total_decode_time = 0.0
+
+    @property
+    def args(self) -> List[str]:
+        return [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostats', '-threads', '1',
+            '-i', 'pipe:0',
+            '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(self.sample_rate),
+            'pipe:1',
+        ]
+
+    def _refill(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed or self._idle.qsize() + self._starting >= self.size:
+                    self._refilling = False
+                    return
+                self._starting += 1
+            try:
+                decoder = _WarmDecoder(self.args)
+            except BaseException:
+                with self._lock:
+                    self._starting -= 1
+                    self._refilling = False
+                raise
+            with self._lock:
+                self._starting -= 1
+                closed = self._closed
+                if not closed:
+                    self._idle.put(decoder)
+            if closed:
+                # close() already emptied the pool
+                decoder.kill()
+
+    def _start_refill(self) -> bool:
+        with self._lock:
+            if self._refilling or self._closed:
+                return False
+            self._refilling = True
+            return True
+
+    def warm_up(self) -> None:
+        """Start the decoder processes now instead of on the first decode."""
+        if self._start_refill():
+            self._refill()
+
+    def _acquire(self) -> _WarmDecoder:
+        while True:
+            try:
+                decoder = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    self._cold_starts += 1
+                return _WarmDecoder(self.args)
+            if decoder.alive:
+                return decoder
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """
+        Decode encoded audio to mono float32 PCM at the pool's sample rate. Blocking.
+
+        :raises ffmpeg.Error: If ffmpeg cannot decode the data.
+        """
+        started_at = time.perf_counter()
+        pcm = read_wav(data, self.sample_rate)
+        if pcm is not None:
+            with self._lock:
+                self._in_process += 1
+                self._total_decode_time += time.perf_counter() - started_at
+            return pcm
+
+        decoder = self._acquire()
+        if self.size and self._start_refill():
+            threading.Thread(target=self._refill, name='audio-decoder-refill', daemon=True).start()
+
+        try:
+            out = decoder.decode(data, self.timeout)
+        except Exception:
+            with self._lock:
+                self._failures += 1
+            raise
+
+        with self._lock:
+            self._decoded += 1
+            self._total_decode_time += time.perf_counter() - started_at
+        return pcm16_to_float(out)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            decodes = max(1, self._decoded + self._in_process)
+            return {
+                'size': self.size,
+                'idle': self._idle.qsize(),
+                'decoded': self._decoded,
+                'in_process': self._in_process,
+                'cold_starts': self._cold_starts,
+                'failures': self._failures,
+                'avg_decode_ms': self._total_decode_time / decodes * 1000,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[AudioDecoderPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_audio_decoder_pool() -> AudioDecoderPool:
+    """The process-wide decoder pool, configured from the framework settings."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Imported here, the framework settings import this package
+                from ..settings import framework_settings
+                settings = framework_settings.runnables.generators.codec
+                _pool = AudioDecoderPool(
+                    size=settings.decoder_pool_size,
+                    sample_rate=settings.sample_rate,
+                    timeout=settings.decode_timeout,
+                )
+    return _pool
@@ -1,12 +1,25 @@
 import json
+import os
 from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
-from ..schemas import ActorSchema, LobbyTreeSchema, ScenarioSchema
+from ..schemas import ActorSchema, LobbyPageSchema, LobbyTileSchema, LobbyTreeSchema, ScenarioSchema
+from .snapshot import PackageSnapshot, SnapshotFormatError, write_snapshot
 from src.utils import logger, get_project_path_str
 
 APP_PACKAGE_PATH = 'data/app_package.json'
+APP_PACKAGE_SNAPSHOT_PATH = 'data/app_package.bin'
+
+_ACTORS_SECTION = 'actors'
+_SCENARIOS_SECTION = 'scenarios'
+_PACKAGE_SECTION = 'package'
+_LOBBY_TREE_KEY = 'lobby_tree'
+_IMAGE_PATHS_KEY = 'image_paths'
+
+
+def _get_path(relative_path: str) -> str:
+    return get_project_path_str() + "/" + relative_path
 
 
 class AppPackageData(BaseModel):
@@ -21,59 +34,126 @@ class AppPackageData(BaseModel):
 
 
 class AppPackage:
+    """
+    The templates of the app. Actors, scenarios and lobby pages and tiles are indexed by id when the package is loaded.
+
+    A package loaded from its snapshot (see snapshot.py) decodes actors and scenarios one by one as they are looked
+    up; the full AppPackageData is only built when something needs it, e.g. the actor or scenario lists.
+    """
+
     _data: AppPackageData | None
+    _snapshot: PackageSnapshot | None
+
+    _actors_by_id: Dict[str, ActorSchema]
+    _scenarios_by_id: Dict[str, ScenarioSchema]
+    _lobby_pages_by_id: Dict[str, LobbyPageSchema]
+    _lobby_tiles_by_id: Dict[str, LobbyTileSchema]
 
     @property
     def valid(self) -> bool:
-        return self._data is not None
+        return self._data is not None or self._snapshot is not None
 
     @property
     def version(self) -> int:
+        if self._data is None and self._snapshot is not None:
+            return self._snapshot.version
         return self._data.version
 
     @property
     def data(self) -> AppPackageData:
+        if self._data is None and self._snapshot is not None:
+            self._load_from_snapshot()
         return self._data
 
     @property
     def lobby_tree(self) -> Optional[LobbyTreeSchema]:
-        return self._data.lobby_tree
+        return self.data.lobby_tree
+
+    @property
+    def image_paths(self) -> Dict[str, str]:
+        return self.data.image_paths
 
     @property
     def actors(self) -> List[ActorSchema]:
-        return self._data.actors
+        return self.data.actors
 
     @property
     def scenarios(self) -> List[ScenarioSchema]:
-        return self._data.scenarios
+        return self.data.scenarios
 
-    def __init__(self, data: AppPackageData | None):
+    def __init__(self, data: AppPackageData | None, *, snapshot: PackageSnapshot | None = None):
         self._data = data
+        self._snapshot = snapshot
+        self._build_indexes()
 
     @classmethod
     def from_local(cls) -> 'AppPackage':
+        """
+        Load the local package, from its snapshot when it is at least as recent as the JSON file. A package loaded
+        from JSON writes a fresh snapshot for the next process.
+        """
+        json_path, snapshot_path = _get_path(APP_PACKAGE_PATH), _get_path(APP_PACKAGE_SNAPSHOT_PATH)
+        json_mtime = os.path.getmtime(json_path) if os.path.exists(json_path) else None
+
+        if os.path.exists(snapshot_path) and (json_mtime is None or os.path.getmtime(snapshot_path) >= json_mtime):
+            try:
+                return cls.from_snapshot(snapshot_path)
+            except (OSError, SnapshotFormatError, ValueError) as e:
+                logger.warning(f"Could not load app package snapshot {snapshot_path}, loading {json_path}: {e}")
+
         try:
-            with open(APP_PACKAGE_PATH, 'r', encoding='utf-8') as file:
-                data_dict: dict = json.load(file)
-                data = AppPackageData.model_validate(data_dict)
-                return cls(data)
+            with open(json_path, 'rb') as file:
+                package = cls(AppPackageData.model_validate_json(file.read()))
         except FileNotFoundError:
             logger.warning(f"App package not found at {APP_PACKAGE_PATH}.")
+            return None
+
+        try:
+            package.save_snapshot()
+        except OSError as e:
+            logger.warning(f"Could not write app package snapshot: {e}")
+        return package
+
+    @classmethod
+    def from_snapshot(cls, path: Optional[str] = None) -> 'AppPackage':
+        return cls(None, snapshot=PackageSnapshot(path or _get_path(APP_PACKAGE_SNAPSHOT_PATH)))
 
     def save(self) -> None:
-        if self._data is None:
+        if not self.valid:
             raise Exception("App package data not loaded.")
         try:
-            file_name = get_project_path_str() + "/" + APP_PACKAGE_PATH
-            with open(file_name, 'w', encoding='utf-8') as file:
-                package_dict = self._data.model_dump()
-                json.dump(package_dict, file, ensure_ascii=False, indent=4)
+            file_name = _get_path(APP_PACKAGE_PATH)
+            temp_file_name = f'{file_name}.{os.getpid()}.tmp'
+            with open(temp_file_name, 'w', encoding='utf-8') as file:
+                file.write(self.data.model_dump_json())
+            os.replace(temp_file_name, file_name)
         except FileNotFoundError as e:
             logger.error(f"Error saving app package: {e}")
             raise e
+        self.save_snapshot()
+
+    def save_snapshot(self, path: Optional[str] = None) -> None:
+        data = self.data
+        actors: Dict[str, bytes] = {}
+        for actor in data.actors:
+            if actor.uid not in actors:
+                actors[actor.uid] = actor.model_dump_json().encode('utf-8')
+        scenarios: Dict[str, bytes] = {}
+        for scenario in data.scenarios:
+            if scenario.uid not in scenarios:
+                scenarios[scenario.uid] = scenario.model_dump_json().encode('utf-8')
+
+        write_snapshot(path or _get_path(APP_PACKAGE_SNAPSHOT_PATH), data.version, {
+            _ACTORS_SECTION: actors,
+            _SCENARIOS_SECTION: scenarios,
+            _PACKAGE_SECTION: {
+                _IMAGE_PATHS_KEY: json.dumps(data.image_paths).encode('utf-8'),
+                _LOBBY_TREE_KEY: data.lobby_tree.model_dump_json().encode('utf-8') if data.lobby_tree else b'null',
+            },
+        })
 
     def check_data(self) -> bool:
-        if self._data is None:
+        if not self.valid:
             logger.fatal("App package data not loaded.")
             return False
         return True
@@ -81,21 +161,102 @@ class AppPackage:
     def get_actor(self, uid: str) -> ActorSchema | None:
         if not self.check_data():
             return None
-        return next((actor for actor in self._data.actors if actor.uid == uid), None)
+        # Read before the index, the snapshot is only dropped once the indexes of the full data are in place
+        snapshot = self._snapshot
+        actor = self._actors_by_id.get(uid)
+        if actor is None and snapshot is not None:
+            blob = snapshot.read(_ACTORS_SECTION, uid)
+            if blob is not None:
+                actor = self._actors_by_id[uid] = ActorSchema.model_validate_json(blob)
+        return actor
+
+    def get_actors(self, uids: List[str]) -> List[ActorSchema | None]:
+        """The actors of ``uids`` in the same order, None for the ones the package does not have."""
+        if not self.check_data():
+            return [None] * len(uids)
+        return [self.get_actor(uid) for uid in uids]
 
     def update_actors(self, actors: List[ActorSchema]) -> None:
         if not self.check_data():
             return
-        self._data.actors = actors
+        self.data.actors = actors
+        self._build_indexes()
         self.save()
 
     def get_scenario(self, uid: str) -> ScenarioSchema | None:
         if not self.check_data():
             return None
-        return next((scenario for scenario in self._data.scenarios if scenario.uid == uid), None)
+        # Read before the index, the snapshot is only dropped once the indexes of the full data are in place
+        snapshot = self._snapshot
+        scenario = self._scenarios_by_id.get(uid)
+        if scenario is None and snapshot is not None:
+            blob = snapshot.read(_SCENARIOS_SECTION, uid)
+            if blob is not None:
+                scenario = self._scenarios_by_id[uid] = ScenarioSchema.model_validate_json(blob)
+        return scenario
 
     def update_scenarios(self, scenarios: List[ScenarioSchema]) -> None:
         if not self.check_data():
             return
-        self._data.scenarios = scenarios
-        self.save()
\ No newline at end of file
+        self.data.scenarios = scenarios
+        self._build_indexes()
+        self.save()
+
+    def get_lobby_page(self, page_id: str) -> LobbyPageSchema | None:
+        if not self.check_data():
+            return None
+        if self._data is None:
+            self._load_from_snapshot()
+        return self._lobby_pages_by_id.get(page_id)
+
+    def get_lobby_tile(self, tile_id: str) -> LobbyTileSchema | None:
+        if not self.check_data():
+            return None
+        if self._data is None:
+            self._load_from_snapshot()
+        return self._lobby_tiles_by_id.get(tile_id)
+
+    def get_image_path(self, image_id: str) -> str | None:
+        if not self.check_data():
+            return None
+        return self.image_paths.get(image_id)
+
+    def _load_from_snapshot(self) -> None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        lobby_tree = json.loads(snapshot.read(_PACKAGE_SECTION, _LOBBY_TREE_KEY) or b'null')
+        self._data = AppPackageData(
+            version=snapshot.version,
+            image_paths=json.loads(snapshot.read(_PACKAGE_SECTION, _IMAGE_PATHS_KEY) or b'{}'),
+            lobby_tree=LobbyTreeSchema.model_validate(lobby_tree) if lobby_tree is not None else None,
+            # Reuse the entries decoded so far, so that references handed out before stay the package's objects
+            actors=[self._actors_by_id.get(uid) or ActorSchema.model_validate_json(snapshot.read(_ACTORS_SECTION, uid))
+                    for uid in snapshot.keys(_ACTORS_SECTION)],
+            scenarios=[self._scenarios_by_id.get(uid) or ScenarioSchema.model_validate_json(snapshot.read(_SCENARIOS_SECTION, uid))
+                       for uid in snapshot.keys(_SCENARIOS_SECTION)],
+        )
+        self._build_indexes()
+        # Lookups on other threads may still be reading the mapping, it is closed once the last reference is dropped
+        self._snapshot = None
+
+    def _build_indexes(self) -> None:
+        actors_by_id, scenarios_by_id, lobby_pages_by_id, lobby_tiles_by_id = {}, {}, {}, {}
+        # Filled as entries are decoded from the snapshot while there is no data
+        if self._data is not None:
+            # Like the linear scans these replace, the first entry with an id wins
+            for actor in self._data.actors:
+                actors_by_id.setdefault(actor.uid, actor)
+            for scenario in self._data.scenarios:
+                scenarios_by_id.setdefault(scenario.uid, scenario)
+
+            lobby_tree = self._data.lobby_tree
+            if lobby_tree is not None:
+                for page in [lobby_tree.root, *lobby_tree.pages.values()]:
+                    lobby_pages_by_id.setdefault(page.id, page)
+                    for tile in page.tiles:
+                        lobby_tiles_by_id.setdefault(tile.id, tile)
+
+        # Swapped in once complete, lookups on other threads never see a partial index
+        self._actors_by_id, self._scenarios_by_id = actors_by_id, scenarios_by_id
+        self._lobby_pages_by_id, self._lobby_tiles_by_id = lobby_pages_by_id, lobby_tiles_by_id
@@ -0,0 +1,91 @@
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+SNAPSHOT_MAGIC = b'QAPK'
+SNAPSHOT_FORMAT_VERSION = 1
+
+# magic, format version, package version, header length
+_PREAMBLE = struct.Struct('<4sHqI')
+
+
+class SnapshotFormatError(Exception):
+    """Raised when a file is not a package snapshot this version can read."""
+
+
+def write_snapshot(path: str, version: int, sections: Dict[str, Dict[str, bytes]]) -> None:
+    """
+    Write a package snapshot: a fixed preamble, a JSON header mapping each section's entry keys to their offset and
+    length, then the entries' encoded bytes back to back.
+
+    The file is written next to its destination and moved over it, so processes that have the previous snapshot
+    memory-mapped keep reading the old file.
+    """
+    index: Dict[str, List[Tuple[str, int, int]]] = {}
+    blobs: List[bytes] = []
+    offset = 0
+    for section, entries in sections.items():
+        section_index = index[section] = []
+        for key, blob in entries.items():
+            section_index.append((key, offset, len(blob)))
+            blobs.append(blob)
+            offset += len(blob)
+
+    header = json.dumps({'sections': index}, separators=(',', ':')).encode('utf-8')
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, version, len(header)))
+        file.write(header)
+        for blob in blobs:
+            file.write(blob)
+    os.replace(temp_path, path)
+
+
+class PackageSnapshot:
+    """
+    A read-only, memory-mapped package snapshot. Opening it only reads the header; entries are sliced out of the
+    mapping when they are read. The mapping is backed by the file, so every worker process mapping the same snapshot
+    shares its pages.
+    """
+
+    version: int
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, format_version, self.version, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        except struct.error as e:
+            self.close()
+            raise SnapshotFormatError(f'{path} is too short to be a package snapshot') from e
+        if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION:
+            self.close()
+            raise SnapshotFormatError(f'{path} is not a package snapshot of format version {SNAPSHOT_FORMAT_VERSION}')
+
+        header_start = _PREAMBLE.size
+        self._data_start = header_start + header_length
+        header = json.loads(self._mmap[header_start:self._data_start])
+        self._sections: Dict[str, Dict[str, Tuple[int, int]]] = {
+            section: {key: (offset, length) for key, offset, length in entries}
+            for section, entries in header['sections'].items()
+        }
+
+    def keys(self, section: str) -> List[str]:
+        return list(self._sections.get(section, ()))
+
+    def has(self, section: str, key: str) -> bool:
+        return key in self._sections.get(section, ())
+
+    def read(self, section: str, key: str) -> Optional[bytes]:
+        location = self._sections.get(section, {}).get(key)
+        if location is None:
+            return None
+        start = self._data_start + location[0]
+        return self._mmap[start:start + location[1]]
+
+    def close(self) -> None:
+        self._mmap.close()
@@ -1,4 +1,5 @@
 import asyncio
+import base64
 from typing import Optional, AsyncIterator, Callable, List
 
 from pydantic import Field, BaseModel
@@ -65,6 +66,9 @@ class VoiceChunk(UIDObject):
     audio: Optional[str] = Field(default=None)
     """The audio data in base64 format."""
 
+    audio_bytes: Optional[bytes] = Field(default=None, exclude=True)
+    """The raw audio data, for chunks received as binary audio frames."""
+
     is_final: bool = Field(default=False)
     """Whether this chunk is the final chunk in a streaming request."""
 
@@ -75,6 +79,14 @@ class VoiceChunk(UIDObject):
     def is_start(self) -> bool:
         return self.index == 0
 
+    def get_audio(self) -> Optional[bytes]:
+        """The raw audio data of the chunk, however it was received."""
+        if self.audio_bytes is not None:
+            return self.audio_bytes
+        if self.audio:
+            return base64.b64decode(self.audio)
+        return None
+
     def create_transcript(self, text: str) -> VoiceTranscript:
         return VoiceTranscript(
             stream_id=self.stream_id,
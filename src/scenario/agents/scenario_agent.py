@@ -75,7 +75,7 @@ class ScenarioAgent(Agent):
 
         try:
             # self.scenario.websocket_connection.create_scenario_task(ScenarioTypingStartEvent(data=self.template.uid))
-            self.scenario.websocket_connection.create_send_task(ScenarioTypingStartEvent(data=self.template.uid))
+            self.scenario.websocket_connection.send_nowait(ScenarioTypingStartEvent(data=self.template.uid))
 
             # audio_callback = do_audio_callback if quiply_settings.services.tts.enabled else None
             audio_callback = do_audio_callback if framework_settings.runnables.generators.audio.enabled else None
@@ -108,17 +108,16 @@ class ScenarioAgent(Agent):
             request: Optional[TextGenerationRequest] = None,
             **kwargs
     ) -> Message:
-        async def send_start_message_delayed():
-            nonlocal sent_start_message
-
+        def get_thinking_delay() -> float:
             delay = 2.5
             last_message = self.full_conversation.last_message
             if last_message and last_message.is_from(MessageRole.user):
                 time_since_last_message = time.time() - datetime.fromisoformat(last_message.created_at).timestamp()
                 delay = max(delay - time_since_last_message, 0)
+            return delay
 
-            print(delay)
-            await asyncio.sleep(delay)
+        async def send_thinking_message():
+            nonlocal sent_start_message
 
             if not sent_start_message:
                 thinking_message = injected_message.model_copy()
@@ -133,25 +132,28 @@ class ScenarioAgent(Agent):
             if chunk.index == 0:
                 nonlocal sent_start_message
 
+                self.scenario.cancel_timer(thinking_timer)
+
                 if not sent_start_message:
                     zero_content_message = injected_message.model_copy()
                     zero_content_message.content = ''
 
                     sent_start_message = True
                     # self.scenario.websocket_connection.create_packet_task(PacketStreamStartEvent(data=zero_content_message))
-                    self.scenario.websocket_connection.create_send_task(PacketStreamStartEvent(data=zero_content_message))
+                    self.scenario.websocket_connection.send_nowait(PacketStreamStartEvent(data=zero_content_message))
 
             # self.scenario.websocket_connection.create_packet_task(PacketStreamChunkEvent(data=chunk))
-            self.scenario.websocket_connection.create_send_task(PacketStreamChunkEvent(data=chunk))
+            self.scenario.websocket_connection.send_nowait(PacketStreamChunkEvent(data=chunk))
 
         def audio_callback(chunk: MessageAudioChunk):
             # self.scenario.websocket_connection.create_packet_task(PacketAudioEvent(data=chunk))
-            self.scenario.websocket_connection.create_send_task(PacketAudioEvent(data=chunk))
+            self.scenario.websocket_connection.send_nowait(PacketAudioEvent(data=chunk))
 
+        thinking_timer = None
         try:
             sent_start_message = False
             # self.scenario.websocket_connection.create_scenario_task(ScenarioTypingStartEvent(data=self.template.uid))
-            self.scenario.websocket_connection.create_send_task(ScenarioTypingStartEvent(data=self.template.uid))
+            self.scenario.websocket_connection.send_nowait(ScenarioTypingStartEvent(data=self.template.uid))
 
             # This sets the correct starting message
             injected_message = Message.from_ai(
@@ -162,7 +164,8 @@ class ScenarioAgent(Agent):
                 from_advisor=self.type == AgentType.MENTOR,
             )
 
-            self.scenario.create_task(send_start_message_delayed())
+            # The thinking indicator is a timer on the shared wheel, cancelled as soon as the first chunk arrives
+            thinking_timer = self.scenario.call_later(get_thinking_delay(), send_thinking_message)
 
             # await asyncio.sleep(10)
 
@@ -184,6 +187,8 @@ class ScenarioAgent(Agent):
         except Exception as e:
             logger.error(f'Error running agent stream: {e}')
             raise e
+        finally:
+            self.scenario.cancel_timer(thinking_timer)
 
         return message
 
@@ -192,12 +197,8 @@ class ScenarioAgent(Agent):
             content: str,
             **metadata,
     ) -> Message:
-        def do_audio_callback(audio: MessageAudio):
-            # self.scenario.websocket_connection.create_packet_task(PacketEventType.AUDIO, data=audio)
-            pass
-
-        # audio_callback = do_audio_callback if quiply_settings.scenario.allow_tts else None
-        audio_callback = do_audio_callback if framework_settings.runnables.generators.speech_to_text.enabled else None
+        def audio_callback(chunk: MessageAudioChunk):
+            self.scenario.websocket_connection.send_nowait(PacketAudioEvent(data=chunk))
 
         message = Message.from_ai(
             content=content,
@@ -210,17 +211,12 @@ class ScenarioAgent(Agent):
         if self.runnable_params.verbose:
             debug(self, request=content)
 
-        if audio_callback:
+        message_audio = None
+        if framework_settings.runnables.generators.audio.enabled:
             if not self.audio_generator:
-                logger.warning('Audio response callback provided but no audio generator is set. Audio will not be generated.')
+                logger.warning('Audio is enabled but no audio generator is set. Audio will not be generated.')
             else:
-                audio_response = await self.audio_generator.run_async(content)
-                message_audio = MessageAudio(
-                    message_id=message.id,
-                    audio=audio_response.audio,
-                    normalized_alignment=audio_response.normalized_alignment
-                )
-                audio_callback(message_audio)
+                message_audio = MessageAudio(message_id=message.id)
                 message.audio_id = message_audio.id
 
         self.memory.save(message)
@@ -229,6 +225,13 @@ class ScenarioAgent(Agent):
         # await self.scenario.websocket_connection.send_packet_async(PacketMessageEvent(data=message))
         await self.scenario.websocket_connection.send_async(PacketMessageEvent(data=message))
 
+        if message_audio:
+            # Streamed like the audio of a generated message, repeated lines are replayed from the audio cache
+            try:
+                await self._call_audio_callback_async(self.audio_generator.run_stream(content, cache=True), audio_callback, message_audio)
+            except Exception as e:
+                logger.error(f'Error streaming pregenerated message audio: {e}')
+
         if self.type == AgentType.MENTOR:
             self.scenario.lifecycle_manager.on_advisor_message(message)
         else:
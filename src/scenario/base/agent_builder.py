@@ -1,17 +1,21 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import List, TYPE_CHECKING, Callable, Tuple
+from contextlib import contextmanager
+from typing import List, TYPE_CHECKING, Callable, Tuple, Dict, Iterator
 
 from devtools import debug
 
 from src._debug import quiply_debug
 from src.framework import prompts, TextGenerator, TextGenerationParams, Message, AgentParams, PromptMessage, Prompt, \
     MessageRole
+from src.framework.settings import framework_settings
 from src.services import storage_service
 from src.utils import add_tab_to_each_line, list_to_comma_delimited_str
 from .component import ScenarioComponent
 from .. import ScenarioAgent
 from ..models import AgentType
-from ...models.schemas import TActorComponent
+from ...models.schemas import TActorComponent, ActorSchema
 
 if TYPE_CHECKING:
     from .scenario import Scenario
@@ -19,9 +23,13 @@ if TYPE_CHECKING:
 
 class AgentBuilder(ScenarioComponent, ABC):
     _summarize_personalities: bool
+    _templates: Dict[str, ActorSchema]
 
     generator: TextGenerator
 
+    initialization_timings: Dict[str, Dict[str, float]]
+    """ Milliseconds spent in each phase of initialize_agents, by agent id. """
+
     def __init__(
             self,
             scenario: 'Scenario',
@@ -37,6 +45,10 @@ class AgentBuilder(ScenarioComponent, ABC):
             )
 
             self._summarize_personalities = self.scenario_template.actor_settings.summarize_actor_personalities
+            self.initialization_timings = {}
+            self._templates = storage_service.get_actor_templates_by_ids(
+                self.scenario_config.actor_ids + (self.scenario_config.special_actor_ids or [])
+            )
             self.scenario.agents = self.build_agents()
             self.scenario.special_agents = self.build_special_agents()
             # self.scenario.mentor = self.build_mentor()
@@ -44,16 +56,26 @@ class AgentBuilder(ScenarioComponent, ABC):
             raise e
 
     async def awake(self):
-        await self.initialize_agents(self.scenario.agents)
-        await self.initialize_agents(self.scenario.special_agents)
+        # The voices connect while the system messages are generated
+        self.prewarm_voices(self.scenario.agents + self.scenario.special_agents)
+
+        await self.initialize_agents(self.scenario.agents + self.scenario.special_agents)
         # await self.initialize_agents([self.scenario.mentor])
 
+    @staticmethod
+    def prewarm_voices(agents: List[ScenarioAgent]) -> None:
+        if not framework_settings.runnables.generators.audio.enabled:
+            return
+        for agent in agents:
+            if agent.audio_generator:
+                agent.audio_generator.prewarm()
+
     def build_agents(self) -> List[ScenarioAgent]:
         agents = []
 
         # Create all agents
         for actor_id in self.scenario_config.actor_ids:
-            template = storage_service.get_actor_template(actor_id)
+            template = self.get_actor_template(actor_id)
             agent = ScenarioAgent(
                 process_id=self.instance_uid,
                 template=template,
@@ -73,7 +95,7 @@ class AgentBuilder(ScenarioComponent, ABC):
     def build_special_agents(self) -> List[ScenarioAgent]:
         special_agents = []
         for special_actor_id in self.scenario_config.special_actor_ids:
-            template = storage_service.get_actor_template(special_actor_id)
+            template = self.get_actor_template(special_actor_id)
             agent = ScenarioAgent(
                 process_id=self.instance_uid,
                 template=template,
@@ -84,6 +106,13 @@ class AgentBuilder(ScenarioComponent, ABC):
             special_agents.append(agent)
         return special_agents
 
+    def get_actor_template(self, actor_id: str) -> ActorSchema:
+        """The template read with the others when the builder was created, or read now if it was not needed then."""
+        template = self._templates.get(actor_id)
+        if template is None:
+            template = self._templates[actor_id] = storage_service.get_actor_template(actor_id)
+        return template
+
     def build_mentor(self) -> ScenarioAgent:
         mentor_template = storage_service.get_mentor_template(self.scenario_template.advisor_uid)
         return ScenarioAgent(
@@ -95,21 +124,59 @@ class AgentBuilder(ScenarioComponent, ABC):
         )
 
     async def initialize_agents(self, agents: List[ScenarioAgent]) -> None:
-        for agent in agents:
-            personality = None
+        """
+        Initializes the agents concurrently, at most ``agent_initialization_concurrency`` at a time, since most of the
+        time goes into waiting for the personality summaries and other generations of each agent.
+        """
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, self.scenario.settings.agent_initialization_concurrency))
+
+        async def initialize(agent: ScenarioAgent) -> None:
+            with self.time_phase(agent, 'queued'):
+                await semaphore.acquire()
+            try:
+                with self.time_phase(agent, 'total'):
+                    await self.initialize_agent(agent)
+            finally:
+                semaphore.release()
+
+        await asyncio.gather(*(initialize(agent) for agent in agents))
+
+        if agents:
+            phases = '; '.join(
+                f"{agent.name}: " + ', '.join(
+                    f'{phase} {milliseconds:.0f}ms'
+                    for phase, milliseconds in self.initialization_timings.get(agent.id, {}).items()
+                )
+                for agent in agents
+            )
+            self.logger.info(f'Initialized {len(agents)} agents in {(time.perf_counter() - start) * 1000:.0f}ms ({phases})')
 
-            if agent.type == AgentType.AGENT:
-                system_message, personality = await self.format_system_message_async(agent)
-            elif agent.type == AgentType.SPECIAL_AGENT:
-                system_message = await self.format_special_actor_system_message_async(agent)
-            elif agent.type == AgentType.MENTOR:
-                system_message = self.get_advisor_system_message(agent)
-            else:
-                raise ValueError(f"Unknown agent type: {agent.type}")
+    async def initialize_agent(self, agent: ScenarioAgent) -> None:
+        personality = None
 
-            agent.add_message(system_message)
-            if personality is not None:
-                agent.personality = personality
+        if agent.type == AgentType.AGENT:
+            system_message, personality = await self.format_system_message_async(agent)
+        elif agent.type == AgentType.SPECIAL_AGENT:
+            system_message = await self.format_special_actor_system_message_async(agent)
+        elif agent.type == AgentType.MENTOR:
+            system_message = self.get_advisor_system_message(agent)
+        else:
+            raise ValueError(f"Unknown agent type: {agent.type}")
+
+        agent.add_message(system_message)
+        if personality is not None:
+            agent.personality = personality
+
+    @contextmanager
+    def time_phase(self, agent: ScenarioAgent, phase: str) -> Iterator[None]:
+        """Adds the time spent in the block to the ``phase`` of the agent in initialization_timings."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timings = self.initialization_timings.setdefault(agent.id, {})
+            timings[phase] = timings.get(phase, 0.0) + (time.perf_counter() - start) * 1000
 
     async def format_system_message_async(self, agent: ScenarioAgent) -> Tuple[Message, str]:
         """Generates final system message for the ScenarioAgent"""
@@ -118,15 +185,17 @@ class AgentBuilder(ScenarioComponent, ABC):
         scenario_instructions = self.get_scenario_instructions(agent)
         scenario_additional_information = self.scenario.get_additional_scenario_information()
         role_and_behaviour = self.get_role_and_behaviour(agent)
-        personality = add_tab_to_each_line(await self.get_actor_personality_async(agent))
+        with self.time_phase(agent, 'personality'):
+            personality = add_tab_to_each_line(await self.get_actor_personality_async(agent))
         # scenario_specific_personality_traits = self.get_scenario_specific_personality_traits(agent)
-        extra_information = await self.get_extra_information_async(
-            agent,
-            scenario_instructions,
-            scenario_additional_information,
-            role_and_behaviour,
-            personality
-        )
+        with self.time_phase(agent, 'extra_information'):
+            extra_information = await self.get_extra_information_async(
+                agent,
+                scenario_instructions,
+                scenario_additional_information,
+                role_and_behaviour,
+                personality
+            )
 
         prompt = prompts.character.system_message_structure
 
@@ -207,9 +276,16 @@ class AgentBuilder(ScenarioComponent, ABC):
             common_personality=common_personality,
             traits=traits
         )
-        response = await self.generator.run_async(_input)
 
-        return f"""\t{response.content}"""
+        async def summarize() -> str:
+            response = await self.generator.run_async(_input)
+            return f"""\t{response.content}"""
+
+        return await self.get_or_create_derived_async(
+            'personality',
+            [_input, self.generator.service_name, self.generator.generation_params],
+            summarize
+        )
 
     def get_additional_actor_information(self, agent: ScenarioAgent) -> str:
         additional_information: str = self.scenario_config.get_actor_additional_information(
@@ -1,16 +1,20 @@
 import asyncio
 from abc import ABC
-from typing import TYPE_CHECKING, TypeVar, Coroutine, Union
+from typing import TYPE_CHECKING, TypeVar, Coroutine, Union, Callable, Any, Optional, Awaitable, Iterable
 
+from src.async_object import DEFAULT_TASK_GROUP
 from src.models import ScenarioInstance, ScenarioSchema, ScenarioConfig, AccountData
+from src.services import derived_content_cache
 from .scenario_state_base import ScenarioStateObject
 from ..models.base_scenario_params import BaseScenarioParams
 from ..util import GenericScenarioLogger, ScenarioLoggers
 
 if TYPE_CHECKING:
+    from src.timer_wheel import TimerHandle
     from src.websocket import WebSocketConnection
 
 T = TypeVar("T", bound="ScenarioComponent")
+TContent = TypeVar("TContent")
 TScenario = TypeVar("TScenario", bound="Scenario")
 
 
@@ -30,12 +34,34 @@ class ScenarioComponent(ScenarioStateObject, ABC):
         del self.scenario
 
     # region Helper Methods
-    def create_task(self, coroutine: Union[Coroutine, list[Coroutine]]) -> asyncio.Task:
-        return self.scenario.create_task(coroutine)
+    def create_task(self, coroutine: Union[Coroutine, list[Coroutine]], group: str = DEFAULT_TASK_GROUP) -> asyncio.Task:
+        return self.scenario.create_task(coroutine, group=group)
 
     def defer_coroutine(self, coroutine: Union[Coroutine, list[Coroutine]]):
         self.scenario.defer_coroutine(coroutine)
 
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> 'TimerHandle':
+        return self.scenario.call_later(delay, callback, *args)
+
+    def cancel_timer(self, handle: Optional['TimerHandle']) -> None:
+        self.scenario.cancel_timer(handle)
+
+    async def get_or_create_derived_async(
+        self,
+        kind: str,
+        parts: Iterable[Any],
+        create: Callable[[], Awaitable[TContent]],
+        dump: Callable[[TContent], Any] = lambda content: content,
+        load: Callable[[Any], TContent] = lambda data: data,
+    ) -> TContent:
+        """
+        Generated content that every session with the same inputs shares, like personality summaries, created once
+        per app package version. ``parts`` are everything the content is generated from, like the formatted prompt
+        and the generation parameters.
+        """
+        parts = [type(self).__qualname__, *parts]
+        return await derived_content_cache.get_or_create(kind, parts, create, dump, load)
+
     # endregion
 
     # region Properties
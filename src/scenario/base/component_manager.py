@@ -1,22 +1,27 @@
-import asyncio
-from typing import TypeVar, List, Type, Optional, TYPE_CHECKING
+from typing import TypeVar, List, Type, Optional, Dict, TYPE_CHECKING
 
 from devtools import debug
 
-from src.framework import Message
+from src.framework import Message, MessageRole
+from src.timer_wheel import TimerHandle
 from src.utils import loggers
 from .agent_builder import AgentBuilder
 from .analysis_engine import AnalysisEngine
 from .component import ScenarioComponent
 from .conversation_controller import ConversationController
+from .scenario_state_base import ScenarioStateObject
 from .stage_manager import StageManager
-from ...exceptions import ScenarioStepException
+from ..models import ScenarioEvent
+from ...exceptions import ScenarioStepException, ScenarioUpdateException
 
 if TYPE_CHECKING:
     from .scenario import Scenario
 
 TScenarioComponent = TypeVar("TScenarioComponent", bound=ScenarioComponent)
 
+_HOOKS = ('step', 'late_step', 'step_mentor', 'late_step_mentor', 'update')
+""" Lifecycle hooks that are only dispatched to components that override them. """
+
 
 class ComponentManager:
 
@@ -24,6 +29,8 @@ class ComponentManager:
     _break_step: bool
 
     _components: List[TScenarioComponent]
+    _subscribers: Dict[str, List[TScenarioComponent]]
+    _update_handle: Optional[TimerHandle]
 
     conversation_controller: ConversationController
     stage_manager: StageManager
@@ -57,10 +64,14 @@ class ComponentManager:
         ]
 
         self.current_frame = 0
+        self._update_handle = None
 
         self._reorder_components()
 
     def cleanup(self):
+        self.scenario.cancel_timer(self._update_handle)
+        self._update_handle = None
+
         for component in self._components:
             component.cleanup()
 
@@ -68,6 +79,11 @@ class ComponentManager:
 
     def _reorder_components(self) -> None:
         self._components.sort(key=lambda component: component.priority)
+        self._subscribers = {
+            hook: [component for component in self._components
+                   if getattr(type(component), hook) is not getattr(ScenarioStateObject, hook)]
+            for hook in _HOOKS
+        }
 
     def add_component(self, component: TScenarioComponent) -> TScenarioComponent:
         self._components.append(component)
@@ -95,7 +111,7 @@ class ComponentManager:
         try:
             self._break_step = False
 
-            for component in self._components:
+            for component in self._subscribers['step_mentor' if mentor_step else 'step']:
                 if mentor_step:
                     await component.step_mentor(message)
                 else:
@@ -105,9 +121,11 @@ class ComponentManager:
 
         await self._late_step(message, mentor_step)
 
+        await self.scenario.event_manager.emit(self._get_message_event(message, mentor_step), message)
+
     async def _late_step(self, message: Message, mentor_step: bool) -> None:
         try:
-            for component in self._components:
+            for component in self._subscribers['late_step_mentor' if mentor_step else 'late_step']:
                 if mentor_step:
                     await component.late_step_mentor(message)
                 else:
@@ -115,17 +133,30 @@ class ComponentManager:
         except Exception as e:
             self.scenario.handle_exception(ScenarioStepException, ScenarioStepException(e.args), e.__traceback__)
 
-    async def update(self) -> None:
-        cur_time = 0
-        sleep_time = 0.25
-        while cur_time < self.scenario.frame_rate:
-            await asyncio.sleep(sleep_time)
-            cur_time += sleep_time
+    @staticmethod
+    def _get_message_event(message: Message, mentor_step: bool) -> ScenarioEvent:
+        if message.is_from(MessageRole.user):
+            return ScenarioEvent.ON_USER_MESSAGE_TO_ADVISOR if mentor_step else ScenarioEvent.ON_USER_MESSAGE
+        return ScenarioEvent.ON_ADVISOR_MESSAGE if mentor_step else ScenarioEvent.ON_AGENT_MESSAGE
+
+    def schedule_update(self) -> None:
+        """
+        Schedules the next update frame ``scenario.frame_rate`` seconds from now on the shared timer wheel. Nothing is
+        scheduled when no component overrides update, so an idle scenario costs no wakeups at all.
+        """
+        if self._update_handle is None and self._subscribers['update']:
+            self._update_handle = self.scenario.call_later(self.scenario.frame_rate, self._update_async)
+
+    async def _update_async(self) -> None:
+        self._update_handle = None
+        await self.update()
+        self.schedule_update()
 
+    async def update(self) -> None:
         self.current_frame += 1
 
         try:
-            for component in self._components:
+            for component in self._subscribers['update']:
                 await component.update(self.current_frame)
         except Exception as e:
-            self.scenario.handle_exception(ScenarioStepException, ScenarioStepException(e.args), e.__traceback__)
+            self.scenario.handle_exception(ScenarioUpdateException, ScenarioUpdateException(e.args), e.__traceback__)
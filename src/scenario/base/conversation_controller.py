@@ -198,9 +198,9 @@ class ConversationController(ScenarioComponent, ABC):
         # print(event_loop)
 
         if self.scenario.settings.message_mode == "stream" and agent.type != AgentType.MENTOR:
-            self.create_task(agent.run_async_stream())
+            self.create_task(agent.run_async_stream(), group='agents')
         elif self.scenario.settings.message_mode == "async" or agent.type == AgentType.MENTOR:
-            self.create_task(agent.run_async())
+            self.create_task(agent.run_async(), group='agents')
         else:
             raise Exception(
                 f"Invalid message mode: {quiply_settings.scenario.message_mode}"
@@ -2,10 +2,9 @@ from typing import TypeVar, TYPE_CHECKING
 
 from devtools import debug
 
-from src.exceptions import BaseScenarioException, ScenarioUpdateException
 from src.framework import Message, ModerationGenerator
 from src.models import ScenarioResult, ScenarioAnalysis
-from src.services import storage_service
+from src.services import storage_service, async_storage_service
 # from src.websocket import WebSocketConnection, ScenarioWsEvents, ScenarioNotification, \
 #     WebSocketMessage, MessageWsEvents
 from src.websocket import WebSocketConnection, WebSocketMessage, PacketEventType
@@ -57,20 +56,11 @@ class LifecycleManager:
         await self.component_manager.start()
         self.scenario.logger.debug(f'Scenario {self.scenario.instance.schema_id} ({self.scenario.instance.uid}) called start successfully')
 
-        self.scenario.create_task(self._update_loop())
-        self.scenario.logger.debug(f'Scenario {self.scenario.instance.schema_id} ({self.scenario.instance.uid}) created update loop task successfully')
+        self.component_manager.schedule_update()
+        self.scenario.logger.debug(f'Scenario {self.scenario.instance.schema_id} ({self.scenario.instance.uid}) scheduled updates successfully')
 
         self.scenario.loggers.stage.info(f'Scenario {self.scenario.instance.schema_id} ({self.scenario.instance.uid}) fully initialized')
 
-    async def _update_loop(self) -> None:
-        while True:
-            try:
-                await self.component_manager.update()
-            except BaseScenarioException as e:
-                self.scenario.handle_exception(e.__class__, e, e.__traceback__)
-            except Exception as e:
-                self.scenario.handle_exception(ScenarioUpdateException, ScenarioUpdateException(e.args), e.__traceback__)
-
     async def end_scenario_async(self) -> ScenarioResult:
         self.scenario.loggers.stage.info(f'Ending scenario task for scenario instance {self.scenario.instance.uid} with client {self.scenario.user_uid}')
         if (debug_conversations := quiply_debug.get_conversations(self.scenario.template_uid)) is not None:
@@ -89,6 +79,7 @@ class LifecycleManager:
         )
         # loggers.stage.warning(result.model_dump_json(indent=2))
         storage_service.create_scenario_result(result)
+        await async_storage_service.flush_scenario_writes(self.scenario.instance.uid, result.uid)
         return result
 
     def _handle_user_websocket_message(self, incoming_message: WebSocketMessage) -> None:
@@ -109,12 +100,12 @@ class LifecycleManager:
         self._handle_user_message(message)
 
     def _handle_user_message(self, message: Message) -> None:
-        self.scenario.create_task(self._validate_user_message(message))
+        self.scenario.create_task(self._validate_user_message(message), group='step')
 
         if message.to_mentor:
-            self.scenario.create_task(self.scenario.component_manager.step(message, True))
+            self.scenario.create_task(self.scenario.component_manager.step(message, True), group='step')
         else:
-            self.scenario.create_task(self.scenario.component_manager.step(message, False))
+            self.scenario.create_task(self.scenario.component_manager.step(message, False), group='step')
 
     async def _validate_user_message(self, message: Message) -> None:
         """
@@ -134,7 +125,7 @@ class LifecycleManager:
             self.websocket_connection.force_close()
 
     def on_agent_message(self, message: Message) -> None:
-        self.scenario.create_task(self.component_manager.step(message, False))
+        self.scenario.create_task(self.component_manager.step(message, False), group='step')
 
     def on_advisor_message(self, message: Message) -> None:
-        self.scenario.create_task(self.component_manager.step(message, True))
+        self.scenario.create_task(self.component_manager.step(message, True), group='step')
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from types import TracebackType
-from typing import List, Type, Optional, TypeVar
+import asyncio
+from typing import List, Type, Optional, TypeVar, Tuple
 
 from src.async_object import AsyncObject
 from src.exceptions import BaseScenarioException
@@ -66,11 +67,15 @@ class Scenario(ScenarioStateObject, AsyncObject, ABC):
 
     scenario_description: str
 
+    teardown_order: Tuple[str, ...] = ('voice', 'step', 'agents')
+    """Stop listening first, then message handling, then agent generations that could otherwise emit new messages"""
+
     # endregion
 
     # region Properties
     @property
     def frame_rate(self) -> float:
+        """Seconds between update frames. Only scheduled when a component overrides update."""
         return 99999
 
     @property
@@ -190,6 +195,8 @@ class Scenario(ScenarioStateObject, AsyncObject, ABC):
             self.lifecycle_manager.cleanup()
 
         super().cleanup()
+        # ScenarioStateObject.cleanup does not chain, cancel the tracked tasks and timers explicitly
+        AsyncObject.cleanup(self)
 
     # endregion
 
@@ -230,6 +237,10 @@ class Scenario(ScenarioStateObject, AsyncObject, ABC):
 
     # endregion
 
+    def on_task_exception(self, task: asyncio.Task, exception: BaseException) -> None:
+        # Logged by handle_exception only
+        self.handle_exception(type(exception), exception, exception.__traceback__)
+
     def handle_exception(
         self,
         exc_type: Optional[Type[BaseScenarioException]],
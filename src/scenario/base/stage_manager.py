@@ -13,6 +13,7 @@ from ..models import TScenarioStage, ScenarioEvent, StageFirstSpeakerMode, \
 from src.framework import Message, MessageRole, prompts, TextGenerator, TextGenerationParams, Conversation
 
 if TYPE_CHECKING:
+    from src.timer_wheel import TimerHandle
     from .scenario import Scenario
 
 
@@ -23,6 +24,7 @@ class StageManager(ScenarioComponent, Generic[TScenarioStage], ABC):
     _current_stage_idx: int
     _completed_all_stages: bool
     _auto_advance_stage: bool
+    _time_limit_handle: Optional['TimerHandle']
 
     @property
     def current_stage(self) -> TScenarioStage:
@@ -47,6 +49,7 @@ class StageManager(ScenarioComponent, Generic[TScenarioStage], ABC):
         self.stages = []
         self._current_stage_idx = 0
         self._completed_all_stages = False
+        self._time_limit_handle = None
 
         self.generator = TextGenerator(process_id=self.instance_uid)
         self.generator.generation_params.temperature = 0
@@ -65,6 +68,7 @@ class StageManager(ScenarioComponent, Generic[TScenarioStage], ABC):
 
         self.current_stage.initialize(initial_stage_first_speaker, 0)
         self.loggers.stage.debug(f"StageManager initialized first stage: {self.current_stage}")
+        self._schedule_time_limit()
 
         await self.try_send_progress_async()
 
@@ -144,12 +148,26 @@ class StageManager(ScenarioComponent, Generic[TScenarioStage], ABC):
 
         new_first_speaker, new_speaker_index = self._get_next_stage_speaker_mode(prev_stage)
         self.current_stage.initialize(new_first_speaker, new_speaker_index)
+        self._schedule_time_limit()
 
         self.send_stage_complete_announcement()
 
         await self.scenario.event_manager.emit(ScenarioEvent.ON_STAGE_CHANGE, self.current_stage)
         return True
 
+    def _schedule_time_limit(self) -> None:
+        """Wakes the stage manager when the current stage runs out of time, instead of waiting for the next message."""
+        self.cancel_timer(self._time_limit_handle)
+        self._time_limit_handle = None
+        if self.current_stage.end_time != 0:
+            self._time_limit_handle = self.call_later(self.current_stage.time_remaining, self._on_time_limit_async)
+
+    async def _on_time_limit_async(self) -> None:
+        self._time_limit_handle = None
+        self.loggers.stage.debug(f'Stage {self._current_stage_idx + 1} reached its time limit')
+        await self.try_advance_stage_async()
+        await self.try_send_progress_async()
+
     def send_stage_complete_announcement(self):
         content = f'Begin {self.current_stage.parseable_data.name}'
         pass
@@ -1,10 +1,12 @@
-import base64
-from typing import TYPE_CHECKING, List, Callable
+import asyncio
+from typing import TYPE_CHECKING, AsyncIterator, Callable, List, Optional
 
+import numpy as np
 from devtools import debug
 
-from src.framework import SpeechToTextGenerator, DiarizationGenerator
+from src.framework import SpeechToTextGenerator, get_voice_activity_detector
 from src.framework.models import Message
+from src.framework.runnables.generators.speech_to_text.models import SpeechToTextResponse, SpeechToTextResponseChunk
 from src.models.voice import VoiceTranscript, VoiceStream, VoiceChunk
 from src.utils import logger
 from src.websocket.connection import WebSocketConnection
@@ -14,7 +16,11 @@ if TYPE_CHECKING:
     from src.scenario.base import Scenario
 
 
-CHUNK_COUNT_THRESHOLD = 2
+NO_SPEECH_CHUNK_THRESHOLD = 2
+""" Consecutive chunks without speech that end an utterance. """
+
+Utterance = asyncio.Queue[Optional[np.ndarray]]
+
 
 class ScenarioVoiceStreaming:
     scenario: "Scenario"
@@ -22,7 +28,6 @@ class ScenarioVoiceStreaming:
     handle_user_message_callback: Callable[[Message], None]
 
     stt_generator: SpeechToTextGenerator
-    diarization_generator: DiarizationGenerator
 
     def __init__(
         self,
@@ -37,96 +42,99 @@ class ScenarioVoiceStreaming:
         websocket_connection.on_voice_stream_start(self._on_voice_stream_start)
 
         self.stt_generator = SpeechToTextGenerator(process_id=scenario.instance_uid)
-        self.diarization_generator = DiarizationGenerator(
-            process_id=scenario.instance_uid
-        )
 
     def _on_voice_stream_start(self, stream: VoiceStream):
-        self.scenario.create_task(self._handle_audio_stream(stream))
+        self.scenario.create_task(self._handle_audio_stream(stream), group='voice')
 
     async def _handle_audio_stream(self, stream: VoiceStream):
+        utterance: Optional[Utterance] = None
         try:
+            vad_session = get_voice_activity_detector().create_session()
             no_speech_count = 0
-            speech_chunks: List[VoiceChunk] = []
-            send_chunks: List[VoiceChunk] = []
 
             async for chunk in stream:
-                if not chunk.audio or chunk.audio == "":
+                audio_bytes = chunk.get_audio()
+                if not audio_bytes:
                     continue
 
-                audio_bytes = base64.b64decode(chunk.audio)
+                vad_result = await vad_session.process_async(audio_bytes)
 
-                diarization_response = await self.diarization_generator.run_async(
-                    audio_bytes
-                )
-
-                if diarization_response.speaker_count == 0:
+                if not vad_result.is_speech:
                     no_speech_count += 1
                 else:
-                    speech_chunks.append(chunk)
                     no_speech_count = 0
+                    if utterance is None:
+                        utterance = asyncio.Queue()
+                        self.scenario.create_task(self._transcribe_utterance(utterance, chunk), group='voice')
+                    utterance.put_nowait(vad_result.pcm)
 
-                    send_chunks.append(chunk)
-                    if len(send_chunks) >= CHUNK_COUNT_THRESHOLD:
-                        self.scenario.create_task(self._handle_speech(send_chunks.copy()))
-                        send_chunks.clear()
-
-                if no_speech_count > 1:
+                if no_speech_count >= NO_SPEECH_CHUNK_THRESHOLD and utterance is not None:
                     no_speech_count = 0
-                    if len(speech_chunks) > 0:
-                        self.scenario.create_task(self._handle_no_speech(speech_chunks.copy()))
-                        speech_chunks.clear()
+                    utterance.put_nowait(None)
+                    utterance = None
         except Exception as e:
             logger.exception(e)
+        finally:
+            if utterance is not None:
+                utterance.put_nowait(None)
 
-    async def _handle_no_speech(self, chunks: List[VoiceChunk]):
+    @staticmethod
+    async def _iterate_utterance(utterance: Utterance) -> AsyncIterator[np.ndarray]:
+        while (pcm := await utterance.get()) is not None:
+            yield pcm
+
+    async def _transcribe_utterance(self, utterance: Utterance, first_chunk: VoiceChunk):
+        """
+        Streams the utterance through speech to text. Partial hypotheses are sent to the client as they change,
+        the committed text becomes the user message once the utterance ends.
+        """
         try:
-            audio_bytes = self._chunks_to_bytes(chunks)
-            stt_response = await self.stt_generator.run_async(audio_bytes)
-
-            debug(f"STT Response: {stt_response.text}")
-
-            message = Message.from_user(
-                stt_response.text,
-                author_id=self.scenario.user_uid,
-                author_name=self.scenario.users_name,
-                scenario_instance_id=self.scenario.instance_uid,
-            )
-
-            final_transcript: VoiceTranscript = VoiceTranscript(
-                stream_id="end",
-                chunk_id="end",
-                text=stt_response.text,
-                is_final=True,
-            )
-            # await self.websocket_connection.send_voice_async(VoiceTranscriptEvent(data=final_transcript.model_dump()))
-            # await self.websocket_connection.send_packet_async(PacketMessageEvent(type=PacketEventType.MESSAGE, data=message))
-            await self.websocket_connection.send_async(VoiceTranscriptEvent(data=final_transcript.model_dump()))
-            await self.websocket_connection.send_async(PacketMessageEvent(type=PacketEventType.MESSAGE, data=message))
-
-            self.handle_user_message_callback(message)
-
-            # await self.websocket_connection.send_voice_async(VoiceTranscriptEvent(data=message.model_dump()))
-            # await self.websocket_connection.send_packet_async(PacketEvent(type=PacketEventType.MESSAGE, data=message)) # LLMPacketEventType.END, message)
-            # self.handle_user_message_callback(message)
+            chunks: List[SpeechToTextResponseChunk] = []
+            committed_text = ""
+
+            async for stt_chunk in self.stt_generator.run_stream(self._iterate_utterance(utterance)):
+                if stt_chunk.is_partial:
+                    # Segment texts carry their leading space, joined like SpeechToTextResponse.from_chunks does
+                    await self._send_partial_transcript(first_chunk, committed_text + (stt_chunk.text or ""))
+                    continue
+
+                chunks.append(stt_chunk)
+                committed_text += stt_chunk.text or ""
+                if not stt_chunk.is_final and committed_text:
+                    await self._send_partial_transcript(first_chunk, committed_text)
+
+            text = (SpeechToTextResponse.from_chunks(chunks).text or "").strip()
+            if text:
+                await self._send_final_transcript(text)
         except Exception as e:
             logger.exception(e)
 
-    async def _handle_speech(self, chunks: List[VoiceChunk]):
-        try:
-            audio_bytes = self._chunks_to_bytes(chunks)
+    async def _send_partial_transcript(self, first_chunk: VoiceChunk, text: str):
+        transcript: VoiceTranscript = first_chunk.create_transcript(text.strip())
+        event: VoiceTranscriptEvent = VoiceTranscriptEvent(data=transcript.model_dump())
 
-            stt_response = await self.stt_generator.run_async(audio_bytes)
+        # await self.websocket_connection.send_voice_async(event)
+        await self.websocket_connection.send_async(event)
 
-            transcript: VoiceTranscript = chunks[0].create_transcript(stt_response.text)
-            debug(transcript)
-            event: VoiceTranscriptEvent = VoiceTranscriptEvent(data=transcript.model_dump())
+    async def _send_final_transcript(self, text: str):
+        debug(f"STT Response: {text}")
 
-            # await self.websocket_connection.send_voice_async(event)
-            await self.websocket_connection.send_async(event)
-        except Exception as e:
-            logger.exception(e)
+        message = Message.from_user(
+            text,
+            author_id=self.scenario.user_uid,
+            author_name=self.scenario.users_name,
+            scenario_instance_id=self.scenario.instance_uid,
+        )
 
-    @staticmethod
-    def _chunks_to_bytes(chunks: List[VoiceChunk]) -> bytes:
-        return b"".join([base64.b64decode(chunk.audio) for chunk in chunks])
+        final_transcript: VoiceTranscript = VoiceTranscript(
+            stream_id="end",
+            chunk_id="end",
+            text=text,
+            is_final=True,
+        )
+        # await self.websocket_connection.send_voice_async(VoiceTranscriptEvent(data=final_transcript.model_dump()))
+        # await self.websocket_connection.send_packet_async(PacketMessageEvent(type=PacketEventType.MESSAGE, data=message))
+        await self.websocket_connection.send_async(VoiceTranscriptEvent(data=final_transcript.model_dump()))
+        await self.websocket_connection.send_async(PacketMessageEvent(type=PacketEventType.MESSAGE, data=message))
+
+        self.handle_user_message_callback(message)
@@ -1,14 +1,19 @@
+import asyncio
+import functools
 import gc
 import importlib
 import inspect
+import json
 import os
 import sys
-from typing import Dict, Callable, List, Literal, get_args, Optional
+from typing import Any, Dict, Callable, List, Literal, get_args, Optional
 
+from pydantic_core import to_jsonable_python
 from starlette.websockets import WebSocket
 
-from src.exceptions import WebsocketScenarioNotFoundException
+from src.exceptions import ScenarioOwnedByWorkerException, WebsocketScenarioNotFoundException
 from src.models import ScenarioInstance, ScenarioResult
+from src.session_registry import BaseSessionRegistry, get_session_registry, get_worker_id
 from src.utils import logger, loggers
 from src.websocket import WebSocketConnection, WebSocketStatus
 from src.websocket.error_handler import handle_websocket_exception
@@ -30,12 +35,16 @@ class ScenarioManager:
 
     callback_dict: Dict[str, List[CallbackType]]
 
-    def __init__(self):
+    registry: BaseSessionRegistry
+    """ Which worker owns each session, so that a websocket landing on another worker can take it over. """
+
+    def __init__(self, registry: Optional[BaseSessionRegistry] = None):
         self.scenario_classes = self._load_scenarios()
         scenario_names = "\n" + "\n".join([f"{idx + 1}: {scenario_id}" for idx, scenario_id in enumerate(list(self.scenario_classes.keys()))])
         loggers.system.info(f'Loaded scenarios: {scenario_names}')
         self.scenarios = {}
         self.running_scenarios = {}
+        self.registry = registry or get_session_registry(quiply_settings.scenario.registry)
 
         self.callback_dict = {}
         for event in get_args(Events):
@@ -72,7 +81,17 @@ class ScenarioManager:
         for callback in self.callback_dict[event]:
             callback(scenario, result)
 
-    def create_scenario(self, scenario_instance: ScenarioInstance, override_settings: dict = None) -> Scenario:
+    async def _run_registry_async(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs a registry call off the event loop, the registry waits for the other workers' writes."""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    def _register(self, scenario_instance: ScenarioInstance, override_settings: Optional[dict]) -> None:
+        self.registry.register(scenario_instance.uid, get_worker_id(), json.dumps(to_jsonable_python({
+            'instance': scenario_instance,
+            'override_settings': override_settings,
+        })))
+
+    def create_scenario(self, scenario_instance: ScenarioInstance, override_settings: dict = None, register: bool = True) -> Scenario:
         # self.check_for_lingering_references()
 
         ScenarioClass = self.scenario_classes.get(scenario_instance.schema_id)
@@ -83,6 +102,8 @@ class ScenarioManager:
 
             scenario = ScenarioClass(scenario_instance, settings)
             self.scenarios[scenario_instance.uid] = scenario
+            if register:
+                self._register(scenario_instance, override_settings)
             self._trigger('create', scenario)
 
             loggers.system.info(f'ScenarioManager created scenario with id {scenario_instance.uid} for user {scenario_instance.user_id} from template {scenario_instance.schema_id} with settings {settings}')
@@ -90,12 +111,19 @@ class ScenarioManager:
         else:
             raise Exception(f'Scenario \'{scenario_instance.schema_id}\' not found')
 
+    async def create_scenario_async(self, scenario_instance: ScenarioInstance, override_settings: dict = None) -> Scenario:
+        """Like create_scenario, registering the session off the event loop."""
+        scenario = self.create_scenario(scenario_instance, override_settings, register=False)
+        await self._run_registry_async(self._register, scenario_instance, override_settings)
+        return scenario
+
     async def start_scenario_async(self, websocket: WebSocket, scenario_instance_id: str):
         loggers.system.debug(f'ScenarioManager start_scenario_async scenario with id {scenario_instance_id} for client {websocket.client.host}')
 
-        scenario = self.scenarios.get(scenario_instance_id, None)
+        scenario = await self._acquire_scenario_async(scenario_instance_id)
         if scenario is None:
             await handle_websocket_exception(websocket, WebsocketScenarioNotFoundException, WebsocketScenarioNotFoundException(stage=WebSocketStatus.GetScenario))
+            return
 
         self.running_scenarios[scenario_instance_id] = scenario
 
@@ -106,11 +134,36 @@ class ScenarioManager:
 
         self._trigger('start', scenario)
 
+    async def _acquire_scenario_async(self, scenario_instance_id: str) -> Scenario | None:
+        """
+        The scenario of the session once this worker owns it and runs it. A session created by another worker is
+        created again here from the state it was registered with, unless that worker is running it and still renews
+        its lease.
+        """
+        record = await self._run_registry_async(self.registry.acquire, scenario_instance_id, get_worker_id(), running=True)
+        if record is None:
+            owner = await self._run_registry_async(self.registry.lookup, scenario_instance_id)
+            if owner is not None:
+                loggers.system.warning(f'Scenario {scenario_instance_id} is running on worker {owner.worker_id}')
+            return None
+
+        scenario = self.scenarios.get(scenario_instance_id, None)
+        if scenario is None:
+            state = json.loads(record.state)
+            loggers.system.info(f'ScenarioManager taking over scenario {scenario_instance_id}')
+            scenario = self.create_scenario(
+                ScenarioInstance.model_validate(state['instance']), state['override_settings'], register=False)
+        return scenario
+
     def get_scenario(self, scenario_instance_id: str) -> Scenario | None:
         scenario = self.scenarios.get(scenario_instance_id, None)
         return scenario
 
     async def end_scenario_async(self, scenario_instance_id: str, completed: bool) -> ScenarioResult | None:
+        """
+        Ends a scenario of this worker. A scenario that another worker owns is ended there on its next heartbeat when
+        it is force ended, completing it raises ScenarioOwnedByWorkerException since only the owner has the result.
+        """
         loggers.system.debug(f'ScenarioManager end_scenario_async scenario with id {scenario_instance_id}')
 
         if scenario_instance_id in self.scenarios:
@@ -124,12 +177,40 @@ class ScenarioManager:
                 self._trigger('end', scenario)
                 # await evaluation_manager.on_scenario_end_async(scenario)
 
-            self.destroy_scenario(scenario_instance_id)
+            await self.destroy_scenario_async(scenario_instance_id)
+        elif completed and (record := await self._run_registry_async(self.registry.lookup, scenario_instance_id)) is not None:
+            raise ScenarioOwnedByWorkerException(scenario_instance_id, record.worker_id)
+        elif not completed and await self._run_registry_async(self.registry.request_end, scenario_instance_id):
+            loggers.system.info(f'Scenario {scenario_instance_id} is owned by another worker, it ends it on its next heartbeat')
+            result = None
         else:
             loggers.system.error(f'Cannot call end_scenario_async: No scenario found with id {scenario_instance_id}')
             result = None
         return result
 
+    async def _get_local_scenario_async(self, scenario_instance_id: str) -> Scenario | None:
+        """The scenario if this worker owns it, raises ScenarioOwnedByWorkerException when another worker does."""
+        scenario = self.scenarios.get(scenario_instance_id, None)
+        if scenario is None and (record := await self._run_registry_async(self.registry.lookup, scenario_instance_id)) is not None:
+            raise ScenarioOwnedByWorkerException(scenario_instance_id, record.worker_id)
+        return scenario
+
+    async def get_task_snapshot_async(self, scenario_instance_id: str) -> Optional[dict]:
+        scenario = await self._get_local_scenario_async(scenario_instance_id)
+        return scenario.task_snapshot() if scenario else None
+
+    async def get_send_queue_stats_async(self, scenario_instance_id: str) -> Optional[dict]:
+        scenario = await self._get_local_scenario_async(scenario_instance_id)
+        connection = getattr(scenario.lifecycle_manager, 'websocket_connection', None) if scenario else None
+        return connection.send_queue_stats() if connection else None
+
+    async def destroy_scenario_async(self, scenario_instance_id: str) -> None:
+        """Cancels the scenario's tasks group by group and waits for them before destroying it."""
+        scenario = self.scenarios.get(scenario_instance_id)
+        if scenario:
+            await scenario.cleanup_async()
+        self.destroy_scenario(scenario_instance_id)
+
     def destroy_scenario(self, scenario_instance_id: str) -> None:
         scenario = self.scenarios.get(scenario_instance_id)
         if not scenario:
@@ -140,12 +221,50 @@ class ScenarioManager:
 
         scenario.cleanup()
 
-        del self.running_scenarios[scenario_instance_id]
+        self.running_scenarios.pop(scenario_instance_id, None)
         del self.scenarios[scenario_instance_id]
+        self.registry.release(scenario_instance_id, get_worker_id())
 
         gc.collect()
         # self.check_for_lingering_references()
 
+    async def maintain_registry_async(self) -> None:
+        """
+        Renews the lease of this worker on its sessions until cancelled. Sessions that another worker took over are
+        dropped here, and sessions that another worker was asked to end are ended.
+        """
+        settings = quiply_settings.scenario.registry
+        while True:
+            try:
+                await self.sync_registry_async()
+            except Exception as e:
+                loggers.system.exception(e)
+            await asyncio.sleep(settings.heartbeat_interval)
+
+    async def sync_registry_async(self) -> None:
+        worker_id = get_worker_id()
+        # Only the scenarios registered before the owned sessions are read
+        scenario_instance_ids = list(self.scenarios)
+        await self._run_registry_async(self.registry.heartbeat, worker_id)
+        owned = {record.instance_uid: record for record in await self._run_registry_async(self.registry.owned, worker_id)}
+
+        for scenario_instance_id in scenario_instance_ids:
+            if scenario_instance_id not in self.scenarios:
+                continue
+            record = owned.get(scenario_instance_id)
+            if record is None and scenario_instance_id not in self.running_scenarios:
+                loggers.system.info(f'Scenario {scenario_instance_id} was taken over by another worker')
+                self.destroy_scenario(scenario_instance_id)
+            elif record is not None and record.end_requested:
+                await self.end_scenario_async(scenario_instance_id, False)
+
+        await self._run_registry_async(self.registry.purge)
+
+    def close_registry(self) -> None:
+        """Lets the other workers take over the sessions of this one right away."""
+        self.registry.retire(get_worker_id())
+        self.registry.close()
+
     @staticmethod
     def check_for_lingering_references():
         # Check for lingering references to the scenario
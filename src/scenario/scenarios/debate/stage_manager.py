@@ -51,21 +51,32 @@ class DebateStageManager(StageManager[DebateStage]):
 
         format_instructions = post_processor.get_generator_instructions_str()
 
-        response = await self._generate_debate_questions_raw(format_instructions)
-        response_list = post_processor.run(response)
-        return response_list
+        _input = self._format_debate_questions_input(format_instructions)
 
-    async def _generate_debate_questions_raw(self, format_instructions: str) -> str:
+        async def generate() -> List[str]:
+            response = await self._generate_debate_questions_raw(_input)
+            return post_processor.run(response)
+
+        return await self.get_or_create_derived_async(
+            'debate-questions',
+            [_input, self.generator.service_name, self.generator.generation_params],
+            generate,
+            load=list
+        )
+
+    def _format_debate_questions_input(self, format_instructions: str) -> str:
         participants = [self.users_name] + [agent.name for agent in self.scenario.agents]
         participants_str = list_to_comma_delimited_str(participants)
 
         prompt = prompts.debate.character.generate_questions
-        _input = prompt.format(
+        return prompt.format(
             topic=self.settings.topic,
             participants=participants_str,
             question_count=self.settings.stage_message_limit,
             format_instructions=format_instructions
         )
+
+    async def _generate_debate_questions_raw(self, _input: str) -> str:
         response = await self.generator.run_async(_input)
         self.loggers.llm.info(f'GENERATE QUESTIONS RESPONSE: {response.content}')
         return response.content
@@ -30,10 +30,18 @@ class InterviewStageManager(StageManager[InterviewStage]):
             format_instructions=stage_datas_list_cls.get_format_instructions()
         )
 
-        response = await generator.run_async(_input)
-        # print('generate stages response', response)
-
-        stage_data_list: stage_datas_list_cls = stage_datas_list_cls().parse(response.content)
+        async def generate() -> InterviewStageDataList:
+            response = await generator.run_async(_input)
+            # print('generate stages response', response)
+            return stage_datas_list_cls().parse(response.content)
+
+        stage_data_list: stage_datas_list_cls = await self.get_or_create_derived_async(
+            'interview-stages',
+            [_input, generator.service_name, generator.generation_params],
+            generate,
+            dump=lambda data_list: data_list.model_dump(),
+            load=stage_datas_list_cls.model_validate
+        )
         stages: List[InterviewStage] = []
         for stage_data in stage_data_list.stage_datas:
             stage = InterviewStage(
@@ -1 +1 @@
-from .main import storage_service
+from .main import storage_service, async_storage_service, derived_content_cache
@@ -1,4 +1,18 @@
+import atexit
+
 from src.settings import quiply_settings
-from .storage import get_storage_service, BaseStorageService
+from .storage import get_storage_service, BaseStorageService, AsyncStorageService, DerivedContentCache
 
 storage_service: BaseStorageService = get_storage_service(quiply_settings.services.storage.provider)
+async_storage_service: AsyncStorageService = AsyncStorageService(storage_service)
+
+
+def _app_package_version() -> int:
+    package = storage_service.local_app_package
+    return package.version if package is not None else 0
+
+
+derived_content_cache: DerivedContentCache = DerivedContentCache(_app_package_version, remote=async_storage_service)
+
+# Commits the buffered writes if the process exits without the FastAPI shutdown
+atexit.register(storage_service.close)
@@ -1,9 +1,17 @@
 from .base_service import BaseStorageService
+from .async_service import AsyncStorageService
+from .cache import StorageCache
+from .derived import DerivedContentCache
+from .exceptions import StorageException, StorageDocumentNotFoundException, StorageTimeoutException
 from .firestore import FirestoreStorageService
+from .memory import MemoryStorageService
+from src.settings import quiply_settings
 
 
 def get_storage_service(name: str) -> BaseStorageService:
     if name == "firestore":
         return FirestoreStorageService()
+    elif name == "memory":
+        return MemoryStorageService(quiply_settings.services.storage.memory_directory)
     else:
         raise NotImplementedError
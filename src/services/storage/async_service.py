@@ -0,0 +1,280 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, TypeVar
+
+from src.models import (
+    ActorSchema,
+    ScenarioSchema,
+    ScenarioConfig,
+    ContextReference,
+    ScenarioInstance,
+    ScenarioResult,
+    AccountData,
+)
+from .base_service import (
+    BaseStorageService,
+    SCENARIO_INSTANCE_PREFIX,
+    SCENARIO_RESULT_PREFIX,
+    ACCOUNT_DATA_PREFIX,
+)
+from .exceptions import StorageTimeoutException
+from src.settings.services import StorageExecutorConfig
+
+_T = TypeVar('_T')
+
+
+class AsyncStorageService:
+    """
+    Async interface of a BaseStorageService for the FastAPI routes and websocket handlers.
+
+    The storage services are synchronous, so every operation that reaches the backend runs on a bounded thread pool
+    instead of the event loop. At most ``max_concurrency`` operations are in flight, and an operation raises
+    StorageTimeoutException when it does not complete within ``timeout`` (``upload_timeout`` for media), including
+    the wait for a slot. A timed out call is not interrupted, it finishes on its thread and its result is dropped.
+
+    Reads of cached documents are answered from the storage cache without leaving the event loop, and concurrent
+    reads of the same uncached document share one backend call. Templates come from the local app package and are
+    returned directly.
+    """
+
+    def __init__(self, storage: BaseStorageService, config: Optional[StorageExecutorConfig] = None):
+        if config is None:
+            from src.settings import quiply_settings
+            config = quiply_settings.services.storage.executor
+        self._storage = storage
+        self._config = config
+        self._executor = ThreadPoolExecutor(max_workers=config.max_workers, thread_name_prefix='storage')
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        self._counters: Dict[str, int] = dict.fromkeys(('completed', 'failed', 'timeouts'), 0)
+        self._in_flight = 0
+
+    @property
+    def storage(self) -> BaseStorageService:
+        return self._storage
+
+    async def _run(self, operation: str, func: Callable[..., _T], *args, timeout: Optional[float] = None, **kwargs) -> _T:
+        timeout = self._config.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(self._run_in_executor(func, *args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            self._counters['timeouts'] += 1
+            raise StorageTimeoutException(operation, timeout) from None
+
+    async def _run_in_executor(self, func: Callable[..., _T], *args, **kwargs) -> _T:
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, functools.partial(func, *args, **kwargs))
+            except Exception:
+                self._counters['failed'] += 1
+                raise
+            finally:
+                self._in_flight -= 1
+            self._counters['completed'] += 1
+            return result
+
+    async def _upload(self, operation: str, func: Callable[..., _T], *args, **kwargs) -> _T:
+        return await self._run(operation, func, *args, timeout=self._config.upload_timeout, **kwargs)
+
+    async def _get(self, key: str, operation: str, getter: Callable[..., _T], fetch: Callable[..., _T], *args,
+                   bypass_cache: bool) -> _T:
+        # getter is the storage's own getter, which caches the document it reads. fetch reads the backend only, so
+        # that get_or_fetch_async is the one to cache it and skips documents that a write overtook
+        if bypass_cache:
+            return await self._run(operation, getter, *args, True)
+        return await self._storage.cache.get_or_fetch_async(
+            key, lambda: self._run(operation, self._storage.fetch_document, key, functools.partial(fetch, *args)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'in_flight': self._in_flight,
+            'max_concurrency': self._config.max_concurrency,
+            'max_workers': self._config.max_workers,
+            **self._counters,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------ Buffered Writes ------------------------------------ #
+
+    async def flush_writes(self, keys: Optional[Iterable[str]] = None) -> None:
+        await self._run('flush_writes', self._storage.flush_writes, None if keys is None else list(keys))
+
+    async def flush_scenario_writes(self, scenario_instance_id: str, scenario_result_id: Optional[str] = None) -> None:
+        """Commit the buffered writes of a scenario instance and its result, e.g. when the scenario ends."""
+        keys = [f"{SCENARIO_INSTANCE_PREFIX}:{scenario_instance_id}"]
+        if scenario_result_id is not None:
+            keys.append(f"{SCENARIO_RESULT_PREFIX}:{scenario_result_id}")
+        await self.flush_writes(keys)
+
+    # ------------------------------------ Media ------------------------------------ #
+
+    async def delete_media(
+            self,
+            path: str,
+            media_type: Optional[str] = None,
+            *,
+            metadata_selectors: Optional[Dict[str, str]] = None,
+    ) -> None:
+        await self._run('delete_media', self._storage.delete_media, path, media_type,
+                        metadata_selectors=metadata_selectors)
+
+    async def upload_media(
+            self,
+            path: str,
+            file_name: str,
+            content_type: str,
+            media_type: Optional[str],
+            media_content
+    ) -> str:
+        return await self._upload('upload_media', self._storage.upload_media, path, file_name, content_type,
+                                  media_type, media_content)
+
+    # ------------------------------------ Actor Template ------------------------------------ #
+
+    async def get_actor_template(self, actor_id: str) -> ActorSchema:
+        return self._storage.get_actor_template(actor_id)
+
+    async def get_actor_templates(self) -> List[ActorSchema]:
+        return self._storage.get_actor_templates()
+
+    async def get_actor_templates_by_ids(self, actor_ids: List[str]) -> Dict[str, ActorSchema]:
+        return self._storage.get_actor_templates_by_ids(actor_ids)
+
+    async def update_actor_templates(self, actors: List[ActorSchema]) -> None:
+        await self._run('update_actor_templates', self._storage.update_actor_templates, actors)
+
+    async def upload_actor_template_image(self, actor_id: str, content_type: str, image_content) -> str:
+        return await self._upload('upload_actor_template_image', self._storage.upload_actor_template_image,
+                                  actor_id, content_type, image_content)
+
+    async def upload_actor_template_video(self, actor_id: str, content_type: str, video_type: str, video_content) -> str:
+        return await self._upload('upload_actor_template_video', self._storage.upload_actor_template_video,
+                                  actor_id, content_type, video_type, video_content)
+
+    # ------------------------------------ Scenario Template ------------------------------------ #
+
+    async def get_scenario_schema(self, scenario_schema_id: str) -> ScenarioSchema:
+        return self._storage.get_scenario_schema(scenario_schema_id)
+
+    async def get_scenario_schemas(self) -> List[ScenarioSchema]:
+        return self._storage.get_scenario_schemas()
+
+    async def update_scenario_templates(self, scenarios: List[ScenarioSchema]) -> None:
+        await self._run('update_scenario_templates', self._storage.update_scenario_templates, scenarios)
+
+    async def upload_scenario_template_image(self, scenario_id: str, content_type: str, image_content) -> str:
+        return await self._upload('upload_scenario_template_image', self._storage.upload_scenario_template_image,
+                                  scenario_id, content_type, image_content)
+
+    async def upload_scenario_template_video(self, scenario_id: str, content_type: str, video_type: str, video_content) -> str:
+        return await self._upload('upload_scenario_template_video', self._storage.upload_scenario_template_video,
+                                  scenario_id, content_type, video_type, video_content)
+
+    # ------------------------------------ Scenario Config ------------------------------------ #
+
+    async def save_scenario_config(self, scenario_config: ScenarioConfig) -> None:
+        await self._run('save_scenario_config', self._storage.save_scenario_config, scenario_config)
+
+    async def delete_scenario_config(self, user_id: str, config_name: str) -> None:
+        await self._run('delete_scenario_config', self._storage.delete_scenario_config, user_id, config_name)
+
+    # ------------------------------------ Context Reference ------------------------------------ #
+
+    async def add_context_reference(
+            self,
+            user_id: str,
+            context_template_uid: str,
+            name: str,
+            scenario_schema_id: str,
+            reference_type: Literal['string', 'file'],
+            content_type: str,
+            value: bytes | str,
+    ) -> ContextReference:
+        return await self._upload('add_context_reference', self._storage.add_context_reference, user_id,
+                                  context_template_uid, name, scenario_schema_id, reference_type, content_type, value)
+
+    async def get_context_reference(self, user_id: str, context_template_uid: str) -> ContextReference:
+        return await self._run('get_context_reference', self._storage.get_context_reference, user_id,
+                               context_template_uid)
+
+    async def delete_context_reference(self, user_id: str, context_reference_uid: str) -> None:
+        await self._run('delete_context_reference', self._storage.delete_context_reference, user_id,
+                        context_reference_uid)
+
+    # ------------------------------------ Scenario Instance ------------------------------------ #
+
+    async def get_scenario_instance(self, user_id: str, scenario_instance_id: str, bypass_cache: bool = False) -> ScenarioInstance:
+        return await self._get(f"{SCENARIO_INSTANCE_PREFIX}:{scenario_instance_id}", 'get_scenario_instance',
+                               self._storage.get_scenario_instance, self._storage._get_scenario_instance,
+                               user_id, scenario_instance_id, bypass_cache=bypass_cache)
+
+    async def create_scenario_instance(self, scenario_instance: ScenarioInstance) -> ScenarioInstance:
+        return await self._run('create_scenario_instance', self._storage.create_scenario_instance, scenario_instance)
+
+    async def delete_scenario_instance(self, user_id: str, scenario_instance_id: str) -> None:
+        await self._run('delete_scenario_instance', self._storage.delete_scenario_instance, user_id,
+                        scenario_instance_id)
+
+    async def update_scenario_instance(self, scenario_instance: ScenarioInstance) -> None:
+        await self._run('update_scenario_instance', self._storage.update_scenario_instance, scenario_instance)
+
+    # ------------------------------------ Scenario Result ------------------------------------ #
+
+    async def get_scenario_result(self, user_id: str, scenario_result_id: str, bypass_cache: bool = False) -> ScenarioResult:
+        return await self._get(f"{SCENARIO_RESULT_PREFIX}:{scenario_result_id}", 'get_scenario_result',
+                               self._storage.get_scenario_result, self._storage._get_scenario_result,
+                               user_id, scenario_result_id, bypass_cache=bypass_cache)
+
+    async def create_scenario_result(self, scenario_result: ScenarioResult) -> ScenarioResult:
+        return await self._run('create_scenario_result', self._storage.create_scenario_result, scenario_result)
+
+    async def delete_scenario_result(self, user_id: str, scenario_result_id: str) -> None:
+        await self._run('delete_scenario_result', self._storage.delete_scenario_result, user_id, scenario_result_id)
+
+    async def update_scenario_result(self, scenario_result: ScenarioResult) -> None:
+        await self._run('update_scenario_result', self._storage.update_scenario_result, scenario_result)
+
+    # ------------------------------------ Derived Content ------------------------------------ #
+
+    async def get_derived_content(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self._run('get_derived_content', self._storage.get_derived_content, key)
+
+    async def set_derived_content(self, key: str, entry: Dict[str, Any]) -> None:
+        await self._run('set_derived_content', self._storage.set_derived_content, key, entry)
+
+    # ------------------------------------ User Account ------------------------------------ #
+
+    async def create_account_data(self, account_data: AccountData) -> AccountData:
+        return await self._run('create_account_data', self._storage.create_account_data, account_data)
+
+    async def get_account_data(self, user_id: str, bypass_cache: bool = False) -> AccountData:
+        return await self._get(f"{ACCOUNT_DATA_PREFIX}:{user_id}", 'get_account_data',
+                               self._storage.get_account_data, self._storage._get_account_data,
+                               user_id, bypass_cache=bypass_cache)
+
+    async def delete_account_data(self, user_id: str) -> None:
+        await self._run('delete_account_data', self._storage.delete_account_data, user_id)
+
+    async def set_account_data_first_last_name(self, user_id: str, first_name: str, last_name: str) -> None:
+        await self._run('set_account_data_first_last_name', self._storage.set_account_data_first_last_name,
+                        user_id, first_name, last_name)
+
+    async def update_account_data(self, user_id: str, changed_fields: Dict[str, Any]) -> AccountData:
+        return await self._run('update_account_data', self._storage.update_account_data, user_id, changed_fields)
+
+    async def upload_account_data_image(self, user_id: str, mime_type: str, image_content) -> str:
+        return await self._upload('upload_account_data_image', self._storage.upload_account_data_image, user_id,
+                                  mime_type, image_content)
+
+    # ------------------------------------ User Profile ------------------------------------ #
+
+    async def update_user_profile(self, uid: str, **kwargs) -> AccountData:
+        return await self._run('update_user_profile', self._storage.update_user_profile, uid, **kwargs)
+
+    async def upload_user_profile_image(self, user_id: str, mime_type: str, image_content) -> str:
+        return await self._upload('upload_user_profile_image', self._storage.upload_user_profile_image, user_id,
+                                  mime_type, image_content)
@@ -1,6 +1,8 @@
 import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Literal, Callable, Any, Dict, Optional
+from typing import List, Literal, Callable, Any, Dict, Iterable, Optional
+
+from pydantic import BaseModel
 
 from src.models import (
     ActorSchema,
@@ -15,8 +17,10 @@ from src.models import (
 )
 from src.models.app_package import AppPackage, AppPackageData
 from .cache import StorageCache
+from .write_behind import DocumentWrite, WriteBehindBuffer
 from ..base_service import BaseService
 from src.settings import quiply_settings
+from src.settings.services import StorageConfig
 from src.utils import logger
 
 SCENARIO_INSTANCE_PREFIX = "scenario_instance"
@@ -27,6 +31,7 @@ ACCOUNT_DATA_PREFIX = "account_data"
 
 class BaseStorageService(BaseService, ABC):
     _cache: StorageCache
+    _write_buffer: WriteBehindBuffer
     _local_app_package: AppPackage
     _remote_app_package_needs_update: bool = False
 
@@ -34,6 +39,10 @@ class BaseStorageService(BaseService, ABC):
     def local_app_package(self) -> AppPackage:
         return self._local_app_package
 
+    @property
+    def cache(self) -> StorageCache:
+        return self._cache
+
     @property
     def _cache_enabled(self) -> bool:
         return self._config.cache.enabled
@@ -42,10 +51,15 @@ class BaseStorageService(BaseService, ABC):
     def _cache_and_prefetch(self) -> bool:
         return self._config.cache.enabled and self._config.cache.prefetch_templates
 
-    def __init__(self) -> None:
+    @property
+    def _write_behind_enabled(self) -> bool:
+        return self._config.write_behind.enabled
+
+    def __init__(self, config: Optional[StorageConfig] = None) -> None:
         super().__init__()
-        self._config = quiply_settings.services.storage
-        self._cache = StorageCache()
+        self._config = config or quiply_settings.services.storage
+        self._cache = StorageCache(self._config.cache)
+        self._write_buffer = WriteBehindBuffer(self._commit_writes, self._config.write_behind)
         self._local_app_package = self._get_app_package()
         # asyncio.run(self._update_app_package_loop())
 
@@ -87,21 +101,63 @@ class BaseStorageService(BaseService, ABC):
         pass
 
     def _get(self, uid: str, prefix: str, func: Callable[[str], Any], bypass_cache: bool) -> Any:
-        key = f"{prefix}:{uid}"
-        if not bypass_cache and (cached := self._cache.get(key)) is not None:
-            return cached
-        value = func(uid)
-        self._cache.set(key, value)
-        return value
+        return self._get_cached(f"{prefix}:{uid}", lambda: func(uid), bypass_cache)
 
     def _get_instance(self, user_id: str, uid: str, prefix: str, func: Callable[[str, str], Any], bypass_cache: bool) -> Any:
-        key = f"{prefix}:{uid}"
-        if not bypass_cache and (cached := self._cache.get(key)) is not None:
-            return cached
-        value = func(user_id, uid)
-        self._cache.set(key, value)
+        return self._get_cached(f"{prefix}:{uid}", lambda: func(user_id, uid), bypass_cache)
+
+    def fetch_document(self, key: str, func: Callable[[], Any]) -> Any:
+        """Read a document from the backend after committing its buffered writes. The document is not cached."""
+        # Reads from the backend must see the buffered writes of the document
+        if self._write_buffer.has_pending(key):
+            self._write_buffer.flush([key])
+        value = func()
+        if self._write_behind_enabled:
+            self._write_buffer.remember(key, value)
         return value
 
+    def _get_cached(self, key: str, func: Callable[[], Any], bypass_cache: bool) -> Any:
+        def fetch() -> Any:
+            return self.fetch_document(key, func)
+
+        if bypass_cache:
+            value = fetch()
+            self._cache.set(key, value)
+            return value
+        return self._cache.get_or_fetch(key, fetch)
+
+    def _write_document(self, prefix: str, uid: str, document: BaseModel, write: Callable[[Any], Any], create: bool = False) -> None:
+        if self._write_behind_enabled:
+            self._write_buffer.write(f"{prefix}:{uid}", self._get_document_path(prefix, document), document, create)
+        else:
+            write(document)
+
+    @abstractmethod
+    def _get_document_path(self, prefix: str, document: BaseModel) -> str:
+        """The path of a document written through the write-behind buffer, by its cache key prefix."""
+        pass
+
+    @abstractmethod
+    def _commit_writes(self, writes: List[DocumentWrite]) -> None:
+        """Commit buffered document writes together, all of them or none."""
+        pass
+
+    def flush_writes(self, keys: Optional[Iterable[str]] = None) -> None:
+        """Commit the buffered writes of the given cache keys, or all buffered writes."""
+        self._write_buffer.flush(keys)
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        return self._write_buffer.stats()
+
+    def close(self) -> None:
+        self._write_buffer.close()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
     def _get_many(self, prefix: str, func: Callable[[], List[Any]], bypass_cache: bool) -> List[Any]:
         if not bypass_cache and (cached := self._cache.try_get_prefetch(prefix)) is not None:
             return cached
@@ -138,6 +194,10 @@ class BaseStorageService(BaseService, ABC):
     def get_actor_templates(self) -> List[ActorSchema]:
         return self._local_app_package.actors
 
+    def get_actor_templates_by_ids(self, actor_ids: List[str]) -> Dict[str, ActorSchema]:
+        actors = self._local_app_package.get_actors(actor_ids)
+        return {actor_id: actor for actor_id, actor in zip(actor_ids, actors) if actor is not None}
+
     def update_actor_templates(self, actors: List[ActorSchema]) -> None:
         for actor in actors:
             actor.update_timestamp()
@@ -337,6 +397,8 @@ class BaseStorageService(BaseService, ABC):
     def create_scenario_instance(self, scenario_instance: ScenarioInstance) -> ScenarioInstance:
         value = self._create_scenario_instance(scenario_instance)
         self._cache.set(f"{SCENARIO_INSTANCE_PREFIX}:{value.uid}", value)
+        if self._write_behind_enabled:
+            self._write_buffer.remember(f"{SCENARIO_INSTANCE_PREFIX}:{value.uid}", value)
         return value
 
     @abstractmethod
@@ -346,6 +408,7 @@ class BaseStorageService(BaseService, ABC):
     def delete_scenario_instance(self, user_id: str, scenario_instance_id: str) -> None:
         key = f"{SCENARIO_INSTANCE_PREFIX}:{scenario_instance_id}"
         self._cache.delete(key)
+        self._write_buffer.discard(key)
         self._delete_scenario_instance(user_id, scenario_instance_id)
 
     @abstractmethod
@@ -355,7 +418,7 @@ class BaseStorageService(BaseService, ABC):
     def update_scenario_instance(self, scenario_instance: ScenarioInstance) -> None:
         scenario_instance.update_timestamp()
         self._cache.set(f"{SCENARIO_INSTANCE_PREFIX}:{scenario_instance.uid}", scenario_instance)
-        self._update_scenario_instance(scenario_instance)
+        self._write_document(SCENARIO_INSTANCE_PREFIX, scenario_instance.uid, scenario_instance, self._update_scenario_instance)
 
     @abstractmethod
     def _update_scenario_instance(self, scenario_instance: ScenarioInstance) -> None:
@@ -371,9 +434,9 @@ class BaseStorageService(BaseService, ABC):
         pass
 
     def create_scenario_result(self, scenario_result: ScenarioResult) -> ScenarioResult:
-        value = self._create_scenario_result(scenario_result)
-        self._cache.set(f"{SCENARIO_RESULT_PREFIX}:{value.uid}", value)
-        return value
+        self._write_document(SCENARIO_RESULT_PREFIX, scenario_result.uid, scenario_result, self._create_scenario_result, create=True)
+        self._cache.set(f"{SCENARIO_RESULT_PREFIX}:{scenario_result.uid}", scenario_result)
+        return scenario_result
 
     @abstractmethod
     def _create_scenario_result(self, scenario_result: ScenarioResult) -> ScenarioResult:
@@ -382,6 +445,7 @@ class BaseStorageService(BaseService, ABC):
     def delete_scenario_result(self, user_id: str, scenario_result_id: str) -> None:
         key = f"{SCENARIO_RESULT_PREFIX}:{scenario_result_id}"
         self._cache.delete(key)
+        self._write_buffer.discard(key)
         self._delete_scenario_result(user_id, scenario_result_id)
 
     @abstractmethod
@@ -391,17 +455,36 @@ class BaseStorageService(BaseService, ABC):
     def update_scenario_result(self, scenario_result: ScenarioResult) -> None:
         scenario_result.update_timestamp()
         self._cache.set(f"{SCENARIO_RESULT_PREFIX}:{scenario_result.uid}", scenario_result)
-        self._update_scenario_result(scenario_result)
+        self._write_document(SCENARIO_RESULT_PREFIX, scenario_result.uid, scenario_result, self._update_scenario_result)
 
     @abstractmethod
     def _update_scenario_result(self, scenario_result: ScenarioResult) -> None:
         pass
 
+    # ------------------------------------ Derived Content ------------------------------------ #
+
+    def get_derived_content(self, key: str) -> Optional[Dict[str, Any]]:
+        """An entry of the derived content cache shared by every instance, None if there is none."""
+        return self._get_derived_content(key)
+
+    @abstractmethod
+    def _get_derived_content(self, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    def set_derived_content(self, key: str, entry: Dict[str, Any]) -> None:
+        self._set_derived_content(key, entry)
+
+    @abstractmethod
+    def _set_derived_content(self, key: str, entry: Dict[str, Any]) -> None:
+        pass
+
     # ------------------------------------ User Account ------------------------------------ #
 
     def create_account_data(self, account_data: AccountData) -> AccountData:
         value = self._create_account_data(account_data)
         self._cache.set(f"{ACCOUNT_DATA_PREFIX}:{value.id}", value)
+        if self._write_behind_enabled:
+            self._write_buffer.remember(f"{ACCOUNT_DATA_PREFIX}:{value.id}", value)
         return value
 
     @abstractmethod
@@ -418,6 +501,7 @@ class BaseStorageService(BaseService, ABC):
     def delete_account_data(self, user_id: str) -> None:
         key = f"{ACCOUNT_DATA_PREFIX}:{user_id}"
         self._cache.delete(key)
+        self._write_buffer.discard(key)
         self._delete_account_data(user_id)
 
     @abstractmethod
@@ -425,19 +509,28 @@ class BaseStorageService(BaseService, ABC):
         pass
 
     def set_account_data_first_last_name(self, user_id: str, first_name: str, last_name: str) -> None:
+        key = f"{ACCOUNT_DATA_PREFIX}:{user_id}"
+        # The names are updated in place, buffered writes of the document must land first and the cached copy is stale
+        self._write_buffer.flush([key])
         self._set_account_data_first_last_name(user_id, first_name, last_name)
+        self._cache.delete(key)
+        self._write_buffer.discard(key)
 
     @abstractmethod
     def _set_account_data_first_last_name(self, user_id: str, first_name: str, last_name: str) -> None:
         pass
 
     def update_account_data(self, user_id: str, changed_fields: Dict[str, Any]) -> AccountData:
-        account_data = self.get_account_data(user_id, True)
+        cache_key = f"{ACCOUNT_DATA_PREFIX}:{user_id}"
+        # With a write pending, the cached copy is the latest state of the document
+        account_data = self._cache.get(cache_key) if self._write_buffer.has_pending(cache_key) else None
+        if account_data is None:
+            account_data = self.get_account_data(user_id, True)
         for key, value in changed_fields.items():
             if hasattr(account_data, key):
                 setattr(account_data, key, value)
-        self._update_account_data(user_id, account_data)
-        self._cache.set(f"{ACCOUNT_DATA_PREFIX}:{user_id}", account_data)
+        self._write_document(ACCOUNT_DATA_PREFIX, user_id, account_data, lambda document: self._update_account_data(user_id, document))
+        self._cache.set(cache_key, account_data)
         return account_data
 
     @abstractmethod
@@ -462,7 +555,7 @@ class BaseStorageService(BaseService, ABC):
         account_data.profile = user_profile
         account_data.update_timestamp()
         self._cache.set(f"{ACCOUNT_DATA_PREFIX}:{account_data.id}", account_data)
-        self._update_account_data(uid, account_data)
+        self._write_document(ACCOUNT_DATA_PREFIX, uid, account_data, lambda document: self._update_account_data(uid, document))
         return account_data
 
     def upload_user_profile_image(self, user_id: str, mime_type: str, image_content) -> str:
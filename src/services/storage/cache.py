@@ -1,38 +1,116 @@
-import collections
-from typing import Any, Optional, Dict, List
+import asyncio
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
 
-from src.settings import quiply_settings
+from pydantic import BaseModel
 
-Cache = Dict[str, Any]
+from .exceptions import StorageDocumentNotFoundException
+from src.settings.services import CacheConfig
+
+_T = TypeVar('_T')
+
+_MAX_SIZE_DEPTH = 4
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate memory held by a value in bytes, following containers and models a few levels deep."""
+    size = sys.getsizeof(value)
+    if _depth >= _MAX_SIZE_DEPTH:
+        return size
+    if isinstance(value, BaseModel):
+        return size + estimate_size(value.__dict__, _depth + 1)
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+
+def get_namespace(key: str) -> str:
+    return key.split(':', 1)[0]
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'expires_at', 'size', 'missing')
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int, missing: bool = False):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.missing = missing
 
 
 class StorageCache:
-    _cache: Cache
-    _max_size: int
-    _hits: int
-    _misses: int
+    """
+    Least recently used cache of storage documents, keyed ``'{namespace}:{id}'``.
+
+    Entries expire after the TTL of their namespace and are evicted from the least recently used end when either
+    ``max_size`` entries or ``max_bytes`` (an estimate of the cached values) is exceeded. Documents that were not
+    found are remembered as missing for ``negative_ttl`` seconds. Keys are also kept sorted, so that prefix queries
+    only visit matching keys. Concurrent misses on the same key share a single fetch through get_or_fetch. A fetch
+    that a set or delete of its key overtook returns its value without caching it.
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None, clock: Callable[[], float] = time.monotonic):
+        if config is None:
+            from src.settings import quiply_settings
+            config = quiply_settings.services.storage.cache
+        self._config = config
+        self._clock = clock
+        self._max_size = max(1, config.max_size)
+        self._max_bytes = config.max_bytes
+
+        self._cache: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._sorted_keys: List[str] = []
+        self._bytes = 0
+        self._lock = threading.RLock()
 
-    def __init__(self):
-        self._config = quiply_settings.services.storage.cache
-        self._cache: Cache = collections.OrderedDict()
-        self._max_size = self._config.max_size
-        self._hits = self._misses = 0
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_async: Dict[str, asyncio.Future] = {}
+        # Bumped by every write of a key while it is fetched, only kept while the key has a fetch in flight
+        self._generations: Dict[str, int] = {}
+
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ('hits', 'misses', 'negative_hits', 'evictions', 'expirations', 'fetches', 'coalesced'), 0)
+        self._namespace_counters: Dict[str, Dict[str, int]] = {}
+
+    # ------------------------------------ Lookups ------------------------------------ #
 
     def has(self, key: str) -> bool:
         if not self._config.enabled:
             return False
-        return key in self._cache
+        with self._lock:
+            entry = self._get_entry(key)
+            return entry is not None and not entry.missing
 
     def get(self, key: str) -> Optional[Any]:
+        """Return the cached value of a key, or None when it is not cached or cached as missing."""
         if not self._config.enabled:
             return None
-        try:
-            value = self._cache.get(key)
-            self._hits += 1
-            return value
-        except KeyError:
-            self._misses += 1
-            return None
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                self._count(key, 'misses')
+                return None
+            if entry.missing:
+                self._count(key, 'negative_hits')
+                return None
+            self._count(key, 'hits')
+            self._cache.move_to_end(key)
+            return entry.value
+
+    def is_missing(self, key: str) -> bool:
+        """Whether a key is cached as not found."""
+        if not self._config.enabled:
+            return False
+        with self._lock:
+            entry = self._get_entry(key)
+            return entry is not None and entry.missing
 
     def try_get_prefetch(self, prefix: str) -> Optional[List[Any]]:
         if not self._config.enabled or not self._config.prefetch_templates:
@@ -42,27 +120,41 @@ class StorageCache:
     def get_all_with_prefix(self, prefix: str) -> Optional[List[Any]]:
         if not self._config.enabled:
             return None
-        values = []
-        for key in self._cache.keys():
-            if key.startswith(prefix):
-                value = self._cache.get(key)
-                self._cache[key] = value
-                self._hits += 1
-                values.append(value)
-        if len(values) > 0:
-            return values
-        self._misses += 1
-        return None
+        with self._lock:
+            keys = []
+            index = bisect_left(self._sorted_keys, prefix)
+            while index < len(self._sorted_keys) and self._sorted_keys[index].startswith(prefix):
+                keys.append(self._sorted_keys[index])
+                index += 1
+
+            values = []
+            for key in keys:
+                entry = self._get_entry(key)
+                if entry is None or entry.missing:
+                    continue
+                self._cache.move_to_end(key)
+                values.append(entry.value)
+
+            if values:
+                self._count(prefix, 'hits')
+                return values
+            self._count(prefix, 'misses')
+            return None
+
+    def _get_entry(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._cache.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= self._clock():
+            self._remove(key)
+            self._counters['expirations'] += 1
+            return None
+        return entry
+
+    # ------------------------------------ Updates ------------------------------------ #
 
     def set(self, key: str, value: Any) -> None:
         if not self._config.enabled:
             return
-        if key in self._cache:
-            del self._cache[key]
-        elif len(self._cache) >= self._max_size:
-            first_key = next(iter(self._cache))
-            self._cache.pop(first_key)
-        self._cache[key] = value
+        self._set_entry(key, _CacheEntry(value, self._expires_at(key), estimate_size(value)))
 
     def set_many(self, items: Dict[str, Any]) -> None:
         if not self._config.enabled:
@@ -70,16 +162,203 @@ class StorageCache:
         for key, value in items.items():
             self.set(key, value)
 
+    def set_missing(self, key: str) -> None:
+        """Remember that the document of a key does not exist, for negative_ttl seconds."""
+        if not self._config.enabled or self._config.negative_ttl <= 0:
+            return
+        self._set_entry(key, _CacheEntry(None, self._clock() + self._config.negative_ttl, 0, missing=True))
+
     def delete(self, key: str) -> None:
         if not self._config.enabled:
             return
-        if key in self._cache:
-            del self._cache[key]
-
-    def stats(self) -> Dict[str, int]:
-        return {
-            'size': len(self._cache),
-            'max_size': self._max_size,
-            'hits': self._hits,
-            'misses': self._misses,
-        }
+        with self._lock:
+            self._bump_generation(key)
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in self._generations:
+                self._generations[key] += 1
+            self._cache.clear()
+            self._sorted_keys.clear()
+            self._bytes = 0
+
+    def _expires_at(self, key: str) -> Optional[float]:
+        ttl = self._config.ttl.get(get_namespace(key), self._config.default_ttl)
+        return None if ttl is None else self._clock() + ttl
+
+    def _set_entry(self, key: str, entry: _CacheEntry) -> None:
+        with self._lock:
+            self._bump_generation(key)
+            previous = self._cache.pop(key, None)
+            if previous is None:
+                insort(self._sorted_keys, key)
+            else:
+                self._bytes -= previous.size
+            self._cache[key] = entry
+            self._bytes += entry.size
+
+            while len(self._cache) > self._max_size or (self._bytes > self._max_bytes and len(self._cache) > 1):
+                oldest = next(iter(self._cache))
+                self._remove(oldest)
+                self._counters['evictions'] += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        index = bisect_left(self._sorted_keys, key)
+        if index < len(self._sorted_keys) and self._sorted_keys[index] == key:
+            del self._sorted_keys[index]
+
+    def _bump_generation(self, key: str) -> None:
+        if key in self._inflight or key in self._inflight_async:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    # ------------------------------------ Fetching ------------------------------------ #
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], _T]) -> _T:
+        """
+        Return the cached value of a key, or fetch and cache it. Concurrent misses on the same key wait for the first
+        fetch instead of fetching again. A fetch raising StorageDocumentNotFoundException caches the key as missing,
+        later calls raise again without fetching until negative_ttl has passed.
+        """
+        if not self._config.enabled:
+            return fetch()
+
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is not None:
+                return self._resolve_hit(key, entry)
+            self._count(key, 'misses')
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                generation = self._generations.get(key, 0)
+            else:
+                self._counters['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            value = self._fetch(key, fetch, generation)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._end_fetch(key)
+
+    async def get_or_fetch_async(self, key: str, fetch: Callable[[], Awaitable[_T]]) -> _T:
+        """Async version of get_or_fetch, concurrent misses on the same key in the event loop share one fetch."""
+        if not self._config.enabled:
+            return await fetch()
+
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is not None:
+                return self._resolve_hit(key, entry)
+            self._count(key, 'misses')
+
+        future = self._inflight_async.get(key)
+        if future is not None:
+            self._counters['coalesced'] += 1
+            return await asyncio.shield(future)
+
+        with self._lock:
+            future = self._inflight_async[key] = asyncio.get_running_loop().create_future()
+            generation = self._generations.get(key, 0)
+        try:
+            self._counters['fetches'] += 1
+            value = await fetch()
+        except StorageDocumentNotFoundException as e:
+            self._store_fetched(key, generation, missing=True)
+            future.set_exception(e)
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._store_fetched(key, generation, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight_async.pop(key, None)
+                self._end_fetch(key)
+            # Nobody may be waiting for it, retrieve the exception so that it is not reported as never retrieved
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    def _resolve_hit(self, key: str, entry: _CacheEntry) -> Any:
+        if entry.missing:
+            self._count(key, 'negative_hits')
+            raise StorageDocumentNotFoundException(key)
+        self._count(key, 'hits')
+        self._cache.move_to_end(key)
+        return entry.value
+
+    def _fetch(self, key: str, fetch: Callable[[], _T], generation: int) -> _T:
+        self._counters['fetches'] += 1
+        try:
+            value = fetch()
+        except StorageDocumentNotFoundException:
+            self._store_fetched(key, generation, missing=True)
+            raise
+        self._store_fetched(key, generation, value)
+        return value
+
+    def _store_fetched(self, key: str, generation: int, value: Any = None, missing: bool = False) -> None:
+        """Cache a fetched value unless the key was written since the fetch started, the write is newer."""
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return
+            if missing:
+                self.set_missing(key)
+            else:
+                self.set(key, value)
+
+    def _end_fetch(self, key: str) -> None:
+        if key not in self._inflight and key not in self._inflight_async:
+            self._generations.pop(key, None)
+
+    # ------------------------------------ Statistics ------------------------------------ #
+
+    def _count(self, key: str, counter: str) -> None:
+        self._counters[counter] += 1
+        namespace_counters = self._namespace_counters.get(namespace := get_namespace(key))
+        if namespace_counters is None:
+            namespace_counters = self._namespace_counters[namespace] = {'hits': 0, 'misses': 0, 'negative_hits': 0}
+        namespace_counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces: Dict[str, Dict[str, int]] = {
+                namespace: {'entries': 0, **counters} for namespace, counters in self._namespace_counters.items()
+            }
+            for key in self._cache:
+                namespace = namespaces.setdefault(get_namespace(key), {'entries': 0, 'hits': 0, 'misses': 0, 'negative_hits': 0})
+                namespace['entries'] += 1
+
+            lookups = self._counters['hits'] + self._counters['misses'] + self._counters['negative_hits']
+            return {
+                'enabled': self._config.enabled,
+                'size': len(self._cache),
+                'max_size': self._max_size,
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                **self._counters,
+                'hit_rate': round((lookups - self._counters['misses']) / lookups, 4) if lookups else 0.0,
+                'inflight': len(self._inflight) + len(self._inflight_async),
+                'namespaces': namespaces,
+            }
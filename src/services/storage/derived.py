@@ -0,0 +1,210 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, TypeVar
+
+from pydantic_core import to_jsonable_python
+
+from src.framework.utils.lru_cache import LRUCache
+from src.settings.services import DerivedContentConfig
+from src.utils import loggers, get_project_path_str
+
+_T = TypeVar('_T')
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class DerivedContentCache:
+    """
+    Content generated from app package data that is the same for every session, like actor personality summaries and
+    scenario stages, keyed by a hash of everything it was generated from: the definitions, the prompt template and
+    the model.
+
+    Entries are kept in memory, in JSON files under ``directory`` and, with a remote storage, in the storage provider
+    where every instance finds them. Keys include the app package version, so a new package never matches the entries
+    of the previous one. Local entries of other versions are deleted when the cache is first used with a version.
+    Concurrent misses of the same key share one generation.
+    """
+
+    def __init__(
+            self,
+            version: Callable[[], int],
+            config: Optional[DerivedContentConfig] = None,
+            remote: Optional[Any] = None,
+    ):
+        if config is None:
+            from src.settings import quiply_settings
+            config = quiply_settings.services.storage.derived
+        self._config = config
+        self._version = version
+        self._remote = remote if config.remote else None
+        self._directory = Path(get_project_path_str()) / config.directory if config.directory else None
+
+        self._memory: LRUCache[str, Any] = LRUCache(config.max_memory_entries)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._uploads: Set[asyncio.Task] = set()
+        self._pruned_version: Optional[int] = None
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ('memory_hits', 'local_hits', 'remote_hits', 'generations', 'coalesced', 'errors'), 0)
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def key(self, kind: str, parts: Iterable[Any]) -> str:
+        data = json.dumps([self._version(), kind, list(parts)], default=to_jsonable_python, sort_keys=True)
+        return f'{kind}-{hashlib.sha256(data.encode()).hexdigest()}'
+
+    async def get_or_create(
+            self,
+            kind: str,
+            parts: Iterable[Any],
+            create: Callable[[], Awaitable[_T]],
+            dump: Callable[[_T], Any] = _identity,
+            load: Callable[[Any], _T] = _identity,
+    ) -> _T:
+        """
+        The content of ``kind`` generated from ``parts``, created and stored when there is none. ``dump`` turns the
+        content into JSON data, ``load`` turns that data back into content.
+        """
+        if not self.enabled:
+            return await create()
+
+        key = self.key(kind, parts)
+        data = self._memory.get(key)
+        if data is not None:
+            self._counters['memory_hits'] += 1
+            return load(data)
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self._counters['coalesced'] += 1
+            return load(await asyncio.shield(pending))
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            data = await self._find(key)
+            if data is None:
+                self._counters['generations'] += 1
+                content = await create()
+                data = to_jsonable_python(dump(content))
+                await self._store(key, data)
+            self._memory.set(key, data)
+            future.set_result(data)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here when nobody else waits for it
+            raise
+        finally:
+            del self._pending[key]
+        return load(data)
+
+    async def _find(self, key: str) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        if self._directory is not None:
+            data = await loop.run_in_executor(None, self._read, key)
+            if data is not None:
+                self._counters['local_hits'] += 1
+                return data
+
+        if self._remote is not None:
+            try:
+                entry = await self._remote.get_derived_content(key)
+            except Exception as e:
+                self._counters['errors'] += 1
+                loggers.storage.warning(f'Unable to read derived content {key}: {e}')
+                entry = None
+            if entry is not None:
+                self._counters['remote_hits'] += 1
+                if self._directory is not None:
+                    await loop.run_in_executor(None, self._write, key, entry['data'])
+                return entry['data']
+        return None
+
+    async def _store(self, key: str, data: Any) -> None:
+        if self._directory is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, key, data)
+        if self._remote is not None:
+            # Nobody waits for the upload, the content is already usable
+            task = asyncio.create_task(self._upload(key, data))
+            self._uploads.add(task)
+            task.add_done_callback(self._uploads.discard)
+
+    async def _upload(self, key: str, data: Any) -> None:
+        try:
+            await self._remote.set_derived_content(key, {'version': self._version(), 'data': data})
+        except Exception as e:
+            self._counters['errors'] += 1
+            loggers.storage.warning(f'Unable to write derived content {key}: {e}')
+
+    async def flush(self) -> None:
+        """Wait for the uploads to the storage provider that are under way."""
+        while self._uploads:
+            await asyncio.gather(*self._uploads, return_exceptions=True)
+
+    # ------------------------------------ Local files ------------------------------------ #
+
+    def _version_directory(self) -> Path:
+        version = self._version()
+        if self._pruned_version != version:
+            self._pruned_version = version
+            self._prune_versions(version)
+        return self._directory / f'v{version}'
+
+    def _prune_versions(self, version: int) -> None:
+        if not self._directory.exists():
+            return
+        for path in self._directory.iterdir():
+            if path.is_dir() and path.name != f'v{version}':
+                loggers.storage.info(f'Deleting derived content of app package {path.name}')
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _path(self, key: str) -> Path:
+        kind = key.rsplit('-', 1)[0]
+        return self._version_directory() / kind / f'{key}.json'
+
+    def _read(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self._counters['errors'] += 1
+            loggers.storage.warning(f'Unreadable derived content {path}: {e}')
+            return None
+
+    def _write(self, key: str, data: Any) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(temporary, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(temporary, path)
+        except OSError as e:
+            self._counters['errors'] += 1
+            loggers.storage.warning(f'Unable to write derived content {path}: {e}')
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+        self._pruned_version = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            'memory_entries': len(self._memory),
+            'version': self._version(),
+        }
@@ -0,0 +1,22 @@
+class StorageException(Exception):
+    """Base class for storage service exceptions."""
+
+
+class StorageDocumentNotFoundException(StorageException):
+    """Raised when a requested document does not exist in storage."""
+    path: str
+
+    def __init__(self, path: str, message: str = None):
+        super().__init__(message or f"Document '{path}' not found")
+        self.path = path
+
+
+class StorageTimeoutException(StorageException):
+    """Raised when a storage operation does not complete within its timeout."""
+    operation: str
+    timeout: float
+
+    def __init__(self, operation: str, timeout: float, message: str = None):
+        super().__init__(message or f"Storage operation '{operation}' timed out after {timeout}s")
+        self.operation = operation
+        self.timeout = timeout
@@ -1,10 +1,11 @@
 import mimetypes
 import time
 from datetime import datetime
-from typing import Literal, TypeVar, Type, Dict, Optional
+from typing import Any, Literal, TypeVar, Type, Dict, List, Optional
 from uuid import uuid4
 
 from devtools import debug
+from google.cloud.firestore_v1.field_path import FieldPath
 from pydantic import BaseModel
 
 from src.models.app_package import AppPackageData
@@ -19,8 +20,15 @@ from src.models import (
     ContextReference,
     AccountData,
 )
+from ..exceptions import StorageDocumentNotFoundException
 from src.utils.logging import loggers
-from ..base_service import BaseStorageService
+from ..base_service import (
+    BaseStorageService,
+    SCENARIO_INSTANCE_PREFIX,
+    SCENARIO_RESULT_PREFIX,
+    ACCOUNT_DATA_PREFIX,
+)
+from ..write_behind import DocumentWrite
 
 import os
 
@@ -45,6 +53,8 @@ APP_PACKAGE_COLLECTION = "appPackage"
 APP_PACKAGE_VERSION_DOCUMENT_PATH = APP_PACKAGE_COLLECTION + "/version"
 APP_PACKAGE_DATA_DOCUMENT_PATH = APP_PACKAGE_COLLECTION + "/data"
 
+DERIVED_CONTENT_DOCUMENT_PATH = "derivedContent/{key}"
+
 ACTOR_TEMPLATES_COLLECTION = "actorTemplates"
 ADVISOR_TEMPLATES_COLLECTION = "advisorTemplates"
 SCENARIO_TEMPLATES_COLLECTION = "scenarioTemplates"
@@ -198,11 +208,8 @@ class FirestoreStorageService(BaseStorageService):
     def _create_doc(self, path: str, data: _T) -> _T:
         try:
             doc_ref = self.db.document(path)
-            # debug(data)
-            data_dict = data.model_dump()
-            debug(data_dict)
-            doc_ref.set(data_dict)
-            loggers.storage.info(f"Created {path}: {data}")
+            doc_ref.set(data.model_dump())
+            loggers.storage.info(f"Created {path}")
             return data
         except Exception as e:
             loggers.storage.exception(e)
@@ -211,7 +218,11 @@ class FirestoreStorageService(BaseStorageService):
     def _get_doc(self, path: str, model: Type[_T]) -> _T:
         try:
             doc = self.db.document(path).get()
+            if not doc.exists:
+                raise StorageDocumentNotFoundException(path)
             return model.model_validate(doc.to_dict())
+        except StorageDocumentNotFoundException:
+            raise
         except Exception as e:
             loggers.storage.exception(e)
             raise e
@@ -227,11 +238,35 @@ class FirestoreStorageService(BaseStorageService):
 
     def _update_doc(self, path: str, data: _T) -> None:
         try:
-            debug(data)
             doc_ref = self.db.document(path)
-            data_dict = data.model_dump()
-            debug(data_dict)
-            doc_ref.set(data_dict)
+            doc_ref.set(data.model_dump())
+        except Exception as e:
+            loggers.storage.exception(e)
+            raise e
+
+    def _get_document_path(self, prefix: str, document: BaseModel) -> str:
+        if prefix == SCENARIO_INSTANCE_PREFIX:
+            return SCENARIO_INSTANCE_COLLECTION_PATH.format(user_id=document.user_id, scenario_instance_id=document.uid)
+        if prefix == SCENARIO_RESULT_PREFIX:
+            return SCENARIO_RESULT_COLLECTION_PATH.format(
+                user_id=document.scenario_instance.user_id, scenario_result_id=document.uid)
+        if prefix == ACCOUNT_DATA_PREFIX:
+            return ACCOUNT_DATA_DOCUMENT_PATH.format(user_id=document.id)
+        raise ValueError(f"No document path for prefix {prefix}")
+
+    def _commit_writes(self, writes: List[DocumentWrite]) -> None:
+        try:
+            batch = self.db.batch()
+            for write in writes:
+                doc_ref = self.db.document(write.path)
+                if write.updates is None:
+                    batch.set(doc_ref, write.data)
+                else:
+                    batch.update(doc_ref, {
+                        FieldPath(*field_path).to_api_repr(): value for field_path, value in write.updates.items()
+                    })
+            batch.commit()
+            loggers.storage.debug(f"Committed {len(writes)} buffered writes")
         except Exception as e:
             loggers.storage.exception(e)
             raise e
@@ -577,6 +612,23 @@ class FirestoreStorageService(BaseStorageService):
             )
         )
 
+    # ------------------------------------ Derived Content ------------------------------------ #
+
+    def _get_derived_content(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            doc = self.db.document(DERIVED_CONTENT_DOCUMENT_PATH.format(key=key)).get()
+            return doc.to_dict() if doc.exists else None
+        except Exception as e:
+            loggers.storage.exception(e)
+            raise e
+
+    def _set_derived_content(self, key: str, entry: Dict[str, Any]) -> None:
+        try:
+            self.db.document(DERIVED_CONTENT_DOCUMENT_PATH.format(key=key)).set(entry)
+        except Exception as e:
+            loggers.storage.exception(e)
+            raise e
+
     # ------------------------------------ User Account ------------------------------------ #
 
     def _create_account_data(self, account_data: AccountData) -> AccountData:
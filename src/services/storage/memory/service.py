@@ -0,0 +1,375 @@
+import copy
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Literal, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from src.models import (
+    ScenarioInstance,
+    ScenarioConfig,
+    ScenarioResult,
+    ContextReference,
+    AccountData,
+)
+from src.models.app_package import AppPackage, AppPackageData
+from ..base_service import (
+    BaseStorageService,
+    SCENARIO_INSTANCE_PREFIX,
+    SCENARIO_RESULT_PREFIX,
+    ACCOUNT_DATA_PREFIX,
+)
+from ..exceptions import StorageDocumentNotFoundException
+from ..write_behind import DocumentWrite
+from src.settings.services import StorageConfig
+
+USERS_COLLECTION = "users"
+SCENARIO_INSTANCE_PATH = USERS_COLLECTION + "/{user_id}/scenarioInstances/{scenario_instance_id}"
+SCENARIO_RESULT_PATH = USERS_COLLECTION + "/{user_id}/scenarioResults/{scenario_result_id}"
+SCENARIO_CONFIG_PATH = USERS_COLLECTION + "/{user_id}/scenarioConfigs/{config_name}"
+CONTEXT_REFERENCE_PATH = USERS_COLLECTION + "/{user_id}/contextReferences/{context_reference_uid}"
+ACCOUNT_DATA_PATH = USERS_COLLECTION + "/{user_id}"
+DERIVED_CONTENT_PATH = "derivedContent/{key}"
+
+ACTOR_TEMPLATES_COLLECTION = "actorTemplates"
+ADVISOR_TEMPLATES_COLLECTION = "advisorTemplates"
+SCENARIO_TEMPLATES_COLLECTION = "scenarioTemplates"
+
+MEDIA_URL_PREFIX = "memory://"
+
+_T = TypeVar("_T", bound=BaseModel)
+
+
+class MemoryStorageService(BaseStorageService):
+    """
+    Storage kept in process, laid out like the Firestore documents. Used as a stand-in for Firestore in tests,
+    benchmarks and local development.
+
+    Documents are stored as JSON data and validated again when read, so callers get copies like they would from
+    Firestore. With a directory, documents are also written there as JSON files and read back by later processes.
+    ``latency`` seconds are slept in every document and media operation, to stand in for the network round trip, and
+    ``stats`` counts the backend round trips, the document writes and the bytes they would send.
+    """
+
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            *,
+            latency: float = 0.0,
+            app_package: Optional[AppPackageData] = None,
+            config: Optional[StorageConfig] = None,
+    ):
+        self.directory = directory
+        self.latency = latency
+        self._app_package_data = app_package
+        self._documents: Dict[str, dict] = {}
+        self._media: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = dict.fromkeys(('round_trips', 'reads', 'writes', 'commits', 'bytes_written'), 0)
+        super().__init__(config)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def _get_app_package(self) -> AppPackage | None:
+        if self._app_package_data is not None:
+            return AppPackage(self._app_package_data)
+        return AppPackage.from_local() or AppPackage(AppPackageData(version=0))
+
+    def _fetch_remote_app_package_version(self) -> int:
+        return self._local_app_package.version
+
+    def _fetch_remote_app_package_data(self) -> AppPackageData | None:
+        return self._local_app_package.data
+
+    def _update_remote_app_package(self) -> None:
+        pass
+
+    # ------------------------------------ Documents ------------------------------------ #
+
+    def _file_path(self, path: str) -> str:
+        return os.path.join(self.directory, *path.split('/')) + '.json'
+
+    def _read(self, path: str) -> Optional[dict]:
+        with self._lock:
+            self._counters['reads'] += 1
+            data = self._documents.get(path)
+        if data is None and self.directory is not None:
+            try:
+                with open(self._file_path(path), 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+            except FileNotFoundError:
+                return None
+            with self._lock:
+                self._documents[path] = data
+        return data
+
+    def _write(self, path: str, data: dict, sent: Any = None) -> None:
+        """Store a document, ``sent`` is what a backend would have been sent for it, by default the document."""
+        size = len(json.dumps(data if sent is None else sent))
+        with self._lock:
+            self._documents[path] = data
+            self._counters['writes'] += 1
+            self._counters['bytes_written'] += size
+        if self.directory is not None:
+            file_path = self._file_path(path)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+
+    def _remove(self, path: str) -> None:
+        with self._lock:
+            self._documents.pop(path, None)
+        if self.directory is not None:
+            try:
+                os.remove(self._file_path(path))
+            except FileNotFoundError:
+                pass
+
+    def _wait(self) -> None:
+        with self._lock:
+            self._counters['round_trips'] += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _create_doc(self, path: str, data: _T) -> _T:
+        self._wait()
+        self._write(path, data.model_dump(mode='json'))
+        return data
+
+    def _get_doc(self, path: str, model: Type[_T]) -> _T:
+        self._wait()
+        data = self._read(path)
+        if data is None:
+            raise StorageDocumentNotFoundException(path)
+        return model.model_validate(data)
+
+    def _delete_doc(self, path: str) -> None:
+        self._wait()
+        self._remove(path)
+
+    def _update_doc(self, path: str, data: _T) -> None:
+        self._wait()
+        self._write(path, data.model_dump(mode='json'))
+
+    def _get_document_path(self, prefix: str, document: BaseModel) -> str:
+        if prefix == SCENARIO_INSTANCE_PREFIX:
+            return SCENARIO_INSTANCE_PATH.format(user_id=document.user_id, scenario_instance_id=document.uid)
+        if prefix == SCENARIO_RESULT_PREFIX:
+            return SCENARIO_RESULT_PATH.format(user_id=document.scenario_instance.user_id, scenario_result_id=document.uid)
+        if prefix == ACCOUNT_DATA_PREFIX:
+            return ACCOUNT_DATA_PATH.format(user_id=document.id)
+        raise ValueError(f"No document path for prefix {prefix}")
+
+    def _commit_writes(self, writes: List[DocumentWrite]) -> None:
+        self._wait()
+        documents = {}
+        # Like a batch, nothing is written when one of the updated documents does not exist
+        for write in writes:
+            if write.updates is None:
+                documents[write.path] = (to_jsonable_python(write.data), None)
+                continue
+            data = documents[write.path][0] if write.path in documents else self._read(write.path)
+            if data is None:
+                raise StorageDocumentNotFoundException(write.path)
+            data = copy.deepcopy(data)
+            updates = {'.'.join(field_path): to_jsonable_python(value) for field_path, value in write.updates.items()}
+            for field_path, value in write.updates.items():
+                node = data
+                for part in field_path[:-1]:
+                    node = node.setdefault(part, {})
+                node[field_path[-1]] = updates['.'.join(field_path)]
+            documents[write.path] = (data, updates)
+
+        for path, (data, updates) in documents.items():
+            self._write(path, data, updates)
+        with self._lock:
+            self._counters['commits'] += 1
+
+    # ------------------------------------ Media ------------------------------------ #
+
+    def delete_media(
+            self,
+            path: str,
+            media_type: Optional[str] = None,
+            *,
+            metadata_selectors: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self._wait()
+        prefix = f"{path}/{media_type}/" if media_type else f"{path}/"
+        with self._lock:
+            for media_path in [media_path for media_path in self._media if media_path.startswith(prefix)]:
+                del self._media[media_path]
+
+    def upload_media(
+            self,
+            path: str,
+            file_name: str,
+            content_type: str,
+            media_type: Optional[str],
+            media_content
+    ) -> str:
+        extension = file_name.split(".")[-1]
+        if media_type:
+            path += f"/{media_type}"
+        return self._put_media(f"{path}/{time.time_ns()}.{extension}", media_content)
+
+    def _put_media(self, path: str, content) -> str:
+        self._wait()
+        with self._lock:
+            self._media[path] = content.encode('utf-8') if isinstance(content, str) else bytes(content)
+        return MEDIA_URL_PREFIX + path
+
+    def get_media(self, url: str) -> Optional[bytes]:
+        with self._lock:
+            return self._media.get(url.removeprefix(MEDIA_URL_PREFIX))
+
+    def _replace_media(self, prefix: str, path: str, content) -> str:
+        self.delete_media(prefix)
+        return self._put_media(f"{prefix}/{path}", content)
+
+    # ------------------------------------ Templates ------------------------------------ #
+
+    def _upload_actor_template_image(self, actor_id: str, content_type: str, image_content) -> str:
+        return self._replace_media(f"{ACTOR_TEMPLATES_COLLECTION}/{actor_id}/images", f"{time.time_ns()}", image_content)
+
+    def _upload_actor_template_video(self, actor_id: str, content_type: str, video_type: str, video_content) -> str:
+        return self._put_media(f"{ACTOR_TEMPLATES_COLLECTION}/{actor_id}/videos/{video_type}-{time.time_ns()}.mp4", video_content)
+
+    def _upload_advisor_template_image(self, advisor_id: str, content_type: str, image_content) -> str:
+        return self._replace_media(f"{ADVISOR_TEMPLATES_COLLECTION}/{advisor_id}/images", f"{time.time_ns()}", image_content)
+
+    def _upload_advisor_template_video(self, advisor_id: str, content_type: str, video_type: str, video_content) -> str:
+        return self._put_media(f"{ADVISOR_TEMPLATES_COLLECTION}/{advisor_id}/videos/{video_type}-{time.time_ns()}.mp4", video_content)
+
+    def _upload_scenario_template_image(self, scenario_id: str, content_type: str, image_content) -> str:
+        return self._replace_media(f"{SCENARIO_TEMPLATES_COLLECTION}/{scenario_id}/images", f"{time.time_ns()}", image_content)
+
+    def _upload_scenario_template_video(self, scenario_id: str, content_type: str, video_type: str, video_content) -> str:
+        return self._put_media(f"{SCENARIO_TEMPLATES_COLLECTION}/{scenario_id}/videos/{video_type}-{time.time_ns()}.mp4", video_content)
+
+    # ------------------------------------ Scenario Instance ------------------------------------ #
+
+    def _get_scenario_instance(self, user_id: str, scenario_instance_id: str) -> ScenarioInstance:
+        return self._get_doc(
+            SCENARIO_INSTANCE_PATH.format(user_id=user_id, scenario_instance_id=scenario_instance_id), ScenarioInstance)
+
+    def _create_scenario_instance(self, scenario_instance: ScenarioInstance) -> ScenarioInstance:
+        return self._create_doc(SCENARIO_INSTANCE_PATH.format(
+            user_id=scenario_instance.account_data.id, scenario_instance_id=scenario_instance.uid), scenario_instance)
+
+    def _delete_scenario_instance(self, user_id: str, scenario_instance_id: str) -> None:
+        self._delete_doc(SCENARIO_INSTANCE_PATH.format(user_id=user_id, scenario_instance_id=scenario_instance_id))
+
+    def _update_scenario_instance(self, scenario_instance: ScenarioInstance) -> None:
+        self._update_doc(SCENARIO_INSTANCE_PATH.format(
+            user_id=scenario_instance.user_id, scenario_instance_id=scenario_instance.uid), scenario_instance)
+
+    # ------------------------------------ Scenario Result ------------------------------------ #
+
+    def _get_scenario_result(self, user_id: str, scenario_result_id: str) -> ScenarioResult:
+        return self._get_doc(
+            SCENARIO_RESULT_PATH.format(user_id=user_id, scenario_result_id=scenario_result_id), ScenarioResult)
+
+    def _create_scenario_result(self, scenario_result: ScenarioResult) -> ScenarioResult:
+        return self._create_doc(SCENARIO_RESULT_PATH.format(
+            user_id=scenario_result.scenario_instance.user_id, scenario_result_id=scenario_result.uid), scenario_result)
+
+    def _delete_scenario_result(self, user_id: str, scenario_result_id: str) -> None:
+        self._delete_doc(SCENARIO_RESULT_PATH.format(user_id=user_id, scenario_result_id=scenario_result_id))
+
+    def _update_scenario_result(self, scenario_result: ScenarioResult) -> None:
+        self._update_doc(SCENARIO_RESULT_PATH.format(
+            user_id=scenario_result.scenario_instance.user_id, scenario_result_id=scenario_result.uid), scenario_result)
+
+    # ------------------------------------ Scenario Config ------------------------------------ #
+
+    def _save_scenario_config(self, scenario_config: ScenarioConfig) -> None:
+        self._update_doc(SCENARIO_CONFIG_PATH.format(
+            user_id=scenario_config.user_id, config_name=scenario_config.name), scenario_config)
+
+    def _delete_scenario_config(self, user_id: str, config_name: str) -> None:
+        self._delete_doc(SCENARIO_CONFIG_PATH.format(user_id=user_id, config_name=config_name))
+
+    # ------------------------------------ Context Reference ------------------------------------ #
+
+    def _add_context_reference(
+            self,
+            user_id: str,
+            context_schema_uid: str,
+            name: str,
+            scenario_schema_id: str | None,
+            reference_type: Literal['string', 'file'],
+            content_type: str,
+            value: bytes | str,
+    ) -> ContextReference:
+        context_reference = ContextReference(
+            user_id=user_id,
+            context_template_uid=context_schema_uid,
+            name=name,
+            scenario_schema_id=scenario_schema_id,
+            reference_type=reference_type,
+            value="",
+        )
+        path = CONTEXT_REFERENCE_PATH.format(user_id=user_id, context_reference_uid=context_reference.uid)
+        context_reference.value = self._put_media(path, value) if reference_type == 'file' else value
+        return self._create_doc(path, context_reference)
+
+    def _get_context_reference(self, user_id: str, context_reference_uid: str) -> ContextReference:
+        return self._get_doc(
+            CONTEXT_REFERENCE_PATH.format(user_id=user_id, context_reference_uid=context_reference_uid), ContextReference)
+
+    def _delete_context_reference(self, user_id: str, context_reference_uid: str) -> None:
+        path = CONTEXT_REFERENCE_PATH.format(user_id=user_id, context_reference_uid=context_reference_uid)
+        with self._lock:
+            self._media.pop(path, None)
+        self._delete_doc(path)
+
+    # ------------------------------------ Derived Content ------------------------------------ #
+
+    def _get_derived_content(self, key: str) -> Optional[Dict[str, Any]]:
+        self._wait()
+        return self._read(DERIVED_CONTENT_PATH.format(key=key))
+
+    def _set_derived_content(self, key: str, entry: Dict[str, Any]) -> None:
+        self._wait()
+        self._write(DERIVED_CONTENT_PATH.format(key=key), to_jsonable_python(entry))
+
+    # ------------------------------------ User Account ------------------------------------ #
+
+    def _create_account_data(self, account_data: AccountData) -> AccountData:
+        return self._create_doc(ACCOUNT_DATA_PATH.format(user_id=account_data.id), account_data)
+
+    def _get_account_data(self, user_id: str) -> AccountData:
+        return self._get_doc(ACCOUNT_DATA_PATH.format(user_id=user_id), AccountData)
+
+    def _delete_account_data(self, user_id: str) -> None:
+        self._delete_doc(ACCOUNT_DATA_PATH.format(user_id=user_id))
+
+    def _update_account_data(self, user_id: str, account_data: AccountData) -> AccountData:
+        self._update_doc(ACCOUNT_DATA_PATH.format(user_id=user_id), account_data)
+        return account_data
+
+    def _set_account_data_first_last_name(self, user_id: str, first_name: str, last_name: str) -> None:
+        path = ACCOUNT_DATA_PATH.format(user_id=user_id)
+        self._wait()
+        data = self._read(path)
+        if data is None:
+            raise StorageDocumentNotFoundException(path)
+        data = dict(data)
+        if first_name is not None:
+            data["first_name"] = first_name
+        if last_name is not None:
+            data["last_name"] = last_name
+        self._write(path, data)
+
+    def _upload_account_data_image(self, user_id: str, mime_type: str, image_content) -> str:
+        return self._replace_media(f"{USERS_COLLECTION}/{user_id}/images", f"{time.time_ns()}", image_content)
+
+    # ------------------------------------ User Profile ------------------------------------ #
+
+    def _upload_user_profile_image(self, user_id: str, content_type: str, image_content) -> str:
+        return self._replace_media(f"{USERS_COLLECTION}/{user_id}/images", f"{time.time_ns()}", image_content)
@@ -0,0 +1,262 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.framework.utils.lru_cache import LRUCache
+from src.settings.services import WriteBehindConfig
+from src.utils.logging import loggers
+
+FieldPath = Tuple[str, ...]
+
+
+class DocumentWrite:
+    """A write of one document: either the full ``data`` of the document, or ``updates`` of some of its fields."""
+    __slots__ = ('path', 'data', 'updates')
+
+    def __init__(self, path: str, data: Optional[Dict[str, Any]] = None, updates: Optional[Dict[FieldPath, Any]] = None):
+        self.path = path
+        self.data = data
+        self.updates = updates
+
+    def __repr__(self) -> str:
+        if self.updates is not None:
+            return f'DocumentWrite({self.path!r}, updates={list(self.updates)})'
+        return f'DocumentWrite({self.path!r}, data)'
+
+
+def diff_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[FieldPath, Any]]:
+    """
+    The fields of a dumped document that changed, by field path. Nested dicts with the same keys are compared field by
+    field, anything else that changed is replaced as a whole. Returns None when a top level field was removed, which
+    an update cannot express.
+    """
+    if previous.keys() - current.keys():
+        return None
+    changes: Dict[FieldPath, Any] = {}
+    _diff_into(changes, previous, current, ())
+    return changes
+
+
+def _diff_into(changes: Dict[FieldPath, Any], previous: Dict[str, Any], current: Dict[str, Any], prefix: FieldPath) -> None:
+    for key, value in current.items():
+        if key not in previous:
+            changes[prefix + (key,)] = value
+            continue
+        old = previous[key]
+        if old == value:
+            continue
+        if isinstance(value, dict) and isinstance(old, dict) and old.keys() == value.keys():
+            _diff_into(changes, old, value, prefix + (key,))
+        else:
+            changes[prefix + (key,)] = value
+
+
+class _PendingWrite:
+    __slots__ = ('path', 'document', 'create', 'since')
+
+    def __init__(self, path: str, document: BaseModel, create: bool, since: float):
+        self.path = path
+        self.document = document
+        self.create = create
+        self.since = since
+
+
+class WriteBehindBuffer:
+    """
+    Buffers document writes keyed like the storage cache (``'{namespace}:{id}'``) and commits them in the background.
+
+    Writes of the same document within ``window`` seconds of its first pending write are coalesced, only the latest
+    state is committed. The committed state of each document is remembered, so a later commit only updates the fields
+    that changed since; documents without a known state are written in full. Documents that are due together are
+    committed in batches of up to ``max_batch_size`` writes.
+
+    A failed batch is retried ``max_retries`` times and otherwise put back to be committed with the next flush. flush()
+    commits everything pending, or the given documents, before returning; close() stops the background thread and
+    flushes.
+    """
+
+    def __init__(
+            self,
+            commit: Callable[[List[DocumentWrite]], None],
+            config: WriteBehindConfig,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self._commit = commit
+        self._config = config
+        self._clock = clock
+
+        self._pending: OrderedDict[str, _PendingWrite] = OrderedDict()
+        self._committed: LRUCache[str, Dict[str, Any]] = LRUCache(config.max_tracked_documents)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # Commits run one at a time, so that an older state of a document never lands after a newer one
+        self._commit_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ('writes', 'coalesced', 'batches', 'documents', 'field_updates', 'full_writes', 'unchanged', 'failures'), 0)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def has_pending(self, key: str) -> bool:
+        return key in self._pending
+
+    def write(self, key: str, path: str, document: BaseModel, create: bool = False) -> None:
+        """Schedule a write of the current state of a document. ``create`` writes it in full."""
+        with self._lock:
+            self._counters['writes'] += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._counters['coalesced'] += 1
+                pending.path = path
+                pending.document = document
+                pending.create = pending.create or create
+            else:
+                self._pending[key] = _PendingWrite(path, document, create, self._clock())
+                if len(self._pending) == 1 or len(self._pending) >= self._config.max_pending:
+                    self._wakeup.notify()
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name='storage-write-behind', daemon=True)
+                self._thread.start()
+
+        if self._closed:
+            self.flush([key])
+
+    def remember(self, key: str, document: BaseModel) -> None:
+        """Remember the stored state of a document that was just read, so that its next write is a field update."""
+        if key not in self._pending:
+            self._committed.set(key, document.model_dump())
+
+    def discard(self, key: str) -> None:
+        """Drop the pending write and the remembered state of a document, e.g. when it is deleted."""
+        with self._lock:
+            self._pending.pop(key, None)
+        self._committed.pop(key)
+
+    def flush(self, keys: Optional[Iterable[str]] = None) -> None:
+        """Commit the pending writes of the given documents, or all of them. Raises when a batch keeps failing."""
+        with self._commit_lock:
+            with self._lock:
+                if keys is None:
+                    entries = list(self._pending.items())
+                    self._pending.clear()
+                else:
+                    entries = [(key, entry) for key in keys if (entry := self._pending.pop(key, None)) is not None]
+            self._commit_entries(entries)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._pending),
+            'tracked': len(self._committed),
+            **self._counters,
+        }
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._pending:
+                        if len(self._pending) >= self._config.max_pending:
+                            break
+                        wait = next(iter(self._pending.values())).since + self._config.window - self._clock()
+                        if wait <= 0:
+                            break
+                        self._wakeup.wait(wait)
+                    else:
+                        self._wakeup.wait()
+                if self._closed:
+                    return
+
+            try:
+                self._flush_due()
+            except Exception as e:
+                loggers.storage.exception(e)
+                # Give the backend a moment before the failed writes become due again
+                time.sleep(self._config.window)
+
+    def _flush_due(self) -> None:
+        with self._commit_lock:
+            with self._lock:
+                if len(self._pending) >= self._config.max_pending:
+                    due = list(self._pending.items())
+                    self._pending.clear()
+                else:
+                    deadline = self._clock() - self._config.window
+                    due = []
+                    # Pending writes are ordered by their first write, the due ones are at the front
+                    for key, entry in self._pending.items():
+                        if entry.since > deadline:
+                            break
+                        due.append((key, entry))
+                    for key, _ in due:
+                        del self._pending[key]
+            self._commit_entries(due)
+
+    def _commit_entries(self, entries: List[Tuple[str, _PendingWrite]]) -> None:
+        writes: List[Tuple[str, _PendingWrite, DocumentWrite, Dict[str, Any]]] = []
+        for key, entry in entries:
+            data = entry.document.model_dump()
+            committed = None if entry.create else self._committed.get(key)
+            updates = diff_fields(committed, data) if committed is not None else None
+            if updates is None:
+                writes.append((key, entry, DocumentWrite(entry.path, data=data), data))
+            elif updates:
+                writes.append((key, entry, DocumentWrite(entry.path, updates=updates), data))
+            else:
+                self._counters['unchanged'] += 1
+
+        batch_size = max(1, self._config.max_batch_size)
+        for start in range(0, len(writes), batch_size):
+            batch = writes[start:start + batch_size]
+            try:
+                self._commit_batch([write for _, _, write, _ in batch])
+            except Exception:
+                # Write the failed documents in full next time, an update fails if the document is gone
+                for key, _, _, _ in batch:
+                    self._committed.pop(key)
+                self._requeue([(key, entry) for key, entry, _, _ in writes[start:]])
+                raise
+            for key, _, write, data in batch:
+                self._committed.set(key, data)
+                self._counters['field_updates' if write.updates is not None else 'full_writes'] += 1
+            self._counters['documents'] += len(batch)
+            self._counters['batches'] += 1
+
+    def _commit_batch(self, batch: List[DocumentWrite]) -> None:
+        for attempt in range(self._config.max_retries + 1):
+            try:
+                self._commit(batch)
+                return
+            except Exception as e:
+                self._counters['failures'] += 1
+                if attempt == self._config.max_retries:
+                    raise
+                loggers.storage.warning(f'Committing {len(batch)} buffered writes failed, retrying: {e}')
+                time.sleep(0.05 * 2 ** attempt)
+
+    def _requeue(self, entries: List[Tuple[str, _PendingWrite]]) -> None:
+        with self._lock:
+            for key, entry in reversed(entries):
+                newer = self._pending.get(key)
+                if newer is None:
+                    self._pending[key] = entry
+                else:
+                    newer.create = newer.create or entry.create
+                    newer.since = min(newer.since, entry.since)
+                self._pending.move_to_end(key, last=False)
+            self._wakeup.notify()
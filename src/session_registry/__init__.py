@@ -0,0 +1,25 @@
+import os
+import socket
+
+from src.settings import SessionRegistrySettings
+from src.utils import get_project_path_str
+from .base import BaseSessionRegistry, SessionRecord
+from .memory import MemorySessionRegistry
+from .sqlite import SqliteSessionRegistry
+
+_HOSTNAME = socket.gethostname()
+
+
+def get_worker_id() -> str:
+    """Identifies the worker process across the registry, read on every call since workers are forked."""
+    return f'{_HOSTNAME}:{os.getpid()}'
+
+
+def get_session_registry(settings: SessionRegistrySettings) -> BaseSessionRegistry:
+    if settings.provider == "sqlite":
+        path = os.path.join(get_project_path_str(), settings.path)
+        return SqliteSessionRegistry(path, lease=settings.lease, retention=settings.retention)
+    elif settings.provider == "memory":
+        return MemorySessionRegistry(lease=settings.lease, retention=settings.retention)
+    else:
+        raise NotImplementedError
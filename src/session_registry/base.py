@@ -0,0 +1,92 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+
+class SessionRecord:
+    """A scenario session as the registry knows it: the worker that owns it and the state it is created from."""
+
+    __slots__ = ('instance_uid', 'worker_id', 'state', 'running', 'end_requested', 'owner_alive')
+
+    def __init__(
+            self,
+            instance_uid: str,
+            worker_id: str,
+            state: str,
+            running: bool,
+            end_requested: bool,
+            owner_alive: bool,
+    ):
+        self.instance_uid = instance_uid
+        self.worker_id = worker_id
+        self.state = state
+        self.running = running
+        self.end_requested = end_requested
+        self.owner_alive = owner_alive
+
+    def __repr__(self) -> str:
+        return (f'SessionRecord({self.instance_uid}, worker={self.worker_id}, running={self.running}, '
+                f'owner_alive={self.owner_alive})')
+
+
+class BaseSessionRegistry(ABC):
+    """
+    Which worker owns each scenario session, shared by the workers of the app.
+
+    A worker registers the sessions it creates with the serialized state they are created from and renews its lease
+    with ``heartbeat``. A websocket that lands on another worker ``acquire``s the session there: the state moves to
+    that worker unless the owner is running the session and its lease has not expired. The sessions of a worker that
+    stopped renewing its lease, e.g. because it crashed, are kept for ``retention`` seconds and then purged.
+    """
+
+    lease: float
+    retention: float
+
+    def __init__(self, lease: float = 30.0, retention: float = 3600.0, clock: Callable[[], float] = time.time):
+        self.lease = lease
+        self.retention = retention
+        # Wall clock time, the leases are compared by other processes
+        self._clock = clock
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str) -> None:
+        """Renews the lease of the worker on its sessions."""
+
+    @abstractmethod
+    def retire(self, worker_id: str) -> None:
+        """Ends the lease of the worker, e.g. on shutdown, so that its sessions are taken over right away."""
+
+    @abstractmethod
+    def register(self, instance_uid: str, worker_id: str, state: str) -> None:
+        """Records the worker as the owner of a new session and renews its lease."""
+
+    @abstractmethod
+    def lookup(self, instance_uid: str) -> Optional[SessionRecord]:
+        pass
+
+    @abstractmethod
+    def acquire(self, instance_uid: str, worker_id: str, running: bool = False) -> Optional[SessionRecord]:
+        """
+        Makes the worker the owner of the session and returns it, None when there is no such session or another
+        worker with a valid lease is running it. With ``running`` the session is marked as running in the same step,
+        so of several workers acquiring it at once only one gets it.
+        """
+
+    @abstractmethod
+    def request_end(self, instance_uid: str) -> bool:
+        """Asks the owner to force end the session the next time it renews its lease. False when there is no such session."""
+
+    @abstractmethod
+    def owned(self, worker_id: str) -> List[SessionRecord]:
+        """The sessions of the worker. Their state may be left out, it is only needed to take a session over."""
+
+    @abstractmethod
+    def release(self, instance_uid: str, worker_id: str) -> None:
+        """Forgets the session if the worker still owns it."""
+
+    @abstractmethod
+    def purge(self) -> int:
+        """Forgets the sessions and workers whose lease expired more than ``retention`` ago. Returns the sessions."""
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,93 @@
+import threading
+from typing import Dict, List, Optional
+
+from .base import BaseSessionRegistry, SessionRecord
+
+
+class MemorySessionRegistry(BaseSessionRegistry):
+    """Sessions of a single worker, for development and tests. Other processes do not see them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._workers: Dict[str, float] = {}
+        self._sessions: Dict[str, dict] = {}
+
+    def _alive(self, worker_id: str) -> bool:
+        return self._workers.get(worker_id, float('-inf')) > self._clock()
+
+    def _record(self, session: dict) -> SessionRecord:
+        return SessionRecord(
+            instance_uid=session['instance_uid'],
+            worker_id=session['worker_id'],
+            state=session['state'],
+            running=session['running'],
+            end_requested=session['end_requested'],
+            owner_alive=self._alive(session['worker_id']),
+        )
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._lock:
+            self._workers[worker_id] = self._clock() + self.lease
+
+    def retire(self, worker_id: str) -> None:
+        with self._lock:
+            self._workers[worker_id] = self._clock()
+
+    def register(self, instance_uid: str, worker_id: str, state: str) -> None:
+        with self._lock:
+            self._workers[worker_id] = self._clock() + self.lease
+            self._sessions[instance_uid] = {
+                'instance_uid': instance_uid,
+                'worker_id': worker_id,
+                'state': state,
+                'running': False,
+                'end_requested': False,
+            }
+
+    def lookup(self, instance_uid: str) -> Optional[SessionRecord]:
+        with self._lock:
+            session = self._sessions.get(instance_uid)
+            return self._record(session) if session is not None else None
+
+    def acquire(self, instance_uid: str, worker_id: str, running: bool = False) -> Optional[SessionRecord]:
+        with self._lock:
+            session = self._sessions.get(instance_uid)
+            if session is None:
+                return None
+            if session['worker_id'] != worker_id:
+                if session['running'] and self._alive(session['worker_id']):
+                    return None
+                session.update(worker_id=worker_id, running=False)
+            session['running'] = session['running'] or running
+            self._workers[worker_id] = self._clock() + self.lease
+            return self._record(session)
+
+    def request_end(self, instance_uid: str) -> bool:
+        with self._lock:
+            session = self._sessions.get(instance_uid)
+            if session is None:
+                return False
+            session['end_requested'] = True
+            return True
+
+    def owned(self, worker_id: str) -> List[SessionRecord]:
+        with self._lock:
+            return [self._record(session) for session in self._sessions.values() if session['worker_id'] == worker_id]
+
+    def release(self, instance_uid: str, worker_id: str) -> None:
+        with self._lock:
+            session = self._sessions.get(instance_uid)
+            if session is not None and session['worker_id'] == worker_id:
+                del self._sessions[instance_uid]
+
+    def purge(self) -> int:
+        with self._lock:
+            cutoff = self._clock() - self.retention
+            expired = {worker_id for worker_id, expires_at in self._workers.items() if expires_at < cutoff}
+            purged = [uid for uid, session in self._sessions.items() if session['worker_id'] in expired]
+            for uid in purged:
+                del self._sessions[uid]
+            for worker_id in expired:
+                del self._workers[worker_id]
+            return len(purged)
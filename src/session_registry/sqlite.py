@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from .base import BaseSessionRegistry, SessionRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    lease_expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    instance_uid TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    running INTEGER NOT NULL DEFAULT 0,
+    end_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_by_worker ON sessions (worker_id);
+"""
+
+_SELECT = """
+SELECT sessions.instance_uid, sessions.worker_id, {state}, sessions.running, sessions.end_requested,
+       COALESCE(workers.lease_expires_at, 0) > ?
+FROM sessions LEFT JOIN workers ON workers.worker_id = sessions.worker_id
+"""
+_SELECT_SESSION = _SELECT.format(state='sessions.state') + 'WHERE sessions.instance_uid = ?'
+_SELECT_OWNED = _SELECT.format(state="''") + 'WHERE sessions.worker_id = ?'
+
+
+class SqliteSessionRegistry(BaseSessionRegistry):
+    """
+    Sessions in a SQLite database in WAL mode, shared by every worker process of the host without an external
+    service. Every operation is a single short transaction, ownership changes take the write lock first so that
+    concurrent acquires of a session have one winner.
+
+    Each process opens its own connection the first time it uses the registry, so a registry created before the
+    workers are forked is safe to use in all of them.
+    """
+
+    def __init__(self, path: str, *args, busy_timeout: float = 5.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = path
+        self._busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self._busy_timeout, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self._connect()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+
+    @staticmethod
+    def _record(row: tuple) -> SessionRecord:
+        return SessionRecord(
+            instance_uid=row[0],
+            worker_id=row[1],
+            state=row[2],
+            running=bool(row[3]),
+            end_requested=bool(row[4]),
+            owner_alive=bool(row[5]),
+        )
+
+    def _renew(self, connection: sqlite3.Connection, worker_id: str, expires_at: float) -> None:
+        connection.execute(
+            'INSERT INTO workers (worker_id, lease_expires_at) VALUES (?, ?) '
+            'ON CONFLICT (worker_id) DO UPDATE SET lease_expires_at = excluded.lease_expires_at',
+            (worker_id, expires_at))
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._transaction() as connection:
+            self._renew(connection, worker_id, self._clock() + self.lease)
+
+    def retire(self, worker_id: str) -> None:
+        with self._transaction() as connection:
+            self._renew(connection, worker_id, self._clock())
+
+    def register(self, instance_uid: str, worker_id: str, state: str) -> None:
+        with self._transaction() as connection:
+            self._renew(connection, worker_id, self._clock() + self.lease)
+            connection.execute(
+                'INSERT OR REPLACE INTO sessions (instance_uid, worker_id, state, running, end_requested) '
+                'VALUES (?, ?, ?, 0, 0)',
+                (instance_uid, worker_id, state))
+
+    def lookup(self, instance_uid: str) -> Optional[SessionRecord]:
+        with self._lock:
+            row = self._connect().execute(
+                _SELECT_SESSION, (self._clock(), instance_uid)).fetchone()
+        return self._record(row) if row is not None else None
+
+    def acquire(self, instance_uid: str, worker_id: str, running: bool = False) -> Optional[SessionRecord]:
+        with self._transaction() as connection:
+            now = self._clock()
+            row = connection.execute(_SELECT_SESSION, (now, instance_uid)).fetchone()
+            if row is None:
+                return None
+            record = self._record(row)
+            if record.worker_id != worker_id:
+                if record.running and record.owner_alive:
+                    return None
+                record.worker_id, record.running = worker_id, False
+            record.running = record.running or running
+            connection.execute(
+                'UPDATE sessions SET worker_id = ?, running = ? WHERE instance_uid = ?',
+                (worker_id, int(record.running), instance_uid))
+            self._renew(connection, worker_id, now + self.lease)
+            record.owner_alive = True
+            return record
+
+    def request_end(self, instance_uid: str) -> bool:
+        with self._transaction() as connection:
+            cursor = connection.execute('UPDATE sessions SET end_requested = 1 WHERE instance_uid = ?', (instance_uid,))
+            return cursor.rowcount > 0
+
+    def owned(self, worker_id: str) -> List[SessionRecord]:
+        with self._lock:
+            rows = self._connect().execute(_SELECT_OWNED, (self._clock(), worker_id)).fetchall()
+        return [self._record(row) for row in rows]
+
+    def release(self, instance_uid: str, worker_id: str) -> None:
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM sessions WHERE instance_uid = ? AND worker_id = ?', (instance_uid, worker_id))
+
+    def purge(self) -> int:
+        with self._transaction() as connection:
+            cutoff = self._clock() - self.retention
+            cursor = connection.execute(
+                'DELETE FROM sessions WHERE worker_id IN (SELECT worker_id FROM workers WHERE lease_expires_at < ?)',
+                (cutoff,))
+            connection.execute('DELETE FROM workers WHERE lease_expires_at < ?', (cutoff,))
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
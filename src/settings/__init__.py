@@ -8,7 +8,7 @@ from .fastapi import FastAPISettings
 from .websocket import WebSocketSettings
 from .logging import BaseLoggingSettings, AppLoggingSettings
 from .services import ServicesSettings, LanguageModelQuality
-from .scenario import ScenarioSettings, ScenarioLoggingSettings
+from .scenario import ScenarioSettings, ScenarioLoggingSettings, SessionRegistrySettings
 from .evaluation import EvaluationSettings
 from .debug import DebugSettings
 
@@ -4,6 +4,15 @@ from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class FirebaseAuthSettings(BaseSettings):
+    cache_enabled: bool = Field(default=True, description='Remember verified ID tokens until they expire instead of verifying them on every request.')
+    cache_max_size: int = Field(default=10_000, description='Verified ID tokens remembered at once.')
+    cache_max_ttl: float = Field(default=3600.0, description='Seconds a verified ID token is remembered for at most, Firebase ID tokens expire after an hour.')
+    clock_skew_seconds: int = Field(default=0, description='Seconds of clock skew tolerated when checking the issue and expiry times of a token, at most 60.')
+    max_workers: int = Field(default=4, description='Threads verifying token signatures off the event loop.')
+    certificates_timeout: float = Field(default=10.0, description='Seconds a fetch of the Google public certificates may take.')
+
+
 class FastAPISettings(BaseSettings):
     title: str = 'Quiply API'
     version: int = 1
@@ -24,6 +33,8 @@ class FastAPISettings(BaseSettings):
 
     allow_registration: bool = True
 
+    auth: FirebaseAuthSettings = Field(default_factory=FirebaseAuthSettings)
+
     # model_config = SettingsConfigDict(env_prefix='FASTAPI_', env_file='.env')
 
     @property
@@ -15,12 +15,22 @@ class ScenarioLoggingSettings(BaseLoggingSettings):
     websocket_log_level: str = Field(default='INFO')
 
 
+class SessionRegistrySettings(BaseSettings):
+    provider: str = Field(default='sqlite', description="'sqlite' shares the sessions between the workers of a host, 'memory' keeps them in the worker.")
+    path: str = Field(default='data/sessions.db', description='SQLite database of the sqlite provider, relative to the project.')
+    lease: float = Field(default=30.0, description='Seconds a worker owns its sessions without renewing its lease. The sessions of a worker whose lease expired are taken over by the worker their client reconnects to.')
+    heartbeat_interval: float = Field(default=10.0, description='Seconds between the lease renewals of a worker.')
+    retention: float = Field(default=3600.0, description='Seconds the sessions of an expired worker are kept for a reconnect.')
+
+
 class ScenarioSettings(BaseSettings):
     logging: ScenarioLoggingSettings = Field(default_factory=ScenarioLoggingSettings)
+    registry: SessionRegistrySettings = Field(default_factory=SessionRegistrySettings)
 
     message_mode: str = Field(default='stream')
     max_conversation_tokens: int = Field(default=-1)
     agent_callbacks: List[Any] = Field(default_factory=list)
+    agent_initialization_concurrency: int = Field(default=4)
 
     def initialize_dependencies(self):
         if self.allow_stt:
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import ClassVar
+from typing import ClassVar, Dict, Optional
 
 from pydantic import Field
 from pydantic.v1 import validator
@@ -21,11 +21,42 @@ class CacheConfig(BaseSettings):
     enabled: bool = Field(default=True)
     prefetch_templates: bool = Field(default=True)
     max_size: int = Field(default=10_000)
+    max_bytes: int = Field(default=256 * 1024 * 1024, description='Approximate memory budget of the cached values.')
+    default_ttl: Optional[float] = Field(default=None, description='Seconds entries are kept for, None to keep them until evicted.')
+    ttl: Dict[str, float] = Field(default_factory=dict, description='Seconds entries are kept for by namespace (the key prefix before the first colon).')
+    negative_ttl: float = Field(default=30.0, description='Seconds a document that was not found is remembered as missing. 0 disables negative caching.')
+
+
+class StorageExecutorConfig(BaseSettings):
+    max_workers: int = Field(default=16, description='Threads running the blocking storage calls of AsyncStorageService.')
+    max_concurrency: int = Field(default=32, description='Storage operations in flight at once, further operations wait for a slot.')
+    timeout: float = Field(default=10.0, description='Seconds a document operation may take, including the wait for a slot.')
+    upload_timeout: float = Field(default=60.0, description='Seconds a media upload may take, including the wait for a slot.')
+
+
+class WriteBehindConfig(BaseSettings):
+    enabled: bool = Field(default=True, description='Buffer scenario instance, scenario result and account data writes instead of writing them right away.')
+    window: float = Field(default=1.0, description='Seconds a document write is held back, writes of the same document in this window are coalesced.')
+    max_pending: int = Field(default=1_000, description='Pending documents that trigger a flush before their window has passed.')
+    max_batch_size: int = Field(default=500, description='Documents committed in one batch. Firestore allows at most 500.')
+    max_retries: int = Field(default=3, description='Retries of a failed batch before its writes are put back for the next flush.')
+    max_tracked_documents: int = Field(default=10_000, description='Documents whose committed state is remembered to compute field updates.')
+
+
+class DerivedContentConfig(BaseSettings):
+    enabled: bool = Field(default=True, description='Reuse content generated from app package data, like personality summaries and stages, across sessions.')
+    directory: Optional[str] = Field(default='data/derived_cache', description='Directory of the local entries relative to the project root, None to keep them in memory only.')
+    remote: bool = Field(default=False, description='Also keep the entries in the storage provider, shared by every instance.')
+    max_memory_entries: int = Field(default=1_000, description='Entries kept in memory in front of the local files.')
 
 
 class StorageConfig(ServiceConfig):
     provider: str = Field(default='firestore')
     cache: CacheConfig = Field(default_factory=CacheConfig)
+    executor: StorageExecutorConfig = Field(default_factory=StorageExecutorConfig)
+    write_behind: WriteBehindConfig = Field(default_factory=WriteBehindConfig)
+    derived: DerivedContentConfig = Field(default_factory=DerivedContentConfig)
+    memory_directory: Optional[str] = Field(default=None, description='Directory the memory provider keeps its documents in, None to keep them in memory only.')
     app_package_update_interval: int = Field(default=5)
 
 
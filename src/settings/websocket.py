@@ -1,7 +1,25 @@
+from enum import Enum
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class SlowConsumerPolicy(str, Enum):
+    DROP_OLDEST = 'drop_oldest'
+    BLOCK = 'block'
+    DISCONNECT = 'disconnect'
+
+
+class WebSocketSendQueueSettings(BaseSettings):
+    max_bytes: int = Field(default=1_048_576, description='Approximate bytes of outbound events queued per connection before the slow consumer policy applies.')
+    slow_consumer_policy: SlowConsumerPolicy = Field(default=SlowConsumerPolicy.DROP_OLDEST, description='What a full send queue does: drop_oldest drops the oldest partial text chunks, block makes producers wait, disconnect closes the connection.')
+    coalesce_window: float = Field(default=0.01, description='Seconds a lone stream chunk waits for the next chunks of its message so they are sent together, 0 to disable.')
+    coalesce_max_bytes: int = Field(default=4096, description='Characters of content stream chunks are coalesced up to.')
+    latency_samples: int = Field(default=1000, description='Recent send latencies kept for the queue metrics.')
+
+
 class WebSocketSettings(BaseSettings):
     accept_timeout: int = Field(default=10)
     ready_event_timeout: int = Field(default=30)
+    binary_audio_frames: bool = Field(default=True, description='Send audio as binary frames to clients that ask for them in their ready event.')
+    send_queue: WebSocketSendQueueSettings = Field(default_factory=WebSocketSendQueueSettings)
@@ -0,0 +1,167 @@
+import asyncio
+import heapq
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils import logger
+
+
+class TimerHandle:
+    """
+    A callback scheduled on a TimerWheel. Cancelling it removes it from its bucket, ``cancelled`` is also set once
+    the callback has run so that a late cancel is a no-op.
+    """
+
+    __slots__ = ('when', 'tick', 'callback', 'args', 'cancelled', '_wheel')
+
+    def __init__(self, wheel: 'TimerWheel', when: float, tick: int, callback: Callable[..., Any], args: tuple):
+        self.when = when
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._wheel = wheel
+
+    def cancel(self) -> None:
+        if not self.cancelled:
+            self.cancelled = True
+            self._wheel._remove(self)
+
+
+class TimerWheel:
+    """
+    Process-wide timers bucketed by tick. Every timer due in the same ``resolution`` slice shares a bucket, and the
+    wheel keeps a single event loop timer armed for the earliest non-empty bucket, so any number of pending timers
+    costs one wakeup per due tick and an empty wheel costs none.
+    """
+
+    resolution: float
+    """ Width of a tick in seconds. Timers fire at most this late, never early. """
+
+    def __init__(self, resolution: float = 0.01):
+        self.resolution = resolution
+        self._clock_resolution = time.get_clock_info('monotonic').resolution
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buckets: Dict[int, Dict[TimerHandle, None]] = {}
+        self._ticks: List[int] = []
+        self._armed: Optional[asyncio.TimerHandle] = None
+        self._armed_tick: Optional[int] = None
+        self._wakeups = 0
+        self._fired = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': self.pending,
+            'buckets': len(self._buckets),
+            'wakeups': self._wakeups,
+            'fired': self._fired,
+        }
+
+    def call_later(self, delay: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        """
+        Schedules ``callback(*args)`` to run on the event loop after ``delay`` seconds.
+        :param delay: Seconds from now, negative delays fire on the next tick.
+        :param callback: A plain callable, run on the event loop thread. It must not block.
+        """
+        loop = asyncio.get_running_loop()
+        self._bind(loop)
+        return self._add(loop.time() + max(0.0, delay), callback, args)
+
+    def call_at(self, when: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        """Like call_later, but ``when`` is an absolute time of the running loop's clock."""
+        self._bind(asyncio.get_running_loop())
+        return self._add(when, callback, args)
+
+    def clear(self) -> None:
+        for bucket in self._buckets.values():
+            for handle in bucket:
+                # Cancelled by an earlier callback of the same tick
+                if handle.cancelled:
+                    continue
+                handle.cancelled = True
+        self._buckets.clear()
+        self._ticks.clear()
+        self._disarm()
+
+    def _bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is not loop:
+            # Timers of a previous (closed) loop can never fire
+            self.clear()
+            self._loop = loop
+
+    def _add(self, when: float, callback: Callable[..., Any], args: tuple) -> TimerHandle:
+        tick = math.ceil(when / self.resolution)
+        handle = TimerHandle(self, when, tick, callback, args)
+
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = self._buckets[tick] = {}
+            heapq.heappush(self._ticks, tick)
+        bucket[handle] = None
+
+        if self._armed_tick is None or tick < self._armed_tick:
+            self._arm(tick)
+        return handle
+
+    def _remove(self, handle: TimerHandle) -> None:
+        bucket = self._buckets.get(handle.tick)
+        if bucket is None:
+            return
+        bucket.pop(handle, None)
+        if not bucket:
+            del self._buckets[handle.tick]
+            if handle.tick == self._armed_tick:
+                self._arm_next()
+
+    def _arm(self, tick: int) -> None:
+        self._disarm()
+        self._armed_tick = tick
+        self._armed = self._loop.call_at(tick * self.resolution, self._fire)
+
+    def _disarm(self) -> None:
+        if self._armed is not None:
+            self._armed.cancel()
+        self._armed = None
+        self._armed_tick = None
+
+    def _arm_next(self) -> None:
+        # Buckets emptied by cancellation leave their tick in the heap, drop them lazily
+        while self._ticks and self._ticks[0] not in self._buckets:
+            heapq.heappop(self._ticks)
+        if self._ticks:
+            self._arm(self._ticks[0])
+        else:
+            self._disarm()
+
+    def _fire(self) -> None:
+        self._armed = None
+        self._armed_tick = None
+        self._wakeups += 1
+
+        deadline = self._loop.time() + self._clock_resolution
+        while self._ticks and self._ticks[0] * self.resolution <= deadline:
+            bucket = self._buckets.pop(heapq.heappop(self._ticks), None)
+            if not bucket:
+                continue
+            for handle in bucket:
+                # Cancelled by an earlier callback of the same tick
+                if handle.cancelled:
+                    continue
+                handle.cancelled = True
+                self._fired += 1
+                try:
+                    handle.callback(*handle.args)
+                except Exception as e:
+                    logger.exception(f'Timer callback {handle.callback} failed: {e}')
+
+        # Callbacks may have scheduled timers, re-arm for whichever tick is now earliest
+        self._arm_next()
+
+
+timer_wheel = TimerWheel()
+""" The timer wheel shared by every scenario and connection in this process. """
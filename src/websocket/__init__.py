@@ -1,2 +1,4 @@
 from .connection import WebSocketConnection
 from .models import *
+from .frames import AudioFrame, AudioFrameType, AudioCodec, AudioFrameError
+from .send_queue import WebSocketSendQueue, OutboundMessage
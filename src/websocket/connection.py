@@ -20,6 +20,8 @@ from src.framework import Message
 from src.models.voice import VoiceStream, VoiceChunk
 from src.utils import enum_contains_value
 from .error_handler import handle_websocket_exception
+from .frames import AudioFrame
+from .send_queue import WebSocketSendQueue
 from .models import (
     WebSocketEvent,
     WebSocketEventType,
@@ -31,6 +33,7 @@ from .models import (
     WebSocketStatus,
     PacketEventType,
     PacketEvent,
+    PacketAudioEvent,
     VoiceEventType,
     VoiceEvent,
 )
@@ -56,6 +59,13 @@ class WebSocketConnection(AsyncObject):
     _voice_streams: Dict[str, VoiceStream]
     _voice_stream_subscribers: List[Callable[[VoiceStream], None]]
 
+    _binary_audio: bool
+    """ Whether the client asked for audio as binary frames in its ready event. """
+    _audio_frames_requested: bool
+
+    _send_queue: WebSocketSendQueue
+    """ Outbound events, sent in order by a single writer task. """
+
     async def __aenter__(self):
         return self
 
@@ -76,8 +86,9 @@ class WebSocketConnection(AsyncObject):
             ):
                 await self._websocket.close(code=1000, reason="Normal closure")
 
+        # Scenario tasks go first so that nothing queues new sends while the connection is torn down
+        await scenario_manager.destroy_scenario_async(self._scenario_instance_id)
         await self.cleanup_async()
-        scenario_manager.destroy_scenario(self._scenario_instance_id)
 
         return True
 
@@ -92,8 +103,19 @@ class WebSocketConnection(AsyncObject):
         self._voice_streams = {}
         self._voice_stream_subscribers = []
 
+        self._binary_audio = False
+        self._audio_frames_requested = False
+
+        self._send_queue = WebSocketSendQueue(
+            self._send_now,
+            lambda coroutine: self.create_task(coroutine, group='send'),
+            quiply_settings.websocket.send_queue,
+            on_slow_consumer=self._on_slow_consumer,
+        )
+
     async def cleanup_async(self):
         self._event_subscribers.clear()
+        self._send_queue.close()
 
         if hasattr(self, "_scenario"):
             del self._scenario
@@ -178,20 +200,33 @@ class WebSocketConnection(AsyncObject):
             data_dict = json.loads(data)
             incoming_message = WebSocketMessage.model_validate(data_dict)
             if incoming_message.type == ConnectionEventType.READY:
+                self._negotiate_audio_frames(incoming_message.data)
                 break
             else:
                 self.logger.warning(
                     f"Unexpected event received while waiting for ready event: {incoming_message}"
                 )
 
-    async def _send_ready_event(self):
-        await self._websocket.send_json(
-            {
-                "type": ConnectionEventType.READY,
-                "data": self._scenario.get_initializing_message(),
-            }
+    def _negotiate_audio_frames(self, ready_data) -> None:
+        """Clients that can handle binary audio frames ask for them with {"audio_frames": "binary"} in their ready event."""
+        if not isinstance(ready_data, dict) or "audio_frames" not in ready_data:
+            return
+        self._audio_frames_requested = True
+        self._binary_audio = (
+            ready_data["audio_frames"] == "binary"
+            and quiply_settings.websocket.binary_audio_frames
         )
 
+    async def _send_ready_event(self):
+        ready_event = {
+            "type": ConnectionEventType.READY,
+            "data": self._scenario.get_initializing_message(),
+        }
+        if self._audio_frames_requested:
+            # Only clients that asked learn about the audio frame mode, the ready event stays the same for the others
+            ready_event["audio_frames"] = "binary" if self._binary_audio else "json"
+        await self._websocket.send_json(ready_event)
+
     async def listen(self):
         """Loop to listen for incoming messages from the client. This keeps the entire scenario loop running."""
 
@@ -209,7 +244,10 @@ class WebSocketConnection(AsyncObject):
                 raise WebsocketReceiveException(inner=e)
 
             try:
-                if "text" in ws_message:
+                if ws_message.get("bytes") is not None:
+                    data = ws_message["bytes"]
+                    self._handle_audio_frame(data)
+                elif ws_message.get("text") is not None:
                     data = ws_message[
                         "text"
                     ].encode()  # convert to bytes for uniformity
@@ -272,10 +310,16 @@ class WebSocketConnection(AsyncObject):
         except Exception as e:
             raise WebsocketHandleMessageException(inner=e, data=incoming_message)
 
+    def _handle_audio_frame(self, data: bytes):
+        frame = AudioFrame.decode(data)
+        self._handle_voice_chunk(frame.event_type, frame.to_voice_chunk())
+
     def _handle_voice_message(self, incoming_message: WebSocketMessage):
         chunk: VoiceChunk = VoiceChunk.model_validate(incoming_message.data)
+        self._handle_voice_chunk(incoming_message.type, chunk)
 
-        if incoming_message.type == VoiceEventType.VOICE_CHUNK:
+    def _handle_voice_chunk(self, event_type: VoiceEventType, chunk: VoiceChunk):
+        if event_type == VoiceEventType.VOICE_CHUNK:
             if chunk.is_start:
                 voice_stream = VoiceStream(chunk.stream_id, chunk.settings)
                 self._voice_streams[chunk.stream_id] = voice_stream
@@ -288,14 +332,14 @@ class WebSocketConnection(AsyncObject):
                     callback(self._voice_streams[chunk.stream_id])
 
             self._voice_streams[chunk.stream_id].add_chunk(chunk)
-        elif incoming_message.type == VoiceEventType.VOICE_END:
+        elif event_type == VoiceEventType.VOICE_END:
             if chunk.stream_id in self._voice_streams:
                 self._voice_streams[chunk.stream_id].add_chunk(chunk)
             else:
                 self.logger.warning(
                     f"Got Voice End event for stream {chunk.stream_id} that does not exist"
                 )
-        elif incoming_message.type == VoiceEventType.VOICE_ERROR:
+        elif event_type == VoiceEventType.VOICE_ERROR:
             if chunk.stream_id in self._voice_streams:
                 self._voice_streams[chunk.stream_id].add_chunk(chunk)
             else:
@@ -303,7 +347,7 @@ class WebSocketConnection(AsyncObject):
                     f"Got Voice Error event for stream {chunk.stream_id} that does not exist"
                 )
         else:
-            self.logger.error(f"Unhandled voice event: {incoming_message}")
+            self.logger.error(f"Unhandled voice event: {event_type} {chunk}")
 
     def _on_stream_end(self, stream_id: str):
         if stream_id in self._voice_streams:
@@ -348,7 +392,7 @@ class WebSocketConnection(AsyncObject):
             #     return
 
             print("sending requires_response", websocket_message)
-            self.create_task(self._websocket.send_json(websocket_message.model_dump()))
+            self.send_nowait(websocket_message)
         except Exception as e:
             raise WebsocketHandleMessageException(inner=e, data=incoming_message)
 
@@ -385,15 +429,35 @@ class WebSocketConnection(AsyncObject):
             return False
         return True
 
-    def create_send_task(self, event: WebSocketEvent) -> asyncio.Task:
-        return self.create_task(self.send_async(event))
+    def send_nowait(self, event: WebSocketEvent | WebSocketMessage) -> None:
+        """Queue an event to be sent after the ones before it, without waiting for it."""
+        self._send_queue.put_nowait(event)
+
+    async def send_async(self, event: WebSocketEvent | WebSocketMessage) -> None:
+        """Queue an event and wait until it was sent, or until there is room for it with the block policy."""
+        await self._send_queue.put(event, wait_sent=True)
 
-    async def send_async(self, event: WebSocketEvent) -> None:
+    def send_queue_stats(self) -> dict:
+        return self._send_queue.stats()
+
+    def _on_slow_consumer(self):
+        self.logger.warning(
+            f"Closing connection of client [{self._client_id}], it fell more than "
+            f"{quiply_settings.websocket.send_queue.max_bytes} bytes behind"
+        )
+        self._force_closed = True
+        self.create_task(self._websocket.close(code=1008, reason="Slow consumer"))
+
+    async def _send_now(self, event: WebSocketEvent | WebSocketMessage) -> None:
         if not self._check_is_connected:
             return
 
+        if self._binary_audio and isinstance(event, PacketAudioEvent) and event.data.audio:
+            await self._send_audio_frame_async(event)
+            return
+
         try:
-            message = WebSocketMessage(type=event.type, data=event.data)
+            message = event if isinstance(event, WebSocketMessage) else WebSocketMessage(type=event.type, data=event.data)
             # print("send_to_client:")
             # print(message)
         except Exception as e:
@@ -409,5 +473,13 @@ class WebSocketConnection(AsyncObject):
             )
         self._handle_websocket_message_sent(message)
 
+    async def _send_audio_frame_async(self, event: PacketAudioEvent) -> None:
+        try:
+            await self._websocket.send_bytes(AudioFrame.of_audio_chunk(event.data).encode())
+        except Exception as e:
+            self.logger.exception(
+                f"Exception while sending audio frame: {e}  ---- {event.data.message_audio_id} [{event.data.index}]"
+            )
+
     def _handle_websocket_message_sent(self, websocket_message: WebSocketMessage):
         pass
@@ -0,0 +1,228 @@
+import base64
+import json
+import struct
+from datetime import datetime
+from enum import IntEnum
+from typing import Any, Dict, Optional
+
+from src.framework import MessageAudioChunk
+from src.models.voice import VoiceChunk
+from .models import PacketEventType, VoiceEventType
+
+AUDIO_FRAME_VERSION = 1
+
+FLAG_FINAL = 0x01
+FLAG_METADATA = 0x02
+
+# version, frame type, flags, codec, sequence, stream id length
+_HEADER = struct.Struct('!BBBBIB')
+_METADATA_LENGTH = struct.Struct('!H')
+
+
+class AudioFrameError(ValueError):
+    pass
+
+
+class AudioFrameType(IntEnum):
+    VOICE_CHUNK = 1
+    VOICE_END = 2
+    AUDIO_PACKET = 3
+
+    @property
+    def event_type(self) -> PacketEventType | VoiceEventType:
+        return _EVENT_TYPES[self]
+
+
+_EVENT_TYPES = {
+    AudioFrameType.VOICE_CHUNK: VoiceEventType.VOICE_CHUNK,
+    AudioFrameType.VOICE_END: VoiceEventType.VOICE_END,
+    AudioFrameType.AUDIO_PACKET: PacketEventType.AUDIO,
+}
+
+
+class AudioCodec(IntEnum):
+    UNSPECIFIED = 0
+    """ The format the stream was set up with, e.g. the output format of the voice generating the audio. """
+    PCM_S16LE = 1
+    MP3 = 2
+    WEBM_OPUS = 3
+    OGG_OPUS = 4
+    WAV = 5
+    ULAW = 6
+
+    @classmethod
+    def from_format(cls, audio_format: Optional[str]) -> 'AudioCodec':
+        """The codec of a mime type (``audio/webm;codecs=opus``) or an output format (``mp3_44100_128``)."""
+        if not audio_format:
+            return cls.UNSPECIFIED
+        audio_format = audio_format.lower()
+        for prefix, codec in _FORMAT_PREFIXES:
+            if audio_format.startswith(prefix):
+                return codec
+        return cls.UNSPECIFIED
+
+
+_FORMAT_PREFIXES = (
+    ('pcm', AudioCodec.PCM_S16LE), ('audio/pcm', AudioCodec.PCM_S16LE), ('audio/l16', AudioCodec.PCM_S16LE),
+    ('mp3', AudioCodec.MP3), ('audio/mpeg', AudioCodec.MP3), ('audio/mp3', AudioCodec.MP3),
+    ('audio/webm', AudioCodec.WEBM_OPUS), ('webm', AudioCodec.WEBM_OPUS),
+    ('audio/ogg', AudioCodec.OGG_OPUS), ('ogg', AudioCodec.OGG_OPUS), ('opus', AudioCodec.OGG_OPUS),
+    ('audio/wav', AudioCodec.WAV), ('audio/x-wav', AudioCodec.WAV), ('wav', AudioCodec.WAV),
+    ('ulaw', AudioCodec.ULAW), ('audio/basic', AudioCodec.ULAW),
+)
+
+
+class AudioFrame:
+    """
+    An audio chunk sent as a binary websocket message instead of a base64 string inside a JSON event.
+
+    A frame is a 9 byte header, the stream id, optional JSON metadata and the raw audio::
+
+        version     u8      AUDIO_FRAME_VERSION
+        type        u8      AudioFrameType
+        flags       u8      FLAG_FINAL, FLAG_METADATA
+        codec       u8      AudioCodec
+        sequence    u32     index of the chunk in its stream
+        id length   u8      length of the utf-8 stream id that follows
+        stream id
+        [metadata length u16, metadata]     only with FLAG_METADATA, a JSON object of the remaining chunk fields
+        audio                               the rest of the message
+
+    Integers are big endian. Fields that only some chunks carry, like the settings of the first voice chunk or the
+    message id and alignment of an audio packet, go in the metadata.
+    """
+    __slots__ = ('type', 'stream_id', 'sequence', 'codec', 'is_final', 'metadata', 'audio')
+
+    def __init__(
+            self,
+            type: AudioFrameType,
+            stream_id: str,
+            sequence: int,
+            audio: bytes = b'',
+            *,
+            codec: AudioCodec = AudioCodec.UNSPECIFIED,
+            is_final: bool = False,
+            metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.type = type
+        self.stream_id = stream_id
+        self.sequence = sequence
+        self.codec = codec
+        self.is_final = is_final
+        self.metadata = metadata
+        self.audio = audio
+
+    def __repr__(self) -> str:
+        return (f'AudioFrame({self.type.name}, {self.stream_id!r}, {self.sequence}, {len(self.audio)} bytes, '
+                f'codec={self.codec.name}, is_final={self.is_final})')
+
+    def encode(self) -> bytes:
+        stream_id = self.stream_id.encode()
+        if len(stream_id) > 255:
+            raise AudioFrameError(f'Stream id is longer than 255 bytes: {self.stream_id}')
+        flags = FLAG_FINAL if self.is_final else 0
+        parts = [b'', stream_id]
+        if self.metadata:
+            flags |= FLAG_METADATA
+            metadata = json.dumps(self.metadata, separators=(',', ':')).encode()
+            if len(metadata) > 0xFFFF:
+                raise AudioFrameError(f'Frame metadata is larger than 64KB: {len(metadata)} bytes')
+            parts += [_METADATA_LENGTH.pack(len(metadata)), metadata]
+        parts[0] = _HEADER.pack(AUDIO_FRAME_VERSION, self.type, flags, self.codec, self.sequence, len(stream_id))
+        parts.append(self.audio)
+        return b''.join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes) -> 'AudioFrame':
+        try:
+            version, frame_type, flags, codec, sequence, id_length = _HEADER.unpack_from(data)
+            if version != AUDIO_FRAME_VERSION:
+                raise AudioFrameError(f'Unsupported audio frame version {version}')
+            offset = _HEADER.size + id_length
+            stream_id = data[_HEADER.size:offset].decode()
+            metadata = None
+            if flags & FLAG_METADATA:
+                (metadata_length,) = _METADATA_LENGTH.unpack_from(data, offset)
+                offset += _METADATA_LENGTH.size
+                metadata = json.loads(data[offset:offset + metadata_length])
+                offset += metadata_length
+            if offset > len(data):
+                raise AudioFrameError(f'Audio frame is truncated, {len(data)} of at least {offset} bytes')
+            return cls(
+                AudioFrameType(frame_type),
+                stream_id,
+                sequence,
+                data[offset:],
+                codec=AudioCodec(codec) if codec in AudioCodec._value2member_map_ else AudioCodec.UNSPECIFIED,
+                is_final=bool(flags & FLAG_FINAL),
+                metadata=metadata,
+            )
+        except AudioFrameError:
+            raise
+        except (struct.error, ValueError) as e:
+            raise AudioFrameError(f'Malformed audio frame: {e}') from e
+
+    @property
+    def event_type(self) -> PacketEventType | VoiceEventType:
+        return self.type.event_type
+
+    # ------------------------------------ Voice Chunks ------------------------------------ #
+
+    @classmethod
+    def of_voice_chunk(cls, chunk: VoiceChunk, event_type: VoiceEventType = VoiceEventType.VOICE_CHUNK) -> 'AudioFrame':
+        metadata = {'uid': chunk.uid, 'created_at': chunk.created_at}
+        if chunk.settings is not None:
+            metadata['settings'] = chunk.settings.model_dump(exclude_none=True)
+        return cls(
+            AudioFrameType.VOICE_END if event_type == VoiceEventType.VOICE_END else AudioFrameType.VOICE_CHUNK,
+            chunk.stream_id,
+            chunk.index,
+            chunk.get_audio() or b'',
+            codec=AudioCodec.from_format(chunk.settings.format) if chunk.settings else AudioCodec.UNSPECIFIED,
+            is_final=chunk.is_final,
+            metadata=metadata,
+        )
+
+    def to_voice_chunk(self) -> VoiceChunk:
+        """The VoiceChunk the client sent, with its raw audio in ``audio_bytes``. Frames without metadata are dated now."""
+        if self.type not in (AudioFrameType.VOICE_CHUNK, AudioFrameType.VOICE_END):
+            raise AudioFrameError(f'{self.type.name} frames do not carry voice chunks')
+        return VoiceChunk.model_validate({
+            'created_at': datetime.now().isoformat(),
+            **(self.metadata or {}),
+            'stream_id': self.stream_id,
+            'index': self.sequence,
+            'is_final': self.is_final,
+            'audio_bytes': self.audio,
+        })
+
+    # ------------------------------------ Audio Packets ------------------------------------ #
+
+    @classmethod
+    def of_audio_chunk(cls, chunk: MessageAudioChunk, codec: AudioCodec = AudioCodec.UNSPECIFIED) -> 'AudioFrame':
+        metadata: Dict[str, Any] = {'message_id': chunk.message_id}
+        if chunk.normalized_alignment is not None:
+            metadata['normalized_alignment'] = chunk.normalized_alignment.model_dump()
+        return cls(
+            AudioFrameType.AUDIO_PACKET,
+            chunk.message_audio_id,
+            chunk.index,
+            # Voices stream their audio base64 encoded, it is decoded once here instead of by every client
+            base64.b64decode(chunk.audio) if chunk.audio else b'',
+            codec=codec,
+            is_final=chunk.is_final,
+            metadata=metadata,
+        )
+
+    def to_audio_chunk(self) -> MessageAudioChunk:
+        if self.type != AudioFrameType.AUDIO_PACKET:
+            raise AudioFrameError(f'{self.type.name} frames do not carry audio packets')
+        metadata = self.metadata or {}
+        return MessageAudioChunk(
+            index=self.sequence,
+            message_id=metadata.get('message_id', ''),
+            message_audio_id=self.stream_id,
+            audio=base64.b64encode(self.audio).decode() if self.audio else None,
+            normalized_alignment=metadata.get('normalized_alignment'),
+            is_final=self.is_final,
+        )
@@ -0,0 +1,257 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Coroutine, Deque, Dict, List, Optional
+
+from src.settings.websocket import SlowConsumerPolicy, WebSocketSendQueueSettings
+from .models import PacketEventType, PacketStreamChunkEvent
+
+EVENT_OVERHEAD_BYTES = 256
+""" Estimated bytes an event adds around its text or audio once serialized. """
+
+
+def estimate_size(item: Any) -> int:
+    """Approximate size of an event or message on the wire, from its text or audio and a fixed overhead."""
+    data = getattr(item, 'data', None)
+    size = EVENT_OVERHEAD_BYTES
+    for field in ('content', 'audio'):
+        value = getattr(data, field, None)
+        if isinstance(value, str):
+            size += len(value)
+    return size
+
+
+class OutboundMessage:
+    __slots__ = ('item', 'size', 'enqueued_at', 'sent')
+
+    def __init__(self, item: Any, size: int, enqueued_at: float, sent: Optional[asyncio.Future] = None):
+        self.item = item
+        self.size = size
+        self.enqueued_at = enqueued_at
+        self.sent = sent
+
+    @property
+    def is_partial_text(self) -> bool:
+        return getattr(self.item, 'type', None) == PacketEventType.STREAM_CHUNK
+
+    def resolve(self) -> None:
+        if self.sent is not None and not self.sent.done():
+            self.sent.set_result(None)
+
+
+class WebSocketSendQueue:
+    """
+    The outbound side of a websocket connection: events are queued in order and sent one after the other by a single
+    writer task, which is started with ``spawn`` on the first event.
+
+    The queue is bounded by the approximate bytes it holds. Once ``max_bytes`` is exceeded the slow consumer policy
+    applies: drop_oldest drops the oldest partial text chunks (the full message follows in the stream end event),
+    block makes ``put`` wait until the client caught up and disconnect calls ``on_slow_consumer`` and closes the queue.
+    Producers that cannot wait use ``put_nowait``, with the block policy their next ``put`` waits for the backlog.
+
+    Adjacent stream chunks of the same message are sent as one chunk. While chunks arrive faster than
+    ``coalesce_window``, a chunk that is alone in the queue is held for up to that long for the chunks after it, so a
+    fast token stream goes out in a few larger messages instead of one message per token. Slower streams are not held.
+    """
+
+    def __init__(
+            self,
+            send: Callable[[Any], Awaitable[None]],
+            spawn: Callable[[Coroutine[Any, Any, None]], asyncio.Task],
+            settings: WebSocketSendQueueSettings,
+            on_slow_consumer: Optional[Callable[[], None]] = None,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        self._send = send
+        self._spawn = spawn
+        self._settings = settings
+        self._on_slow_consumer = on_slow_consumer
+        self._clock = clock
+
+        self._queue: Deque[OutboundMessage] = deque()
+        self._bytes = 0
+        self._closed = False
+        self._writer: Optional[asyncio.Task] = None
+        self._last_chunk_at = float('-inf')
+        self._chunk_interval = float('inf')
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+
+        self._latencies: Deque[float] = deque(maxlen=settings.latency_samples)
+        self._max_depth = 0
+        self._max_bytes = 0
+        self._counters: Dict[str, int] = dict.fromkeys(
+            ('enqueued', 'sent', 'messages', 'coalesced', 'dropped', 'blocked', 'errors', 'slow_consumer'), 0)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._bytes
+
+    def put_nowait(self, item: Any) -> Optional[OutboundMessage]:
+        """Queue an event without waiting. Returns None if the queue is closed or the event closed it."""
+        return self._put(item, None)
+
+    async def put(self, item: Any, wait_sent: bool = False) -> None:
+        """Queue an event, waiting for room with the block policy and, with ``wait_sent``, until it was sent."""
+        if self._settings.slow_consumer_policy == SlowConsumerPolicy.BLOCK and not self._space.is_set():
+            self._counters['blocked'] += 1
+            while not self._closed and not self._space.is_set():
+                await self._space.wait()
+
+        sent = asyncio.get_running_loop().create_future() if wait_sent else None
+        message = self._put(item, sent)
+        if message is not None and sent is not None:
+            await sent
+
+    def _put(self, item: Any, sent: Optional[asyncio.Future]) -> Optional[OutboundMessage]:
+        if self._closed:
+            return None
+
+        message = OutboundMessage(item, estimate_size(item), self._clock(), sent)
+        if message.is_partial_text:
+            self._chunk_interval = message.enqueued_at - self._last_chunk_at
+            self._last_chunk_at = message.enqueued_at
+        if self._bytes + message.size > self._settings.max_bytes:
+            policy = self._settings.slow_consumer_policy
+            if policy == SlowConsumerPolicy.DROP_OLDEST:
+                self._drop_partial_text(self._bytes + message.size - self._settings.max_bytes)
+            elif policy == SlowConsumerPolicy.DISCONNECT:
+                self._counters['slow_consumer'] += 1
+                self.close()
+                if self._on_slow_consumer is not None:
+                    self._on_slow_consumer()
+                return None
+
+        self._queue.append(message)
+        self._bytes += message.size
+        self._counters['enqueued'] += 1
+        self._max_depth = max(self._max_depth, len(self._queue))
+        self._max_bytes = max(self._max_bytes, self._bytes)
+        if self._bytes > self._settings.max_bytes:
+            self._space.clear()
+
+        self._wakeup.set()
+        if self._writer is None:
+            self._writer = self._spawn(self._run())
+        return message
+
+    def _drop_partial_text(self, excess: int) -> None:
+        """Drop the oldest stream chunks until ``excess`` bytes are freed. Other events are never dropped."""
+        kept: Deque[OutboundMessage] = deque()
+        for message in self._queue:
+            if excess > 0 and message.is_partial_text:
+                excess -= message.size
+                self._bytes -= message.size
+                self._counters['dropped'] += 1
+                message.resolve()
+            else:
+                kept.append(message)
+        self._queue = kept
+
+    async def _run(self) -> None:
+        try:
+            while not self._closed:
+                if not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                head = self._queue[0]
+                window = self._settings.coalesce_window
+                if (len(self._queue) == 1 and head.is_partial_text and not head.item.data.is_final
+                        and self._chunk_interval < window):
+                    delay = head.enqueued_at + window - self._clock()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                        if not self._queue or self._queue[0] is not head:
+                            continue
+
+                batch = self._take_batch()
+                item = batch[0].item if len(batch) == 1 else self._coalesce(batch)
+                try:
+                    await self._send(item)
+                except Exception:
+                    self._counters['errors'] += 1
+                finally:
+                    for message in batch:
+                        message.resolve()
+
+                now = self._clock()
+                self._counters['sent'] += 1
+                self._counters['messages'] += len(batch)
+                self._latencies.extend(now - message.enqueued_at for message in batch)
+        finally:
+            self._writer = None
+            self.close()
+
+    def _take_batch(self) -> List[OutboundMessage]:
+        """The head of the queue, with the stream chunks of the same message right behind it if it is one."""
+        head = self._queue.popleft()
+        batch = [head]
+        if head.is_partial_text:
+            message_id = head.item.data.message_id
+            length = len(head.item.data.content)
+            while self._queue and not batch[-1].item.data.is_final:
+                next_message = self._queue[0]
+                if not next_message.is_partial_text or next_message.item.data.message_id != message_id:
+                    break
+                length += len(next_message.item.data.content)
+                if length > self._settings.coalesce_max_bytes:
+                    break
+                batch.append(self._queue.popleft())
+
+        self._bytes -= sum(message.size for message in batch)
+        if self._bytes <= self._settings.max_bytes:
+            self._space.set()
+        return batch
+
+    def _coalesce(self, batch: List[OutboundMessage]) -> PacketStreamChunkEvent:
+        """One chunk with the content of the batch, keeping the index of the first chunk."""
+        self._counters['coalesced'] += len(batch) - 1
+        first, last = batch[0].item.data, batch[-1].item.data
+        return PacketStreamChunkEvent(data=first.model_copy(update={
+            'content': ''.join(message.item.data.content for message in batch),
+            'is_final': last.is_final,
+        }))
+
+    def close(self) -> None:
+        """Stop sending. Queued events are dropped, the writer is cancelled and anyone waiting is released."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+        for message in self._queue:
+            message.resolve()
+        self._queue.clear()
+        self._bytes = 0
+        self._space.set()
+        self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 3) if latencies else 0.0
+
+        return {
+            **self._counters,
+            'depth': len(self._queue),
+            'bytes': self._bytes,
+            'max_depth': self._max_depth,
+            'max_bytes': self._max_bytes,
+            'closed': self._closed,
+            'send_latency_ms': {
+                'p50': percentile(0.50),
+                'p99': percentile(0.99),
+                'max': round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            },
+        }
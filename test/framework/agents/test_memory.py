@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 import pytest
 from src.framework.runnables.agents.memory import ConversationMemory, ConversationSummaryMemory
 from src.framework.models import Message, MessageRole
@@ -56,3 +59,146 @@ class TestMemory:
         assert memory.moving_summary_buffer != ""
         print(memory.to_string())
 
+
+
+class CountingSummaryMemory(ConversationSummaryMemory):
+    def predict_new_summary(self, messages, existing_summary):
+        return f'summary of {len(messages)} messages'
+
+
+def count_words(text: str) -> int:
+    count_words.calls += 1
+    return len(text.split())
+
+
+count_words.calls = 0
+
+
+class TestSummaryMemoryTokenAccounting:
+    def _memory(self, **kwargs) -> ConversationSummaryMemory:
+        count_words.calls = 0
+        return CountingSummaryMemory(token_counter=count_words, **kwargs)
+
+    def test_messages_are_tokenized_once(self):
+        memory = self._memory(max_buffer_tokens=10_000)
+        for i in range(200):
+            memory.save(Message.from_user(f'message number {i}', author_name='testing_user'))
+
+        assert count_words.calls == 200
+        assert memory.get_token_count() == sum(count_words(f'{m.to_string()}\n') for m in memory.messages)
+
+    def test_prune_keeps_running_total(self):
+        memory = self._memory(max_buffer_tokens=60, summarize_message_batch=2)
+        memory.save(Message.from_system('you are a helpful assistant'))
+        for i in range(100):
+            memory.save(Message.from_user(f'a b c d e {i}', author_name='testing_user'))
+            # The summary is inserted after pruning, so it may overshoot by its own size
+            assert memory.get_token_count() <= 60 + len(f'{memory.messages[1].to_string()}\n'.split())
+
+        assert memory.messages[0].is_from(MessageRole.system)
+        assert memory.messages[1].is_from(MessageRole.summary)
+        assert sum(1 for m in memory.messages if m.is_from(MessageRole.summary)) == 1
+        assert memory.get_token_count() == sum(len(f'{m.to_string()}\n'.split()) for m in memory.messages)
+        # One count per saved message plus one per inserted summary, never a recount of the buffer
+        assert count_words.calls < 2 * 101
+
+    def test_headroom(self):
+        memory = self._memory(max_buffer_tokens=20)
+        memory.save(Message.from_user('one two three', author_name='testing_user'))
+        used = memory.get_token_count()
+
+        assert memory.token_headroom == 20 - used
+        assert memory.fits(Message.from_user('four', author_name='testing_user'))
+        assert not memory.fits(Message.from_user('word ' * 30, author_name='testing_user'))
+
+    def test_direct_assignment_is_recounted(self):
+        memory = self._memory()
+        memory.save(Message.from_user('one two three', author_name='testing_user'))
+        memory.messages = []
+        assert memory.get_token_count() == 0
+
+        memory.clear()
+        assert memory.get_token_count() == 0
+
+    def test_same_length_assignment_is_recounted(self):
+        memory = self._memory()
+        memory.save(Message.from_user('one two three', author_name='testing_user'))
+        memory.messages = [Message.from_user('one two three four five six', author_name='testing_user')]
+
+        assert memory.get_token_count() == len(f'{memory.messages[0].to_string()}\n'.split())
+
+
+class SlowSummaryMemory(ConversationSummaryMemory):
+    """Summarizes through a stub generator that takes ``delay`` seconds, like a real LLM call."""
+
+    delay: float = 0.3
+    calls: int = 0
+
+    async def predict_new_summary_async(self, messages, existing_summary):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f'{existing_summary} +{len(messages)}'.strip()
+
+
+@pytest.mark.asyncio
+class TestSummaryMemoryBackgroundSummary:
+    def _memory(self) -> SlowSummaryMemory:
+        return SlowSummaryMemory(token_counter=lambda text: len(text.split()), max_buffer_tokens=40, summarize_message_batch=2)
+
+    async def test_other_sessions_keep_streaming(self):
+        memory = self._memory()
+        gaps = []
+
+        async def stream_other_session():
+            last = time.perf_counter()
+            for _ in range(40):
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        streaming = asyncio.create_task(stream_other_session())
+        save_times = []
+        for i in range(20):
+            start = time.perf_counter()
+            memory.save(Message.from_user(f'a b c d e f {i}', author_name='testing_user'))
+            save_times.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+        await streaming
+
+        assert max(save_times) < 0.05
+        assert max(gaps) < 0.1
+
+    async def test_serves_unsummarized_tail_until_committed(self):
+        memory = self._memory()
+        memory.save(Message.from_system('system prompt'))
+        for i in range(10):
+            memory.save(Message.from_user(f'a b c d e f {i}', author_name='testing_user'))
+
+        assert memory.pending_summary_count > 0
+        loaded = memory.load()
+        assert loaded[0].is_from(MessageRole.system)
+        assert [m.content for m in loaded if m.is_from(MessageRole.user)] == [f'a b c d e f {i}' for i in range(10)]
+
+        await memory.wait_for_summary()
+        assert memory.pending_summary_count == 0
+        loaded = memory.load()
+        assert loaded[1].is_from(MessageRole.summary)
+        assert loaded[1].content == memory.moving_summary_buffer
+        assert len(loaded) == len(memory.messages)
+
+    async def test_concurrent_prunes_coalesce(self):
+        memory = self._memory()
+        for i in range(10):
+            memory.save(Message.from_user(f'a b c d e f {i}', author_name='testing_user'))
+        await asyncio.sleep(0.05)
+        for i in range(10, 30):
+            memory.save(Message.from_user(f'a b c d e f {i}', author_name='testing_user'))
+            await asyncio.sleep(0)
+        await memory.wait_for_summary()
+
+        # One call for the first prunes, one for everything pruned while it was running
+        assert memory.calls == 2
+        assert sum(1 for m in memory.messages if m.is_from(MessageRole.summary)) == 1
+        summarized = sum(int(part) for part in memory.moving_summary_buffer.split('+') if part.strip())
+        assert summarized + sum(1 for m in memory.messages if m.is_from(MessageRole.user)) == 30
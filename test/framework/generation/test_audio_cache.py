@@ -0,0 +1,120 @@
+import asyncio
+import base64
+
+import pytest
+
+from src.framework.runnables.generators.audio import AudioCache, AudioGenerationParams, AudioResponse
+from src.framework.runnables.generators.audio.cache import audio_cache_key, join_chunks
+
+PARAMS = AudioGenerationParams()
+
+
+def response_of(size: int) -> AudioResponse:
+    return AudioResponse(audio=base64.b64encode(bytes(range(256)) * (size // 256)).decode())
+
+
+def test_keys_ignore_whitespace_but_not_voices():
+    other_voice = PARAMS.model_copy(update={'voice_id': 'other'})
+    assert audio_cache_key('Hello  there\n', PARAMS) == audio_cache_key(' Hello there', PARAMS)
+    assert audio_cache_key('Hello there', PARAMS) != audio_cache_key('Hello there', other_voice)
+
+
+@pytest.mark.asyncio
+class TestAudioCache:
+
+    async def test_disk_entries_outlive_the_memory_front(self, tmp_path):
+        key = audio_cache_key('Welcome back', PARAMS)
+        await AudioCache(tmp_path).put(key, response_of(4096))
+
+        cache = AudioCache(tmp_path)
+        assert (await cache.get(key)).audio == response_of(4096).audio
+        assert (await cache.get(key)).audio == response_of(4096).audio
+        stats = cache.stats()
+        assert stats['disk_hits'] == 1 and stats['memory_hits'] == 1
+
+    async def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = AudioCache(tmp_path, max_memory_bytes=12_000, max_disk_bytes=20_000)
+        keys = [audio_cache_key(f'Line {index}', PARAMS) for index in range(3)]
+        await cache.put(keys[0], response_of(6144))
+        await cache.put(keys[1], response_of(6144))
+        await cache.get(keys[0])
+        await cache.put(keys[2], response_of(6144))
+
+        assert await cache.get(keys[1]) is None
+        assert await cache.get(keys[0]) is not None and await cache.get(keys[2]) is not None
+        stats = cache.stats()
+        assert stats['disk_evictions'] == 1 and stats['memory_bytes'] <= 12_000
+        assert len(list(tmp_path.glob('*/*.json'))) == 2
+
+    async def test_concurrent_misses_generate_once(self, tmp_path):
+        cache = AudioCache(tmp_path)
+        calls = 0
+
+        async def generate() -> AudioResponse:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return response_of(1024)
+
+        responses = await asyncio.gather(*(cache.get_or_generate('Good morning', PARAMS, generate) for _ in range(5)))
+        assert calls == 1 and len({response.audio for response in responses}) == 1
+
+    async def test_concurrent_streams_share_one_generation(self, tmp_path):
+        cache = AudioCache(tmp_path)
+        calls = 0
+
+        async def generate():
+            nonlocal calls
+            calls += 1
+            async for chunk in AudioCache.replay(response_of(4096), 1024):
+                await asyncio.sleep(0.001)
+                yield chunk
+
+        async def stream():
+            return [chunk async for chunk in cache.stream('Good morning', PARAMS, generate)]
+
+        streams = await asyncio.gather(*(stream() for _ in range(4)))
+        assert calls == 1 and all(chunks == streams[0] for chunks in streams)
+        assert join_chunks(streams[0]).audio == response_of(4096).audio
+
+        assert join_chunks(await stream()).audio == response_of(4096).audio
+        assert calls == 1 and cache.stats()['shared_streams'] == 3
+
+        # The generation is written to disk after the streams following it ended
+        await cache.flush()
+        assert len(list(tmp_path.glob('*/*.json'))) == 1
+
+    async def test_abandoned_streams_cancel_the_generation(self, tmp_path):
+        cache = AudioCache(tmp_path)
+        cancelled = asyncio.Event()
+
+        async def generate():
+            try:
+                async for chunk in AudioCache.replay(response_of(4096), 256):
+                    await asyncio.sleep(0.01)
+                    yield chunk
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        streams = [cache.stream('Good morning', PARAMS, generate) for _ in range(2)]
+        for stream in streams:
+            await anext(stream)
+        await streams[0].aclose()
+        assert not cancelled.is_set()
+
+        await streams[1].aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await cache.flush()
+        assert cache.stats()['cancelled_streams'] == 1
+        assert await cache.get(audio_cache_key('Good morning', PARAMS)) is None
+
+    async def test_replay_streams_chunks_like_a_live_generation(self):
+        response = response_of(5000)
+        chunks = [chunk async for chunk in AudioCache.replay(response, 2048)]
+
+        assert chunks[0].is_start and chunks[-1].is_final
+        assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+        audio = b''.join(base64.b64decode(chunk.audio) for chunk in chunks if chunk.audio)
+        assert audio == base64.b64decode(response.audio)
+        assert join_chunks(chunks).audio == response.audio
@@ -0,0 +1,136 @@
+import asyncio
+import base64
+import json
+from typing import AsyncIterator
+
+import pytest
+import websockets
+
+from src.framework.runnables.generators.audio.services.eleven_labs.client import ElevenLabsClient
+from src.framework.runnables.generators.audio.services.eleven_labs.transport import ElevenLabsTransport, StreamKey
+
+KEY = StreamKey('voice', 'eleven_turbo_v2', 'mp3_44100_128', 1)
+
+
+class StreamInputServer:
+    """Answers every text of a stream-input websocket with its bytes as audio, like ElevenLabs ends on empty text."""
+
+    def __init__(self):
+        self.connections = 0
+        self.paths = []
+        self._server = None
+
+    @property
+    def ws_url_base(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'ws://{host}:{port}/v1'
+
+    async def __aenter__(self) -> 'StreamInputServer':
+        self._server = await websockets.serve(self._handle, '127.0.0.1', 0)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, websocket) -> None:
+        self.connections += 1
+        self.paths.append(websocket.request.path)
+        async for message in websocket:
+            data = json.loads(message)
+            if 'xi_api_key' in data:
+                continue
+            if data['text'] == '':
+                await websocket.send(json.dumps({'isFinal': True}))
+                return
+            await websocket.send(json.dumps({'audio': base64.b64encode(data['text'].encode()).decode()}))
+
+
+async def words(text: str) -> AsyncIterator[str]:
+    for word in text.split():
+        yield f'{word} '
+
+
+async def wait_for_warm(transport: ElevenLabsTransport, count: int = 1) -> None:
+    while transport.stats()['warm'].get(f'{KEY.voice_id}/{KEY.model_id}', 0) < count:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+class TestElevenLabsTransport:
+
+    async def test_generations_take_prewarmed_sockets(self):
+        async with StreamInputServer() as server:
+            transport = ElevenLabsTransport(ws_url_base=server.ws_url_base)
+            transport.prewarm(KEY)
+            await wait_for_warm(transport)
+            assert server.connections == 1 and 'inactivity_timeout' in server.paths[0]
+
+            websocket = await transport.acquire(KEY)
+            await websocket.close()
+            await wait_for_warm(transport)
+            stats = transport.stats()
+            assert stats['warm_hits'] == 1 and stats['cold_connects'] == 0 and server.connections == 2
+            await transport.aclose()
+
+    async def test_expired_sockets_are_replaced(self):
+        now = [0.0]
+        async with StreamInputServer() as server:
+            transport = ElevenLabsTransport(ws_url_base=server.ws_url_base, clock=lambda: now[0])
+            transport.prewarm(KEY)
+            await wait_for_warm(transport)
+
+            now[0] += transport.warm_socket_max_idle
+            websocket = await transport.acquire(KEY)
+            await websocket.close()
+            stats = transport.stats()
+            assert stats['expired'] == 1 and stats['warm_hits'] == 0 and stats['cold_connects'] == 1
+            await transport.aclose()
+
+    async def test_full_duplex_stream_uses_a_warm_socket(self):
+        async with StreamInputServer() as server:
+            transport = ElevenLabsTransport(ws_url_base=server.ws_url_base)
+            client = ElevenLabsClient('key', transport=transport)
+            client.prewarm(*KEY)
+            await wait_for_warm(transport)
+
+            chunks = [chunk async for chunk in client.generate_async_stream_full_duplex(
+                words('Hello there world'), KEY.voice_id, None, KEY.model_id, KEY.output_format, KEY.latency, 2048, None)]
+
+            audio = b''.join(base64.b64decode(chunk.audio) for chunk in chunks if chunk.audio)
+            assert audio.split() == [b'Hello', b'there', b'world']
+            assert chunks[0].is_start and chunks[-1].is_final
+            assert transport.stats()['warm_hits'] == 1
+            await transport.aclose()
+
+    async def test_clients_have_their_own_headers(self):
+        first, second = ElevenLabsClient('first'), ElevenLabsClient('second')
+        assert first.headers['xi-api-key'] == 'first' and second.headers['xi-api-key'] == 'second'
+        assert 'xi-api-key' not in ElevenLabsClient.default_headers
+
+    async def test_sockets_opened_for_a_dropped_voice_are_closed(self):
+        opened = asyncio.Event()
+        release = asyncio.Event()
+        closed = []
+
+        class FakeWebsocket:
+            async def close(self):
+                closed.append(self)
+
+        async def connect(uri, **kwargs):
+            opened.set()
+            await release.wait()
+            return FakeWebsocket()
+
+        transport = ElevenLabsTransport(ws_url_base='ws://localhost/v1', connect=connect)
+        transport.prewarm(KEY)
+        await opened.wait()
+
+        # The voice goes cold while its warm socket is still connecting
+        transport._sockets.pop(KEY)
+        release.set()
+        await transport._fills[KEY]
+
+        assert len(closed) == 1
+        assert KEY not in transport._sockets
+        await transport.aclose()
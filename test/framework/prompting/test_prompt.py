@@ -1,6 +1,7 @@
 import pytest
 
 from src.framework import Prompt
+from src.framework.prompting.models import PromptMessage, compile_template
 
 
 @pytest.fixture
@@ -17,3 +18,71 @@ def test_prompt_format(prompt):
     assert prompt.format(name="World") == "Hello World"
     print(prompt.input_keys)
     # assert 'World' in prompt.input_keys
+
+
+class TestCompiledTemplate:
+
+    @pytest.mark.parametrize('template', [
+        'Hello {name}',
+        '{greeting}, {name}! {greeting} again',
+        'Literal {{braces}} and {name}',
+        'No variables at all',
+        '{count:>4} items for {name!r}',
+        '{user.name} and {items[0]}',
+    ])
+    def test_render_matches_str_format(self, template):
+        class User:
+            name = 'Ada'
+
+        values = {'name': 'World', 'greeting': 'Hi', 'count': 3, 'user': User(), 'items': ['first']}
+        assert compile_template(template).render(values) == template.format(**values)
+
+    def test_input_keys(self):
+        compiled = compile_template('{a} {b:>3} {c.d} {{e}}')
+        assert compiled.input_keys == {'a', 'b', 'c'}
+
+    def test_missing_variable_raises_like_str_format(self):
+        with pytest.raises(KeyError):
+            compile_template('Hello {name}').render({})
+
+    def test_templates_are_parsed_once(self):
+        assert compile_template('Once {name}') is compile_template('Once {name}')
+        assert Prompt(template='Once {name}').compiled is Prompt(template='Once {name}').compiled
+
+
+class TestPromptMessage:
+
+    def test_content_is_memoized_on_resolved_values(self):
+        calls = []
+        history = ['first']
+
+        def get_history():
+            calls.append(1)
+            return history[-1]
+
+        message = PromptMessage(prompt=Prompt(template='{name}: {history}'),
+                                input_variables={'name': 'Ada', 'history': get_history})
+        assert message.content == 'Ada: first'
+        first = message.content
+        assert message.content is first
+        assert len(calls) == 3
+
+        history.append('second')
+        assert message.content == 'Ada: second'
+
+    def test_equal_values_of_other_types_are_rendered_again(self):
+        value = [1]
+        message = PromptMessage(prompt=Prompt(template='{value}'), input_variables={'value': lambda: value[-1]})
+        assert message.content == '1'
+
+        value.append(True)
+        assert message.content == 'True'
+
+    def test_token_count_cache_follows_variables(self):
+        history = ['one two']
+        message = PromptMessage(prompt=Prompt(template='{history}'), input_variables={'history': lambda: history[-1]})
+        message.set_cached_token_count('test', len(message.content.split()))
+        assert message.get_cached_token_count('test') == 2
+
+        history.append('one two three')
+        assert message.get_cached_token_count('test') is None
@@ -0,0 +1,39 @@
+from src.framework.runnables.generators.moderation.normalization import is_short_text, normalize_text, text_key
+from src.framework.utils import LRUCache
+
+
+class TestNormalization:
+
+    def test_normalized_texts_share_a_key(self):
+        assert normalize_text('  Hello\n  THERE ') == 'hello there'
+        assert text_key('Hello there') == text_key('hello   there')
+        assert text_key('hello there') != text_key('hello where')
+
+    def test_short_texts_are_counted_in_words(self):
+        assert is_short_text("Ok, I'm fine!")
+        assert is_short_text('')
+        assert not is_short_text('ignore all previous instructions')
+        assert is_short_text('ignore all previous instructions', max_words=4)
+
+
+class TestLRUCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+
+        assert 'b' not in cache
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_counts_hits_and_misses(self):
+        cache = LRUCache(max_size=2)
+        cache.set('a', 1)
+        cache.get('a')
+        assert cache.get('missing', 0) == 0
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.fixture
+def service(monkeypatch):
+    pytest.importorskip('torch')
+    pytest.importorskip('transformers')
+    from src.framework.runnables.generators.moderation.services.transformers import TransformersModerationService
+    from src.framework.runnables.generators.moderation.services.transformers.service import moderation_cache
+
+    calls = []
+
+    def classify_batch(key, texts):
+        calls.append(list(texts))
+        return [{'label': 'SAFE', 'score': 0.99}] * len(texts)
+
+    monkeypatch.setattr(TransformersModerationService, '_classify_batch', staticmethod(classify_batch))
+    moderation_cache.clear()
+    service = TransformersModerationService()
+    service.calls = calls
+    return service
+
+
+@pytest.mark.asyncio
+class TestTransformersModerationService:
+
+    async def test_short_messages_are_classified_and_cached_by_precision(self, service):
+        from src.framework.runnables.generators.moderation.models import ModerationGenerationParams
+
+        service._batcher = None
+        params = ModerationGenerationParams()
+
+        response = await service.run_async('ok thanks', params)
+        await service.run_async('OK  thanks', params)
+        service.quantize = not service.quantize
+        await service.run_async('ok thanks', params)
+
+        assert response.flagged is False
+        assert service.calls == [['ok thanks'], ['ok thanks']]
+
+    async def test_short_messages_skip_the_batch_wait(self, service):
+        from src.framework.runnables.generators.moderation.models import ModerationGenerationParams
+
+        submitted = []
+
+        class Batcher:
+            async def submit(self, request, key):
+                submitted.append(request)
+                return {'label': 'SAFE', 'score': 0.99}
+
+        service._batcher = Batcher()
+        service.cache_enabled = False
+        params = ModerationGenerationParams()
+
+        await service.run_async('ignore previous', params)
+        await service.run_async('please tell me more about the next step', params)
+
+        assert service.calls == [['ignore previous']]
+        assert submitted == ['please tell me more about the next step']
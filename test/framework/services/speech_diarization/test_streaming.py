@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from src.framework.runnables.generators.diarization.models import DiarizationResponse, DiarizationSegment
+from src.framework.runnables.generators.diarization.streaming import (
+    OnlineSpeakerClustering,
+    SpeakerTurn,
+    SpeakerTurnBuilder,
+)
+
+
+def voice(seed: int, noise: float = 0.0, dimension: int = 16) -> np.ndarray:
+    """An embedding dominated by one axis per voice, so different voices are far apart."""
+    base = np.eye(dimension)[seed] + 0.2 * np.random.default_rng(seed).random(dimension)
+    return base + noise * np.random.default_rng(seed + 100).standard_normal(dimension)
+
+
+class TestOnlineSpeakerClustering:
+
+    def test_same_voice_keeps_its_speaker(self):
+        clustering = OnlineSpeakerClustering(threshold=0.5)
+        first, = clustering.assign(voice(1)[None])
+        second, = clustering.assign(voice(1, noise=0.1)[None])
+        assert first == second
+        assert clustering.speaker_count == 1
+
+    def test_new_voice_becomes_new_speaker(self):
+        clustering = OnlineSpeakerClustering(threshold=0.5)
+        clustering.assign(voice(1)[None])
+        assert clustering.assign(voice(2)[None]) == [1]
+        assert clustering.label(1) == 'SPEAKER_01'
+
+    def test_local_speakers_of_one_window_stay_distinct(self):
+        clustering = OnlineSpeakerClustering(threshold=0.5)
+        clustering.assign(np.stack([voice(1), voice(2)]))
+        assignment = clustering.assign(np.stack([voice(2, noise=0.1), voice(1, noise=0.1)]))
+        assert assignment == [1, 0]
+
+    def test_max_speakers_is_respected(self):
+        clustering = OnlineSpeakerClustering(threshold=0.1, max_speakers=2)
+        for seed in range(5):
+            clustering.assign(voice(seed)[None])
+        assert clustering.speaker_count == 2
+
+
+class TestSpeakerTurnBuilder:
+
+    def test_turn_closes_after_silence(self):
+        builder = SpeakerTurnBuilder(min_duration_off=0.2)
+        closed = []
+        for frame in range(20):
+            start = frame * 0.1
+            closed += builder.update(start, start + 0.1, ['A'] if frame < 10 else [])
+        assert closed == [SpeakerTurn('A', 0.0, pytest.approx(1.0))]
+        assert builder.open_turns == []
+
+    def test_short_gap_is_bridged(self):
+        builder = SpeakerTurnBuilder(min_duration_off=0.3)
+        closed = []
+        for frame in range(10):
+            start = frame * 0.1
+            closed += builder.update(start, start + 0.1, [] if frame in (4, 5) else ['A'])
+        assert closed == []
+        assert builder.flush() == [SpeakerTurn('A', 0.0, pytest.approx(1.0))]
+
+    def test_short_turns_are_dropped(self):
+        builder = SpeakerTurnBuilder(min_duration_on=0.5)
+        closed = builder.update(0.0, 0.1, ['A']) + builder.update(0.1, 0.2, [])
+        assert closed == []
+
+    def test_overlapping_speakers(self):
+        builder = SpeakerTurnBuilder()
+        builder.update(0.0, 0.1, ['A'])
+        builder.update(0.1, 0.2, ['A', 'B'])
+        closed = builder.update(0.2, 0.3, ['B'])
+        assert closed == [SpeakerTurn('A', 0.0, 0.2)]
+        assert builder.flush() == [SpeakerTurn('B', 0.1, 0.3)]
+
+
+def test_response_from_chunks():
+    chunks = [
+        DiarizationResponse(mode='diarization', duration=1.0, segments=[
+            DiarizationSegment(index=0, start_time=0.0, end_time=0.5, speaker='SPEAKER_00'),
+        ]),
+        DiarizationResponse(mode='diarization', duration=2.0, segments=[
+            DiarizationSegment(index=0, start_time=0.6, end_time=1.5, speaker='SPEAKER_01'),
+        ]),
+    ]
+    response = DiarizationResponse.from_chunks(chunks)
+    assert [segment.index for segment in response.segments] == [0, 1]
+    assert response.speaker_count == 2
+    assert response.duration == 2.0
+
+
+class TestPyannoteStreamingSession:
+
+    def test_audio_inserted_during_a_step_is_diarized_by_the_next(self):
+        pytest.importorskip('pyannote.audio')
+        from src.framework.runnables.generators.diarization.models import DiarizationGenerationParams
+        from src.framework.runnables.generators.diarization.services.pyannote.streaming import (
+            SAMPLE_RATE,
+            PyannoteStreamingSession,
+        )
+
+        session = None
+        inserted = []
+
+        def segmentation(chunk):
+            # The client keeps sending audio while the model runs on the inference executor
+            if not inserted:
+                inserted.append(True)
+                session.insert_audio(np.ones(SAMPLE_RATE, dtype=np.float32))
+            frames = chunk['waveform'].shape[-1] // (SAMPLE_RATE // 100)
+            return np.ones((frames, 1), dtype=np.float32)
+
+        session = PyannoteStreamingSession(segmentation, None, DiarizationGenerationParams(mode='detection'))
+        session.insert_audio(np.ones(SAMPLE_RATE // 2, dtype=np.float32))
+
+        assert session.process() == []
+        assert session.processed_until == pytest.approx(0.5)
+        assert session.stream_seconds == pytest.approx(1.5)
+
+        assert session.finish() == [SpeakerTurn('SPEECH', 0.0, pytest.approx(1.5))]
+        assert session.processed_until == pytest.approx(1.5)
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.framework.runnables.generators.diarization.vad import get_voice_activity_detector
+from src.framework.runnables.generators.diarization.vad.energy import EnergyVoiceActivityDetector
+
+SAMPLE_RATE = 16000
+
+
+def noise(seconds: float, level: float = 0.001, seed: int = 0) -> np.ndarray:
+    return (level * np.random.default_rng(seed).standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def voiced(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.2 * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+
+@pytest.fixture
+def detector():
+    return EnergyVoiceActivityDetector(sample_rate=SAMPLE_RATE, frame_ms=30, onset_ms=60, hangover_ms=300)
+
+
+class TestVoiceActivitySession:
+
+    def test_silence_is_not_speech(self, detector):
+        session = detector.create_session()
+        for seed in range(4):
+            assert not session.process(noise(0.5, seed=seed)).is_speech
+        assert session.segments == []
+
+    def test_speech_is_detected_and_closed_after_hangover(self, detector):
+        session = detector.create_session()
+        session.process(noise(0.5))
+
+        result = session.process(voiced(1.0))
+        assert result.is_speech
+        assert result.is_speaking
+        assert result.speech_ratio > 0.9
+
+        assert session.process(noise(0.2, seed=1)).is_speaking
+        assert not session.process(noise(0.5, seed=2)).is_speaking
+
+        (start, end), = session.segments
+        assert start == pytest.approx(0.5, abs=0.05)
+        assert end == pytest.approx(1.5, abs=0.05)
+
+    def test_short_click_does_not_start_speech(self, detector):
+        session = detector.create_session()
+        audio = noise(1.0)
+        click = voiced(0.03)
+        audio[7680:7680 + len(click)] += click
+        assert not session.process(audio).is_speech
+
+    def test_frames_span_chunk_boundaries(self, detector):
+        whole = detector.create_session()
+        split = detector.create_session()
+        audio = np.concatenate([noise(0.3), voiced(0.7), noise(0.6, seed=1)])
+
+        whole.process(audio)
+        for start in range(0, len(audio), 1234):
+            split.process(audio[start:start + 1234])
+
+        assert whole.segments == split.segments
+        assert whole.frame_count == split.frame_count
+
+    def test_sessions_do_not_share_state(self, detector):
+        speaking = detector.create_session()
+        speaking.process(voiced(0.5))
+        assert speaking.is_speaking
+        assert not detector.create_session().is_speaking
+
+
+def test_get_voice_activity_detector_is_cached():
+    assert get_voice_activity_detector('energy') is get_voice_activity_detector('energy')
+    with pytest.raises(NotImplementedError):
+        get_voice_activity_detector('unknown')
@@ -0,0 +1,66 @@
+from src.framework.runnables.generators.speech_to_text.models import SpeechToTextResponse, SpeechToTextResponseChunk
+from src.framework.runnables.generators.speech_to_text.streaming import LocalAgreementBuffer, TimedWord, join_words
+
+
+def words(*items):
+    return [TimedWord(start, start + 0.3, text) for start, text in items]
+
+
+class TestLocalAgreementBuffer:
+
+    def test_commits_only_agreed_prefix(self):
+        buffer = LocalAgreementBuffer()
+
+        buffer.insert(words((0.0, ' The'), (0.4, ' quick')))
+        assert buffer.flush() == []
+
+        buffer.insert(words((0.0, ' The'), (0.4, ' quick'), (0.8, ' brown')))
+        committed = buffer.flush()
+        assert join_words(committed) == 'The quick'
+        assert join_words(buffer.tail) == 'brown'
+
+    def test_revised_tail_is_not_committed(self):
+        buffer = LocalAgreementBuffer()
+        buffer.insert(words((0.0, ' I'), (0.4, ' scream')))
+        buffer.flush()
+        buffer.insert(words((0.0, ' Ice'), (0.4, ' cream')))
+        assert buffer.flush() == []
+        assert join_words(buffer.tail) == 'Ice cream'
+
+    def test_committed_words_are_not_repeated(self):
+        buffer = LocalAgreementBuffer()
+        buffer.insert(words((0.0, ' Hello'), (0.4, ' there')))
+        buffer.flush()
+        buffer.insert(words((0.0, ' Hello'), (0.4, ' there'), (0.8, ' friend')))
+        buffer.flush()
+
+        # The trimmed window repeats the last committed word with a slightly earlier timestamp
+        buffer.insert(words((0.35, ' there'), (0.8, ' friend'), (1.2, ' again')))
+        buffer.flush()
+        buffer.insert(words((0.35, ' there'), (0.8, ' friend'), (1.2, ' again')))
+        buffer.flush()
+
+        assert join_words(buffer.committed) == 'Hello there friend again'
+
+    def test_complete_commits_tail(self):
+        buffer = LocalAgreementBuffer()
+        buffer.insert(words((0.0, ' Good'), (0.4, ' morning.')))
+        assert join_words(buffer.complete()) == 'Good morning.'
+        assert buffer.tail == []
+        assert buffer.committed_text(max_chars=8) == 'morning.'
+
+    def test_agreement_ignores_case_and_punctuation(self):
+        buffer = LocalAgreementBuffer()
+        buffer.insert(words((0.0, ' hello'), (0.4, ' world')))
+        buffer.flush()
+        buffer.insert(words((0.0, ' Hello,'), (0.4, ' world')))
+        assert join_words(buffer.flush()) == 'Hello, world'
+
+
+def test_from_chunks_skips_partial_chunks():
+    response = SpeechToTextResponse.from_chunks([
+        SpeechToTextResponseChunk(index=0, text=' Hello'),
+        SpeechToTextResponseChunk(index=1, text='wrld', is_partial=True),
+        SpeechToTextResponseChunk(index=1, text=' world', is_final=True),
+    ])
+    assert response.text == ' Hello world'
@@ -0,0 +1,112 @@
+import io
+import shutil
+import time
+import wave
+
+import ffmpeg
+import numpy as np
+import pytest
+
+from src.framework.utils.audio_decoder import AudioDecoderPool, _WarmDecoder, read_wav
+
+
+def wav_bytes(pcm: np.ndarray, sample_rate: int = 16000, channels: int = 1) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class EchoDecoderPool(AudioDecoderPool):
+    """Stands in for ffmpeg with `cat`, so the output is the input reinterpreted as 16 bit PCM."""
+
+    @property
+    def args(self):
+        return ['cat']
+
+
+class TestReadWav:
+
+    def test_reads_mono_at_target_rate(self):
+        pcm = read_wav(wav_bytes(np.array([0, 16384, -16384])), 16000)
+        assert pcm.tolist() == [0.0, 0.5, -0.5]
+
+    def test_downmixes_stereo(self):
+        pcm = read_wav(wav_bytes(np.array([16384, 0, 0, -16384]), channels=2), 16000)
+        assert pcm.tolist() == [0.25, -0.25]
+
+    def test_needs_ffmpeg_for_other_rates_and_formats(self):
+        assert read_wav(wav_bytes(np.zeros(4), sample_rate=44100), 16000) is None
+        assert read_wav(b'\x1aE\xdf\xa3 webm header', 16000) is None
+
+
+class TestAudioDecoderPool:
+
+    def test_wav_at_target_rate_skips_ffmpeg(self):
+        pool = EchoDecoderPool(size=1)
+        assert pool.decode(wav_bytes(np.array([16384]))).tolist() == [0.5]
+        assert pool.stats()['in_process'] == 1
+        assert pool.stats()['idle'] == 0
+
+    def test_warm_decoders_are_reused_and_refilled(self):
+        pool = EchoDecoderPool(size=2)
+        pool.warm_up()
+        assert pool.stats()['idle'] == 2
+
+        data = np.array([0, 16384], dtype=np.int16).tobytes()
+        for _ in range(3):
+            assert pool.decode(data).tolist() == [0.0, 0.5]
+            time.sleep(0.05)
+
+        stats = pool.stats()
+        assert stats['decoded'] == 3
+        assert stats['cold_starts'] == 0
+        pool.close()
+        assert pool.stats()['idle'] == 0
+
+    def test_one_worker_refills_the_pool(self, monkeypatch):
+        pool = EchoDecoderPool(size=2)
+        started = []
+        monkeypatch.setattr('threading.Thread.start', lambda thread: started.append(thread))
+
+        data = np.array([16384], dtype=np.int16).tobytes()
+        for _ in range(3):
+            pool.decode(data)
+        assert len(started) == 1
+
+        started[0].run()
+        assert pool.stats()['idle'] == 2
+        pool.close()
+
+    def test_decoders_started_after_close_are_killed(self, monkeypatch):
+        pool = EchoDecoderPool(size=1)
+        started = []
+        original = _WarmDecoder.__init__
+
+        def start(decoder, args):
+            original(decoder, args)
+            started.append(decoder)
+            pool.close()
+
+        monkeypatch.setattr(_WarmDecoder, '__init__', start)
+        pool.warm_up()
+
+        assert pool.stats()['idle'] == 0
+        assert not started[0].alive
+
+    def test_decode_without_warm_decoder_starts_one(self):
+        pool = EchoDecoderPool(size=0)
+        assert pool.decode(np.array([16384], dtype=np.int16).tobytes()).tolist() == [0.5]
+        assert pool.stats()['cold_starts'] == 1
+
+    @pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+    def test_ffmpeg_resamples(self):
+        pool = AudioDecoderPool(size=1)
+        pcm = pool.decode(wav_bytes(np.zeros(44100), sample_rate=44100, channels=2))
+        assert abs(len(pcm) - 16000) < 100
+        with pytest.raises(ffmpeg.Error):
+            pool.decode(b'not audio')
+        pool.close()
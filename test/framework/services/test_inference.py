@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.framework.exceptions import AdmissionException
+from src.framework.runnables.generators.inference import InferenceExecutor, MicroBatcher, ModelPool
+
+
+class TestInferenceExecutor:
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self):
+        executor = InferenceExecutor('test', max_workers=2)
+        assert await executor.run(lambda x: x * 2, 21) == 42
+        stats = executor.stats()
+        assert stats['completed'] == 1
+        assert stats['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_is_full(self):
+        executor = InferenceExecutor('test', max_workers=1, max_queue_depth=1)
+        release = threading.Event()
+
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(AdmissionException):
+            await executor.run(release.wait)
+
+        release.set()
+        await asyncio.gather(running, queued)
+        stats = executor.stats()
+        assert stats['rejected'] == 1
+        assert stats['peak_queue_depth'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self):
+        executor = InferenceExecutor('test', max_workers=1)
+
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            await executor.run(fail)
+        assert executor.stats()['failed'] == 1
+
+
+class TestModelPool:
+
+    def test_loads_each_key_once(self):
+        loads = []
+
+        def loader(name, device):
+            time.sleep(0.01)
+            loads.append((name, device))
+            return object()
+
+        pool = ModelPool('test', loader)
+        threads = [threading.Thread(target=pool.get, args=('base', 'cpu')) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loads == [('base', 'cpu')]
+        assert pool.get('base', 'cpu') is pool.get('base', 'cpu')
+        assert pool.get('small', 'cpu') is not pool.get('base', 'cpu')
+
+
+class TestMicroBatcher:
+
+    @pytest.mark.asyncio
+    async def test_groups_concurrent_items(self):
+        batches = []
+
+        def batch_fn(key, items):
+            batches.append((key, list(items)))
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(batch_fn, InferenceExecutor('test', max_workers=1), max_batch_size=4, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i, key='a') for i in range(6)))
+
+        assert results == [i * 10 for i in range(6)]
+        assert [len(items) for _, items in batches] == [4, 2]
+        assert batcher.stats()['items'] == 6
+
+    @pytest.mark.asyncio
+    async def test_batch_error_propagates_to_all_items(self):
+        def batch_fn(key, items):
+            raise RuntimeError('decode failed')
+
+        batcher = MicroBatcher(batch_fn, InferenceExecutor('test', max_workers=1), max_batch_size=2, max_wait_ms=5)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_close_waits_for_running_batches(self):
+        started, release = threading.Event(), threading.Event()
+
+        def batch_fn(key, items):
+            started.set()
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(batch_fn, InferenceExecutor('test', max_workers=1), max_batch_size=2, max_wait_ms=1000)
+        running = asyncio.gather(batcher.submit(1, key='a'), batcher.submit(2, key='a'))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        waiting = asyncio.ensure_future(batcher.submit(3, key='b'))
+        await asyncio.sleep(0)
+
+        closing = asyncio.ensure_future(batcher.aclose())
+        await asyncio.sleep(0.01)
+        assert not closing.done()
+        release.set()
+        await closing
+
+        assert running.result() == [1, 2]
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.framework.runnables.generators.clients import ProviderClientRegistry
+
+
+@pytest.fixture
+def registry():
+    return ProviderClientRegistry()
+
+
+class TestProviderClientRegistry:
+
+    @pytest.mark.asyncio
+    async def test_same_key_returns_same_client(self, registry):
+        first = registry.get_async_client('openai', api_key='key')
+        second = registry.get_async_client('openai', api_key='key')
+        assert first is second
+        assert registry.stats()['created'] == 1
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_different_keys_return_different_clients(self, registry):
+        openai_client = registry.get_async_client('openai', api_key='key')
+        other_key = registry.get_async_client('openai', api_key='other')
+        other_url = registry.get_async_client('openai', api_key='key', base_url='http://localhost:1/v1')
+        other_timeout = registry.get_async_client('openai', api_key='key', timeout=1.0)
+        anthropic_client = registry.get_async_client('anthropic', api_key='key')
+        assert len({id(c) for c in (openai_client, other_key, other_url, other_timeout, anthropic_client)}) == 5
+        await registry.aclose()
+
+    def test_sync_clients_are_pooled(self, registry):
+        assert registry.get_sync_client('openai', api_key='key') is registry.get_sync_client('openai', api_key='key')
+        assert registry.stats()['sync_clients'] == 1
+
+    def test_async_client_is_replaced_on_new_event_loop(self, registry):
+        async def get():
+            return registry.get_async_client('openai', api_key='key')
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+        assert first is not second
+
+    def test_replaced_async_clients_are_closed(self, registry, monkeypatch):
+        closed = []
+
+        class Client:
+            async def close(self):
+                closed.append(self)
+
+        monkeypatch.setattr(registry, '_build_client', lambda key, is_async: Client())
+
+        async def get():
+            return registry.get_async_client('openai', api_key='key')
+
+        first = asyncio.run(get())
+        second = asyncio.run(get())
+        asyncio.run(registry.aclose())
+        assert closed == [first, second]
+
+    def test_clients_of_other_running_loops_are_closed_on_their_loop(self, registry, monkeypatch):
+        closed_on = []
+
+        class Client:
+            async def close(self):
+                closed_on.append(asyncio.get_running_loop())
+
+        monkeypatch.setattr(registry, '_build_client', lambda key, is_async: Client())
+
+        async def get():
+            return registry.get_async_client('openai', api_key='key')
+
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever)
+        thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(get(), other_loop).result()
+            asyncio.run(registry.aclose())
+        finally:
+            other_loop.call_soon_threadsafe(other_loop.stop)
+            thread.join()
+            other_loop.close()
+        assert closed_on == [other_loop]
+
+    @pytest.mark.asyncio
+    async def test_aclose_clears_clients(self, registry):
+        registry.get_async_client('openai', api_key='key')
+        registry.get_sync_client('openai', api_key='key')
+        await registry.aclose()
+        assert registry.stats()['async_clients'] == 0
+        assert registry.stats()['sync_clients'] == 0
+        await registry.aclose()
+
+    def test_unknown_provider_raises(self, registry):
+        with pytest.raises(NotImplementedError):
+            registry.get_sync_client('unknown')
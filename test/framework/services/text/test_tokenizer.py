@@ -0,0 +1,86 @@
+import pytest
+
+from src.framework.models import Message
+from src.framework.runnables.generators.text.tokenizer import TokenizerRegistry
+
+
+class WhitespaceEncoding:
+    """Stands in for a tiktoken encoding, which cannot be downloaded in the test environment."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.encoded = 0
+
+    def encode(self, text, disallowed_special=()):
+        self.encoded += 1
+        return text.split()
+
+    def encode_batch(self, texts, disallowed_special=()):
+        self.encoded += len(texts)
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def loaded():
+    return []
+
+
+@pytest.fixture
+def registry(loaded):
+    def load(name):
+        loaded.append(name)
+        return WhitespaceEncoding(name)
+
+    return TokenizerRegistry(loader=load)
+
+
+class TestTokenizerRegistry:
+
+    def test_encodings_are_loaded_once_per_family(self, registry, loaded):
+        assert registry.get_encoding('gpt-4o').name == 'o200k_base'
+        assert registry.get_encoding('gpt-4o-2024-08-06') is registry.get_encoding('gpt-4o')
+        assert registry.get_encoding('claude-3-5-sonnet-20240620').name == 'cl100k_base'
+        assert registry.get_encoding('gpt-4-turbo') is registry.get_encoding('claude-3-haiku-20240307')
+        assert registry.get_encoding(None).name == 'cl100k_base'
+        assert loaded == ['o200k_base', 'cl100k_base']
+
+    def test_warm_up_ignores_failures(self, loaded):
+        def load(name):
+            if name == 'o200k_base':
+                raise ConnectionError('offline')
+            loaded.append(name)
+            return WhitespaceEncoding(name)
+
+        registry = TokenizerRegistry(loader=load)
+        registry.warm_up(['gpt-4o', 'claude-3-5-sonnet-20240620'])
+        assert loaded == ['cl100k_base']
+
+    def test_message_counts_are_cached_until_content_changes(self, registry):
+        message = Message.from_user('one two three', author_name='User')
+        encoding = registry.get_encoding('gpt-4o')
+
+        assert registry.count_tokens(message, 'gpt-4o') == 4
+        assert registry.count_tokens(message, 'gpt-4o') == 4
+        assert encoding.encoded == 1
+
+        message.content += ' four'
+        assert registry.count_tokens(message, 'gpt-4o') == 5
+        assert encoding.encoded == 2
+
+    def test_counts_are_cached_per_encoding_and_prefix(self, registry):
+        message = Message.from_user('one two three', author_name='User')
+        registry.count_tokens(message, 'gpt-4o')
+        assert message.get_cached_token_count('cl100k_base') is None
+
+        message.author_name = 'Jordan Lee'
+        assert message.get_cached_token_count('o200k_base') is None
+        assert registry.count_tokens(message, 'gpt-4o') == 5
+
+    def test_lists_batch_only_uncached_messages(self, registry):
+        messages = [Message.from_user(f'message {i}', author_name='User') for i in range(10)]
+        encoding = registry.get_encoding('gpt-4')
+        registry.count_tokens(messages[:4], 'gpt-4')
+
+        total = registry.count_tokens(messages, 'gpt-4')
+        assert total == len(Message.join_as_string(messages).split())
+        assert encoding.encoded == 10
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from src.framework import Message
+from src.scenario.base import AgentBuilder
+from src.scenario.models import AgentType
+from src.settings.scenario import ScenarioSettings
+
+
+class StubAgentBuilder(AgentBuilder):
+
+    def __init__(self, concurrency: int):
+        # Skips building the agents from the scenario config
+        self.scenario = SimpleNamespace(
+            settings=ScenarioSettings(agent_initialization_concurrency=concurrency),
+            logger=logging.getLogger('test'),
+            instance_uid='instance',
+        )
+        self.initialization_timings = {}
+        self.running = 0
+        self.max_running = 0
+
+    async def format_system_message_async(self, agent):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        with self.time_phase(agent, 'personality'):
+            await asyncio.sleep(0.02)
+        self.running -= 1
+        return Message.from_system(content=f'You are {agent.name}', author_id=agent.id), f'{agent.name} personality'
+
+    def get_scenario_instructions(self, agent) -> str:
+        return ''
+
+    def get_role_and_behaviour(self, agent) -> str:
+        return ''
+
+    def get_scenario_specific_personality_traits(self, agent) -> str:
+        return ''
+
+
+def make_agent(name: str, agent_type: AgentType = AgentType.AGENT) -> SimpleNamespace:
+    messages = []
+    return SimpleNamespace(id=name.lower(), name=name, type=agent_type, personality=None, messages=messages,
+                           add_message=messages.append)
+
+
+@pytest.mark.asyncio
+class TestAgentBuilder:
+
+    async def test_agents_are_initialized_concurrently_within_the_limit(self):
+        builder = StubAgentBuilder(concurrency=2)
+        agents = [make_agent(name) for name in ('Ada', 'Grace', 'Alan', 'Edsger', 'Barbara')]
+
+        await builder.initialize_agents(agents)
+
+        assert builder.max_running == 2
+        assert [agent.messages[0].content for agent in agents] == [f'You are {agent.name}' for agent in agents]
+        assert all(agent.personality == f'{agent.name} personality' for agent in agents)
+
+    async def test_phases_are_timed_for_each_agent(self):
+        builder = StubAgentBuilder(concurrency=1)
+        agents = [make_agent('Ada'), make_agent('Moderator', AgentType.SPECIAL_AGENT)]
+
+        await builder.initialize_agents(agents)
+
+        assert set(builder.initialization_timings['ada']) == {'queued', 'total', 'personality'}
+        assert builder.initialization_timings['ada']['personality'] >= 15
+        assert builder.initialization_timings['moderator']['queued'] >= 15
+        assert agents[1].messages[0].content == ''
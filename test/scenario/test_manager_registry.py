@@ -0,0 +1,53 @@
+import pytest
+
+from src.scenario.manager import ScenarioManager
+from src.exceptions import ScenarioOwnedByWorkerException
+from src.session_registry import MemorySessionRegistry
+
+
+@pytest.fixture
+def registry():
+    registry = MemorySessionRegistry()
+    registry.register('session', 'other-worker', '{}')
+    registry.acquire('session', 'other-worker', running=True)
+    return registry
+
+
+@pytest.mark.asyncio
+class TestScenarioManagerRegistry:
+
+    async def test_force_ending_a_session_of_another_worker_asks_the_owner(self, registry):
+        manager = ScenarioManager(registry=registry)
+
+        assert await manager.end_scenario_async('session', False) is None
+        assert registry.lookup('session').end_requested
+
+    async def test_completing_a_session_of_another_worker_names_the_owner(self, registry):
+        manager = ScenarioManager(registry=registry)
+
+        with pytest.raises(ScenarioOwnedByWorkerException) as info:
+            await manager.end_scenario_async('session', True)
+        assert info.value.worker_id == 'other-worker'
+        assert not registry.lookup('session').end_requested
+
+    async def test_unknown_sessions_are_not_found(self, registry):
+        manager = ScenarioManager(registry=registry)
+
+        assert await manager.end_scenario_async('missing', True) is None
+        assert await manager.end_scenario_async('missing', False) is None
+
+    async def test_task_snapshots_of_another_worker_name_the_owner(self, registry):
+        manager = ScenarioManager(registry=registry)
+
+        with pytest.raises(ScenarioOwnedByWorkerException) as info:
+            await manager.get_task_snapshot_async('session')
+        assert info.value.worker_id == 'other-worker'
+        with pytest.raises(ScenarioOwnedByWorkerException):
+            await manager.get_send_queue_stats_async('session')
+        assert await manager.get_task_snapshot_async('missing') is None
+
+    async def test_sessions_running_on_another_worker_are_not_acquired(self, registry):
+        manager = ScenarioManager(registry=registry)
+
+        assert await manager._acquire_scenario_async('session') is None
+        assert registry.lookup('session').worker_id == 'other-worker'
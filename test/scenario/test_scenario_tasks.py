@@ -0,0 +1,24 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.scenario import Scenario
+
+
+@pytest.mark.asyncio
+class TestScenarioTasks:
+
+    async def test_task_exceptions_are_handled_and_logged_once(self):
+        scenario = MagicMock(spec=Scenario)
+        scenario.logger = MagicMock()
+
+        async def fail():
+            raise RuntimeError('step failed')
+
+        task = asyncio.ensure_future(fail())
+        await asyncio.gather(task, return_exceptions=True)
+        Scenario.on_task_exception(scenario, task, task.exception())
+
+        scenario.handle_exception.assert_called_once_with(RuntimeError, task.exception(), task.exception().__traceback__)
+        scenario.logger.error.assert_not_called()
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from src.models.app_package.app_package import AppPackage, AppPackageData
+from src.models.app_package.snapshot import PackageSnapshot, SnapshotFormatError, write_snapshot
+from src.models.schemas import ActorSchema
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / 'app_package.bin')
+
+
+class TestPackageSnapshot:
+
+    def test_round_trip(self, snapshot_path):
+        write_snapshot(snapshot_path, 7, {
+            'actors': {'a1': b'{"uid":"a1"}', 'a2': b'{"uid":"a2"}'},
+            'package': {'image_paths': b'{}'},
+        })
+
+        snapshot = PackageSnapshot(snapshot_path)
+        try:
+            assert snapshot.version == 7
+            assert snapshot.keys('actors') == ['a1', 'a2']
+            assert snapshot.read('actors', 'a2') == b'{"uid":"a2"}'
+            assert snapshot.read('package', 'image_paths') == b'{}'
+            assert snapshot.has('actors', 'a1') and not snapshot.has('scenarios', 'a1')
+        finally:
+            snapshot.close()
+
+    def test_missing_entries(self, snapshot_path):
+        write_snapshot(snapshot_path, 1, {'actors': {}})
+
+        snapshot = PackageSnapshot(snapshot_path)
+        try:
+            assert snapshot.keys('actors') == []
+            assert snapshot.keys('scenarios') == []
+            assert snapshot.read('actors', 'a1') is None
+        finally:
+            snapshot.close()
+
+    def test_rewrite_does_not_affect_open_snapshot(self, snapshot_path):
+        write_snapshot(snapshot_path, 1, {'actors': {'a1': b'old'}})
+        snapshot = PackageSnapshot(snapshot_path)
+        try:
+            write_snapshot(snapshot_path, 2, {'actors': {'a1': b'new'}})
+            assert snapshot.read('actors', 'a1') == b'old'
+        finally:
+            snapshot.close()
+
+        snapshot = PackageSnapshot(snapshot_path)
+        try:
+            assert snapshot.version == 2 and snapshot.read('actors', 'a1') == b'new'
+        finally:
+            snapshot.close()
+        assert os.listdir(os.path.dirname(snapshot_path)) == ['app_package.bin']
+
+    def test_rejects_other_files(self, snapshot_path):
+        with open(snapshot_path, 'wb') as file:
+            file.write(b'{"version": 1, "actors": []}')
+        with pytest.raises(SnapshotFormatError):
+            PackageSnapshot(snapshot_path)
+
+        with open(snapshot_path, 'wb') as file:
+            file.write(b'QAPK')
+        with pytest.raises(SnapshotFormatError):
+            PackageSnapshot(snapshot_path)
+
+
+class TestAppPackageFromSnapshot:
+
+    def test_lookups_keep_reading_while_the_full_data_is_loaded(self, snapshot_path, monkeypatch):
+        AppPackage(AppPackageData(version=3, actors=[
+            ActorSchema(uid='a1', name='Ada', image_url=''), ActorSchema(uid='a2', name='Grace', image_url=''),
+        ])).save_snapshot(snapshot_path)
+        package = AppPackage.from_snapshot(snapshot_path)
+        read = PackageSnapshot.read
+        loads = []
+
+        def read_during_load(snapshot, section, key):
+            # Another thread needs the full data while this lookup is reading from the snapshot
+            if section == 'actors' and key == 'a2' and not loads:
+                loads.append(True)
+                package._load_from_snapshot()
+            return read(snapshot, section, key)
+
+        monkeypatch.setattr(PackageSnapshot, 'read', read_during_load)
+        assert package.get_actor('a2').name == 'Grace'
+        assert package.get_actor('a1') is package.actors[0]
+        assert loads and package._snapshot is None
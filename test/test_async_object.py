@@ -0,0 +1,149 @@
+import asyncio
+import gc
+import tracemalloc
+
+import pytest
+
+from src.async_object import AsyncObject, MAX_RECENT_TASK_ERRORS
+
+
+class RecordingAsyncObject(AsyncObject):
+    def __init__(self):
+        super().__init__()
+        self.failures = []
+
+    def on_task_exception(self, task, exception):
+        self.failures.append(exception)
+
+
+@pytest.mark.asyncio
+class TestAsyncObjectTasks:
+    async def test_finished_tasks_are_dropped(self):
+        obj = AsyncObject()
+        tasks = [obj.create_task(asyncio.sleep(0)) for _ in range(10)]
+        await asyncio.gather(*tasks)
+
+        snapshot = obj.task_snapshot()
+        assert snapshot['running'] == 0
+        assert snapshot['created'] == snapshot['completed'] == 10
+        assert snapshot['groups'] == {}
+
+    async def test_failures_are_surfaced_and_bounded(self):
+        obj = RecordingAsyncObject()
+
+        async def fail(i):
+            raise ValueError(i)
+
+        tasks = [obj.create_task(fail(i)) for i in range(MAX_RECENT_TASK_ERRORS + 5)]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        snapshot = obj.task_snapshot()
+        assert snapshot['failed'] == MAX_RECENT_TASK_ERRORS + 5
+        assert len(snapshot['recent_errors']) == MAX_RECENT_TASK_ERRORS
+        assert snapshot['recent_errors'][-1]['error'] == repr(ValueError(MAX_RECENT_TASK_ERRORS + 4))
+        assert len(obj.failures) == MAX_RECENT_TASK_ERRORS + 5
+
+    async def test_snapshot_lists_running_tasks_by_group(self):
+        obj = AsyncObject()
+        obj.create_task(asyncio.sleep(10), group='send')
+        obj.create_task(asyncio.sleep(10), group='send')
+        obj.create_task(asyncio.sleep(10))
+        await asyncio.sleep(0)
+
+        snapshot = obj.task_snapshot()
+        assert snapshot['running'] == 3
+        assert len(snapshot['groups']['send']) == 2
+        assert len(snapshot['groups']['default']) == 1
+
+        await obj.cleanup_async()
+        snapshot = obj.task_snapshot()
+        assert snapshot['running'] == 0
+        assert snapshot['cancelled'] == 3
+
+    async def test_teardown_order(self):
+        order = []
+
+        class Teardown(AsyncObject):
+            teardown_order = ('first', 'second')
+
+        obj = Teardown()
+
+        async def wait(name):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                order.append(name)
+                raise
+
+        obj.create_task(wait('other'), group='other')
+        obj.create_task(wait('second'), group='second')
+        obj.create_task(wait('first'), group='first')
+        await asyncio.sleep(0)
+
+        await obj.cleanup_async()
+        assert order == ['first', 'second', 'other']
+
+    async def test_cancel_group_skips_calling_task(self):
+        obj = AsyncObject()
+        result = []
+
+        async def teardown_from_inside():
+            await obj.cancel_group_async('step')
+            result.append('done')
+
+        other = obj.create_task(asyncio.sleep(10), group='step')
+        await obj.create_task(teardown_from_inside(), group='step')
+        assert other.cancelled()
+        assert result == ['done']
+
+
+@pytest.mark.asyncio
+async def test_long_conversation_soak():
+    """
+    A synthetic conversation of a few thousand turns, each streaming chunks through a send task per chunk like
+    ScenarioAgent does. Tracked tasks and memory must stay flat.
+    """
+    obj = RecordingAsyncObject()
+    turns, chunks_per_turn = 3000, 20
+    sent = 0
+
+    async def send(chunk: str) -> str:
+        nonlocal sent
+        sent += 1
+        await asyncio.sleep(0)
+        return chunk * 64
+
+    async def turn(i: int) -> None:
+        for j in range(chunks_per_turn):
+            obj.create_task(send(f'{i}:{j}'), group='send')
+        if i % 100 == 0:
+            raise RuntimeError(f'turn {i} failed')
+
+    tracemalloc.start()
+    try:
+        peak_running = 0
+        baseline = None
+        for i in range(turns):
+            obj.create_task(turn(i), group='step')
+            await asyncio.sleep(0)
+            peak_running = max(peak_running, obj.task_snapshot()['running'])
+            if i == 200:
+                gc.collect()
+                baseline = tracemalloc.get_traced_memory()[0]
+
+        while obj.task_snapshot()['running']:
+            await asyncio.sleep(0)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+
+    snapshot = obj.task_snapshot()
+    assert sent == turns * chunks_per_turn
+    assert snapshot['created'] == turns * (chunks_per_turn + 1)
+    assert snapshot['failed'] == turns // 100
+    assert snapshot['completed'] == snapshot['created'] - snapshot['failed']
+    assert len(obj._async_tasks) == 0 and obj._task_groups == {}
+    assert peak_running <= 4 * (chunks_per_turn + 1)
+    # Holding every finished task and its result would take several megabytes
+    assert growth < 256 * 1024
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import pytest
+
+from src.models import AccountData
+from src.models.app_package import AppPackageData
+from src.services.storage.async_service import AsyncStorageService
+from src.services.storage.exceptions import StorageDocumentNotFoundException, StorageTimeoutException
+from src.services.storage.memory import MemoryStorageService
+from src.settings.services import StorageExecutorConfig
+
+
+def make_account_data(user_id: str) -> AccountData:
+    return AccountData(
+        id=user_id,
+        created_at='2024-01-01',
+        updated_at='2024-01-01',
+        email=f'{user_id}@example.com',
+        first_name='Ada',
+        last_name='Lovelace',
+    )
+
+
+def make_storage(latency: float = 0.0, directory: str = None) -> MemoryStorageService:
+    return MemoryStorageService(directory, latency=latency, app_package=AppPackageData(version=1))
+
+
+def make_async_storage(storage: MemoryStorageService, **config) -> AsyncStorageService:
+    return AsyncStorageService(storage, StorageExecutorConfig(**config))
+
+
+class TestMemoryStorageService:
+
+    def test_account_data_round_trip(self):
+        storage = make_storage()
+        storage.create_account_data(make_account_data('user'))
+        storage.set_account_data_first_last_name('user', 'Grace', None)
+
+        account_data = storage.get_account_data('user', bypass_cache=True)
+        assert account_data.first_name == 'Grace' and account_data.last_name == 'Lovelace'
+
+        storage.delete_account_data('user')
+        with pytest.raises(StorageDocumentNotFoundException):
+            storage.get_account_data('user')
+
+    def test_directory_is_read_by_other_instances(self, tmp_path):
+        make_storage(directory=str(tmp_path)).create_account_data(make_account_data('user'))
+        assert make_storage(directory=str(tmp_path)).get_account_data('user').email == 'user@example.com'
+
+    def test_media(self):
+        storage = make_storage()
+        url = storage.upload_user_profile_image('user', 'image/png', b'first')
+        assert storage.get_media(url) == b'first'
+
+        second_url = storage.upload_user_profile_image('user', 'image/png', b'second')
+        assert storage.get_media(url) is None
+        assert storage.get_media(second_url) == b'second'
+
+
+class TestAsyncStorageService:
+
+    @pytest.mark.asyncio
+    async def test_operations_do_not_block_the_event_loop(self):
+        storage = make_storage(latency=0.05)
+        async_storage = make_async_storage(storage, max_workers=4, max_concurrency=4)
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        ticker = asyncio.create_task(tick())
+        try:
+            await asyncio.gather(*(async_storage.create_account_data(make_account_data(f'user{i}')) for i in range(4)))
+        finally:
+            ticker.cancel()
+            async_storage.close()
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        storage = make_storage(latency=0.05)
+        async_storage = make_async_storage(storage, max_workers=8, max_concurrency=2)
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(async_storage.create_account_data(make_account_data(f'user{i}')) for i in range(4)))
+        finally:
+            async_storage.close()
+        assert time.perf_counter() - start >= 0.1
+        assert async_storage.stats()['completed'] == 4
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        storage = make_storage(latency=0.2)
+        async_storage = make_async_storage(storage, timeout=0.05)
+        try:
+            with pytest.raises(StorageTimeoutException) as exc_info:
+                await async_storage.create_account_data(make_account_data('user'))
+        finally:
+            async_storage.close()
+        assert exc_info.value.operation == 'create_account_data'
+        assert async_storage.stats()['timeouts'] == 1
+
+    @pytest.mark.asyncio
+    async def test_cached_reads_share_one_backend_call(self):
+        storage = make_storage(latency=0.02)
+        storage.create_account_data(make_account_data('user'))
+        storage.clear_cache()
+        async_storage = make_async_storage(storage)
+        try:
+            results = await asyncio.gather(*(async_storage.get_account_data('user') for _ in range(5)))
+            assert {account_data.id for account_data in results} == {'user'}
+            assert await async_storage.get_account_data('user') is results[0]
+        finally:
+            async_storage.close()
+        assert async_storage.stats()['completed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_writes_during_a_read_are_not_overwritten(self):
+        storage = make_storage(latency=0.2)
+        storage.create_account_data(make_account_data('user'))
+        storage.clear_cache()
+        async_storage = make_async_storage(storage)
+        try:
+            read = asyncio.ensure_future(async_storage.get_account_data('user'))
+            await asyncio.sleep(0.05)
+            # A write lands in the cache while the read is waiting for the backend
+            storage.cache.set('account_data:user', make_account_data('user').model_copy(update={'first_name': 'NEW'}))
+
+            assert (await read).first_name == 'Ada'
+            assert (await async_storage.get_account_data('user')).first_name == 'NEW'
+        finally:
+            async_storage.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_document(self):
+        async_storage = make_async_storage(make_storage())
+        try:
+            with pytest.raises(StorageDocumentNotFoundException):
+                await async_storage.get_account_data('nobody')
+        finally:
+            async_storage.close()
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from src.models.app_package import AppPackageData
+from src.services.storage.derived import DerivedContentCache
+from src.services.storage.async_service import AsyncStorageService
+from src.services.storage.memory import MemoryStorageService
+from src.settings.services import DerivedContentConfig, StorageExecutorConfig
+
+
+class Generations:
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return f'summary {self.calls}'
+
+
+def make_cache(directory, version: int = 1, remote=None) -> DerivedContentCache:
+    config = DerivedContentConfig(directory=str(directory), remote=remote is not None)
+    return DerivedContentCache(lambda: version, config, remote)
+
+
+@pytest.mark.asyncio
+class TestDerivedContentCache:
+
+    async def test_local_entries_are_shared_by_instances(self, tmp_path):
+        create = Generations()
+        assert await make_cache(tmp_path).get_or_create('personality', ['Ada', 'gpt'], create) == 'summary 1'
+
+        cache = make_cache(tmp_path)
+        assert await cache.get_or_create('personality', ['Ada', 'gpt'], create) == 'summary 1'
+        assert await cache.get_or_create('personality', ['Ada', 'gpt'], create) == 'summary 1'
+        assert await cache.get_or_create('personality', ['Ada', 'claude'], create) == 'summary 2'
+        stats = cache.stats()
+        assert stats['local_hits'] == 1 and stats['memory_hits'] == 1 and stats['generations'] == 1
+
+    async def test_new_package_versions_regenerate_and_delete_old_entries(self, tmp_path):
+        create = Generations()
+        await make_cache(tmp_path, version=1).get_or_create('personality', ['Ada'], create)
+
+        assert await make_cache(tmp_path, version=2).get_or_create('personality', ['Ada'], create) == 'summary 2'
+        assert [path.name for path in tmp_path.iterdir()] == ['v2']
+
+    async def test_concurrent_misses_generate_once(self, tmp_path):
+        cache = make_cache(tmp_path)
+        create = Generations()
+
+        results = await asyncio.gather(*(cache.get_or_create('stages', ['interview'], create) for _ in range(5)))
+        assert create.calls == 1 and set(results) == {'summary 1'}
+        assert cache.stats()['coalesced'] == 4
+
+    async def test_remote_entries_are_found_by_other_instances(self, tmp_path):
+        storage = MemoryStorageService(latency=0.0, app_package=AppPackageData(version=1))
+        remote = AsyncStorageService(storage, StorageExecutorConfig())
+        create = Generations()
+
+        dump, load = (lambda words: {'words': words}), (lambda data: data['words'])
+        first = make_cache(tmp_path / 'first', remote=remote)
+        await first.get_or_create('questions', ['debate'], create, dump, load)
+        await first.flush()
+
+        cache = make_cache(tmp_path / 'second', remote=remote)
+        assert await cache.get_or_create('questions', ['debate'], create, dump, load) == 'summary 1'
+        assert create.calls == 1 and cache.stats()['remote_hits'] == 1
+        assert list((tmp_path / 'second').glob('v1/questions/*.json'))
+
+    async def test_disabled_cache_always_generates(self, tmp_path):
+        cache = DerivedContentCache(lambda: 1, DerivedContentConfig(enabled=False, directory=str(tmp_path)))
+        create = Generations()
+        await cache.get_or_create('personality', ['Ada'], create)
+        assert await cache.get_or_create('personality', ['Ada'], create) == 'summary 2'
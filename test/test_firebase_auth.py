@@ -0,0 +1,181 @@
+import asyncio
+import base64
+import datetime
+import json
+import time
+from typing import Any, Dict
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.x509.oid import NameOID
+from firebase_admin import auth as firebase_auth
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.fastapi_app.middlewares import (
+    CachedTokenVerifier,
+    FirebaseAuthMiddleware,
+    FirebaseTokenVerifier,
+    GooglePublicKeys,
+)
+from src.settings.fastapi import FirebaseAuthSettings
+
+PROJECT_ID = 'quiply-test'
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+class Signer:
+    def __init__(self, key_id: str = 'key1'):
+        self.key_id = key_id
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken')])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        certificate = (x509.CertificateBuilder()
+                       .subject_name(name).issuer_name(name)
+                       .public_key(self.key.public_key())
+                       .serial_number(x509.random_serial_number())
+                       .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+                       .sign(self.key, hashes.SHA256()))
+        self.certificate = certificate.public_bytes(serialization.Encoding.PEM).decode()
+
+    def sign(self, uid: str = 'user', expires_in: float = 3600, **claims: Any) -> str:
+        now = int(time.time())
+        header = {'alg': 'RS256', 'kid': self.key_id, 'typ': 'JWT'}
+        payload = {
+            'iss': f'https://securetoken.google.com/{PROJECT_ID}', 'aud': PROJECT_ID, 'sub': uid,
+            'iat': now, 'exp': now + expires_in, **claims,
+        }
+        signing_input = f'{_b64encode(json.dumps(header).encode())}.{_b64encode(json.dumps(payload).encode())}'
+        signature = self.key.sign(signing_input.encode(), padding.PKCS1v15(), hashes.SHA256())
+        return f'{signing_input}.{_b64encode(signature)}'
+
+
+class CertificateServer:
+    def __init__(self, *signers: Signer, max_age: int = 3600):
+        self.certificates: Dict[str, str] = {signer.key_id: signer.certificate for signer in signers}
+        self.max_age = max_age
+        self.fetches = 0
+
+    def __call__(self, url: str):
+        self.fetches += 1
+        return dict(self.certificates), {'Cache-Control': f'public, max-age={self.max_age}, must-revalidate'}
+
+
+class CountingVerifier:
+    def __init__(self, verify):
+        self.verify = verify
+        self.calls = 0
+
+    def __call__(self, token: str):
+        self.calls += 1
+        return self.verify(token)
+
+
+@pytest.fixture(scope='module')
+def signer() -> Signer:
+    return Signer()
+
+
+class TestFirebaseTokenVerifier:
+
+    def test_verifies_tokens(self, signer):
+        verifier = FirebaseTokenVerifier(PROJECT_ID, GooglePublicKeys(fetch=CertificateServer(signer)))
+        claims = verifier.verify(signer.sign('ada'))
+        assert claims['uid'] == 'ada'
+
+        with pytest.raises(firebase_auth.ExpiredIdTokenError):
+            verifier.verify(signer.sign(expires_in=-10))
+        with pytest.raises(firebase_auth.InvalidIdTokenError):
+            verifier.verify(signer.sign(aud='another-project'))
+        with pytest.raises(firebase_auth.InvalidIdTokenError):
+            verifier.verify(Signer('key1').sign())
+        with pytest.raises(firebase_auth.InvalidIdTokenError):
+            verifier.verify('not a token')
+
+    def test_certificates_are_kept_for_their_max_age(self, signer):
+        now = [0.0]
+        server = CertificateServer(signer, max_age=100)
+        verifier = FirebaseTokenVerifier(PROJECT_ID, GooglePublicKeys(fetch=server, clock=lambda: now[0]))
+        for _ in range(3):
+            verifier.verify(signer.sign())
+        assert server.fetches == 1
+
+        now[0] = 101
+        verifier.verify(signer.sign())
+        assert server.fetches == 2
+
+    def test_unknown_keys_refresh_the_certificates(self, signer):
+        rotated = Signer('key2')
+        server = CertificateServer(signer)
+        verifier = FirebaseTokenVerifier(PROJECT_ID, GooglePublicKeys(fetch=server, min_refresh_interval=0))
+        verifier.verify(signer.sign())
+
+        server.certificates[rotated.key_id] = rotated.certificate
+        assert verifier.verify(rotated.sign('grace'))['uid'] == 'grace'
+        assert server.fetches == 2
+
+
+class TestCachedTokenVerifier:
+
+    @pytest.mark.asyncio
+    async def test_caches_verified_tokens_until_they_expire(self, signer):
+        now = [time.time()]
+        verify = CountingVerifier(FirebaseTokenVerifier(PROJECT_ID, GooglePublicKeys(fetch=CertificateServer(signer))))
+        verifier = CachedTokenVerifier(verify, FirebaseAuthSettings(), clock=lambda: now[0])
+        token = signer.sign(expires_in=60)
+
+        claims = await verifier.verify(token)
+        claims['uid'] = 'changed'
+        assert (await verifier.verify(token))['uid'] == 'user'
+        assert verify.calls == 1
+
+        now[0] += 61
+        await verifier.verify(token)
+        assert verify.calls == 2
+        verifier.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_verifications_share_one_call(self, signer):
+        verify = CountingVerifier(FirebaseTokenVerifier(PROJECT_ID, GooglePublicKeys(fetch=CertificateServer(signer))))
+        verifier = CachedTokenVerifier(verify, FirebaseAuthSettings(cache_enabled=False))
+        token = signer.sign()
+
+        await asyncio.gather(*(verifier.verify(token) for _ in range(10)))
+        assert verify.calls == 1
+        assert verifier.stats()['shared'] == 9
+
+        with pytest.raises(firebase_auth.ExpiredIdTokenError):
+            await verifier.verify(signer.sign(expires_in=-10))
+        assert verifier.stats()['cache']['size'] == 0
+        verifier.close()
+
+
+class TestFirebaseAuthMiddleware:
+
+    def make_client(self, signer: Signer) -> TestClient:
+        async def user(request: Request) -> JSONResponse:
+            return JSONResponse({'uid': request.state.user['uid']})
+
+        verifier = CachedTokenVerifier(
+            FirebaseTokenVerifier(PROJECT_ID, GooglePublicKeys(fetch=CertificateServer(signer))), FirebaseAuthSettings())
+        app = Starlette(routes=[Route('/user', user)])
+        app.add_middleware(FirebaseAuthMiddleware, verifier=verifier)
+        return TestClient(app)
+
+    def test_requests_are_authenticated(self, signer):
+        client = self.make_client(signer)
+
+        response = client.get('/user', headers={'Authorization': f'Bearer {signer.sign("ada")}'})
+        assert response.status_code == 200 and response.json() == {'uid': 'ada'}
+
+        assert client.get('/user').status_code == 401
+        assert client.get('/user', headers={'Authorization': 'Bearer invalid'}).status_code == 403
+        assert client.options('/user').status_code != 401
@@ -0,0 +1,15 @@
+import importlib
+import sys
+from unittest.mock import MagicMock
+
+
+def test_firestore_service_module_imports(monkeypatch):
+    # The firestore package connects to Firebase with the credentials of the environment when it is imported
+    monkeypatch.setitem(sys.modules, 'firestore', MagicMock())
+    monkeypatch.delitem(sys.modules, 'src.services.storage.firestore.service', raising=False)
+
+    module = importlib.import_module('src.services.storage.firestore.service')
+
+    from src.services.storage.base_service import BaseStorageService
+    assert issubclass(module.FirestoreStorageService, BaseStorageService)
+    assert module.FieldPath.document_id() == '__name__'
@@ -0,0 +1,189 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from src.session_registry import MemorySessionRegistry, SqliteSessionRegistry
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_registry(request, tmp_path):
+    clock = FakeClock()
+
+    def make(lease: float = 30.0, retention: float = 3600.0):
+        if request.param == 'memory':
+            return MemorySessionRegistry(lease=lease, retention=retention, clock=clock)
+        return SqliteSessionRegistry(str(tmp_path / 'sessions.db'), lease=lease, retention=retention, clock=clock)
+
+    make.clock = clock
+    return make
+
+
+class TestSessionRegistry:
+
+    def test_sessions_move_to_the_worker_the_client_connects_to(self, make_registry):
+        registry = make_registry()
+        registry.register('session', 'worker-a', '{"instance": 1}')
+
+        record = registry.acquire('session', 'worker-b', running=True)
+        assert record.worker_id == 'worker-b' and record.state == '{"instance": 1}'
+        assert [record.instance_uid for record in registry.owned('worker-b')] == ['session']
+        assert registry.owned('worker-a') == []
+
+    def test_running_sessions_stay_with_a_live_owner(self, make_registry):
+        registry = make_registry(lease=30)
+        registry.register('session', 'worker-a', '{}')
+        assert registry.acquire('session', 'worker-a', running=True).running
+
+        assert registry.acquire('session', 'worker-b', running=True) is None
+        assert registry.acquire('session', 'worker-a', running=True) is not None
+
+        make_registry.clock.now += 31
+        record = registry.acquire('session', 'worker-b', running=True)
+        assert record.worker_id == 'worker-b' and record.owner_alive
+
+    def test_retired_workers_hand_over_right_away(self, make_registry):
+        registry = make_registry()
+        registry.register('session', 'worker-a', '{}')
+        registry.acquire('session', 'worker-a', running=True)
+
+        registry.retire('worker-a')
+        assert not registry.lookup('session').owner_alive
+        assert registry.acquire('session', 'worker-b', running=True).worker_id == 'worker-b'
+
+    def test_end_requests_and_releases(self, make_registry):
+        registry = make_registry()
+        registry.register('session', 'worker-a', '{}')
+        assert registry.request_end('session') and not registry.request_end('missing')
+        assert registry.owned('worker-a')[0].end_requested
+
+        registry.release('session', 'worker-b')
+        assert registry.lookup('session') is not None
+        registry.release('session', 'worker-a')
+        assert registry.lookup('session') is None
+
+    def test_sessions_of_expired_workers_are_purged_after_the_retention(self, make_registry):
+        registry = make_registry(lease=30, retention=60)
+        registry.register('crashed', 'worker-a', '{}')
+        registry.register('alive', 'worker-b', '{}')
+
+        make_registry.clock.now += 80
+        registry.heartbeat('worker-b')
+        assert registry.purge() == 0
+        make_registry.clock.now += 20
+        registry.heartbeat('worker-b')
+        assert registry.purge() == 1
+        assert registry.lookup('crashed') is None and registry.lookup('alive') is not None
+
+
+# ---- Multi-process harness ---- #
+
+def _worker_main(path: str, lease: float, commands, results) -> None:
+    """A worker process: renews its lease in the background and runs the registry calls it is sent."""
+    registry = SqliteSessionRegistry(path, lease=lease)
+    worker_id = f'worker-{os.getpid()}'
+    registry.heartbeat(worker_id)
+
+    def renew() -> None:
+        while True:
+            time.sleep(lease / 4)
+            registry.heartbeat(worker_id)
+
+    threading.Thread(target=renew, daemon=True).start()
+    results.put(worker_id)
+    while True:
+        command, args = commands.get()
+        if command == 'register':
+            for instance_uid in args:
+                registry.register(instance_uid, worker_id, f'{{"created_by": "{worker_id}"}}')
+            results.put(len(args))
+        elif command == 'connect':
+            records = [registry.acquire(instance_uid, worker_id, running=True) for instance_uid in args]
+            results.put([(record.worker_id, record.state) if record else None for record in records])
+        elif command == 'stop':
+            registry.retire(worker_id)
+            return
+
+
+class Worker:
+
+    def __init__(self, context, path: str, lease: float):
+        self.commands, self.results = context.Queue(), context.Queue()
+        self.process = context.Process(target=_worker_main, args=(path, lease, self.commands, self.results))
+        self.process.start()
+        self.id = self.results.get(timeout=30)
+
+    def call(self, command: str, args):
+        self.commands.put((command, args))
+        return self.results.get(timeout=30)
+
+    def send(self, command: str, args) -> None:
+        self.commands.put((command, args))
+
+
+@pytest.fixture
+def start_workers(tmp_path):
+    context = multiprocessing.get_context('spawn')
+    workers = []
+
+    def start(count: int, lease: float):
+        workers.extend(Worker(context, str(tmp_path / 'sessions.db'), lease) for _ in range(count))
+        return workers
+
+    yield start
+    for worker in workers:
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+
+
+class TestSessionRegistryAcrossWorkers:
+
+    def test_reconnects_to_other_workers_find_their_sessions(self, start_workers):
+        workers = start_workers(4, lease=5.0)
+        sessions = {worker.id: [f'{worker.id}-session-{index}' for index in range(5)] for worker in workers}
+        for worker in workers:
+            worker.call('register', sessions[worker.id])
+
+        # Every client reconnects to the next worker
+        for index, worker in enumerate(workers):
+            creator = workers[index - 1]
+            records = worker.call('connect', sessions[creator.id])
+            assert records == [(worker.id, f'{{"created_by": "{creator.id}"}}')] * 5
+
+    def test_concurrent_connects_have_one_winner(self, start_workers):
+        workers = start_workers(4, lease=5.0)
+        instance_uids = [f'session-{index}' for index in range(20)]
+        workers[0].call('register', instance_uids)
+
+        for worker in workers:
+            worker.send('connect', instance_uids)
+        results = [worker.results.get(timeout=30) for worker in workers]
+
+        for index in range(len(instance_uids)):
+            winners = [result[index] for result in results if result[index] is not None]
+            assert len(winners) == 1
+
+    def test_sessions_of_a_crashed_worker_are_taken_over_after_its_lease(self, start_workers, tmp_path):
+        lease = 1.0
+        crashed, survivor = start_workers(2, lease=lease)
+        crashed.call('register', ['session'])
+        assert crashed.call('connect', ['session'])[0][0] == crashed.id
+
+        crashed.process.kill()
+        crashed.process.join()
+        assert survivor.call('connect', ['session']) == [None]
+
+        time.sleep(lease * 1.5)
+        assert survivor.call('connect', ['session'])[0][0] == survivor.id
@@ -0,0 +1,177 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.services.storage.cache import StorageCache
+from src.services.storage.exceptions import StorageDocumentNotFoundException
+from src.settings.services import CacheConfig
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_cache(clock=None, **config) -> StorageCache:
+    return StorageCache(CacheConfig(**config), clock=clock or time.monotonic)
+
+
+class TestStorageCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = make_cache(max_size=2)
+        cache.set('a:1', 1)
+        cache.set('a:2', 2)
+        assert cache.get('a:1') == 1
+        cache.set('a:3', 3)
+
+        assert cache.get('a:2') is None
+        assert cache.get('a:1') == 1 and cache.get('a:3') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_misses_are_counted(self):
+        cache = make_cache()
+        cache.set('a:1', 1)
+        cache.get('a:1')
+        cache.get('a:2')
+
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['namespaces']['a'] == {'entries': 1, 'hits': 1, 'misses': 1, 'negative_hits': 0}
+
+    def test_ttl_by_namespace(self, clock):
+        cache = make_cache(clock, ttl={'session': 10}, default_ttl=None)
+        cache.set('session:1', 'value')
+        cache.set('template:1', 'value')
+
+        clock.now = 11
+        assert cache.get('session:1') is None
+        assert cache.get('template:1') == 'value'
+        assert cache.stats()['expirations'] == 1
+
+    def test_byte_budget(self):
+        cache = make_cache(max_bytes=20_000)
+        for i in range(10):
+            cache.set(f'blob:{i}', 'x' * 5_000)
+
+        stats = cache.stats()
+        assert stats['bytes'] <= 20_000
+        assert stats['size'] < 10
+        assert cache.get('blob:9') is not None
+
+    def test_prefix_query_only_returns_matching_keys(self):
+        cache = make_cache()
+        cache.set_many({'scenario:1': 1, 'scenario:2': 2, 'scenario_instance:1': 3, 'actor:1': 4})
+        assert sorted(cache.get_all_with_prefix('scenario:')) == [1, 2]
+        assert cache.get_all_with_prefix('mentor:') is None
+
+        cache.delete('scenario:1')
+        assert cache.get_all_with_prefix('scenario:') == [2]
+
+    def test_negative_caching(self, clock):
+        cache = make_cache(clock, negative_ttl=30)
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            raise StorageDocumentNotFoundException('account_data/1')
+
+        for _ in range(3):
+            with pytest.raises(StorageDocumentNotFoundException):
+                cache.get_or_fetch('account_data:1', fetch)
+        assert len(fetches) == 1
+        assert cache.stats()['negative_hits'] == 2
+
+        clock.now = 31
+        with pytest.raises(StorageDocumentNotFoundException):
+            cache.get_or_fetch('account_data:1', fetch)
+        assert len(fetches) == 2
+
+        cache.set('account_data:1', 'created')
+        assert cache.get_or_fetch('account_data:1', fetch) == 'created'
+
+    def test_concurrent_misses_share_one_fetch(self):
+        cache = make_cache()
+        fetches = []
+        release = threading.Event()
+
+        def fetch():
+            fetches.append(1)
+            release.wait(1)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch('a:1', fetch))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['value'] * 8
+        assert len(fetches) == 1
+        assert cache.stats()['coalesced'] == 7
+
+    @pytest.mark.asyncio
+    async def test_concurrent_async_misses_share_one_fetch(self):
+        cache = make_cache()
+        fetches = []
+
+        async def fetch():
+            fetches.append(1)
+            await asyncio.sleep(0.01)
+            return 'value'
+
+        results = await asyncio.gather(*(cache.get_or_fetch_async('a:1', fetch) for _ in range(8)))
+        assert results == ['value'] * 8
+        assert len(fetches) == 1
+        assert await cache.get_or_fetch_async('a:1', fetch) == 'value'
+        assert len(fetches) == 1
+
+    def test_writes_during_a_fetch_are_not_overwritten(self):
+        cache = make_cache()
+
+        def fetch_then_update():
+            cache.set('a:1', 'updated')
+            return 'stale'
+
+        def fetch_then_delete():
+            cache.delete('a:2')
+            return 'stale'
+
+        assert cache.get_or_fetch('a:1', fetch_then_update) == 'stale'
+        assert cache.get('a:1') == 'updated'
+        assert cache.get_or_fetch('a:2', fetch_then_delete) == 'stale'
+        assert not cache.has('a:2')
+        assert cache.get_or_fetch('a:2', lambda: 'fresh') == 'fresh'
+        assert cache.get('a:2') == 'fresh'
+
+    @pytest.mark.asyncio
+    async def test_writes_during_an_async_fetch_are_not_overwritten(self):
+        cache = make_cache()
+
+        async def fetch():
+            await asyncio.sleep(0)
+            cache.set('a:1', 'updated')
+            return 'stale'
+
+        assert await cache.get_or_fetch_async('a:1', fetch) == 'stale'
+        assert cache.get('a:1') == 'updated'
+        assert cache._generations == {}
+
+    def test_disabled_cache_always_fetches(self):
+        cache = make_cache(enabled=False)
+        cache.set('a:1', 1)
+        assert cache.get('a:1') is None
+        assert cache.get_or_fetch('a:1', lambda: 2) == 2
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from src.async_object import AsyncObject
+from src.timer_wheel import TimerWheel
+
+
+@pytest.mark.asyncio
+class TestTimerWheel:
+    async def test_fires_in_deadline_order(self):
+        wheel = TimerWheel(resolution=0.005)
+        fired = []
+        wheel.call_later(0.03, fired.append, 'c')
+        wheel.call_later(0.01, fired.append, 'a')
+        wheel.call_later(0.02, fired.append, 'b')
+
+        await asyncio.sleep(0.06)
+        assert fired == ['a', 'b', 'c']
+        assert wheel.pending == 0
+
+    async def test_never_fires_early(self):
+        wheel = TimerWheel(resolution=0.02)
+        loop = asyncio.get_running_loop()
+        fired_at = []
+        start = loop.time()
+        wheel.call_later(0.05, lambda: fired_at.append(loop.time()))
+
+        await asyncio.sleep(0.12)
+        assert fired_at and fired_at[0] - start >= 0.05
+
+    async def test_timers_in_the_same_tick_share_one_wakeup(self):
+        wheel = TimerWheel(resolution=0.05)
+        fired = []
+        for i in range(100):
+            wheel.call_later(0.01, fired.append, i)
+
+        await asyncio.sleep(0.1)
+        assert fired == list(range(100))
+        assert wheel.stats()['wakeups'] == 1
+
+    async def test_cancel(self):
+        wheel = TimerWheel(resolution=0.005)
+        fired = []
+        first = wheel.call_later(0.01, fired.append, 'first')
+        wheel.call_later(0.02, fired.append, 'second')
+        first.cancel()
+
+        await asyncio.sleep(0.05)
+        assert fired == ['second']
+        # Cancelling the only bucket of the armed tick re-armed the wheel for the next one
+        assert wheel.stats()['wakeups'] == 1
+
+    async def test_callback_can_cancel_a_timer_of_the_same_tick(self):
+        wheel = TimerWheel(resolution=0.05)
+        fired = []
+        second = None
+
+        def first():
+            fired.append('first')
+            second.cancel()
+
+        wheel.call_later(0.01, first)
+        second = wheel.call_later(0.01, fired.append, 'second')
+
+        await asyncio.sleep(0.1)
+        assert fired == ['first']
+        assert wheel.stats()['fired'] == 1
+
+    async def test_empty_wheel_is_not_armed(self):
+        wheel = TimerWheel(resolution=0.005)
+        handle = wheel.call_later(0.01, lambda: None)
+        handle.cancel()
+
+        await asyncio.sleep(0.03)
+        assert wheel.stats() == {'pending': 0, 'buckets': 0, 'wakeups': 0, 'fired': 0}
+
+    async def test_callback_can_schedule_earlier_timer(self):
+        wheel = TimerWheel(resolution=0.005)
+        fired = []
+        wheel.call_later(0.05, fired.append, 'late')
+        wheel.call_later(0.01, lambda: wheel.call_later(0.01, fired.append, 'chained'))
+
+        await asyncio.sleep(0.08)
+        assert fired == ['chained', 'late']
+
+    async def test_failing_callback_does_not_stop_the_tick(self):
+        wheel = TimerWheel(resolution=0.01)
+        fired = []
+        wheel.call_later(0.01, lambda: 1 / 0)
+        wheel.call_later(0.01, fired.append, 'ok')
+
+        await asyncio.sleep(0.04)
+        assert fired == ['ok']
+
+
+@pytest.mark.asyncio
+class TestAsyncObjectTimers:
+    async def test_coroutine_callback_runs_as_tracked_task(self):
+        obj = AsyncObject()
+        done = asyncio.Event()
+
+        async def callback(value):
+            assert value == 42
+            done.set()
+
+        obj.call_later(0.01, callback, 42)
+        await asyncio.wait_for(done.wait(), 1)
+        assert obj.task_snapshot()['created'] == 1
+        assert not obj._timer_handles
+
+    async def test_cleanup_cancels_pending_timers(self):
+        obj = AsyncObject()
+        fired = []
+        obj.call_later(0.01, fired.append, 'x')
+        await obj.cleanup_async()
+
+        await asyncio.sleep(0.04)
+        assert fired == []
@@ -0,0 +1,172 @@
+import time
+from typing import Dict, List
+
+import pytest
+from pydantic import BaseModel, Field
+
+from src.models import AccountData
+from src.models.app_package import AppPackageData
+from src.services.storage.memory import MemoryStorageService
+from src.services.storage.write_behind import DocumentWrite, WriteBehindBuffer, diff_fields
+from src.settings.services import StorageConfig, WriteBehindConfig
+
+
+class Document(BaseModel):
+    name: str
+    count: int = 0
+    settings: Dict[str, str] = Field(default_factory=dict)
+
+
+class RecordingCommit:
+    def __init__(self):
+        self.batches: List[List[DocumentWrite]] = []
+        self.fail = 0
+
+    def __call__(self, writes: List[DocumentWrite]) -> None:
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError('unavailable')
+        self.batches.append(writes)
+
+    @property
+    def writes(self) -> List[DocumentWrite]:
+        return [write for batch in self.batches for write in batch]
+
+
+def make_buffer(commit: RecordingCommit, **config) -> WriteBehindBuffer:
+    config = {'window': 60, 'max_retries': 0, **config}
+    return WriteBehindBuffer(commit, WriteBehindConfig(**config))
+
+
+class TestDiffFields:
+
+    def test_nested_changes(self):
+        previous = {'name': 'a', 'count': 1, 'settings': {'voice': 'x', 'theme': 'dark'}}
+        current = {'name': 'a', 'count': 2, 'settings': {'voice': 'y', 'theme': 'dark'}}
+        assert diff_fields(previous, current) == {('count',): 2, ('settings', 'voice'): 'y'}
+
+    def test_changed_keys_replace_the_field(self):
+        previous = {'settings': {'voice': 'x'}}
+        current = {'settings': {'theme': 'dark'}}
+        assert diff_fields(previous, current) == {('settings',): {'theme': 'dark'}}
+        assert diff_fields({'name': 'a', 'old': 1}, {'name': 'a'}) is None
+
+
+class TestWriteBehindBuffer:
+
+    def test_coalesces_writes_and_then_updates_fields(self):
+        commit = RecordingCommit()
+        buffer = make_buffer(commit)
+        document = Document(name='a')
+        for i in range(10):
+            document.count = i
+            buffer.write('doc:a', 'docs/a', document)
+        buffer.flush()
+
+        assert len(commit.writes) == 1
+        assert commit.writes[0].data == {'name': 'a', 'count': 9, 'settings': {}}
+
+        document.settings = {'voice': 'x'}
+        buffer.write('doc:a', 'docs/a', document)
+        buffer.flush()
+        assert commit.writes[1].updates == {('settings',): {'voice': 'x'}}
+        assert buffer.stats()['coalesced'] == 9
+
+    def test_remembered_documents_are_updated(self):
+        commit = RecordingCommit()
+        buffer = make_buffer(commit)
+        document = Document(name='a')
+        buffer.remember('doc:a', document)
+
+        buffer.write('doc:a', 'docs/a', document)
+        buffer.flush()
+        assert commit.writes == []
+        assert buffer.stats()['unchanged'] == 1
+
+        document.name = 'b'
+        buffer.write('doc:a', 'docs/a', document)
+        buffer.write('doc:a', 'docs/a', document, create=True)
+        buffer.flush()
+        assert commit.writes[0].data is not None
+
+    def test_batches(self):
+        commit = RecordingCommit()
+        buffer = make_buffer(commit, max_batch_size=2)
+        for i in range(5):
+            buffer.write(f'doc:{i}', f'docs/{i}', Document(name=str(i)))
+        buffer.flush(['doc:0', 'doc:1', 'doc:2'])
+        assert [len(batch) for batch in commit.batches] == [2, 1]
+        assert buffer.pending_count == 2
+
+        buffer.flush()
+        assert [len(batch) for batch in commit.batches] == [2, 1, 2]
+
+    def test_failed_writes_are_kept(self):
+        commit = RecordingCommit()
+        buffer = make_buffer(commit, max_retries=1)
+        document = Document(name='a')
+        buffer.remember('doc:a', document)
+        document.count = 1
+        buffer.write('doc:a', 'docs/a', document)
+
+        commit.fail = 2
+        with pytest.raises(RuntimeError):
+            buffer.flush()
+        assert buffer.has_pending('doc:a')
+        assert buffer.stats()['failures'] == 2
+
+        buffer.flush()
+        assert commit.writes[0].data == {'name': 'a', 'count': 1, 'settings': {}}
+        assert not buffer.has_pending('doc:a')
+
+    def test_flushes_in_the_background_after_the_window(self):
+        commit = RecordingCommit()
+        buffer = make_buffer(commit, window=0.05)
+        buffer.write('doc:a', 'docs/a', Document(name='a'))
+        buffer.write('doc:a', 'docs/a', Document(name='b'))
+        assert commit.writes == []
+
+        deadline = time.monotonic() + 2
+        while not commit.writes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(commit.writes) == 1 and commit.writes[0].data['name'] == 'b'
+        buffer.close()
+
+    def test_close_flushes(self):
+        commit = RecordingCommit()
+        buffer = make_buffer(commit)
+        buffer.write('doc:a', 'docs/a', Document(name='a'))
+        buffer.close()
+        assert len(commit.writes) == 1
+
+
+class TestStorageWriteBehind:
+
+    def make_storage(self) -> MemoryStorageService:
+        config = StorageConfig(write_behind=WriteBehindConfig(window=60))
+        storage = MemoryStorageService(app_package=AppPackageData(version=1), config=config)
+        storage.create_account_data(AccountData(
+            id='user', created_at='2024-01-01', updated_at='2024-01-01',
+            email='user@example.com', first_name='Ada', last_name='Lovelace',
+        ))
+        return storage
+
+    def test_profile_updates_are_coalesced_into_a_field_update(self):
+        storage = self.make_storage()
+        writes = storage.stats()['writes']
+        for i in range(5):
+            storage.update_account_data('user', {'birthday': f'2000-01-0{i + 1}'})
+        assert storage.stats()['writes'] == writes
+
+        storage.flush_writes()
+        assert storage.stats()['writes'] == writes + 1
+        assert storage.get_write_stats()['field_updates'] == 1
+        assert storage.get_account_data('user', bypass_cache=True).birthday == '2000-01-05'
+
+    def test_reads_from_the_backend_see_buffered_writes(self):
+        storage = self.make_storage()
+        storage.update_account_data('user', {'first_name': 'Grace'})
+        storage.clear_cache()
+
+        assert storage.get_account_data('user').first_name == 'Grace'
+        assert storage.get_write_stats()['pending'] == 0
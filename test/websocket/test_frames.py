@@ -0,0 +1,118 @@
+import base64
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from starlette.websockets import WebSocketState
+
+from src.framework import MessageAudioChunk
+from src.models.voice import VoiceChunk, VoiceStream, VoiceStreamSettings
+from src.websocket import (
+    AudioCodec,
+    AudioFrame,
+    AudioFrameError,
+    AudioFrameType,
+    PacketAudioEvent,
+    VoiceEventType,
+    WebSocketConnection,
+)
+
+AUDIO = bytes(range(256)) * 8
+
+
+def make_voice_chunk(index: int = 0, **kwargs) -> VoiceChunk:
+    return VoiceChunk(
+        created_at='2024-01-01T00:00:00',
+        stream_id='stream',
+        index=index,
+        audio=base64.b64encode(AUDIO).decode(),
+        settings=VoiceStreamSettings(format='audio/webm;codecs=opus', chunk_timeslice=250) if index == 0 else None,
+        **kwargs,
+    )
+
+
+class TestAudioFrame:
+
+    def test_voice_chunk_round_trip(self):
+        chunk = make_voice_chunk()
+        data = AudioFrame.of_voice_chunk(chunk).encode()
+        assert len(data) < len(chunk.model_dump_json())
+
+        frame = AudioFrame.decode(data)
+        assert frame.type == AudioFrameType.VOICE_CHUNK
+        assert frame.codec == AudioCodec.WEBM_OPUS
+        decoded = frame.to_voice_chunk()
+        assert decoded.uid == chunk.uid and decoded.stream_id == 'stream' and decoded.index == 0
+        assert decoded.settings == chunk.settings
+        assert decoded.get_audio() == AUDIO
+        assert 'audio_bytes' not in decoded.model_dump()
+
+    def test_minimal_voice_frame(self):
+        data = AudioFrame(AudioFrameType.VOICE_END, 'stream', 7, AUDIO, is_final=True).encode()
+        chunk = AudioFrame.decode(data).to_voice_chunk()
+        assert chunk.index == 7 and chunk.is_final and chunk.audio_bytes == AUDIO
+
+    def test_audio_packet_round_trip(self):
+        chunk = MessageAudioChunk(index=3, message_id='message', message_audio_id='audio',
+                                  audio=base64.b64encode(AUDIO).decode(), is_final=True)
+        frame = AudioFrame.decode(AudioFrame.of_audio_chunk(chunk, AudioCodec.MP3).encode())
+        assert frame.event_type == 'audio_packet'
+        assert frame.audio == AUDIO and frame.codec == AudioCodec.MP3
+        assert frame.to_audio_chunk() == chunk
+
+    def test_malformed_frames(self):
+        with pytest.raises(AudioFrameError):
+            AudioFrame.decode(b'\x01\x01')
+        with pytest.raises(AudioFrameError):
+            AudioFrame.decode(b'\x02' + bytes(8))
+        with pytest.raises(AudioFrameError):
+            AudioFrame.decode(AudioFrame(AudioFrameType.VOICE_CHUNK, 'stream', 0, metadata={'a': 1}).encode()[:12])
+
+    def test_codec_from_format(self):
+        assert AudioCodec.from_format('mp3_44100_128') == AudioCodec.MP3
+        assert AudioCodec.from_format('pcm_16000') == AudioCodec.PCM_S16LE
+        assert AudioCodec.from_format('audio/ogg;codecs=opus') == AudioCodec.OGG_OPUS
+        assert AudioCodec.from_format(None) == AudioCodec.UNSPECIFIED
+
+
+class TestConnectionAudioFrames:
+
+    def make_connection(self, binary_audio: bool) -> WebSocketConnection:
+        connection = WebSocketConnection(client_id='client', scenario_instance_id='instance')
+        connection._websocket = MagicMock()
+        connection._websocket.application_state = WebSocketState.CONNECTED
+        connection._websocket.client_state = WebSocketState.CONNECTED
+        connection._websocket.send_bytes = AsyncMock()
+        connection._websocket.send_json = AsyncMock()
+        connection.logger = MagicMock()
+        connection._negotiate_audio_frames({'audio_frames': 'binary' if binary_audio else 'json'})
+        return connection
+
+    def test_binary_voice_frames_start_streams(self):
+        connection = self.make_connection(binary_audio=False)
+        streams = []
+        connection.on_voice_stream_start(streams.append)
+
+        connection._handle_audio_frame(AudioFrame.of_voice_chunk(make_voice_chunk()).encode())
+        connection._handle_audio_frame(AudioFrame.of_voice_chunk(make_voice_chunk(1), VoiceEventType.VOICE_END).encode())
+
+        stream: VoiceStream = streams[0]
+        assert stream.id == 'stream' and stream.queue.qsize() == 2
+        assert stream.queue.get_nowait().get_audio() == AUDIO
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('binary_audio', [True, False])
+    async def test_audio_packets_are_sent_in_the_negotiated_mode(self, binary_audio):
+        connection = self.make_connection(binary_audio)
+        chunk = MessageAudioChunk(index=0, message_id='message', message_audio_id='audio',
+                                  audio=base64.b64encode(AUDIO).decode())
+        await connection.send_async(PacketAudioEvent(data=chunk))
+
+        if binary_audio:
+            frame = AudioFrame.decode(connection._websocket.send_bytes.call_args.args[0])
+            assert frame.audio == AUDIO and frame.metadata == {'message_id': 'message'}
+            connection._websocket.send_json.assert_not_called()
+        else:
+            sent = connection._websocket.send_json.call_args.args[0]
+            assert sent['type'] == 'audio_packet' and sent['data']['audio'] == chunk.audio
+            connection._websocket.send_bytes.assert_not_called()
+        await connection.cleanup_async()
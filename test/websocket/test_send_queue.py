@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, List
+
+import pytest
+
+from src.framework import Message, MessageChunk, MessageRole
+from src.settings.websocket import SlowConsumerPolicy, WebSocketSendQueueSettings
+from src.websocket import (
+    PacketStreamChunkEvent,
+    PacketStreamEndEvent,
+    ScenarioTypingStartEvent,
+    WebSocketSendQueue,
+)
+
+
+def chunk_event(index: int, content: str = 'token ', message_id: str = 'message', is_final: bool = False):
+    return PacketStreamChunkEvent(data=MessageChunk(
+        index=index, message_id=message_id, role=MessageRole.ai, content=content, is_final=is_final))
+
+
+class SlowClient:
+    """Stands in for a client on a slow network, every send takes ``delay`` seconds."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: List[Any] = []
+
+    async def send(self, item: Any) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(item)
+
+
+def make_queue(client: SlowClient, **settings) -> WebSocketSendQueue:
+    return WebSocketSendQueue(client.send, asyncio.create_task, WebSocketSendQueueSettings(**settings))
+
+
+class TestWebSocketSendQueue:
+
+    @pytest.mark.asyncio
+    async def test_events_are_sent_in_order(self):
+        client = SlowClient()
+        queue = make_queue(client, coalesce_window=0)
+        events = [ScenarioTypingStartEvent(data='agent')] + [chunk_event(i, message_id=f'm{i}') for i in range(5)]
+        for event in events[:-1]:
+            queue.put_nowait(event)
+        await queue.put(events[-1], wait_sent=True)
+
+        assert client.sent == events
+        assert queue.stats()['depth'] == 0 and queue.stats()['sent'] == 6
+        queue.close()
+
+    @pytest.mark.asyncio
+    async def test_adjacent_chunks_are_coalesced(self):
+        client = SlowClient(delay=0.01)
+        queue = make_queue(client, coalesce_window=0.005)
+        for index in range(20):
+            queue.put_nowait(chunk_event(index, content=f'{index} '))
+        await queue.put(chunk_event(20, content='end', is_final=True), wait_sent=True)
+
+        content = ''.join(event.data.content for event in client.sent)
+        assert content == ''.join(f'{index} ' for index in range(20)) + 'end'
+        assert len(client.sent) < 5 and client.sent[0].data.index == 0 and client.sent[-1].data.is_final
+        assert queue.stats()['coalesced'] == 21 - len(client.sent)
+        queue.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_drops_oldest_partial_text(self):
+        client = SlowClient(delay=0.05)
+        queue = make_queue(client, max_bytes=2000, coalesce_window=0, coalesce_max_bytes=0)
+        typing = ScenarioTypingStartEvent(data='agent')
+        queue.put_nowait(typing)
+        for index in range(50):
+            queue.put_nowait(chunk_event(index, content='x' * 100))
+        end = PacketStreamEndEvent(data=Message.from_ai(content='x' * 100))
+        await queue.put(end, wait_sent=True)
+
+        stats = queue.stats()
+        assert stats['dropped'] > 40 and stats['max_bytes'] <= 2000
+        assert client.sent[0] is typing and client.sent[-1] is end
+        indexes = [event.data.index for event in client.sent[1:-1]]
+        assert indexes == sorted(indexes) and indexes[-1] == 49
+        queue.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_blocks_producers(self):
+        client = SlowClient(delay=0.01)
+        queue = make_queue(client, max_bytes=1000, slow_consumer_policy=SlowConsumerPolicy.BLOCK,
+                           coalesce_window=0, coalesce_max_bytes=0)
+        for index in range(10):
+            await queue.put(chunk_event(index, content='x' * 200))
+            assert queue.queued_bytes <= 1000 + 456
+        await queue.put(chunk_event(10, is_final=True), wait_sent=True)
+
+        assert len(client.sent) == 11 and queue.stats()['blocked'] > 0 and queue.stats()['dropped'] == 0
+        queue.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_is_disconnected(self):
+        client = SlowClient(delay=1)
+        disconnected = []
+        settings = WebSocketSendQueueSettings(max_bytes=1000, slow_consumer_policy=SlowConsumerPolicy.DISCONNECT)
+        queue = WebSocketSendQueue(client.send, asyncio.create_task, settings,
+                                   on_slow_consumer=lambda: disconnected.append(True))
+        for index in range(10):
+            queue.put_nowait(chunk_event(index, content='x' * 200))
+
+        assert disconnected == [True] and queue.closed
+        assert queue.put_nowait(chunk_event(10)) is None
+        await queue.put(chunk_event(11), wait_sent=True)
+        assert queue.stats()['slow_consumer'] == 1
@@ -0,0 +1,53 @@
+import resource
+import statistics
+import time
+from typing import Dict, List
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summarize a list of latency samples (seconds) as milliseconds."""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+        return ordered[index] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def print_report(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(f'\n{title}')
+    for name, values in results.items():
+        formatted = ', '.join(f'{key}={value:.2f}' if isinstance(value, float) else f'{key}={value}'
+                              for key, value in values.items())
+        print(f'  {name:<24} {formatted}')
+
+
+class Timer:
+    def __enter__(self) -> 'Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self.start
+
+
+def current_rss_mb() -> float:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
@@ -0,0 +1,126 @@
+"""
+Scenario startup time of AgentBuilder as the number of actors grows, one agent at a time and concurrently.
+
+A stand-in builder reads the actor templates from a store that answers after ``--read-ms`` and spends ``--llm-ms``
+summarizing the personality of each agent and ``--extra-ms`` on the rest of its system message. Debate scenarios
+also initialize a moderator special agent, speed dating scenarios only the dates. The modes compare:
+
+- sequential: a template read per actor, then the agents one after another, how AgentBuilder worked before
+- concurrent: one batched template read, then AgentBuilder.initialize_agents with ``--concurrency``
+
+    python -m tools.benchmarks.agent_initialization --actors 2 4 8 --concurrency 4 --llm-ms 1200
+"""
+import argparse
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+from tools.benchmarks import print_report
+
+
+class StubTemplateStore:
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.reads = 0
+
+    async def get(self, actor_id: str) -> str:
+        self.reads += 1
+        await asyncio.sleep(self.latency)
+        return actor_id
+
+    async def get_many(self, actor_ids: List[str]) -> Dict[str, str]:
+        self.reads += 1
+        await asyncio.sleep(self.latency)
+        return {actor_id: actor_id for actor_id in actor_ids}
+
+
+def make_builder(concurrency: int, llm: float, extra: float):
+    from src.framework import Message
+    from src.scenario.base import AgentBuilder
+    from src.settings.scenario import ScenarioSettings
+
+    class BenchmarkAgentBuilder(AgentBuilder):
+
+        def __init__(self):
+            self.scenario = SimpleNamespace(
+                settings=ScenarioSettings(agent_initialization_concurrency=concurrency),
+                logger=logging.getLogger('benchmark'),
+                instance_uid='benchmark',
+            )
+            self.initialization_timings = {}
+
+        async def format_system_message_async(self, agent):
+            with self.time_phase(agent, 'personality'):
+                await asyncio.sleep(llm)
+            with self.time_phase(agent, 'extra_information'):
+                await asyncio.sleep(extra)
+            return Message.from_system(content=agent.name, author_id=agent.id), agent.name
+
+        def get_scenario_instructions(self, agent) -> str:
+            return ''
+
+        def get_role_and_behaviour(self, agent) -> str:
+            return ''
+
+        def get_scenario_specific_personality_traits(self, agent) -> str:
+            return ''
+
+    return BenchmarkAgentBuilder()
+
+
+def make_agent(actor_id: str, agent_type) -> SimpleNamespace:
+    return SimpleNamespace(id=actor_id, name=actor_id, type=agent_type, personality=None,
+                           add_message=lambda message: None)
+
+
+async def start(scenario: str, actors: int, mode: str, args) -> Dict[str, float]:
+    from src.scenario.models import AgentType
+
+    store = StubTemplateStore(args.read_ms / 1000)
+    actor_ids = [f'actor-{index}' for index in range(actors)]
+    special_actor_ids = ['moderator'] if scenario == 'debate' else []
+    concurrency = 1 if mode == 'sequential' else args.concurrency
+    builder = make_builder(concurrency, args.llm_ms / 1000, args.extra_ms / 1000)
+
+    begin = time.perf_counter()
+    if mode == 'sequential':
+        templates = {actor_id: await store.get(actor_id) for actor_id in actor_ids + special_actor_ids}
+    else:
+        templates = await store.get_many(actor_ids + special_actor_ids)
+    agents = [make_agent(templates[actor_id], AgentType.AGENT) for actor_id in actor_ids]
+    agents += [make_agent(templates[actor_id], AgentType.SPECIAL_AGENT) for actor_id in special_actor_ids]
+    await builder.initialize_agents(agents)
+    elapsed = time.perf_counter() - begin
+
+    queued = [timings.get('queued', 0.0) for timings in builder.initialization_timings.values()]
+    return {
+        'startup_ms': elapsed * 1000,
+        'template_reads': store.reads,
+        'max_queued_ms': max(queued, default=0.0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--actors', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--read-ms', type=float, default=30)
+    parser.add_argument('--llm-ms', type=float, default=1200)
+    parser.add_argument('--extra-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    for scenario in ('debate', 'speed_dating'):
+        results = {
+            f'{mode}_{actors}_actors': asyncio.run(start(scenario, actors, mode, args))
+            for actors in args.actors
+            for mode in ('sequential', 'concurrent')
+        }
+        print_report(f'{scenario}, {args.llm_ms}ms per personality summary, concurrency {args.concurrency}', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+AppPackage cold load, actor / scenario lookups and per worker memory with a synthetic package of many actors,
+comparing the previous JSON load with linear scans, the JSON load with id indexes, and the memory-mapped snapshot.
+
+Every mode runs in ``--workers`` separate processes that hold their loaded package at the same time, like uvicorn
+workers, so the reported PSS splits the pages of the shared snapshot mapping between them.
+
+    python -m tools.benchmarks.app_package --actors 5000 --scenarios 500 --workers 4 --lookups 20000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+from tools.benchmarks import Timer, current_rss_mb, print_report, summarize
+
+MODES = ('legacy_json_scan', 'json_indexed', 'snapshot')
+# Importing the settings prints them, worker reports are told apart by this prefix
+REPORT_PREFIX = 'app_package_report '
+
+
+def proportional_set_size_mb() -> float:
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            for line in smaps:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def generate(directory: str, actors: int, scenarios: int) -> None:
+    from src.models.app_package import AppPackage, AppPackageData
+    from src.models.schemas import ActorSchema, LobbyPageSchema, LobbyTileSchema, LobbyTreeSchema, ScenarioSchema
+
+    rng = random.Random(0)
+    words = [f'word{i}' for i in range(500)]
+
+    def sentence(length: int) -> str:
+        return ' '.join(rng.choices(words, k=length))
+
+    data = AppPackageData(
+        version=1,
+        image_paths={f'image_{i}': f'images/image_{i}.png' for i in range(actors + scenarios)},
+        actors=[ActorSchema(
+            uid=f'actor_{i}',
+            name=f'Actor {i}',
+            image_url=f'https://example.com/actors/{i}.png',
+            description=sentence(20),
+            qualities=[sentence(2) for _ in range(5)],
+            essence=sentence(30),
+            profile=sentence(120),
+            autobiography=sentence(300),
+        ) for i in range(actors)],
+        scenarios=[ScenarioSchema(uid=f'scenario_{i}', name=f'Scenario {i}', description=sentence(60),
+                                  image_url=f'https://example.com/scenarios/{i}.png')
+                   for i in range(scenarios)],
+        lobby_tree=LobbyTreeSchema(
+            root=LobbyPageSchema(id='root', title='Lobby', tiles=[
+                LobbyTileSchema(id=f'tile_{i}', title=f'Tile {i}', scenario_link_id=f'scenario_{i}')
+                for i in range(min(scenarios, 50))
+            ]),
+        ),
+    )
+
+    with open(os.path.join(directory, 'app_package.json'), 'w', encoding='utf-8') as file:
+        file.write(data.model_dump_json())
+    AppPackage(data).save_snapshot(os.path.join(directory, 'app_package.bin'))
+
+
+def worker(mode: str, directory: str, actors: int, scenarios: int, lookups: int) -> None:
+    from src.models.app_package import AppPackage, AppPackageData
+
+    rss_before = current_rss_mb()
+    with Timer() as load:
+        if mode == 'snapshot':
+            package = AppPackage.from_snapshot(os.path.join(directory, 'app_package.bin'))
+        elif mode == 'json_indexed':
+            with open(os.path.join(directory, 'app_package.json'), 'rb') as file:
+                package = AppPackage(AppPackageData.model_validate_json(file.read()))
+        else:
+            with open(os.path.join(directory, 'app_package.json'), 'r', encoding='utf-8') as file:
+                package = AppPackage(AppPackageData.model_validate(json.load(file)))
+
+    if mode == 'legacy_json_scan':
+        def get_actor(uid: str):
+            return next((actor for actor in package.data.actors if actor.uid == uid), None)
+
+        def get_scenario(uid: str):
+            return next((scenario for scenario in package.data.scenarios if scenario.uid == uid), None)
+    else:
+        get_actor, get_scenario = package.get_actor, package.get_scenario
+
+    rng = random.Random(os.getpid())
+    # Requests keep coming back to a small set of popular templates
+    popular = max(1, actors // 20)
+    actor_ids = [f'actor_{rng.randrange(popular) if rng.random() < 0.8 else rng.randrange(actors)}' for _ in range(lookups)]
+    scenario_ids = [f'scenario_{rng.randrange(scenarios)}' for _ in range(lookups // 10)]
+
+    latencies: List[float] = []
+    for uid in actor_ids:
+        with Timer() as lookup:
+            actor = get_actor(uid)
+        latencies.append(lookup.elapsed)
+        assert actor is not None
+    for uid in scenario_ids:
+        with Timer() as lookup:
+            scenario = get_scenario(uid)
+        latencies.append(lookup.elapsed)
+        assert scenario is not None
+
+    lookup_summary = summarize(latencies)
+    print(REPORT_PREFIX + json.dumps({
+        'load_ms': load.elapsed * 1000,
+        'lookup_mean_us': lookup_summary['mean_ms'] * 1000,
+        'lookup_p99_us': lookup_summary['p99_ms'] * 1000,
+        'package_rss_mb': current_rss_mb() - rss_before,
+        'rss_mb': current_rss_mb(),
+        'pss_mb': proportional_set_size_mb(),
+    }), flush=True)
+    # Hold the package until every worker of this mode has reported
+    sys.stdin.read()
+
+
+def run_workers(mode: str, args, directory: str) -> Dict[str, float]:
+    command = [sys.executable, '-m', 'tools.benchmarks.app_package', '--worker', mode, '--directory', directory,
+               '--actors', str(args.actors), '--scenarios', str(args.scenarios), '--lookups', str(args.lookups)]
+    processes = [subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(args.workers)]
+    reports = []
+    for process in processes:
+        for line in process.stdout:
+            if line.startswith(REPORT_PREFIX):
+                reports.append(json.loads(line[len(REPORT_PREFIX):]))
+                break
+        else:
+            raise RuntimeError(f'{mode} worker exited with code {process.wait()}')
+    for process in processes:
+        process.stdin.close()
+        process.wait()
+
+    return {
+        'load_ms': max(report['load_ms'] for report in reports),
+        'lookup_mean_us': sum(report['lookup_mean_us'] for report in reports) / len(reports),
+        'lookup_p99_us': max(report['lookup_p99_us'] for report in reports),
+        'package_rss_mb': sum(report['package_rss_mb'] for report in reports) / len(reports),
+        'worker_pss_mb': sum(report['pss_mb'] for report in reports) / len(reports),
+        'total_pss_mb': sum(report['pss_mb'] for report in reports),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--actors', type=int, default=5_000)
+    parser.add_argument('--scenarios', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--lookups', type=int, default=20_000)
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--directory', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.directory, args.actors, args.scenarios, args.lookups)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        with Timer() as generation:
+            generate(directory, args.actors, args.scenarios)
+        sizes = {name: os.path.getsize(os.path.join(directory, name)) / 2 ** 20
+                 for name in ('app_package.json', 'app_package.bin')}
+        print(f'Generated {args.actors} actors and {args.scenarios} scenarios in {generation.elapsed:.1f}s '
+              f'(json {sizes["app_package.json"]:.1f} MB, snapshot {sizes["app_package.bin"]:.1f} MB)')
+
+        print_report(f'{args.workers} workers, {args.lookups} actor lookups each', {
+            mode: run_workers(mode, args, directory) for mode in MODES
+        })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Voice chunk decode latency and I/O of the previous temp-file path (write the chunk to a temp file, convert it to a
+wav file with ffmpeg, read that back through another ffmpeg run) against ffmpeg pipes, started per chunk or taken
+warm from the decoder pool.
+
+The webm/opus chunks are encoded from a synthetic speech-like signal with ffmpeg before the measurement starts.
+Syscalls and I/O are read from /proc/self/io for this process and from getrusage for the ffmpeg children.
+
+    python -m tools.benchmarks.audio_decode --chunks 50 --chunk-ms 500 --pool-size 4
+"""
+import argparse
+import resource
+import time
+from typing import Callable, Dict, List
+
+import ffmpeg
+import numpy as np
+
+from tools.benchmarks import print_report, summarize
+
+SAMPLE_RATE = 16000
+
+
+def speech_like_pcm(seconds: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    phase = 2 * np.pi * np.cumsum(120 + 40 * np.sin(2 * np.pi * 0.5 * t + seed)) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    signal = 0.3 * voiced * (np.sin(2 * np.pi * 3 * t) > -0.3) + 0.02 * rng.standard_normal(t.shape)
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+
+def encode_webm(pcm: np.ndarray) -> bytes:
+    out, _ = (
+        ffmpeg
+        .input('pipe:0', format='s16le', ac=1, ar=SAMPLE_RATE)
+        .output('pipe:1', format='webm', acodec='libopus')
+        .run(input=pcm.tobytes(), capture_stdout=True, capture_stderr=True)
+    )
+    return out
+
+
+def decode_temp_file(data: bytes) -> np.ndarray:
+    from src.framework.utils import CreateWavFile
+
+    with CreateWavFile(data, mime_type='audio/webm;codec=opus') as file_path:
+        out, _ = (
+            ffmpeg
+            .input(file_path, threads=0)
+            .output('-', format='s16le', acodec='pcm_s16le', ac=1, ar=SAMPLE_RATE)
+            .run(cmd=['ffmpeg', '-nostdin'], capture_stdout=True, capture_stderr=True)
+        )
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def read_proc_io() -> Dict[str, int]:
+    with open('/proc/self/io') as io:
+        return {key: int(value) for key, value in (line.split(': ') for line in io)}
+
+
+def measure(decode: Callable[[bytes], np.ndarray], chunks: List[bytes]) -> Dict[str, float]:
+    io_before, children_before = read_proc_io(), resource.getrusage(resource.RUSAGE_CHILDREN)
+    latencies: List[float] = []
+    for chunk in chunks:
+        start = time.perf_counter()
+        decode(chunk)
+        latencies.append(time.perf_counter() - start)
+    io_after, children_after = read_proc_io(), resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    count = len(chunks)
+    timing = summarize(latencies)
+    return {
+        'p50_ms': timing['p50_ms'],
+        'p95_ms': timing['p95_ms'],
+        'syscalls': (io_after['syscr'] + io_after['syscw'] - io_before['syscr'] - io_before['syscw']) / count,
+        'disk_write_kb': (io_after['write_bytes'] - io_before['write_bytes']) / 1024 / count,
+        'child_blocks': (children_after.ru_inblock + children_after.ru_oublock
+                         - children_before.ru_inblock - children_before.ru_oublock) / count,
+        'child_cpu_ms': ((children_after.ru_utime + children_after.ru_stime)
+                         - (children_before.ru_utime + children_before.ru_stime)) * 1000 / count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunks', type=int, default=50)
+    parser.add_argument('--chunk-ms', type=int, default=500)
+    parser.add_argument('--pool-size', type=int, default=4)
+    args = parser.parse_args()
+
+    from src.framework.utils import AudioDecoderPool
+
+    chunks = [encode_webm(speech_like_pcm(args.chunk_ms / 1000, seed)) for seed in range(args.chunks)]
+    print(f'{len(chunks)} webm/opus chunks of {args.chunk_ms}ms, {np.mean([len(c) for c in chunks]):.0f} bytes on average')
+
+    warm_pool = AudioDecoderPool(size=args.pool_size, sample_rate=SAMPLE_RATE)
+    warm_pool.warm_up()
+    time.sleep(0.5)
+
+    results = {
+        'temp_file': measure(decode_temp_file, chunks),
+        'pipe_per_chunk': measure(AudioDecoderPool(size=0, sample_rate=SAMPLE_RATE).decode, chunks),
+        'warm_pool': measure(warm_pool.decode, chunks),
+    }
+    results['warm_pool'].update(cold_starts=warm_pool.stats()['cold_starts'])
+    warm_pool.close()
+
+    print_report('Voice chunk decode', results)
+
+
+if __name__ == '__main__':
+    main()
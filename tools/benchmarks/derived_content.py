@@ -0,0 +1,117 @@
+"""
+Scenario start latency and LLM calls with and without the derived content cache.
+
+A stand-in scenario start summarizes the personality of ``--agents`` agents one after another, like
+AgentBuilder.initialize_agents, generates the stages, like InterviewStageManager, and then waits for the first agent
+message. Every LLM call of the stub takes ``--llm-ms``. ``--starts`` scenarios are started one after another with the
+same template and actors. The modes compare:
+
+- no_cache: every start generates everything, how scenarios started before
+- cold: the first start of a new app package version generates, later starts hit the memory front
+- warm: every start in a new process after the package was used, reading the local files
+- remote: every start on a new instance without local files, reading the storage provider
+
+    python -m tools.benchmarks.derived_content --starts 20 --agents 3 --llm-ms 1500
+"""
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from tools.benchmarks import print_report, summarize
+
+
+class StubLLM:
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def run_async(self, _input: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return f'Generated from {len(_input)} characters'
+
+
+async def start_scenario(cache, llm: StubLLM, agents: int) -> None:
+    params = {'model': 'gpt-4o', 'temperature': 0.4}
+    for index in range(agents):
+        _input = f'Summarize the personality of actor {index}: curious, direct, impatient.'
+        await cache.get_or_create('personality', ['AgentBuilder', _input, 'openai', params],
+                                  lambda: llm.run_async(_input))
+
+    _input = 'Generate the stages of a job interview for a junior developer.'
+    await cache.get_or_create('interview-stages', ['InterviewStageManager', _input, 'openai', params],
+                              lambda: llm.run_async(_input))
+
+    # The first agent message is generated for every session
+    await llm.run_async('First message')
+
+
+async def run(mode: str, args) -> Dict[str, float]:
+    from src.services.storage.async_service import AsyncStorageService
+    from src.services.storage.derived import DerivedContentCache
+    from src.services.storage.memory import MemoryStorageService
+    from src.settings.services import DerivedContentConfig, StorageExecutorConfig
+    from src.models.app_package import AppPackageData
+
+    directory = tempfile.TemporaryDirectory()
+    remote = AsyncStorageService(
+        MemoryStorageService(latency=args.storage_ms / 1000, app_package=AppPackageData(version=1)),
+        StorageExecutorConfig())
+
+    def make_cache(subdirectory: str) -> DerivedContentCache:
+        config = DerivedContentConfig(
+            enabled=mode != 'no_cache', directory=str(Path(directory.name) / subdirectory), remote=True)
+        return DerivedContentCache(lambda: 1, config, remote)
+
+    llm = StubLLM(args.llm_ms / 1000)
+    if mode in ('warm', 'remote'):
+        # A previous process generated everything
+        previous = make_cache('previous')
+        await start_scenario(previous, llm, args.agents)
+        await previous.flush()
+        llm.calls = 0
+
+    shared = make_cache('current')
+    latencies: List[float] = []
+    for index in range(args.starts):
+        if mode == 'warm':
+            # A new process finds the files of the previous one
+            cache = make_cache('previous')
+        elif mode == 'remote':
+            cache = make_cache(f'instance-{index}')
+        else:
+            cache = shared
+        start = time.perf_counter()
+        await start_scenario(cache, llm, args.agents)
+        latencies.append(time.perf_counter() - start)
+
+    directory.cleanup()
+    start_latency = summarize(latencies)
+    return {
+        'llm_calls_per_start': llm.calls / args.starts,
+        'first_start_ms': latencies[0] * 1000,
+        'start_p50_ms': start_latency['p50_ms'],
+        'start_p99_ms': start_latency['p99_ms'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--starts', type=int, default=20)
+    parser.add_argument('--agents', type=int, default=3)
+    parser.add_argument('--llm-ms', type=float, default=1500)
+    parser.add_argument('--storage-ms', type=float, default=40)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {mode: asyncio.run(run(mode, args)) for mode in ('no_cache', 'cold', 'warm', 'remote')}
+    print_report(f'{args.starts} scenario starts, {args.agents} agents, {args.llm_ms}ms per LLM call', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+CPU cost and accuracy of incremental diarization against re-running the full pyannote pipeline on the whole
+conversation every time a chunk arrives.
+
+The two-speaker fixture is synthetic: alternating turns cut from a speech recording, with every other turn
+resampled to shift its pitch and formants so that it sounds like a second speaker. The turn boundaries are known,
+so the speaker error is measured per 100ms frame under the best mapping of hypothesis to reference speakers.
+
+    python -m tools.benchmarks.diarization_stream --turns 8 --chunk-ms 500
+"""
+import argparse
+import asyncio
+import itertools
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.benchmarks import print_report, summarize
+from tools.benchmarks.vad import DEFAULT_FIXTURE, SAMPLE_RATE, load_wav
+
+FRAME_SECONDS = 0.1
+
+Turn = Tuple[str, float, float]
+
+
+def shift_voice(audio: np.ndarray, factor: float) -> np.ndarray:
+    """Resample so that playback at the original rate is ``factor`` times higher pitched."""
+    positions = np.arange(0, len(audio) - 1, factor)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def two_speaker_fixture(speech: np.ndarray, turns: int, turn_seconds: float, gap_seconds: float) -> Tuple[np.ndarray, List[Turn]]:
+    size, gap = int(turn_seconds * SAMPLE_RATE), int(gap_seconds * SAMPLE_RATE)
+    parts: List[np.ndarray] = []
+    reference: List[Turn] = []
+    position = 0
+    for turn in range(turns):
+        start = (turn * size) % max(1, len(speech) - size)
+        clip = speech[start:start + size]
+        speaker = 'A' if turn % 2 == 0 else 'B'
+        if speaker == 'B':
+            clip = shift_voice(clip, 0.8)
+        parts += [np.zeros(gap, dtype=np.float32), clip]
+        position += gap
+        reference.append((speaker, position / SAMPLE_RATE, (position + len(clip)) / SAMPLE_RATE))
+        position += len(clip)
+    return np.concatenate(parts), reference
+
+
+def frame_labels(turns: List[Turn], duration: float) -> List[Optional[str]]:
+    labels: List[Optional[str]] = []
+    for frame in range(int(duration / FRAME_SECONDS)):
+        middle = (frame + 0.5) * FRAME_SECONDS
+        labels.append(next((speaker for speaker, start, end in turns if start <= middle < end), None))
+    return labels
+
+
+def speaker_error(hypothesis: List[Turn], reference: List[Turn], duration: float) -> float:
+    """Fraction of reference speech frames not attributed to the right speaker, under the best speaker mapping."""
+    ref, hyp = frame_labels(reference, duration), frame_labels(hypothesis, duration)
+    ref_speakers = sorted({label for label in ref if label})
+    hyp_speakers = sorted({label for label in hyp if label})
+    speech_frames = sum(1 for label in ref if label)
+    best = speech_frames
+    for permutation in itertools.permutations(hyp_speakers + [None] * len(ref_speakers), len(ref_speakers)):
+        mapping = dict(zip(permutation, ref_speakers))
+        errors = sum(1 for r, h in zip(ref, hyp) if r and mapping.get(h) != r)
+        best = min(best, errors)
+    return best / max(1, speech_frames)
+
+
+def segments_to_turns(segments) -> List[Turn]:
+    return [(segment.speaker, segment.start_time, segment.end_time) for segment in segments if segment.speaker]
+
+
+def run_full_rerun(chunks: List[np.ndarray]) -> Tuple[List[float], List[Turn]]:
+    from src.framework.runnables.generators.diarization.models import DiarizationGenerationParams
+    from src.framework.runnables.generators.diarization.services.pyannote import PyannoteSpeechDiarizationService
+
+    service = PyannoteSpeechDiarizationService()
+    params = DiarizationGenerationParams(mode='diarization')
+    received: List[np.ndarray] = []
+    cpu_times: List[float] = []
+    response = None
+    for chunk in chunks:
+        received.append(chunk)
+        start = time.process_time()
+        response = service.run(np.concatenate(received), params)
+        cpu_times.append(time.process_time() - start)
+    return cpu_times, segments_to_turns(response.segments)
+
+
+async def run_streaming(chunks: List[np.ndarray]) -> Tuple[List[float], List[Turn]]:
+    from src.framework.runnables.generators.diarization.models import DiarizationGenerationParams
+    from src.framework.runnables.generators.diarization.services.pyannote import PyannoteSpeechDiarizationService
+
+    service = PyannoteSpeechDiarizationService()
+    params = DiarizationGenerationParams(mode='diarization', min_duration_off=0.3)
+    await asyncio.get_running_loop().run_in_executor(None, service.create_streaming_session, params)
+
+    cpu_times: List[float] = []
+    turns: List[Turn] = []
+    last = time.process_time()
+
+    async def replay() -> AsyncIterator[np.ndarray]:
+        for chunk in chunks:
+            yield chunk
+
+    # Chunks are replayed without delay, so the per-response CPU time covers every chunk merged into that step
+    async for response in service.run_stream(replay(), params):
+        now = time.process_time()
+        cpu_times.append(now - last)
+        last = now
+        turns += segments_to_turns(response.segments)
+    return cpu_times, turns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixture', type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument('--turns', type=int, default=8)
+    parser.add_argument('--turn-seconds', type=float, default=3.0)
+    parser.add_argument('--gap-seconds', type=float, default=0.5)
+    parser.add_argument('--chunk-ms', type=int, default=500)
+    parser.add_argument('--skip-rerun', action='store_true', help='Skip the full re-run baseline, it grows quadratically')
+    args = parser.parse_args()
+
+    audio, reference = two_speaker_fixture(load_wav(args.fixture), args.turns, args.turn_seconds, args.gap_seconds)
+    duration = len(audio) / SAMPLE_RATE
+    size = int(SAMPLE_RATE * args.chunk_ms / 1000)
+    chunks = [audio[i:i + size] for i in range(0, len(audio), size)]
+    print(f'{duration:.1f}s two-speaker fixture, {len(chunks)} chunks of {args.chunk_ms}ms')
+
+    runs = {'streaming': lambda: asyncio.run(run_streaming(chunks))}
+    if not args.skip_rerun:
+        runs = {'full_rerun': lambda: run_full_rerun(chunks), **runs}
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, run in runs.items():
+        cpu_times, turns = run()
+        timing = summarize(cpu_times)
+        results[name] = {
+            'cpu_total_s': sum(cpu_times),
+            'cpu_rtf': sum(cpu_times) / duration,
+            'step_p50_ms': timing['p50_ms'],
+            'step_max_ms': timing['max_ms'],
+            'speakers': len({speaker for speaker, _, _ in turns}),
+            'speaker_error': speaker_error(turns, reference, duration),
+        }
+
+    print_report('Two-speaker diarization on CPU', results)
+
+
+if __name__ == '__main__':
+    main()
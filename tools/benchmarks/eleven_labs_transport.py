@@ -0,0 +1,175 @@
+"""
+Time to the first audio byte of ElevenLabs text to speech against local stubs that add ``--handshake-ms`` to every new
+connection, standing in for the DNS, TCP, TLS and websocket handshakes with the real API.
+
+``--agents`` agents with voices of their own each speak ``--utterances`` replies ``--gap-ms`` apart. The modes compare:
+
+- ws_cold: a stream-input websocket connected per reply, how full duplex streams connected before
+- ws_warm: warm sockets from the shared transport, prewarmed like AgentBuilder does when the agents are built
+- http_per_call: a ClientSession per request to the streaming endpoint, how the client made requests before
+- http_shared: the shared session of the transport
+
+    python -m tools.benchmarks.eleven_labs_transport --agents 10 --utterances 5 --handshake-ms 150
+"""
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import AsyncIterator, Dict, List
+
+import aiohttp
+import websockets
+from aiohttp import web
+
+from tools.benchmarks import print_report, summarize
+
+MODEL, OUTPUT_FORMAT, LATENCY = 'eleven_turbo_v2', 'mp3_44100_128', 1
+AUDIO = base64.b64encode(bytes(2048)).decode()
+
+
+class StubServers:
+    """A stream-input websocket and a streaming HTTP endpoint, both paying the handshake once per connection."""
+
+    def __init__(self, handshake: float):
+        self.handshake = handshake
+        self.connections = 0
+        self._known_transports = set()
+
+    async def start(self) -> None:
+        self._ws_server = await websockets.serve(self._handle_ws, '127.0.0.1', 0, process_request=self._handshake)
+        app = web.Application()
+        app.router.add_post('/v1/text-to-speech/{voice_id}/stream', self._handle_http)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        self._http_site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await self._http_site.start()
+
+    async def stop(self) -> None:
+        self._ws_server.close()
+        await self._ws_server.wait_closed()
+        await self._runner.cleanup()
+
+    @property
+    def ws_url_base(self) -> str:
+        host, port = self._ws_server.sockets[0].getsockname()[:2]
+        return f'ws://{host}:{port}/v1'
+
+    @property
+    def url_base(self) -> str:
+        host, port = self._runner.addresses[0][:2]
+        return f'http://{host}:{port}/v1'
+
+    async def _handshake(self, connection, request) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake)
+
+    async def _handle_ws(self, websocket) -> None:
+        async for message in websocket:
+            data = json.loads(message)
+            if 'xi_api_key' in data:
+                continue
+            if data['text'] == '':
+                await websocket.send(json.dumps({'isFinal': True}))
+                return
+            await websocket.send(json.dumps({'audio': AUDIO}))
+
+    async def _handle_http(self, request: web.Request) -> web.StreamResponse:
+        if request.transport not in self._known_transports:
+            self._known_transports.add(request.transport)
+            self.connections += 1
+            await asyncio.sleep(self.handshake)
+        await request.read()
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for _ in range(4):
+            await response.write(bytes(2048))
+        await response.write_eof()
+        return response
+
+
+async def reply_text() -> AsyncIterator[str]:
+    for word in 'Sure, I can walk you through the next steps of the plan.'.split():
+        yield f'{word} '
+
+
+async def first_audio(chunks) -> float:
+    start = time.perf_counter()
+    first = None
+    async for chunk in chunks:
+        if first is None and chunk.audio:
+            first = time.perf_counter() - start
+    return first
+
+
+async def http_per_call(servers: StubServers) -> float:
+    # The request as generate_async_stream_output made it, with a session of its own
+    start = time.perf_counter()
+    first = None
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f'{servers.url_base}/text-to-speech/voice/stream', json={'text': 'Sure'}) as response:
+            async for chunk in response.content.iter_chunked(2048):
+                if first is None and chunk:
+                    first = time.perf_counter() - start
+    return first
+
+
+async def run(mode: str, args) -> Dict[str, float]:
+    from src.framework.runnables.generators.audio.services.eleven_labs.client import ElevenLabsClient
+    from src.framework.runnables.generators.audio.services.eleven_labs.transport import ElevenLabsTransport
+
+    servers = StubServers(args.handshake_ms / 1000)
+    await servers.start()
+    transport = ElevenLabsTransport(ws_url_base=servers.ws_url_base)
+    transport.warm_sockets = 0 if mode == 'ws_cold' else 1
+    client = ElevenLabsClient('benchmark', transport=transport)
+    client.url_base = servers.url_base
+
+    if mode == 'ws_warm':
+        for index in range(args.agents):
+            client.prewarm(f'voice{index}', MODEL, OUTPUT_FORMAT, LATENCY)
+        await asyncio.sleep(args.handshake_ms / 1000 + 0.05)
+
+    latencies: List[float] = []
+
+    async def agent(voice_id: str) -> None:
+        for _ in range(args.utterances):
+            if mode == 'http_per_call':
+                latencies.append(await http_per_call(servers))
+            elif mode == 'http_shared':
+                latencies.append(await first_audio(client.generate_async_stream_output(
+                    'Sure', voice_id, None, MODEL, OUTPUT_FORMAT, LATENCY, 2048)))
+            else:
+                latencies.append(await first_audio(client.generate_async_stream_full_duplex(
+                    reply_text(), voice_id, None, MODEL, OUTPUT_FORMAT, LATENCY, 2048, None)))
+            await asyncio.sleep(args.gap_ms / 1000)
+
+    await asyncio.gather(*(agent(f'voice{index}') for index in range(args.agents)))
+    await transport.aclose()
+    await servers.stop()
+
+    first_byte = summarize(latencies)
+    return {
+        'replies': len(latencies),
+        'connections': servers.connections,
+        'first_audio_p50_ms': first_byte['p50_ms'],
+        'first_audio_p99_ms': first_byte['p99_ms'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--agents', type=int, default=10)
+    parser.add_argument('--utterances', type=int, default=5)
+    parser.add_argument('--handshake-ms', type=float, default=150)
+    parser.add_argument('--gap-ms', type=float, default=500)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {mode: asyncio.run(run(mode, args)) for mode in ('ws_cold', 'ws_warm', 'http_per_call', 'http_shared')}
+    print_report(f'{args.agents} agents, {args.utterances} replies each, {args.handshake_ms}ms handshake', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Requests per second and latency added per request by FirebaseAuthMiddleware, with tokens signed by a local key.
+
+Clients send requests to a FastAPI route through the middleware, each reusing its own ID token like the app does
+between refreshes. The modes compare:
+
+- no_auth: the route without the middleware, the baseline the added latency is measured against
+- base_http_uncached: the previous BaseHTTPMiddleware, verifying every token on the event loop the way
+  ``firebase_admin.auth.verify_id_token`` does (google.oauth2.id_token with the certificates parsed on every call)
+- asgi_uncached: the ASGI middleware verifying every token on its thread pool
+- asgi_cached: the ASGI middleware with the token cache
+
+    python -m tools.benchmarks.firebase_auth --clients 50 --users 200 --seconds 5
+"""
+import argparse
+import asyncio
+import base64
+import datetime
+import json
+import logging
+import time
+from typing import Dict, List
+
+from tools.benchmarks import print_report, summarize
+
+PROJECT_ID = 'quiply-benchmark'
+KEY_ID = 'benchmark'
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+class LocalSigner:
+    """Signs ID tokens with a local RSA key and serves its certificate like Google's certificate endpoint."""
+
+    def __init__(self):
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import padding, rsa
+        from cryptography.x509.oid import NameOID
+
+        self._hashes, self._padding = hashes, padding
+        self.key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'securetoken')])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        certificate = (x509.CertificateBuilder()
+                       .subject_name(name).issuer_name(name)
+                       .public_key(self.key.public_key())
+                       .serial_number(x509.random_serial_number())
+                       .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+                       .sign(self.key, hashes.SHA256()))
+        self.certificates = {KEY_ID: certificate.public_bytes(serialization.Encoding.PEM).decode()}
+
+    def sign(self, uid: str) -> str:
+        now = int(time.time())
+        header = {'alg': 'RS256', 'kid': KEY_ID, 'typ': 'JWT'}
+        payload = {'iss': f'https://securetoken.google.com/{PROJECT_ID}', 'aud': PROJECT_ID, 'sub': uid,
+                   'iat': now, 'exp': now + 3600}
+        signing_input = f'{_b64encode(json.dumps(header).encode())}.{_b64encode(json.dumps(payload).encode())}'
+        signature = self.key.sign(signing_input.encode(), self._padding.PKCS1v15(), self._hashes.SHA256())
+        return f'{signing_input}.{_b64encode(signature)}'
+
+    def fetch(self, url: str):
+        return dict(self.certificates), {'Cache-Control': 'public, max-age=21600'}
+
+
+def make_base_http_middleware(signer: LocalSigner):
+    """The middleware as it was, with the certificate request answered locally instead of from the HTTP cache."""
+    import google.oauth2.id_token
+    from google.auth import transport
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from starlette.responses import JSONResponse
+
+    class LocalResponse(transport.Response):
+        status = 200
+        headers = {'content-type': 'application/json'}
+        data = json.dumps(signer.certificates).encode()
+
+    class LocalRequest(transport.Request):
+        def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+            return LocalResponse()
+
+    request = LocalRequest()
+
+    class UncachedFirebaseAuthMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request_, call_next):
+            authorization = request_.headers.get('Authorization')
+            if not authorization:
+                return JSONResponse({"detail": "Authorization header is missing"}, status_code=401)
+            try:
+                request_.state.user = google.oauth2.id_token.verify_token(
+                    authorization.split(" ")[-1], request=request, audience=PROJECT_ID)
+            except Exception:
+                return JSONResponse({"detail": "Invalid or expired token"}, status_code=403)
+            return await call_next(request_)
+
+    return UncachedFirebaseAuthMiddleware
+
+
+def make_app(mode: str, signer: LocalSigner, args):
+    from fastapi import FastAPI, Request
+    from src.fastapi_app.middlewares import (
+        CachedTokenVerifier,
+        FirebaseAuthMiddleware,
+        FirebaseTokenVerifier,
+        GooglePublicKeys,
+    )
+    from src.settings.fastapi import FirebaseAuthSettings
+
+    app = FastAPI()
+
+    @app.get('/profile')
+    async def profile(request: Request):
+        user = getattr(request.state, 'user', None)
+        return {'uid': user['sub'] if user else None}
+
+    verifier = None
+    if mode == 'base_http_uncached':
+        app.add_middleware(make_base_http_middleware(signer))
+    elif mode.startswith('asgi'):
+        verifier = CachedTokenVerifier(
+            FirebaseTokenVerifier(PROJECT_ID, GooglePublicKeys(fetch=signer.fetch)),
+            FirebaseAuthSettings(cache_enabled=mode == 'asgi_cached', max_workers=args.workers),
+        )
+        app.add_middleware(FirebaseAuthMiddleware, verifier=verifier)
+    return app, verifier
+
+
+async def request(app, token: str) -> int:
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': '/profile', 'raw_path': b'/profile', 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'authorization', f'Bearer {token}'.encode())],
+        'client': ('127.0.0.1', 1234), 'server': ('localhost', 80),
+    }
+    status = 0
+    received = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Like a server, report the disconnect once the response was sent
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+            finished.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(mode: str, signer: LocalSigner, tokens: List[str], args) -> Dict[str, float]:
+    app, verifier = make_app(mode, signer, args)
+    await request(app, tokens[0])  # builds the middleware stack and fetches the certificates
+
+    latencies: List[float] = []
+    probe_lags: List[float] = []
+    failures = 0
+    deadline = time.perf_counter() + args.seconds
+
+    async def client(index: int) -> None:
+        nonlocal failures
+        token = tokens[index % len(tokens)]
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if await request(app, token) != 200:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    async def probe() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            probe_lags.append(time.perf_counter() - start - 0.01)
+
+    await asyncio.gather(probe(), *(client(index) for index in range(args.clients)))
+    if verifier is not None:
+        verifier.close()
+
+    requests, lag = summarize(latencies), summarize(probe_lags)
+    return {
+        'requests_per_s': len(latencies) / args.seconds,
+        'mean_ms': requests['mean_ms'],
+        'p50_ms': requests['p50_ms'],
+        'p99_ms': requests['p99_ms'],
+        'loop_lag_p99_ms': lag['p99_ms'],
+        'failures': failures,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--users', type=int, default=200, help='Distinct ID tokens, one per signed in user.')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    signer = LocalSigner()
+    tokens = [signer.sign(f'user{index}') for index in range(args.users)]
+
+    results = {}
+    for mode in ('no_auth', 'base_http_uncached', 'asgi_uncached', 'asgi_cached'):
+        results[mode] = asyncio.run(run(mode, signer, tokens, args))
+        results[mode]['added_ms_per_request'] = results[mode]['mean_ms'] - results['no_auth']['mean_ms']
+
+    print_report(f'{args.clients} clients, {args.users} users', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Compares per-call provider clients against the pooled client registry using a local stub of the
+OpenAI chat completions endpoint. The stub counts accepted TCP connections so the effect of connection reuse
+is visible next to the latency numbers.
+
+    python -m tools.benchmarks.llm_clients --requests 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from tools.benchmarks import Timer, print_report, summarize
+
+_COMPLETION = json.dumps({
+    'id': 'chatcmpl-bench',
+    'object': 'chat.completion',
+    'created': 0,
+    'model': 'gpt-4o',
+    'choices': [{
+        'index': 0,
+        'finish_reason': 'stop',
+        'message': {'role': 'assistant', 'content': 'Paris'},
+    }],
+    'usage': {'prompt_tokens': 10, 'completion_tokens': 1, 'total_tokens': 11},
+}).encode()
+
+
+class StubServer:
+    """Minimal HTTP/1.1 keep-alive server answering every request with a fixed chat completion."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f'http://{host}:{port}/v1'
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                header = await reader.readuntil(b'\r\n\r\n')
+                length = 0
+                for line in header.split(b'\r\n'):
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':', 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    + f'Content-Length: {len(_COMPLETION)}\r\n\r\n'.encode()
+                    + _COMPLETION
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _run(factory, requests: int, concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            client = factory()
+            await client.chat.completions.create(
+                model='gpt-4o',
+                messages=[{'role': 'user', 'content': 'What is the capital of France?'}],
+            )
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return samples
+
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    from openai import AsyncOpenAI
+    from src.framework.runnables.generators.clients import ProviderClientRegistry
+
+    results: Dict[str, Dict[str, float]] = {}
+
+    server = StubServer(latency)
+    await server.start()
+    per_call_clients = []
+
+    def per_call():
+        client = AsyncOpenAI(api_key='bench', base_url=server.base_url)
+        per_call_clients.append(client)
+        return client
+
+    with Timer() as timer:
+        samples = await _run(per_call, requests, concurrency)
+    results['per_call_client'] = {**summarize(samples), 'wall_s': timer.elapsed, 'connections': server.connections}
+    for client in per_call_clients:
+        await client.close()
+    await server.stop()
+
+    server = StubServer(latency)
+    await server.start()
+    registry = ProviderClientRegistry()
+
+    def pooled():
+        return registry.get_async_client('openai', api_key='bench', base_url=server.base_url)
+
+    with Timer() as timer:
+        samples = await _run(pooled, requests, concurrency)
+    results['pooled_registry'] = {**summarize(samples), 'wall_s': timer.elapsed, 'connections': server.connections}
+    await registry.aclose()
+    await server.stop()
+
+    print_report(f'LLM client pooling ({requests} requests, concurrency {concurrency})', results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.0, help='Artificial server latency in seconds')
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
@@ -0,0 +1,94 @@
+"""
+Latency of ConversationSummaryMemory.save and of other sessions streaming on the same event loop while memory is
+summarized, comparing a blocking summarizer (the previous behaviour: the summary LLM call holds the loop thread until
+it returns) with the background summarizer.
+
+The summary LLM call is a stub that takes ``--summary-ms``. Other sessions stream a chunk every ``--chunk-ms`` and
+report the gap between consecutive chunks.
+
+    python -m tools.benchmarks.memory_summary --sessions 50 --messages 200 --summary-ms 800
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from tools.benchmarks import print_report, summarize
+
+
+def make_memory(blocking: bool, summary_seconds: float):
+    from src.framework.runnables.agents.memory import ConversationSummaryMemory
+
+    class BlockingSummaryMemory(ConversationSummaryMemory):
+        def _schedule_summary(self) -> None:
+            batch = list(self._unsummarized)
+            time.sleep(summary_seconds)
+            self._commit_summary(f'{self.moving_summary_buffer} +{len(batch)}', len(batch))
+
+    class BackgroundSummaryMemory(ConversationSummaryMemory):
+        async def predict_new_summary_async(self, messages, existing_summary):
+            await asyncio.sleep(summary_seconds)
+            return f'{existing_summary} +{len(messages)}'
+
+    memory_cls = BlockingSummaryMemory if blocking else BackgroundSummaryMemory
+    return memory_cls(token_counter=lambda text: len(text.split()), max_buffer_tokens=400)
+
+
+async def run(blocking: bool, args: argparse.Namespace) -> Dict[str, float]:
+    from src.framework.models import Message
+
+    memory = make_memory(blocking, args.summary_ms / 1000)
+    done = asyncio.Event()
+    gaps: List[float] = []
+
+    async def stream_session() -> None:
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(args.chunk_ms / 1000)
+            now = time.perf_counter()
+            gaps.append(now - last - args.chunk_ms / 1000)
+            last = now
+
+    sessions = [asyncio.create_task(stream_session()) for _ in range(args.sessions)]
+
+    save_latencies: List[float] = []
+    for i in range(args.messages):
+        message = Message.from_user(f'message {i} ' + 'lorem ipsum dolor sit amet ' * 8, author_name='User')
+        start = time.perf_counter()
+        memory.save(message)
+        save_latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(args.message_interval_ms / 1000)
+
+    if not blocking:
+        await memory.wait_for_summary()
+    done.set()
+    await asyncio.gather(*sessions)
+
+    saves, stalls = summarize(save_latencies), summarize(gaps)
+    return {
+        'save_p50_ms': saves['p50_ms'],
+        'save_max_ms': saves['max_ms'],
+        'stream_stall_p99_ms': stalls['p99_ms'],
+        'stream_stall_max_ms': stalls['max_ms'],
+        'summary_tokens': len(memory.moving_summary_buffer.split()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--message-interval-ms', type=float, default=20)
+    parser.add_argument('--chunk-ms', type=float, default=20)
+    parser.add_argument('--summary-ms', type=float, default=800)
+    args = parser.parse_args()
+
+    results = {
+        'blocking_summary': asyncio.run(run(True, args)),
+        'background_summary': asyncio.run(run(False, args)),
+    }
+    print_report(f'Summarization with {args.sessions} other streaming sessions, {args.summary_ms:.0f}ms summaries', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Tokenizer calls and wall time per ``save`` of ConversationSummaryMemory over long synthetic conversations, comparing
+the previous pruning (re-tokenize the whole buffer after every save and after every popped message) with the cached
+per-message counts and running total.
+
+Summaries are stubbed so that only token accounting is measured. Tokens are counted with tiktoken's cl100k_base
+encoding when it is available locally, otherwise with a whitespace tokenizer.
+
+    python -m tools.benchmarks.memory_tokens --messages 2000 --max-buffer-tokens 2100
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from tools.benchmarks import print_report, summarize
+
+WORDS = ('the quick brown fox jumps over lazy dog interview pitch investor stage round question answer '
+         'product market customer feedback launch team growth revenue strategy plan').split()
+
+
+def load_tokenizer() -> (str, Callable[[str], int]):
+    try:
+        import tiktoken
+        encoder = tiktoken.get_encoding('cl100k_base')
+        return 'tiktoken', lambda text: len(encoder.encode(text))
+    except Exception:
+        return 'whitespace', lambda text: len(text.split())
+
+
+def synthetic_conversation(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [' '.join(rng.choices(WORDS, k=rng.randint(8, 80))) for _ in range(count)]
+
+
+class CallCounter:
+    def __init__(self, tokenize: Callable[[str], int]):
+        self.tokenize = tokenize
+        self.calls = 0
+        self.chars = 0
+
+    def __call__(self, text: str) -> int:
+        self.calls += 1
+        self.chars += len(text)
+        return self.tokenize(text)
+
+
+def make_memories(counter: CallCounter, max_buffer_tokens: int):
+    from src.framework.models import Message, MessageRole
+    from src.framework.runnables.agents.memory import ConversationMemory, ConversationSummaryMemory
+
+    def stub_summary(self, messages: List[Message], existing_summary: str) -> str:
+        return f'{existing_summary} {len(messages)} more messages.'.strip()
+
+    class LegacySummaryMemory(ConversationMemory):
+        """
+        The previous ConversationSummaryMemory.prune, with its token counts going through ``counter``. Like the
+        current one it replaces the previous summary, so that both buffers hold the same messages.
+        """
+
+        moving_summary_buffer: str = ''
+
+        def save(self, request) -> None:
+            super().save(request)
+            self.prune()
+
+        def get_token_count(self) -> int:
+            return counter(Message.join_as_string(self.messages))
+
+        def prune(self) -> None:
+            def pop_first_message() -> Optional[Message]:
+                for index, message in enumerate(self):
+                    if not message.is_from(MessageRole.system) and not message.is_from(MessageRole.summary):
+                        return self.pop(index)
+                return None
+
+            def popable_length() -> int:
+                return sum(1 for message in self
+                           if not message.is_from(MessageRole.system) and not message.is_from(MessageRole.summary))
+
+            if len(self) == 0 or popable_length() == 0:
+                return
+
+            buffer_tokens = self.get_token_count()
+            if buffer_tokens > max_buffer_tokens:
+                pruned_messages = []
+                error = False
+                while not error and buffer_tokens > max_buffer_tokens:
+                    for i in range(min(4, popable_length())):
+                        popped = pop_first_message()
+                        if popped is not None:
+                            pruned_messages.append(popped)
+                        else:
+                            error = True
+                            break
+                    buffer_tokens = self.get_token_count()
+                self.moving_summary_buffer = stub_summary(self, pruned_messages, self.moving_summary_buffer)
+                for index in reversed([i for i, m in enumerate(self) if m.is_from(MessageRole.summary)]):
+                    self.pop(index)
+                self.add_message(Message.from_summary(self.moving_summary_buffer), index=0)
+                self.get_token_count()
+
+    class BenchSummaryMemory(ConversationSummaryMemory):
+        predict_new_summary = stub_summary
+
+    return (
+        LegacySummaryMemory(),
+        BenchSummaryMemory(max_buffer_tokens=max_buffer_tokens, token_counter=counter),
+    )
+
+
+def measure(memory, counter: CallCounter, conversation: List[str]) -> Dict[str, float]:
+    from src.framework.models import Message
+
+    messages = [Message.from_user(text, author_name='User') if i % 2 == 0 else Message.from_ai(text, author_name='Agent')
+                for i, text in enumerate(conversation)]
+    counter.calls = counter.chars = 0
+    latencies: List[float] = []
+    for message in messages:
+        start = time.perf_counter()
+        memory.save(message)
+        latencies.append(time.perf_counter() - start)
+
+    timing = summarize(latencies)
+    return {
+        'calls_per_save': counter.calls / len(messages),
+        'chars_tokenized_per_save': counter.chars / len(messages),
+        'mean_ms': timing['mean_ms'],
+        'p99_ms': timing['p99_ms'],
+        'total_s': sum(latencies),
+        'final_tokens': memory.get_token_count(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--max-buffer-tokens', type=int, default=2100)
+    args = parser.parse_args()
+
+    tokenizer_name, tokenize = load_tokenizer()
+    conversation = synthetic_conversation(args.messages)
+
+    legacy_counter, cached_counter = CallCounter(tokenize), CallCounter(tokenize)
+    legacy, _ = make_memories(legacy_counter, args.max_buffer_tokens)
+    _, cached = make_memories(cached_counter, args.max_buffer_tokens)
+
+    results = {
+        'recount_buffer': measure(legacy, legacy_counter, conversation),
+        'cached_counts': measure(cached, cached_counter, conversation),
+    }
+    print_report(f'ConversationSummaryMemory.save, {args.messages} messages, {tokenizer_name} tokenizer', results)
+
+
+if __name__ == '__main__':
+    main()
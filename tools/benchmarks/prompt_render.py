@@ -0,0 +1,102 @@
+"""
+Rendering time of every prompt (and alternative) in data/prompting, comparing the previous path (build a Prompt and
+parse the template on every get_prompt, then str.format) with the compiled templates, and repeated reads of a
+PromptMessage's content within a turn with and without the render memo.
+
+Variables are filled with realistic values: names, a paragraph of instructions and a conversation history of
+``--history`` messages for the *_history / conversation variables.
+
+    python -m tools.benchmarks.prompt_render --rounds 200 --history 40 --reads 6
+"""
+import argparse
+import random
+import re
+import time
+from typing import Any, Dict, List
+
+from tools.benchmarks import print_report
+
+NAMES = ['Alex Morgan', 'Priya Shah', 'Jordan Lee', 'Sam Rivera', 'Taylor Brooks']
+SENTENCES = [
+    'Keep your answers short and conversational.',
+    'You are skeptical of claims that are not backed by numbers.',
+    'Ask at most one follow up question at a time.',
+    'The meeting takes place in a glass walled conference room downtown.',
+    'Stay in character and never mention that you are an AI.',
+    'Push back when the pitch glosses over the competition.',
+]
+
+
+def realistic_value(key: str, rng: random.Random, history: int) -> str:
+    if 'name' in key or key in ('users_name', 'moderator_name', 'next_speaker', 'first_speaker'):
+        return rng.choice(NAMES)
+    if 'history' in key or 'conversation' in key:
+        return '\n'.join(f'{rng.choice(NAMES)}: {" ".join(rng.choices(SENTENCES, k=2))}' for _ in range(history))
+    if 'count' in key:
+        return str(rng.randint(3, 10))
+    return ' '.join(rng.choices(SENTENCES, k=rng.randint(2, 6)))
+
+
+def legacy_format(template: str, values: Dict[str, Any]) -> str:
+    # What get_prompt().format() did: a new Prompt (regex parse of the template) per call, then str.format
+    re.findall(r"\{([^}]+)\}", template)
+    return template.format(**values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--history', type=int, default=40)
+    parser.add_argument('--reads', type=int, default=6, help='content reads of a PromptMessage per turn')
+    args = parser.parse_args()
+
+    from src.framework.prompting import prompt_manager
+    from src.framework.prompting.models import PromptMessage, compile_template
+
+    rng = random.Random(0)
+    prompts = list(prompt_manager._flattened_prompt_dict.values())
+    cases = []
+    for prompt in prompts:
+        for template in [prompt.template, *prompt.alternatives.values()]:
+            keys = compile_template(template).input_keys
+            cases.append((template, {key: realistic_value(key, rng, args.history) for key in keys}))
+
+    renders = args.rounds * len(cases)
+    results: Dict[str, Dict[str, float]] = {}
+
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for template, values in cases:
+            legacy_format(template, values)
+    elapsed = time.perf_counter() - start
+    results['parse_and_format'] = {'us_per_render': elapsed / renders * 1e6, 'total_s': elapsed}
+
+    compiled = [(compile_template(template), values) for template, values in cases]
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        for template, values in compiled:
+            template.render(values)
+    elapsed = time.perf_counter() - start
+    results['compiled'] = {'us_per_render': elapsed / renders * 1e6, 'total_s': elapsed}
+
+    # A system message like AgentBuilder's: constants plus lambdas resolving to the same strings within a turn
+    prompt = max(prompts, key=lambda p: len(p.input_keys))
+    values = {key: realistic_value(key, rng, args.history) for key in prompt.input_keys}
+    variables: Dict[str, Any] = {key: (lambda v=value: v) if i % 2 else value for i, (key, value) in enumerate(values.items())}
+    for name, memoize in (('message_content_no_memo', False), ('message_content_memo', True)):
+        # The default prompt, so that no evaluation context is resolved per read
+        message = PromptMessage(prompt=prompt.default_prompt, input_variables=variables, memoize=memoize)
+        timings: List[float] = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            for _ in range(args.reads):
+                message.content
+            timings.append(time.perf_counter() - start)
+        results[name] = {'us_per_turn': sum(timings) / len(timings) * 1e6, 'total_s': sum(timings)}
+
+    print_report(f'{len(cases)} templates x {args.rounds} rounds, {args.reads} content reads per turn of {prompt.name}',
+                 results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+CPU per idle scenario and event-to-reaction latency of the previous polling update loop (every scenario sleeping in
+0.25s slices forever and stepping all of its components on every message) against the event driven scheduler
+(update frames and stage/thinking timers on the shared timer wheel, messages dispatched only to subscribed components).
+
+Scenarios are stand-ins with the same lifecycle as ``Scenario``: four components of which two react to messages
+through a mocked generator, and a 2.5s "thinking" timeout per reply. Active scenarios receive a user message every
+``--interval`` seconds.
+
+    python -m tools.benchmarks.scenario_scheduler --idle 500 --active 50 --seconds 10
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from tools.benchmarks import print_report, summarize
+
+FRAME_RATE = 99999
+THINKING_DELAY = 2.5
+
+
+async def mocked_generator(message: str) -> str:
+    await asyncio.sleep(0)
+    return message
+
+
+class Component:
+    reacts = False
+
+    async def step(self, message: str) -> None:
+        pass
+
+    async def update(self, frame: int) -> None:
+        pass
+
+
+class ReactingComponent(Component):
+    reacts = True
+
+    async def step(self, message: str) -> None:
+        await mocked_generator(message)
+
+
+def create_components() -> List[Component]:
+    return [ReactingComponent(), ReactingComponent(), Component(), Component()]
+
+
+class PollingScenario:
+    """The previous LifecycleManager._update_loop and ComponentManager.update/step."""
+
+    def __init__(self):
+        self.components = create_components()
+        self.tasks: List[asyncio.Task] = []
+        self.current_frame = 0
+
+    def start(self) -> None:
+        self.tasks.append(asyncio.create_task(self._update_loop()))
+
+    async def _update_loop(self) -> None:
+        while True:
+            cur_time = 0
+            sleep_time = 0.25
+            while cur_time < FRAME_RATE:
+                await asyncio.sleep(sleep_time)
+                cur_time += sleep_time
+            self.current_frame += 1
+            for component in self.components:
+                await component.update(self.current_frame)
+
+    async def _thinking(self) -> None:
+        await asyncio.sleep(THINKING_DELAY)
+
+    async def step(self, message: str) -> None:
+        thinking = asyncio.create_task(self._thinking())
+        for component in self.components:
+            await component.step(message)
+        thinking.cancel()
+
+    def on_message(self, message: str) -> asyncio.Task:
+        task = asyncio.create_task(self.step(message))
+        self.tasks.append(task)
+        return task
+
+    def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+
+
+class ScheduledScenario:
+    """Event driven: ComponentManager subscribers, update frames and thinking timeouts on the timer wheel."""
+
+    def __init__(self):
+        from src.async_object import AsyncObject
+
+        self.owner = AsyncObject()
+        self.components = create_components()
+        self.step_subscribers = [component for component in self.components if component.reacts]
+        self.update_subscribers: List[Component] = []
+
+    def start(self) -> None:
+        if self.update_subscribers:
+            self.owner.call_later(FRAME_RATE, self._update_async)
+
+    async def _update_async(self) -> None:
+        for component in self.update_subscribers:
+            await component.update(0)
+        self.start()
+
+    async def _thinking(self) -> None:
+        pass
+
+    async def step(self, message: str) -> None:
+        thinking = self.owner.call_later(THINKING_DELAY, self._thinking)
+        for component in self.step_subscribers:
+            await component.step(message)
+        self.owner.cancel_timer(thinking)
+
+    def on_message(self, message: str) -> asyncio.Task:
+        return self.owner.create_task(self.step(message))
+
+    def stop(self) -> None:
+        self.owner.cleanup()
+
+
+async def run(scenario_cls, idle: int, active: int, seconds: float, interval: float) -> Dict[str, float]:
+    idle_scenarios = [scenario_cls() for _ in range(idle)]
+    for scenario in idle_scenarios:
+        scenario.start()
+
+    # Idle only
+    await asyncio.sleep(0.5)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.sleep(seconds)
+    idle_cpu = time.process_time() - cpu_start
+    idle_wall = time.perf_counter() - wall_start
+
+    # Idle plus active traffic
+    active_scenarios = [scenario_cls() for _ in range(active)]
+    for scenario in active_scenarios:
+        scenario.start()
+
+    latencies: List[float] = []
+
+    async def drive(scenario) -> None:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            sent = time.perf_counter()
+            await scenario.on_message('hello')
+            latencies.append(time.perf_counter() - sent)
+            await asyncio.sleep(interval)
+
+    cpu_start = time.process_time()
+    await asyncio.gather(*(drive(scenario) for scenario in active_scenarios))
+    active_cpu = time.process_time() - cpu_start
+
+    for scenario in idle_scenarios + active_scenarios:
+        scenario.stop()
+    await asyncio.sleep(0)
+
+    timing = summarize(latencies)
+    return {
+        'idle_cpu_us_per_s': idle_cpu / max(1, idle) / idle_wall * 1e6,
+        'active_cpu_ms_per_s': active_cpu / seconds * 1000,
+        'react_p50_ms': timing['p50_ms'],
+        'react_p99_ms': timing['p99_ms'],
+        'messages': timing['count'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--idle', type=int, default=500)
+    parser.add_argument('--active', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between messages of an active scenario')
+    args = parser.parse_args()
+
+    from src.timer_wheel import timer_wheel
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, scenario_cls in (('polling', PollingScenario), ('scheduled', ScheduledScenario)):
+        results[name] = asyncio.run(run(scenario_cls, args.idle, args.active, args.seconds, args.interval))
+    results['scheduled'].update(wheel_wakeups=timer_wheel.stats()['wakeups'])
+
+    print_report(f'Scenario scheduling, {args.idle} idle and {args.active} active scenarios', results)
+
+
+if __name__ == '__main__':
+    main()
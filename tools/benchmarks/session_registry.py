@@ -0,0 +1,106 @@
+"""
+Cost of the session registry calls a worker makes when scenarios are created and clients connect.
+
+``--sessions`` sessions are registered, then looked up and acquired at random, and the heartbeat with its owned
+sessions query runs like the registry loop of ScenarioManager. The modes compare:
+
+- memory: MemorySessionRegistry, a dict in the worker
+- sqlite: SqliteSessionRegistry on a file, no other worker using it
+- sqlite_contended: the same while ``--processes`` other workers register and acquire sessions as fast as they can
+
+    python -m tools.benchmarks.session_registry --sessions 2000 --calls 5000 --processes 7
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from tools.benchmarks import print_report, summarize
+
+
+def _contend(path: str, stop) -> None:
+    from src.session_registry import SqliteSessionRegistry
+
+    registry = SqliteSessionRegistry(path)
+    worker_id = f'contender-{os.getpid()}'
+    index = 0
+    while not stop.is_set():
+        instance_uid = f'{worker_id}-{index % 500}'
+        registry.register(instance_uid, worker_id, '{}')
+        registry.acquire(instance_uid, worker_id, running=True)
+        index += 1
+
+
+def timed(samples: List[float], call, *args):
+    start = time.perf_counter()
+    result = call(*args)
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+def run(mode: str, args) -> Dict[str, float]:
+    from src.session_registry import MemorySessionRegistry, SqliteSessionRegistry
+
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, 'sessions.db')
+    registry = MemorySessionRegistry() if mode == 'memory' else SqliteSessionRegistry(path)
+
+    context = multiprocessing.get_context('spawn')
+    stop = context.Event()
+    contenders = []
+    if mode == 'sqlite_contended':
+        registry.heartbeat('benchmark')  # Creates the database before the contenders open it
+        contenders = [context.Process(target=_contend, args=(path, stop)) for _ in range(args.processes)]
+        for process in contenders:
+            process.start()
+        time.sleep(1.0)
+
+    state = '{"instance": "' + 'x' * args.state_bytes + '"}'
+    samples: Dict[str, List[float]] = {'register': [], 'lookup': [], 'acquire': [], 'heartbeat': []}
+    instance_uids = [f'session-{index}' for index in range(args.sessions)]
+    for index, instance_uid in enumerate(instance_uids):
+        timed(samples['register'], registry.register, instance_uid, f'worker-{index % 8}', state)
+
+    random.seed(0)
+    for _ in range(args.calls):
+        timed(samples['lookup'], registry.lookup, random.choice(instance_uids))
+        timed(samples['acquire'], registry.acquire, random.choice(instance_uids), 'benchmark', True)
+    for _ in range(args.calls // 100):
+        start = time.perf_counter()
+        registry.heartbeat('benchmark')
+        registry.owned('benchmark')
+        samples['heartbeat'].append(time.perf_counter() - start)
+
+    stop.set()
+    for process in contenders:
+        process.join()
+    registry.close()
+    directory.cleanup()
+
+    results = {}
+    for name, values in samples.items():
+        summary = summarize(values)
+        results[f'{name}_p50_us'] = summary['p50_ms'] * 1000
+        results[f'{name}_p99_us'] = summary['p99_ms'] * 1000
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--calls', type=int, default=5000)
+    parser.add_argument('--processes', type=int, default=7)
+    parser.add_argument('--state-bytes', type=int, default=4096)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {mode: run(mode, args) for mode in ('memory', 'sqlite', 'sqlite_contended')}
+    print_report(f'{args.sessions} sessions, {args.calls} lookups and acquires', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+StorageCache under Zipf distributed document reads, comparing the previous cache (insertion order eviction, hits
+counted on every get) with the LRU cache, plus prefix queries over a full cache and concurrent misses on hot keys.
+
+Documents are fetched from a stub backend that takes ``--fetch-ms``. Reads go through the same get / fetch / set path
+as BaseStorageService._get.
+
+    python -m tools.benchmarks.storage_cache --keys 20000 --capacity 2000 --reads 200000 --zipf 1.1
+"""
+import argparse
+import asyncio
+import random
+import time
+from bisect import bisect
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Any, Dict, List, Optional
+
+from tools.benchmarks import print_report
+
+NAMESPACES = ('account_data', 'scenario_instance', 'scenario_result')
+
+
+class LegacyStorageCache:
+    """The previous StorageCache, without the settings lookup."""
+
+    def __init__(self, max_size: int):
+        self._cache = OrderedDict()
+        self._max_size = max_size
+        self._hits = self._misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            value = self._cache.get(key)
+            self._hits += 1
+            return value
+        except KeyError:
+            self._misses += 1
+            return None
+
+    def get_all_with_prefix(self, prefix: str) -> Optional[List[Any]]:
+        values = []
+        for key in self._cache.keys():
+            if key.startswith(prefix):
+                value = self._cache.get(key)
+                self._cache[key] = value
+                self._hits += 1
+                values.append(value)
+        if len(values) > 0:
+            return values
+        self._misses += 1
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        if key in self._cache:
+            del self._cache[key]
+        elif len(self._cache) >= self._max_size:
+            first_key = next(iter(self._cache))
+            self._cache.pop(first_key)
+        self._cache[key] = value
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self._hits, 'misses': self._misses}
+
+
+def zipf_keys(count: int, keys: int, s: float, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    cumulative = list(accumulate(1 / (rank ** s) for rank in range(1, keys + 1)))
+    total = cumulative[-1]
+    names = [f'{NAMESPACES[i % len(NAMESPACES)]}:{i:06d}' for i in range(keys)]
+    rng.shuffle(names)
+    return [names[min(bisect(cumulative, rng.random() * total), keys - 1)] for _ in range(count)]
+
+
+def make_document(key: str) -> Dict[str, Any]:
+    return {'id': key, 'payload': 'x' * 512, 'messages': [f'message {i}' for i in range(10)]}
+
+
+def run_reads(cache, reads: List[str], fetch_seconds: float) -> Dict[str, float]:
+    fetches = 0
+    start = time.perf_counter()
+    for key in reads:
+        value = cache.get(key)
+        if value is None:
+            fetches += 1
+            value = make_document(key)
+            cache.set(key, value)
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+    return {
+        'true_hit_rate': 1 - fetches / len(reads),
+        'reported_hit_rate': stats['hits'] / max(1, stats['hits'] + stats['misses']),
+        'backend_fetches': fetches,
+        'cache_us_per_read': elapsed / len(reads) * 1e6,
+        'backend_s': fetches * fetch_seconds,
+    }
+
+
+def run_prefix(cache, queries: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    for i in range(queries):
+        cache.get_all_with_prefix(f'{NAMESPACES[i % len(NAMESPACES)]}:0000')
+    return {'us_per_query': (time.perf_counter() - start) / queries * 1e6}
+
+
+async def run_stampede(cache, hot_keys: int, readers: int, fetch_seconds: float) -> Dict[str, float]:
+    fetches = 0
+
+    async def fetch(key: str):
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(fetch_seconds)
+        return make_document(key)
+
+    async def legacy_read(key: str):
+        value = cache.get(key)
+        if value is None:
+            value = await fetch(key)
+            cache.set(key, value)
+        return value
+
+    keys = [f'account_data:hot{i}' for i in range(hot_keys)]
+    if hasattr(cache, 'get_or_fetch_async'):
+        reads = [cache.get_or_fetch_async(key, lambda key=key: fetch(key)) for key in keys for _ in range(readers)]
+    else:
+        reads = [legacy_read(key) for key in keys for _ in range(readers)]
+    start = time.perf_counter()
+    await asyncio.gather(*reads)
+    return {'backend_fetches': fetches, 'elapsed_s': time.perf_counter() - start}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--keys', type=int, default=20_000)
+    parser.add_argument('--capacity', type=int, default=2_000)
+    parser.add_argument('--reads', type=int, default=200_000)
+    parser.add_argument('--zipf', type=float, default=1.1)
+    parser.add_argument('--fetch-ms', type=float, default=15)
+    parser.add_argument('--hot-keys', type=int, default=20)
+    parser.add_argument('--readers', type=int, default=50)
+    args = parser.parse_args()
+
+    from src.services.storage.cache import StorageCache
+    from src.settings.services import CacheConfig
+
+    def lru() -> StorageCache:
+        return StorageCache(CacheConfig(max_size=args.capacity))
+
+    reads = zipf_keys(args.reads, args.keys, args.zipf)
+    fetch_seconds = args.fetch_ms / 1000
+
+    print_report(f'{args.reads} Zipf({args.zipf}) reads over {args.keys} documents, capacity {args.capacity}', {
+        'insertion_order': run_reads(LegacyStorageCache(args.capacity), reads, fetch_seconds),
+        'lru': run_reads(lru(), reads, fetch_seconds),
+    })
+
+    legacy, indexed = LegacyStorageCache(args.capacity), lru()
+    for key in reads[:args.capacity * 5]:
+        legacy.set(key, key)
+        indexed.set(key, key)
+    print_report(f'Prefix queries over {args.capacity} cached documents', {
+        'scan_all_keys': run_prefix(legacy, 2_000),
+        'sorted_key_index': run_prefix(indexed, 2_000),
+    })
+
+    print_report(f'{args.readers} concurrent readers on each of {args.hot_keys} cold keys', {
+        'insertion_order': asyncio.run(run_stampede(LegacyStorageCache(args.capacity), args.hot_keys, args.readers, fetch_seconds)),
+        'lru_single_flight': asyncio.run(run_stampede(lru(), args.hot_keys, args.readers, fetch_seconds)),
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Event loop lag while REST handlers call storage, comparing the synchronous storage service called from async
+handlers with AsyncStorageService.
+
+REST clients run a profile request loop like profile_router (read the account data, update the profile) against a
+MemoryStorageService that sleeps ``--latency-ms`` per call, standing in for a Firestore round trip. Meanwhile
+websocket sessions send a frame every ``--frame-ms`` and a probe measures how late the event loop wakes it up.
+
+    python -m tools.benchmarks.storage_event_loop --clients 50 --sessions 100 --latency-ms 30 --seconds 5
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+from tools.benchmarks import print_report, summarize
+
+
+def make_storage(latency: float):
+    from src.models import AccountData
+    from src.models.app_package import AppPackageData
+    from src.services.storage.memory import MemoryStorageService
+
+    storage = MemoryStorageService(app_package=AppPackageData(version=1))
+    for i in range(100):
+        storage.create_account_data(AccountData(
+            id=f'user{i}', created_at='2024-01-01', updated_at='2024-01-01',
+            email=f'user{i}@example.com', first_name='Ada', last_name='Lovelace',
+        ))
+    storage.latency = latency
+    return storage
+
+
+async def run(mode: str, args) -> Dict[str, float]:
+    from src.services.storage.async_service import AsyncStorageService
+    from src.settings.services import StorageExecutorConfig
+
+    storage = make_storage(args.latency_ms / 1000)
+    async_storage = AsyncStorageService(storage, StorageExecutorConfig(
+        max_workers=args.workers, max_concurrency=args.workers * 2, timeout=60, upload_timeout=60))
+    deadline = time.perf_counter() + args.seconds
+    request_latencies: List[float] = []
+    frame_delays: List[float] = []
+    probe_lags: List[float] = []
+
+    async def rest_client(client: int) -> None:
+        user_id = f'user{client % 100}'
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            if mode == 'sync_storage':
+                storage.get_account_data(user_id, bypass_cache=True)
+                storage.update_user_profile(user_id, description=f'request at {start}')
+            else:
+                await async_storage.get_account_data(user_id, bypass_cache=True)
+                await async_storage.update_user_profile(user_id, description=f'request at {start}')
+            request_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    async def websocket_session() -> None:
+        interval = args.frame_ms / 1000
+        expected = time.perf_counter() + interval
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+            now = time.perf_counter()
+            frame_delays.append(max(0.0, now - expected))
+            expected = max(expected + interval, now)
+
+    async def probe() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            probe_lags.append(time.perf_counter() - start - 0.01)
+
+    try:
+        await asyncio.gather(
+            probe(),
+            *(websocket_session() for _ in range(args.sessions)),
+            *(rest_client(client) for client in range(args.clients)),
+        )
+    finally:
+        async_storage.close()
+
+    requests, frames, lag = summarize(request_latencies), summarize(frame_delays), summarize(probe_lags)
+    return {
+        'requests_per_s': len(request_latencies) / args.seconds,
+        'request_p50_ms': requests['p50_ms'],
+        'request_p99_ms': requests['p99_ms'],
+        'frame_delay_p50_ms': frames['p50_ms'],
+        'frame_delay_p99_ms': frames['p99_ms'],
+        'loop_lag_p99_ms': lag['p99_ms'],
+        'loop_lag_max_ms': lag['max_ms'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=30)
+    parser.add_argument('--frame-ms', type=float, default=20)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print_report(f'{args.clients} REST clients, {args.sessions} websocket sessions, {args.latency_ms}ms storage calls', {
+        mode: asyncio.run(run(mode, args)) for mode in ('sync_storage', 'async_storage')
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Document writes and bytes sent per scenario session with and without the write-behind buffer, against the in-memory
+storage stand-in.
+
+Each session updates its scenario instance after every message (completion info), updates the user profile a few
+times, creates its scenario result and flushes at the end, as when a scenario ends. Sessions run on threads, like
+requests served by the storage executor.
+
+    python -m tools.benchmarks.storage_write_behind --sessions 50 --messages 40 --profile-updates 5
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from tools.benchmarks import print_report
+
+
+def run(write_behind: bool, args) -> Dict[str, float]:
+    from src.models import AccountData, ScenarioConfig, ScenarioInstance, ScenarioResult
+    from src.models.app_package import AppPackageData
+    from src.services.storage.memory import MemoryStorageService
+    from src.settings.services import StorageConfig, WriteBehindConfig
+
+    config = StorageConfig(write_behind=WriteBehindConfig(enabled=write_behind, window=args.window_ms / 1000))
+    storage = MemoryStorageService(latency=args.latency_ms / 1000, app_package=AppPackageData(version=1), config=config)
+
+    def session(index: int) -> None:
+        user_id = f'user{index}'
+        account_data = storage.create_account_data(AccountData(
+            id=user_id, created_at='2024-01-01', updated_at='2024-01-01',
+            email=f'{user_id}@example.com', first_name='Ada', last_name='Lovelace',
+        ))
+        instance = storage.create_scenario_instance(ScenarioInstance(
+            account_data=account_data,
+            scenario_config=ScenarioConfig(schema_id='interview', name='Interview', user_id=user_id,
+                                           scenario_additional_information='x' * 2_000),
+        ))
+
+        for message in range(args.messages):
+            instance.llm_completion_info = {'messages': message + 1, 'prompt_tokens': 500 * message,
+                                            'completion_tokens': 80 * message}
+            storage.update_scenario_instance(instance)
+            if message % max(1, args.messages // max(1, args.profile_updates)) == 0:
+                storage.update_user_profile(user_id, description=f'Profile after message {message}')
+            time.sleep(args.message_ms / 1000)
+
+        # The analysis is left out, it is written the same way with and without the buffer
+        result = storage.create_scenario_result(ScenarioResult.model_construct(scenario_instance=instance, analysis=None))
+        storage.flush_writes([f'scenario_instance:{instance.uid}', f'scenario_result:{result.uid}'])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        list(executor.map(session, range(args.sessions)))
+    storage.close()
+    elapsed = time.perf_counter() - start
+
+    stats = storage.stats()
+    return {
+        'round_trips_per_session': stats['round_trips'] / args.sessions,
+        'writes_per_session': stats['writes'] / args.sessions,
+        'kb_per_session': stats['bytes_written'] / args.sessions / 1024,
+        'elapsed_s': elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=40)
+    parser.add_argument('--profile-updates', type=int, default=5)
+    parser.add_argument('--message-ms', type=float, default=5)
+    parser.add_argument('--latency-ms', type=float, default=5)
+    parser.add_argument('--window-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print_report(f'{args.sessions} sessions of {args.messages} messages', {
+        'direct_writes': run(False, args),
+        'write_behind': run(True, args),
+    })
+
+
+if __name__ == '__main__':
+    main()
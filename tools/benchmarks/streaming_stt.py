@@ -0,0 +1,137 @@
+"""
+Replays recorded PCM through speech to text the way ScenarioVoiceStreaming receives it and compares the previous
+approach (re-decode the whole utterance every two chunks, decode it once more after the utterance ends) with the
+incremental local-agreement stream.
+
+Reports final-word latency (end of audio to final transcript) and real-time factor (decode time / audio time).
+
+    python -m tools.benchmarks.streaming_stt --fixture test/framework/generation/harvard.wav --chunk-ms 500
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+
+import numpy as np
+
+from tools.benchmarks import print_report
+
+SAMPLE_RATE = 16000
+DEFAULT_FIXTURE = Path(__file__).parents[2] / 'test' / 'framework' / 'generation' / 'harvard.wav'
+
+
+def load_fixture(path: Path, max_seconds: float) -> np.ndarray:
+    import whisper
+    audio = whisper.load_audio(str(path))
+    return audio[:int(max_seconds * SAMPLE_RATE)]
+
+
+def split_chunks(audio: np.ndarray, chunk_ms: int) -> List[np.ndarray]:
+    size = int(SAMPLE_RATE * chunk_ms / 1000)
+    return [audio[i:i + size] for i in range(0, len(audio), size)]
+
+
+async def replay(chunks: List[np.ndarray], chunk_ms: int, realtime: bool) -> AsyncIterator[np.ndarray]:
+    for chunk in chunks:
+        if realtime:
+            await asyncio.sleep(chunk_ms / 1000)
+        yield chunk
+
+
+async def run_legacy(chunks: List[np.ndarray], chunk_ms: int, realtime: bool, model_name: str) -> Dict[str, float]:
+    import whisper
+    from src.framework.runnables.generators.speech_to_text.services.whisper.service import (
+        whisper_executor, whisper_model_pool,
+    )
+
+    model = whisper_model_pool.get(model_name, 'cpu')
+    options = whisper.DecodingOptions(language='en', fp16=False)
+    decode_time = 0.0
+
+    def decode(audio: np.ndarray) -> str:
+        nonlocal decode_time
+        start = time.perf_counter()
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+        text = whisper.decode(model, mel, options).text
+        decode_time += time.perf_counter() - start
+        return text
+
+    received: List[np.ndarray] = []
+    pending = 0
+    async for chunk in replay(chunks, chunk_ms, realtime):
+        received.append(chunk)
+        pending += 1
+        if pending >= 2:
+            pending = 0
+            await whisper_executor.run(decode, np.concatenate(received))
+
+    audio_end = time.perf_counter()
+    text = await whisper_executor.run(decode, np.concatenate(received))
+    return {
+        'final_latency_ms': (time.perf_counter() - audio_end) * 1000,
+        'rtf': decode_time / (sum(len(c) for c in chunks) / SAMPLE_RATE),
+        'text': text.strip(),
+    }
+
+
+async def run_streaming(chunks: List[np.ndarray], chunk_ms: int, realtime: bool, model_name: str) -> Dict[str, float]:
+    from src.framework.runnables.generators.speech_to_text.models import SpeechToTextGenerationParams
+    from src.framework.runnables.generators.speech_to_text.services.whisper import WhisperGenerationService
+    from src.framework.runnables.generators.speech_to_text.services.whisper import service as whisper_service
+
+    service = WhisperGenerationService()
+    params = SpeechToTextGenerationParams(model=model_name, device='cpu')
+    audio_end = 0.0
+    partials = 0
+    committed = ''
+
+    async def audio() -> AsyncIterator[np.ndarray]:
+        nonlocal audio_end
+        async for chunk in replay(chunks, chunk_ms, realtime):
+            yield chunk
+        audio_end = time.perf_counter()
+
+    run_time_before = whisper_service.whisper_executor.stats()['total_run_s']
+    async for chunk in service.run_stream(audio(), params):
+        if chunk.is_partial:
+            partials += 1
+        else:
+            committed += chunk.text or ''
+    final_latency = time.perf_counter() - audio_end
+    decode_time = whisper_service.whisper_executor.stats()['total_run_s'] - run_time_before
+
+    return {
+        'final_latency_ms': final_latency * 1000,
+        'rtf': decode_time / (sum(len(c) for c in chunks) / SAMPLE_RATE),
+        'partials': partials,
+        'text': committed.strip(),
+    }
+
+
+async def main(fixture: Path, chunk_ms: int, max_seconds: float, realtime: bool, model_name: str) -> None:
+    from src.framework.runnables.generators.speech_to_text.services.whisper.service import whisper_model_pool
+
+    audio = load_fixture(fixture, max_seconds)
+    chunks = split_chunks(audio, chunk_ms)
+    whisper_model_pool.get(model_name, 'cpu')
+
+    results = {
+        'legacy_full_redecode': await run_legacy(chunks, chunk_ms, realtime, model_name),
+        'local_agreement_stream': await run_streaming(chunks, chunk_ms, realtime, model_name),
+    }
+    texts = {name: result.pop('text') for name, result in results.items()}
+    print_report(f'Streaming STT replay of {fixture.name} ({len(audio) / SAMPLE_RATE:.1f}s, {chunk_ms}ms chunks)', results)
+    for name, text in texts.items():
+        print(f'  {name}: {text}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fixture', type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument('--chunk-ms', type=int, default=500)
+    parser.add_argument('--max-seconds', type=float, default=20.0)
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--no-realtime', action='store_true', help='Feed chunks as fast as possible')
+    args = parser.parse_args()
+    asyncio.run(main(args.fixture, args.chunk_ms, args.max_seconds, not args.no_realtime, args.model))
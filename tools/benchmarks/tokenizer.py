@@ -0,0 +1,172 @@
+"""
+Token counting over a long synthetic conversation, comparing the previous path (resolve the encoding for the model and
+tokenize the joined request on every call) with the shared tokenizer registry and the per message token count cache.
+
+    get_token_count   counting the last ``--window`` messages after every new message, as agents do before a call
+    calculate_cost    pricing lookup for a response, with and without the per model cache
+    memory_prune      ``--agents`` ConversationSummaryMemory buffers saving the same messages, as every agent of a
+                      scenario does. Summaries are stubbed.
+
+Tokens are counted with tiktoken's encodings when they are available locally, otherwise with a small local BPE
+vocabulary through the same tiktoken encoder.
+
+    python -m tools.benchmarks.tokenizer --messages 10000 --window 50 --agents 3
+"""
+import argparse
+import functools
+import logging
+import random
+import time
+from typing import Callable, Dict, List
+
+from tools.benchmarks import print_report, summarize
+
+WORDS = ('the quick brown fox jumps over lazy dog interview pitch investor stage round question answer '
+         'product market customer feedback launch team growth revenue strategy plan').split()
+
+MODEL = 'gpt-4o'
+
+
+def local_encoding(name: str):
+    """
+    A byte level BPE encoding over the benchmark vocabulary, for when tiktoken's encodings cannot be downloaded.
+    Encoding goes through the same tiktoken code path, only the vocabulary is small.
+    """
+    import tiktoken
+    from tiktoken_ext.openai_public import r50k_pat_str
+
+    ranks = {bytes([i]): i for i in range(256)}
+    for word in WORDS + [word.capitalize() for word in WORDS] + ['User', 'Agent']:
+        for piece in (word, f' {word}'):
+            encoded = piece.encode()
+            for end in range(2, len(encoded) + 1):
+                ranks.setdefault(encoded[:end], len(ranks))
+    return tiktoken.Encoding(name=f'local_{name}', pat_str=r50k_pat_str, mergeable_ranks=ranks, special_tokens={})
+
+
+def make_loader() -> (str, Callable[[str], object]):
+    import tiktoken
+    try:
+        tiktoken.get_encoding('o200k_base')
+        return 'tiktoken', tiktoken.get_encoding
+    except Exception:
+        # Memoized like tiktoken.get_encoding
+        return 'local BPE', functools.lru_cache(maxsize=None)(local_encoding)
+
+
+def synthetic_messages(count: int, seed: int = 0):
+    from src.framework.models import Message
+
+    rng = random.Random(seed)
+    return [
+        (Message.from_user if i % 2 == 0 else Message.from_ai)(
+            ' '.join(rng.choices(WORDS, k=rng.randint(8, 80))), author_name='User' if i % 2 == 0 else 'Agent')
+        for i in range(count)
+    ]
+
+
+def bench_token_count(loader, messages, window: int) -> Dict[str, Dict[str, float]]:
+    import tiktoken
+    from src.framework.models import Message
+    from src.framework.runnables.generators.text.tokenizer import TokenizerRegistry
+
+    def legacy_count(request) -> int:
+        encoding = loader(tiktoken.encoding_name_for_model(MODEL))
+        return len(encoding.encode(Message.join_as_string(request)))
+
+    registry = TokenizerRegistry(loader=loader)
+
+    results = {}
+    for name, count in (('recount_joined', legacy_count), ('registry_cached', lambda r: registry.count_tokens(r, MODEL))):
+        latencies: List[float] = []
+        for i in range(1, len(messages) + 1):
+            request = messages[max(0, i - window):i]
+            start = time.perf_counter()
+            count(request)
+            latencies.append(time.perf_counter() - start)
+        timing = summarize(latencies)
+        results[name] = {'mean_us': timing['mean_ms'] * 1000, 'p99_us': timing['p99_ms'] * 1000,
+                         'total_s': sum(latencies)}
+    return results
+
+
+def bench_cost(calls: int) -> Dict[str, Dict[str, float]]:
+    from src.framework.runnables.generators.text.services import base
+
+    def legacy_cost(token_count: int, model_name: str) -> float:
+        base._COST_PER_TOKEN_CACHE.clear()
+        return base.BaseTextGenerationService.calculate_cost(token_count, model_name)
+
+    results = {}
+    for name, cost in (('lookup_every_call', legacy_cost), ('cached_lookup', base.BaseTextGenerationService.calculate_cost)):
+        start = time.perf_counter()
+        for i in range(calls):
+            cost(i, 'gpt-4o-2024-08-06')
+        elapsed = time.perf_counter() - start
+        results[name] = {'mean_us': elapsed / calls * 1e6, 'total_s': elapsed}
+    return results
+
+
+def bench_memory(loader, count: int, agents: int, max_buffer_tokens: int) -> Dict[str, Dict[str, float]]:
+    import tiktoken
+    from src.framework.runnables.agents.memory import ConversationSummaryMemory
+    from src.framework.runnables.generators.text.tokenizer import TokenizerRegistry
+
+    def stub_summary(self, messages, existing_summary: str) -> str:
+        return f'Summary of {len(messages)} more messages.'
+
+    registry = TokenizerRegistry(loader=loader)
+
+    class LegacyMemory(ConversationSummaryMemory):
+        predict_new_summary = stub_summary
+
+        def count_tokens(self, message) -> int:
+            encoding = loader(tiktoken.encoding_name_for_model(MODEL))
+            return len(encoding.encode(f'{message.to_string()}\n'))
+
+    class CachedMemory(ConversationSummaryMemory):
+        """What the default count_tokens does through the summary generator's service."""
+        predict_new_summary = stub_summary
+
+        def count_tokens(self, message) -> int:
+            return registry.count_tokens(message, MODEL)
+
+    results = {}
+    for name, memory_cls in (('tokenize_per_memory', LegacyMemory), ('message_cache', CachedMemory)):
+        # Fresh messages so that the second run does not start with warm caches
+        messages = synthetic_messages(count)
+        memories = [memory_cls(max_buffer_tokens=max_buffer_tokens) for _ in range(agents)]
+        latencies: List[float] = []
+        for message in messages:
+            start = time.perf_counter()
+            for memory in memories:
+                memory.save(message)
+            latencies.append(time.perf_counter() - start)
+        timing = summarize(latencies)
+        results[name] = {'mean_us': timing['mean_ms'] * 1000, 'p99_us': timing['p99_ms'] * 1000,
+                         'total_s': sum(latencies), 'final_tokens': memories[0].get_token_count()}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=10_000)
+    parser.add_argument('--window', type=int, default=50)
+    parser.add_argument('--agents', type=int, default=3)
+    parser.add_argument('--max-buffer-tokens', type=int, default=2100)
+    args = parser.parse_args()
+    # Pruning logs every summary
+    logging.disable(logging.WARNING)
+
+    tokenizer_name, loader = make_loader()
+    messages = synthetic_messages(args.messages)
+
+    print_report(f'get_token_count, last {args.window} of {args.messages} messages, {tokenizer_name} tokenizer',
+                 bench_token_count(loader, messages, args.window))
+    print_report(f'calculate_cost, {args.messages} calls', bench_cost(args.messages))
+    print_report(f'ConversationSummaryMemory.save, {args.agents} agents, {args.messages} messages, {tokenizer_name} tokenizer',
+                 bench_memory(loader, args.messages, args.agents, args.max_buffer_tokens))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Time to the first audio chunk and text to speech calls of pregenerated lines, with and without the audio cache.
+
+``--sessions`` sessions each send ``--lines`` pregenerated messages drawn from ``--distinct-lines`` fixed lines, like
+greetings and moderator messages, through AudioGenerator.run_stream. The text to speech stub answers after
+``--ttfb-ms`` and streams 2048 byte chunks ``--chunk-ms`` apart. The modes compare:
+
+- no_cache: every line is synthesized, how send_pregenerated_message worked before
+- disk: the disk cache without the memory front, like the first session of a new process
+- cache: the disk cache with the memory front
+- prewarmed: the cache filled with the fixed lines before the first session, like prewarm_on_startup
+
+    python -m tools.benchmarks.tts_cache --sessions 50 --lines 5 --distinct-lines 10 --ttfb-ms 300
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import AsyncIterator, Dict, List
+
+from tools.benchmarks import print_report, summarize
+
+
+class StubTextToSpeech:
+    """Answers like the ElevenLabs streaming endpoint: a start chunk, the audio after the first byte latency, a final chunk."""
+
+    def __init__(self, ttfb: float, chunk_interval: float, chunks: int = 8):
+        self.ttfb = ttfb
+        self.chunk_interval = chunk_interval
+        self.chunks = chunks
+        self.calls = 0
+
+    def prewarm(self, generation_params) -> None:
+        pass
+
+    async def generate_async(self, request: str, generation_params):
+        from src.framework.runnables.generators.audio import AudioResponse
+        self.calls += 1
+        await asyncio.sleep(self.ttfb + self.chunk_interval * self.chunks)
+        return AudioResponse(audio=base64.b64encode(bytes(2048 * self.chunks)).decode())
+
+    async def generate_stream_output(self, request: str, generation_params) -> AsyncIterator:
+        from src.framework.runnables.generators.audio import AudioResponseChunk
+        self.calls += 1
+        yield AudioResponseChunk(index=0, is_start=True)
+        await asyncio.sleep(self.ttfb)
+        for index in range(1, self.chunks + 1):
+            yield AudioResponseChunk(index=index, audio=base64.b64encode(bytes(2048)).decode())
+            await asyncio.sleep(self.chunk_interval)
+        yield AudioResponseChunk(index=self.chunks + 1, is_final=True)
+
+
+async def run(mode: str, args) -> Dict[str, float]:
+    from src.framework.runnables.generators.audio import AudioCache, AudioGenerator
+
+    service = StubTextToSpeech(args.ttfb_ms / 1000, args.chunk_ms / 1000)
+    directory = tempfile.TemporaryDirectory()
+    cache = None if mode == 'no_cache' else AudioCache(
+        Path(directory.name), max_memory_bytes=0 if mode == 'disk' else 64 * 1024 * 1024)
+
+    class BenchmarkAudioGenerator(AudioGenerator):
+        def _get_generation_service(self):
+            return service
+
+        def _get_audio_cache(self):
+            return cache
+
+    lines = [f'Welcome to round {index}, the floor is yours.' for index in range(args.distinct_lines)]
+    if mode == 'prewarmed':
+        generation_params = BenchmarkAudioGenerator().generation_params
+        await cache.prewarm([(line, generation_params) for line in lines], service.generate_async)
+    prewarm_calls = service.calls
+
+    random.seed(0)
+    latencies: List[float] = []
+
+    async def session() -> None:
+        generator = BenchmarkAudioGenerator()
+        for line in random.choices(lines, k=args.lines):
+            start = time.perf_counter()
+            first = None
+            async for chunk in generator.run_stream(line, cache=True):
+                if first is None and chunk.audio:
+                    first = time.perf_counter() - start
+            latencies.append(first)
+            await asyncio.sleep(args.gap_ms / 1000)
+
+    await asyncio.gather(*(session() for _ in range(args.sessions)))
+    directory.cleanup()
+
+    first_audio = summarize(latencies)
+    return {
+        'tts_calls_per_session': (service.calls - prewarm_calls) / args.sessions,
+        'first_audio_p50_ms': first_audio['p50_ms'],
+        'first_audio_p99_ms': first_audio['p99_ms'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--lines', type=int, default=5)
+    parser.add_argument('--distinct-lines', type=int, default=10)
+    parser.add_argument('--ttfb-ms', type=float, default=300)
+    parser.add_argument('--chunk-ms', type=float, default=20)
+    parser.add_argument('--gap-ms', type=float, default=200)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {mode: asyncio.run(run(mode, args)) for mode in ('no_cache', 'disk', 'cache', 'prewarmed')}
+    print_report(f'{args.sessions} sessions, {args.lines} of {args.distinct_lines} lines each, '
+                 f'{args.ttfb_ms}ms to the first byte', results)
+
+
+if __name__ == '__main__':
+    main()
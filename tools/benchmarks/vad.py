@@ -0,0 +1,158 @@
+"""
+Per-chunk CPU time, memory and detection accuracy of the streaming voice activity detectors against the pyannote
+detection pipeline that ScenarioVoiceStreaming used to run on every chunk.
+
+The labelled fixture is built from a speech recording: clips of the recording are separated by gaps of background
+noise at a range of levels, and every chunk overlapping a clip is labelled speech. Accuracy is measured per chunk,
+which is the granularity the scenario makes its decisions at.
+
+    python -m tools.benchmarks.vad --fixture test/framework/generation/harvard.wav --chunk-ms 500
+    python -m tools.benchmarks.vad --engines energy silero pyannote
+"""
+import argparse
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from tools.benchmarks import current_rss_mb, print_report, summarize
+
+SAMPLE_RATE = 16000
+DEFAULT_FIXTURE = Path(__file__).parents[2] / 'test' / 'framework' / 'generation' / 'harvard.wav'
+
+
+def load_wav(path: Path) -> np.ndarray:
+    """Read a PCM wav file as 16 kHz mono float32, without ffmpeg."""
+    with wave.open(str(path)) as wav:
+        channels, rate = wav.getnchannels(), wav.getframerate()
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), np.int16).astype(np.float32) / 32768.0
+    pcm = pcm.reshape(-1, channels).mean(axis=1)
+    target = np.arange(0, len(pcm) * SAMPLE_RATE / rate) * rate / SAMPLE_RATE
+    return np.interp(target, np.arange(len(pcm)), pcm).astype(np.float32)
+
+
+def labelled_stream(
+        speech: np.ndarray,
+        clip_seconds: float,
+        gap_seconds: float,
+        noise_levels: List[float],
+        seed: int = 0,
+) -> Tuple[np.ndarray, List[Tuple[float, float]]]:
+    """Alternate noise gaps and speech clips. Returns the audio and the (start, end) times of the speech clips."""
+    rng = np.random.default_rng(seed)
+    clip, gap = int(clip_seconds * SAMPLE_RATE), int(gap_seconds * SAMPLE_RATE)
+    parts: List[np.ndarray] = []
+    labels: List[Tuple[float, float]] = []
+    position = 0
+
+    for index, start in enumerate(range(0, len(speech) - clip + 1, clip)):
+        level = noise_levels[index % len(noise_levels)]
+        parts.append((level * rng.standard_normal(gap)).astype(np.float32))
+        position += gap
+        parts.append(speech[start:start + clip] + (level * rng.standard_normal(clip)).astype(np.float32))
+        labels.append((position / SAMPLE_RATE, (position + clip) / SAMPLE_RATE))
+        position += clip
+
+    return np.concatenate(parts), labels
+
+
+def chunk_labels(chunks: int, chunk_seconds: float, labels: List[Tuple[float, float]]) -> List[bool]:
+    return [
+        any(start < (i + 1) * chunk_seconds and end > i * chunk_seconds for start, end in labels)
+        for i in range(chunks)
+    ]
+
+
+def accuracy(predicted: List[bool], expected: List[bool]) -> Dict[str, float]:
+    tp = sum(p and e for p, e in zip(predicted, expected))
+    fp = sum(p and not e for p, e in zip(predicted, expected))
+    fn = sum(e and not p for p, e in zip(predicted, expected))
+    return {
+        'accuracy': sum(p == e for p, e in zip(predicted, expected)) / max(1, len(expected)),
+        'precision': tp / max(1, tp + fp),
+        'recall': tp / max(1, tp + fn),
+    }
+
+
+def make_vad_detector(engine: str) -> Callable[[np.ndarray], bool]:
+    from src.framework.runnables.generators.diarization.vad import get_voice_activity_detector
+
+    detector = get_voice_activity_detector(engine)
+    detector.warm_up()
+    session = detector.create_session()
+    return lambda chunk: session.process(chunk).is_speech
+
+
+def make_pyannote_detector() -> Callable[[np.ndarray], bool]:
+    from src.framework.runnables.generators.diarization.models import DiarizationGenerationParams
+    from src.framework.runnables.generators.diarization.services.pyannote import PyannoteSpeechDiarizationService
+
+    service = PyannoteSpeechDiarizationService()
+    params = DiarizationGenerationParams()
+    return lambda chunk: service.run(chunk, params).speaker_count > 0
+
+
+def run(engine: str, chunks: List[np.ndarray]) -> Tuple[List[bool], List[float], Dict[str, float]]:
+    rss_before = current_rss_mb()
+    tracemalloc.start()
+    detect = make_pyannote_detector() if engine == 'pyannote' else make_vad_detector(engine)
+    load_rss = current_rss_mb() - rss_before
+
+    predicted: List[bool] = []
+    cpu_times: List[float] = []
+    for chunk in chunks:
+        start = time.process_time()
+        predicted.append(detect(chunk))
+        cpu_times.append(time.process_time() - start)
+
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return predicted, cpu_times, {
+        'load_rss_mb': load_rss,
+        'rss_mb': current_rss_mb() - rss_before,
+        'peak_py_alloc_mb': peak_traced / 2 ** 20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixture', type=Path, default=DEFAULT_FIXTURE)
+    parser.add_argument('--chunk-ms', type=int, default=500)
+    parser.add_argument('--clip-seconds', type=float, default=2.0)
+    parser.add_argument('--gap-seconds', type=float, default=1.5)
+    parser.add_argument('--noise-levels', type=float, nargs='+', default=[0.0005, 0.003, 0.01])
+    parser.add_argument('--engines', nargs='+', default=['energy', 'silero', 'pyannote'])
+    args = parser.parse_args()
+
+    # Settings are loaded up front so their import does not count towards the first engine's memory
+    from src.framework.settings import framework_settings  # noqa: F401
+
+    audio, labels = labelled_stream(load_wav(args.fixture), args.clip_seconds, args.gap_seconds, args.noise_levels)
+    size = int(SAMPLE_RATE * args.chunk_ms / 1000)
+    chunks = [audio[i:i + size] for i in range(0, len(audio), size)]
+    expected = chunk_labels(len(chunks), args.chunk_ms / 1000, labels)
+    print(f'{len(chunks)} chunks of {args.chunk_ms}ms, {sum(expected)} labelled speech')
+
+    results: Dict[str, Dict[str, float]] = {}
+    for engine in args.engines:
+        try:
+            predicted, cpu_times, memory = run(engine, chunks)
+        except Exception as e:
+            print(f'Skipping {engine}: {type(e).__name__}: {e}')
+            continue
+        timing = summarize(cpu_times)
+        results[engine] = {
+            'cpu_mean_ms': timing['mean_ms'],
+            'cpu_p95_ms': timing['p95_ms'],
+            **memory,
+            **accuracy(predicted, expected),
+        }
+
+    print_report('Voice activity detection per chunk', results)
+
+
+if __name__ == '__main__':
+    main()
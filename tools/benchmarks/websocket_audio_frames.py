@@ -0,0 +1,173 @@
+"""
+Bytes on the wire and CPU per chunk for websocket audio, base64 JSON events against binary audio frames.
+
+- tts_reply: a spoken reply sent to the client, ``--reply-seconds`` of mp3 at ``--tts-kbps`` in chunks like the voice
+  streams them (base64, with character alignment), through WebSocketConnection.send_async's serialization
+- user_utterance: an utterance received from the client, ``--utterance-seconds`` of webm/opus at ``--mic-kbps`` in
+  ``--timeslice-ms`` chunks, through WebSocketConnection.listen's parsing up to the raw audio bytes
+
+``server_us_per_chunk`` is the serialization above, ``client_us_per_chunk`` the other end of it done in Python: parsing
+the event and decoding the audio of a reply chunk, encoding the audio and the event of an utterance chunk. With binary
+frames the base64 audio a voice streams is decoded once on the server instead of on the client.
+
+    python -m tools.benchmarks.websocket_audio_frames --reply-seconds 15 --utterance-seconds 10 --repeat 50
+"""
+import argparse
+import base64
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from tools.benchmarks import print_report
+
+
+def make_reply_chunks(args) -> List:
+    from src.framework import MessageAudioChunk
+    from src.framework.runnables.generators.audio.models import NormalizedAlignment
+
+    chunk_bytes = args.tts_kbps * 1000 // 8 * args.tts_chunk_ms // 1000
+    chunk_count = args.reply_seconds * 1000 // args.tts_chunk_ms
+    chars_per_chunk = args.tts_chunk_ms // 70
+    chunks = []
+    for index in range(chunk_count):
+        alignment = NormalizedAlignment(
+            chars=['a'] * chars_per_chunk,
+            char_start_times_ms=[index * args.tts_chunk_ms + 70 * i for i in range(chars_per_chunk)],
+            chars_durations_ms=[70] * chars_per_chunk,
+        )
+        chunks.append(MessageAudioChunk(
+            index=index, message_id='3f1b1f8e-6c1a-4c55-9d5e-0a7c3b8e2f10', message_audio_id='9a0c6d52-1d7e-4b0e-8f7c-2e6d5b4a3c21',
+            audio=base64.b64encode(os.urandom(chunk_bytes)).decode(), normalized_alignment=alignment,
+            is_final=index == chunk_count - 1,
+        ))
+    return chunks
+
+
+def make_utterance_chunks(args) -> List:
+    from src.models.voice import VoiceChunk, VoiceStreamSettings
+
+    chunk_bytes = args.mic_kbps * 1000 // 8 * args.timeslice_ms // 1000
+    chunk_count = args.utterance_seconds * 1000 // args.timeslice_ms
+    settings = VoiceStreamSettings(format='audio/webm;codecs=opus', chunk_timeslice=args.timeslice_ms)
+    return [
+        VoiceChunk(
+            created_at=datetime.now().isoformat(), stream_id='5e2d7c1a-0b9f-4e3d-8a6c-1f2e3d4c5b6a', index=index,
+            audio=base64.b64encode(os.urandom(chunk_bytes)).decode(), settings=settings if index == 0 else None,
+            is_final=index == chunk_count - 1,
+        )
+        for index in range(chunk_count)
+    ]
+
+
+def measure(payloads: List, process: Callable, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            process(payload)
+    return (time.perf_counter() - start) / (repeat * len(payloads)) * 1e6
+
+
+def tts_reply(args) -> Dict[str, Dict[str, float]]:
+    from src.websocket import AudioCodec, AudioFrame, PacketAudioEvent, WebSocketMessage
+
+    events = [PacketAudioEvent(data=chunk) for chunk in make_reply_chunks(args)]
+
+    def send_json(event) -> bytes:
+        # send_async, then starlette's send_json
+        message = WebSocketMessage(type=event.type, data=event.data)
+        return json.dumps(message.model_dump(exclude_unset=False), separators=(",", ":"), ensure_ascii=False).encode()
+
+    def send_binary(event) -> bytes:
+        return AudioFrame.of_audio_chunk(event.data, AudioCodec.MP3).encode()
+
+    def receive_json(data: bytes) -> bytes:
+        return base64.b64decode(json.loads(data)['data']['audio'])
+
+    def receive_binary(data: bytes) -> bytes:
+        return AudioFrame.decode(data).audio
+
+    json_messages = [send_json(event) for event in events]
+    binary_messages = [send_binary(event) for event in events]
+    return {
+        'tts_reply_json': {
+            'chunks': len(events),
+            'kb_on_wire': sum(map(len, json_messages)) / 1024,
+            'server_us_per_chunk': measure(events, send_json, args.repeat),
+            'client_us_per_chunk': measure(json_messages, receive_json, args.repeat),
+        },
+        'tts_reply_binary': {
+            'chunks': len(events),
+            'kb_on_wire': sum(map(len, binary_messages)) / 1024,
+            'server_us_per_chunk': measure(events, send_binary, args.repeat),
+            'client_us_per_chunk': measure(binary_messages, receive_binary, args.repeat),
+        },
+    }
+
+
+def user_utterance(args) -> Dict[str, Dict[str, float]]:
+    from src.models.voice import VoiceChunk
+    from src.websocket import AudioFrame, AudioFrameType, VoiceEventType, WebSocketMessage
+
+    chunks = make_utterance_chunks(args)
+    recordings = [(chunk, chunk.get_audio()) for chunk in chunks]
+
+    def send_json(recording) -> str:
+        chunk, audio = recording
+        data = {**chunk.model_dump(exclude={'audio'}), 'audio': base64.b64encode(audio).decode()}
+        return json.dumps({'type': VoiceEventType.VOICE_CHUNK.value, 'data': data}, separators=(',', ':'))
+
+    def send_binary(recording) -> bytes:
+        chunk, audio = recording
+        return AudioFrame(AudioFrameType.VOICE_CHUNK, chunk.stream_id, chunk.index, audio, is_final=chunk.is_final,
+                          metadata={'uid': chunk.uid, 'created_at': chunk.created_at}).encode()
+
+    json_messages = [send_json(recording) for recording in recordings]
+    binary_messages = [AudioFrame.of_voice_chunk(chunk).encode() for chunk in chunks]
+
+    def receive_json(text: str) -> bytes:
+        # listen and _handle_voice_message, then the voice stream decodes the audio
+        incoming_message = WebSocketMessage.model_validate(json.loads(text.encode().decode("utf-8")))
+        return VoiceChunk.model_validate(incoming_message.data).get_audio()
+
+    def receive_binary(data: bytes) -> bytes:
+        return AudioFrame.decode(data).to_voice_chunk().get_audio()
+
+    return {
+        'utterance_json': {
+            'chunks': len(chunks),
+            'kb_on_wire': sum(len(text.encode()) for text in json_messages) / 1024,
+            'server_us_per_chunk': measure(json_messages, receive_json, args.repeat),
+            'client_us_per_chunk': measure(recordings, send_json, args.repeat),
+        },
+        'utterance_binary': {
+            'chunks': len(chunks),
+            'kb_on_wire': sum(len(data) for data in binary_messages) / 1024,
+            'server_us_per_chunk': measure(binary_messages, receive_binary, args.repeat),
+            'client_us_per_chunk': measure(recordings, send_binary, args.repeat),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reply-seconds', type=int, default=15)
+    parser.add_argument('--tts-kbps', type=int, default=128)
+    parser.add_argument('--tts-chunk-ms', type=int, default=500)
+    parser.add_argument('--utterance-seconds', type=int, default=10)
+    parser.add_argument('--mic-kbps', type=int, default=48)
+    parser.add_argument('--timeslice-ms', type=int, default=250)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print_report(f'{args.reply_seconds}s reply, {args.utterance_seconds}s utterance', {
+        **tts_reply(args),
+        **user_utterance(args),
+    })
+
+
+if __name__ == '__main__':
+    main()
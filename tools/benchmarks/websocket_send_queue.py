@@ -0,0 +1,129 @@
+"""
+Throughput, latency and ordering of streamed text chunks sent to websocket clients, with a task per chunk against the
+per-connection send queue.
+
+``--connections`` agents each stream ``--tokens`` chunks, one every ``--token-interval-ms`` (0 streams them as fast as
+they are produced), through WebSocketConnection's serialization to a websocket that encodes the JSON like starlette
+and waits up to ``--jitter-ms`` before each write, like a write waiting for the transport to drain. The modes compare:
+
+- tasks: a task per chunk, how create_send_task sent them
+- queue: the send queue without coalescing
+- queue_coalesced: the send queue coalescing adjacent chunks within ``--coalesce-window-ms``
+
+``out_of_order`` counts chunks a client received after a later chunk of the same message, ``latency`` is from the
+chunk being produced to it being written. Chunks only overtake each other with tasks when the writes of one connection
+overlap, e.g. ``--connections 1 --jitter-ms 2``.
+
+    python -m tools.benchmarks.websocket_send_queue --connections 50 --tokens 500 --token-interval-ms 0
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, List
+from unittest.mock import MagicMock
+
+from starlette.websockets import WebSocketState
+
+from tools.benchmarks import print_report, summarize
+
+
+class FakeWebSocket:
+    application_state = WebSocketState.CONNECTED
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self, produced_at: Dict[int, float], latencies: List[float], jitter: float):
+        self.produced_at = produced_at
+        self.latencies = latencies
+        self.jitter = jitter
+        self.messages = 0
+        self.last_index = -1
+        self.out_of_order = 0
+
+    async def send_json(self, data) -> None:
+        text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        await asyncio.sleep(random.uniform(0, self.jitter) if self.jitter else 0)
+        now = time.perf_counter()
+        self.messages += 1
+        for token in json.loads(text)['data']['content'].split():
+            index = int(token)
+            self.latencies.append(now - self.produced_at.pop(index))
+            if index < self.last_index:
+                self.out_of_order += 1
+            self.last_index = max(self.last_index, index)
+
+
+async def stream(mode: str, latencies: List[float], args) -> FakeWebSocket:
+    from src.framework import MessageChunk, MessageRole
+    from src.settings.websocket import WebSocketSendQueueSettings
+    from src.websocket import PacketStreamChunkEvent, WebSocketConnection, WebSocketSendQueue
+
+    produced_at: Dict[int, float] = {}
+    websocket = FakeWebSocket(produced_at, latencies, args.jitter_ms / 1000)
+    connection = WebSocketConnection(client_id='client', scenario_instance_id='instance')
+    connection._websocket = websocket
+    connection.logger = MagicMock()
+    connection._send_queue = WebSocketSendQueue(
+        connection._send_now,
+        lambda coroutine: connection.create_task(coroutine, group='send'),
+        WebSocketSendQueueSettings(
+            coalesce_window=args.coalesce_window_ms / 1000 if mode == 'queue_coalesced' else 0,
+            coalesce_max_bytes=args.coalesce_max_bytes if mode == 'queue_coalesced' else 0,
+        ),
+    )
+
+    for index in range(args.tokens):
+        event = PacketStreamChunkEvent(data=MessageChunk(
+            index=index, message_id='message', role=MessageRole.ai, content=f'{index} ',
+            is_final=index == args.tokens - 1))
+        produced_at[index] = time.perf_counter()
+        if mode == 'tasks':
+            connection.create_task(connection._send_now(event), group='send')
+        else:
+            connection.send_nowait(event)
+        await asyncio.sleep(args.token_interval_ms / 1000)
+
+    while produced_at:
+        await asyncio.sleep(0.001)
+    await connection.cleanup_async()
+    return websocket
+
+
+async def run(mode: str, args) -> Dict[str, float]:
+    await stream(mode, [], argparse.Namespace(**{**vars(args), 'tokens': 20, 'jitter_ms': 0}))  # imports and warms up
+
+    latencies: List[float] = []
+    start = time.perf_counter()
+    websockets = await asyncio.gather(*(stream(mode, latencies, args) for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latency = summarize(latencies)
+    return {
+        'chunks_per_s': len(latencies) / elapsed,
+        'ws_messages': sum(websocket.messages for websocket in websockets),
+        'out_of_order': sum(websocket.out_of_order for websocket in websockets),
+        'latency_p50_ms': latency['p50_ms'],
+        'latency_p99_ms': latency['p99_ms'],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=50)
+    parser.add_argument('--tokens', type=int, default=500)
+    parser.add_argument('--token-interval-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--coalesce-window-ms', type=float, default=10)
+    parser.add_argument('--coalesce-max-bytes', type=int, default=4096)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {mode: asyncio.run(run(mode, args)) for mode in ('tasks', 'queue', 'queue_coalesced')}
+    print_report(f'{args.connections} connections, {args.tokens} chunks every {args.token_interval_ms}ms, '
+                 f'{args.jitter_ms}ms write jitter', results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+CPU-only Whisper transcription latency and RSS, comparing the previous per-call behaviour (load the model and
+create a thread pool for every utterance) against the resident model pool and shared inference executor.
+
+Synthetic wav fixtures (voiced tone bursts with noise) are generated on the fly, so no audio assets are needed.
+
+    python -m tools.benchmarks.whisper_pool --model base --utterances 8 --concurrency 4
+"""
+import argparse
+import asyncio
+import io
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+from tools.benchmarks import Timer, current_rss_mb, peak_rss_mb, print_report, summarize
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_wav(seconds: float, seed: int) -> bytes:
+    """A speech-like signal: harmonic bursts with a moving pitch, separated by short pauses, plus noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.5 * t + seed)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 3 * t) > -0.3).astype(np.float32)
+    signal = 0.3 * voiced * envelope + 0.02 * rng.standard_normal(t.shape)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+async def run_legacy(fixtures: List[bytes], model_name: str, concurrency: int) -> List[float]:
+    import torch
+    import whisper
+    from src.framework.utils import CreateWavFile
+
+    def transcribe(data: bytes) -> str:
+        with CreateWavFile(data, mime_type='audio/webm;codec=opus') as file_path:
+            audio = whisper.load_audio(file_path)
+        model = whisper.load_model(model_name, torch.device('cpu'))
+        audio = whisper.pad_or_trim(audio)
+        mel = whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels).to(model.device)
+        return whisper.decode(model, mel, whisper.DecodingOptions(language='en', fp16=False)).text
+
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+
+    async def one(data: bytes) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            with ThreadPoolExecutor() as executor:
+                await asyncio.get_running_loop().run_in_executor(executor, transcribe, data)
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(data) for data in fixtures))
+    return samples
+
+
+async def run_pooled(fixtures: List[bytes], model_name: str, concurrency: int) -> List[float]:
+    from src.framework.runnables.generators.speech_to_text.models import SpeechToTextGenerationParams
+    from src.framework.runnables.generators.speech_to_text.services.whisper import WhisperGenerationService
+
+    service = WhisperGenerationService()
+    params = SpeechToTextGenerationParams(model=model_name, device='cpu')
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+
+    async def one(data: bytes) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await service.run_async(data, params)
+            samples.append(time.perf_counter() - start)
+
+    # First call loads the model, as it would on a cold worker without preloading
+    await one(fixtures[0])
+    await asyncio.gather(*(one(data) for data in fixtures[1:]))
+    print(f'  executor stats: {service.stats()["executor"]}')
+    return samples
+
+
+async def main(model_name: str, utterances: int, seconds: float, concurrency: int, mode: str) -> None:
+    fixtures = [synthetic_wav(seconds, seed) for seed in range(utterances)]
+    results: Dict[str, Dict[str, float]] = {}
+    baseline_rss = current_rss_mb()
+
+    runners = {'legacy_per_call': run_legacy, 'resident_pool': run_pooled}
+    for name, runner in runners.items():
+        if mode != 'both' and not name.startswith(mode):
+            continue
+        with Timer() as timer:
+            samples = await runner(fixtures, model_name, concurrency)
+        results[name] = {
+            **summarize(samples),
+            'wall_s': timer.elapsed,
+            'rss_mb': current_rss_mb() - baseline_rss,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    print_report(f'Whisper {model_name} on CPU ({utterances} x {seconds}s utterances, concurrency {concurrency})',
+                 results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--utterances', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--mode', choices=['legacy', 'resident', 'both'], default='both',
+                        help='Run one side per process to get a clean peak RSS reading')
+    args = parser.parse_args()
+    asyncio.run(main(args.model, args.utterances, args.seconds, args.concurrency, args.mode))